@@ -217,6 +217,7 @@ def start_wallet_monitoring():
         from config import Config
         from flask import current_app
         telegram_notifier = current_app.config.get('TELEGRAM_NOTIFIER')
+        from services.redis_pool import get_redis_client
         paper_trader = PaperTrader()
 
         monitor = WalletActivityMonitor(
@@ -224,6 +225,8 @@ def start_wallet_monitoring():
             poll_interval=21600,
             telegram_notifier=telegram_notifier,
             paper_trader=paper_trader,
+            # Persist open multi-wallet windows so a restart doesn't drop them
+            signal_window_redis=get_redis_client(),
         )
         current_app.config['WALLET_MONITOR'] = monitor
         current_app.config['PAPER_TRADER'] = paper_trader
@@ -128,6 +128,20 @@ celery.conf.beat_schedule = {
         'options': {'expires': 9},
     },
 
+    # Telegram delivery retry queue — every 5 seconds
+    'drain-telegram-delivery': {
+        'task': 'tasks.drain_telegram_delivery',
+        'schedule': 5.0,
+        'options': {'expires': 4},
+    },
+
+    # Wallet → watchers index rebuild (Helius fan-out) — every 6 hours
+    'rebuild-wallet-watchers-index': {
+        'task': 'tasks.rebuild_wallet_watchers_index',
+        'schedule': crontab(hour='*/6', minute=20),
+        'options': {'expires': 3600, 'queue': 'stats'},
+    },
+
     # Forward price-path capture for the co-buy substrate — every 3 minutes
     'capture-cobuy-price-paths': {
         'task': 'tasks.capture_cobuy_price_paths',
@@ -215,6 +229,9 @@ celery.conf.task_routes = {
     'tasks.send_paper_trader_daily_digest': {'queue': 'stats'},
     'tasks.ingest_helius_signal':    {'queue': 'alerts'},
     'tasks.flush_signal_aggregator': {'queue': 'alerts'},
+    'tasks.drain_telegram_delivery': {'queue': 'alerts'},
+    'tasks.fanout_wallet_alerts':    {'queue': 'alerts'},
+    'tasks.rebuild_wallet_watchers_index': {'queue': 'stats'},
     'tasks.capture_cobuy_price_paths': {'queue': 'stats'},
     'tasks.score_paper_variants':      {'queue': 'stats'},
     'tasks.send_telegram_alert_async':    {'queue': 'alerts'},
@@ -256,6 +273,8 @@ print("""
   💾 Redis → DuckDB flush:     Every hour (:30)
   🔄 ATH cache invalidation:   Every hour (:45)
   📡 Signal aggregator flush:    Every 10 seconds
+  ✉️  Telegram retry drain:      Every 5 seconds
+  👀 Watchers index rebuild:   Every 6 hours (:20)
   📈 Paper trader exit checks:  Every 2 minutes
   📧 Paper trader digest:      Daily 7am UTC
   🗑️  Notification TTL purge:    Daily 2:30am UTC
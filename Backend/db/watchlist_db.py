@@ -5,6 +5,7 @@ import logging
 from typing import List, Dict, Optional
 
 from services.supabase_client import get_supabase_client, SCHEMA_NAME
+from services.wallet_watchers_index import invalidate as invalidate_watchers
 
 logger = logging.getLogger(__name__)
 
@@ -212,6 +213,7 @@ class WatchlistDatabase:
                 normalized, 
                 on_conflict='user_id,wallet_address'
             ).execute()
+            invalidate_watchers(normalized['wallet_address'])
             return True
         except Exception as e:
             print(f"[WATCHLIST DB] Error: {e}")
@@ -261,6 +263,7 @@ class WatchlistDatabase:
             self._table('wallet_watchlist').delete().eq(
                 'user_id', user_id
             ).eq('wallet_address', wallet_address).execute()
+            invalidate_watchers(wallet_address)
             return True
         except Exception as e:
             print(f"[WATCHLIST DB] Error removing wallet: {e}")
@@ -338,6 +341,7 @@ class WatchlistDatabase:
             self._table('wallet_watchlist').update(update_data).eq(
                 'user_id', user_id
             ).eq('wallet_address', wallet_address).execute()
+            invalidate_watchers(wallet_address)
 
             return True
 
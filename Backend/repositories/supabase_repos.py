@@ -48,6 +48,12 @@ def _ensure_user(user_id: str, wallet_address: str | None = None) -> None:
         logger.warning("ensure_user failed for %s: %s", user_id, exc)
 
 
+def _invalidate_watchers(wallet_address: str | None) -> None:
+    """Drop the Helius watcher index entry after a watchlist write."""
+    from services.wallet_watchers_index import invalidate
+    invalidate(wallet_address)
+
+
 # ===========================================================================
 # Twitter account watchlist
 # ===========================================================================
@@ -247,6 +253,7 @@ class SupabaseWalletWatchlistRepo(WalletWatchlistRepository):
             _table('wallet_watchlist').upsert(
                 normalized, on_conflict='user_id,wallet_address',
             ).execute()
+            _invalidate_watchers(normalized['wallet_address'])
             return True
         except Exception as exc:
             logger.error("add_wallet failed: %s", exc, exc_info=True)
@@ -279,6 +286,7 @@ class SupabaseWalletWatchlistRepo(WalletWatchlistRepository):
             _table('wallet_watchlist').delete().eq(
                 'user_id', user_id,
             ).eq('wallet_address', wallet_address).execute()
+            _invalidate_watchers(wallet_address)
             return True
         except Exception as exc:
             logger.error("remove_wallet failed: %s", exc)
@@ -318,6 +326,7 @@ class SupabaseWalletWatchlistRepo(WalletWatchlistRepository):
             _table('wallet_watchlist').update(update_data).eq(
                 'user_id', user_id,
             ).eq('wallet_address', wallet_address).execute()
+            _invalidate_watchers(wallet_address)
             return True
         except Exception as exc:
             logger.error("update_wallet_alert_settings failed: %s", exc)
@@ -487,6 +496,7 @@ class SupabaseWalletWatchlistRepo(WalletWatchlistRepository):
         try:
             _ensure_user(user_id)
             _table('wallet_watchlist').insert(data).execute()
+            _invalidate_watchers(data.get('wallet_address'))
             return True
         except Exception as exc:
             logger.error("add_wallet_raw failed: %s", exc, exc_info=True)
@@ -526,6 +536,7 @@ class SupabaseWalletWatchlistRepo(WalletWatchlistRepository):
             _table('wallet_watchlist').update(data).eq(
                 'user_id', user_id,
             ).eq('wallet_address', wallet_address).execute()
+            _invalidate_watchers(wallet_address)
             return True
         except Exception as exc:
             logger.error("update_wallet_fields failed: %s", exc)
@@ -6,6 +6,7 @@ import secrets
 from datetime import datetime, timedelta, timezone
 
 from flask import Blueprint, request, jsonify
+from services import bot_user_cache
 from services.referral_points_manager import get_referral_manager
 from services.supabase_client import get_supabase_client, SCHEMA_NAME
 from services.email_service import get_email_service
@@ -190,6 +191,29 @@ def handle_magic_link(token):
 
 # ── Bot Signup ─────────────────────────────────────────────────────────────────
 
+def _link_telegram_chat(supabase, user_id: str, chat_id: str) -> None:
+    """Point ``user_id``'s telegram_users row at ``chat_id`` and drop stale bot contexts."""
+    db = supabase.schema(SCHEMA_NAME)
+    previous = db.table("telegram_users").select("user_id").eq("telegram_chat_id", chat_id).execute()
+    existing = db.table("telegram_users").select("id").eq("user_id", user_id).limit(1).execute()
+    if not existing.data:
+        db.table("telegram_users").insert({
+            "user_id": user_id,
+            "telegram_chat_id": chat_id,
+        }).execute()
+    else:
+        db.table("telegram_users").update({
+            "telegram_chat_id": chat_id,
+        }).eq("user_id", user_id).execute()
+
+    # The chat may have belonged to another account, and this account may
+    # still be cached under its previous chat.
+    bot_user_cache.invalidate(chat_id)
+    for old_user_id in {row.get("user_id") for row in previous.data or []} - {user_id}:
+        bot_user_cache.invalidate_user(old_user_id)
+    bot_user_cache.invalidate_user(user_id)
+
+
 @auth_bp.route('/bot-signup', methods=['POST'])
 def handle_bot_signup():
     """Create a new user account from Telegram (email + password)."""
@@ -225,22 +249,7 @@ def handle_bot_signup():
         # The trigger on auth.users INSERT auto-creates the sifter_dev.users row.
         # Link the Telegram chat_id now.
         try:
-            existing = (
-                supabase.schema(SCHEMA_NAME).table("telegram_users")
-                .select("id")
-                .eq("user_id", user_id)
-                .limit(1)
-                .execute()
-            )
-            if not existing.data:
-                supabase.schema(SCHEMA_NAME).table("telegram_users").insert({
-                    "user_id": user_id,
-                    "telegram_chat_id": chat_id,
-                }).execute()
-            else:
-                supabase.schema(SCHEMA_NAME).table("telegram_users").update({
-                    "telegram_chat_id": chat_id,
-                }).eq("user_id", user_id).execute()
+            _link_telegram_chat(supabase, user_id, chat_id)
         except Exception as exc:
             logger.exception("[AUTH] bot-signup: telegram_users link failed for %s: %s", user_id, exc)
             # User was created but Telegram link failed — still return success
@@ -318,22 +327,7 @@ def handle_bot_login():
 
         # Link / refresh the Telegram chat_id (same pattern as bot-signup).
         try:
-            existing = (
-                supabase.schema(SCHEMA_NAME).table("telegram_users")
-                .select("id")
-                .eq("user_id", user_id)
-                .limit(1)
-                .execute()
-            )
-            if not existing.data:
-                supabase.schema(SCHEMA_NAME).table("telegram_users").insert({
-                    "user_id": user_id,
-                    "telegram_chat_id": chat_id,
-                }).execute()
-            else:
-                supabase.schema(SCHEMA_NAME).table("telegram_users").update({
-                    "telegram_chat_id": chat_id,
-                }).eq("user_id", user_id).execute()
+            _link_telegram_chat(supabase, user_id, chat_id)
         except Exception as exc:
             logger.exception("[AUTH] bot-login: telegram_users link failed for %s: %s", user_id, exc)
             return jsonify({'error': 'Logged in but could not link Telegram. Try /start.'}), 500
@@ -5,8 +5,9 @@ Replaces SolanaTracker polling as the primary wallet monitoring signal source.
 from __future__ import annotations
 import hmac, logging, os
 from typing import Any, Dict, List, Optional
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, jsonify, request
 
+from services.ingress_limiter import rate_limit
 from services.supabase_client import get_supabase_client, SCHEMA_NAME
 
 try:
@@ -80,19 +81,19 @@ def _extract_swap_signal(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 def _process_signal(signal: Dict[str, Any]) -> None:
     """
     Process a validated swap signal:
-    1. Create notifications for all users watching this wallet
-    2. Send Telegram alerts
+    1. Create notifications for all users watching this wallet (one bulk insert)
+    2. Queue Telegram alerts (one fan-out task, sent off the request path)
     3. Record paper trades for auto-trading users
+
+    Watchers come from the Redis wallet → watchers index, so the work done
+    here doesn't grow with the audience beyond building the insert payload.
     """
     wallet_address = signal["wallet_address"]
-    supabase = get_supabase_client()
 
     # Find all users watching this wallet with alerts enabled
     try:
-        result = supabase.schema(SCHEMA_NAME).table("wallet_watchlist").select(
-            "user_id, alert_enabled, alert_threshold_usd, min_trade_usd, alert_on_buy, alert_on_sell"
-        ).eq("wallet_address", wallet_address).eq("alert_enabled", True).execute()
-        watchers = result.data or []
+        from services.wallet_watchers_index import get_watchers
+        watchers = get_watchers(wallet_address)
     except Exception as e:
         logger.error("[HELIUS] action=query_watchers status=failed wallet=%s error=%s", wallet_address[:8], str(e)[:200])
         watchers = []
@@ -101,60 +102,56 @@ def _process_signal(signal: Dict[str, Any]) -> None:
         logger.debug("[HELIUS] action=process status=no_watchers wallet=%s", wallet_address[:8])
         return
 
-    # Create notifications and send Telegram alerts
-    telegram_notifier = current_app.config.get("TELEGRAM_NOTIFIER")
-    notifications_created = 0
-
+    usd_value = signal.get("usd_value", 0)
+    recipients = []
     for watcher in watchers:
-        user_id = watcher["user_id"]
-        usd_value = signal.get("usd_value", 0)
-
         # Check threshold filters
         min_trade = float(watcher.get("min_trade_usd") or 0)
         if min_trade > 0 and usd_value < min_trade:
             continue
-
-        alert_on_buy = watcher.get("alert_on_buy", True)
-        if not alert_on_buy:
+        if watcher.get("alert_on_buy") is False:
             continue
+        recipients.append(watcher["user_id"])
 
-        # Insert notification
+    # Create notifications in one insert
+    notifications_created = 0
+    if recipients:
+        metadata = {
+            "token_address": signal["token_address"],
+            "tx_hash": signal["tx_hash"],
+            "usd_value": usd_value,
+            "source": "helius_webhook",
+            "sol_amount": signal.get("sol_amount", 0),
+        }
+        rows = [{
+            "user_id": user_id,
+            "wallet_address": wallet_address,
+            "notification_type": "buy",
+            "title": f"BUY: {signal['token_ticker']}",
+            "message": f"${usd_value:.2f} buy via Helius webhook",
+            "metadata": metadata,
+        } for user_id in recipients]
         try:
-            supabase.schema(SCHEMA_NAME).table("wallet_notifications").insert({
-                "user_id": user_id,
-                "wallet_address": wallet_address,
-                "notification_type": "buy",
-                "title": f"BUY: {signal['token_ticker']}",
-                "message": f"${usd_value:.2f} buy via Helius webhook",
-                "metadata": {
+            get_supabase_client().schema(SCHEMA_NAME).table("wallet_notifications").insert(rows).execute()
+            notifications_created = len(rows)
+        except Exception as e:
+            logger.error("[HELIUS] action=create_notifications status=failed wallet=%s count=%d error=%s",
+                         wallet_address[:8], len(rows), str(e)[:200])
+
+        # Send Telegram alerts from the alerts queue, not the request
+        try:
+            from services.tasks import fanout_wallet_alerts
+            fanout_wallet_alerts.delay(recipients, {
+                "wallet": {"address": wallet_address, "tier": signal.get("wallet_tier", "C")},
+                "trade": {
+                    "token_ticker": signal["token_ticker"],
                     "token_address": signal["token_address"],
+                    "amount_usd": usd_value,
                     "tx_hash": signal["tx_hash"],
-                    "usd_value": usd_value,
-                    "source": "helius_webhook",
-                    "sol_amount": signal.get("sol_amount", 0),
                 },
-            }).execute()
-            notifications_created += 1
+            })
         except Exception as e:
-            logger.error("[HELIUS] action=create_notification status=failed user=%s error=%s", user_id[:8], str(e)[:200])
-
-        # Send Telegram alert
-        if telegram_notifier:
-            try:
-                telegram_notifier.send_wallet_alert(
-                    user_id=user_id,
-                    alert_type="trade",
-                    data={
-                        "wallet_address": wallet_address,
-                        "side": "buy",
-                        "token_ticker": signal["token_ticker"],
-                        "token_address": signal["token_address"],
-                        "usd_value": usd_value,
-                        "tx_hash": signal["tx_hash"],
-                    },
-                )
-            except Exception as e:
-                logger.error("[HELIUS] action=telegram_alert status=failed user=%s error=%s", user_id[:8], str(e)[:200])
+            logger.error("[HELIUS] action=queue_fanout status=failed wallet=%s error=%s", wallet_address[:8], str(e)[:200])
 
     if notifications_created > 0:
         logger.info("[HELIUS] action=notify wallet=%s notifications=%d", wallet_address[:8], notifications_created)
@@ -209,41 +206,24 @@ def _maybe_record_paper_trades(signal: Dict[str, Any], watchers: List[Dict]) ->
         logger.error("[HELIUS] action=paper_trade_module status=failed error=%s", str(e)[:200])
 
 
-_helius_rate_tracker: dict = {}  # IP -> (count, window_start)
-_HELIUS_RATE_LIMIT = 100  # max requests per minute per IP
+_HELIUS_RATE_LIMIT = 100  # max requests per minute per IP, across all workers
 _HELIUS_RATE_WINDOW = 60  # seconds
 
 
-def _check_helius_rate_limit(ip: str) -> bool:
-    """Simple in-memory rate limiter for the webhook endpoint."""
-    import time as _time
-    now = _time.time()
-    if ip in _helius_rate_tracker:
-        count, window_start = _helius_rate_tracker[ip]
-        if now - window_start > _HELIUS_RATE_WINDOW:
-            _helius_rate_tracker[ip] = (1, now)
-            return True
-        if count >= _HELIUS_RATE_LIMIT:
-            return False
-        _helius_rate_tracker[ip] = (count + 1, window_start)
-    else:
-        _helius_rate_tracker[ip] = (1, now)
-    return True
+def _helius_rate_limited(retry_after: float):
+    # 200, not 429 — Helius retries anything else and would amplify the burst.
+    return jsonify({"status": "rate_limited"}), 200
 
 
 @helius_bp.route("/api/webhooks/helius", methods=["POST"])
+@rate_limit("helius", _HELIUS_RATE_LIMIT, _HELIUS_RATE_WINDOW, on_limited=_helius_rate_limited)
 def helius_wallet_alert():
     """
     Helius webhook endpoint for enhanced transaction events.
     Always returns 200 to prevent Helius from retrying.
-    Rate limited to 100 req/min per IP.
+    Rate limited to 100 req/min per IP, shared across workers via Redis.
     """
-    # Rate limit check
     client_ip = request.remote_addr or "unknown"
-    if not _check_helius_rate_limit(client_ip):
-        logger.warning("[HELIUS] Rate limited IP=%s", client_ip)
-        return jsonify({"status": "rate_limited"}), 200
-
     auth_header = request.headers.get("Authorization", "")
     if not _verify_secret(auth_header):
         logger.warning("[HELIUS] Invalid webhook secret")
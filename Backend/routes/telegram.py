@@ -12,6 +12,7 @@ from routes import anon_user_id
 logger = logging.getLogger(__name__)
 
 from auth import require_auth, optional_auth
+from services import bot_user_cache
 from services.supabase_client import is_supabase_available
 from services.telegram_notifier import TelegramNotifier
 from repositories.registry import get_telegram_repo
@@ -39,6 +40,33 @@ def _operator_error():
     return jsonify({'error': 'Operator access required'}), 403
 
 
+def _process_update(update: dict):
+    if telegram_notifier:
+        telegram_notifier.process_bot_updates([update])
+
+
+def _answer_discarded_query(update: dict, status: str):
+    """Stop the button spinner for a callback query the dispatcher collapsed or shed."""
+    if telegram_notifier:
+        telegram_notifier._make_request(
+            "answerCallbackQuery", {"callback_query_id": update["callback_query"].get("id")})
+
+
+_update_dispatcher = None
+_update_dispatcher_lock = threading.Lock()
+
+
+def _get_update_dispatcher():
+    global _update_dispatcher
+    if _update_dispatcher is None:
+        with _update_dispatcher_lock:
+            if _update_dispatcher is None:
+                from services.telegram_update_dispatcher import UpdateDispatcher
+                _update_dispatcher = UpdateDispatcher(
+                    _process_update, on_discard=_answer_discarded_query)
+    return _update_dispatcher
+
+
 def _get_paper_trader():
     try:
         from flask import current_app
@@ -237,6 +265,7 @@ def telegram_webhook():
     Ultra-fast webhook handler - queues processing immediately
     Responds to Telegram in <50ms
     """
+    started = time.perf_counter()
     if not telegram_notifier:
         return jsonify({'error': 'Telegram not configured'}), 503
 
@@ -256,24 +285,15 @@ def telegram_webhook():
         logger.warning("[TELEGRAM WEBHOOK] Invalid secret token")
         return jsonify({'error': 'Unauthorized'}), 401
 
-    # Handle callback queries (button clicks)
-    if 'callback_query' in update:
-        threading.Thread(
-            target=telegram_notifier._handle_callback,
-            args=(update['callback_query'],),
-            daemon=True
-        ).start()
-        return jsonify({'ok': True}), 200
-
-    # Handle messages
-    if 'message' in update:
-        # Process in background thread
-        threading.Thread(
-            target=telegram_notifier.process_bot_updates,
-            args=([update],),
-            daemon=True
-        ).start()
-        print(f"[TELEGRAM WEBHOOK] ✓ Update queued")
+    # Button clicks and messages go to the bounded per-chat worker pool
+    if 'callback_query' in update or 'message' in update:
+        dispatcher = _get_update_dispatcher()
+        status = dispatcher.submit(update)
+        dispatcher.record_ack((time.perf_counter() - started) * 1000.0)
+        if status == 'overflow':
+            # Non-2xx makes Telegram redeliver later instead of us queueing without bound
+            logger.warning("[TELEGRAM WEBHOOK] Update queue full — asking Telegram to retry")
+            return jsonify({'ok': False, 'error': 'busy'}), 503
 
     # Respond immediately (Telegram requires <1s response)
     return jsonify({'ok': True}), 200
@@ -327,6 +347,8 @@ def operator_status():
         'status': runtime.get_status(),
         'summary': trader.get_summary(),
         'failure_report': trader.get_failure_report(),
+        'webhook': _update_dispatcher.metrics() if _update_dispatcher else None,
+        'user_ctx_cache': bot_user_cache.stats(),
     }), 200
 
 
@@ -8,6 +8,7 @@ logger = logging.getLogger(__name__)
 from config import Config
 from auth import require_auth, optional_auth
 from db.watchlist_db import WatchlistDatabase
+from services.wallet_watchers_index import invalidate as invalidate_watchers
 from collections import defaultdict
 from datetime import datetime
 import os
@@ -265,6 +266,7 @@ def recover_job(job_id):
 
     try:
         from services.supabase_client import get_supabase_client, SCHEMA_NAME
+        from services import redis_codec
         from redis import Redis
 
         redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379')
@@ -287,7 +289,7 @@ def recover_job(job_id):
         if not raw:
             return jsonify({'recovered': False, 'message': 'No result found in Redis — job genuinely incomplete'}), 404
 
-        result = json.loads(raw)
+        result = redis_codec.loads(raw)
         supabase.schema(SCHEMA_NAME).table('analysis_jobs').update({
             'status': 'completed', 'phase': 'done', 'progress': 100, 'results': result,
         }).eq('job_id', job_id).execute()
@@ -762,6 +764,7 @@ def add_wallet_to_watchlist():
             'last_updated':       added_at,
             'last_trade_time':    None,
         }).execute()
+        invalidate_watchers(wallet_data['wallet'])
 
         print(f"[WATCHLIST ADD] ✅ {wallet_data['wallet'][:8]}... score={wallet_data.get('professional_score', 0)} tier={wallet_data.get('tier', 'C')} consistency={wallet_data.get('consistency_score', 50)}")
 
@@ -917,6 +920,7 @@ def update_wallet_alert_settings():
         supabase.schema(SCHEMA_NAME).table('wallet_watchlist').update(
             update_data
         ).eq('user_id', user_id).eq('wallet_address', wallet_address).execute()
+        invalidate_watchers(wallet_address)
 
         return jsonify({'success': True, 'message': 'Alert settings updated'}), 200
 
@@ -960,7 +964,7 @@ def get_wallet_stats(wallet_address):
         from services.watchlist_manager import WatchlistLeagueManager
         manager = WatchlistLeagueManager()
         metrics = manager._refresh_wallet_metrics(wallet_address)
-        trades  = manager._get_recent_trades(wallet_address, days=30, limit=10)
+        trades  = manager._get_recent_trades(wallet_address, days=30, limit=10) or []
 
         return jsonify({'success': True, 'wallet_address': wallet_address,
                         'metrics': metrics, 'recent_trades': trades}), 200
@@ -1084,6 +1088,7 @@ def add_wallet_quick():
             'last_updated':       datetime.utcnow().isoformat(),
             'last_trade_time':    None,
         }).execute()
+        invalidate_watchers(wallet_address)
 
         print(f"[QUICK ADD] ✅ {wallet_address[:8]}... added")
         return jsonify({'success': True, 'message': f'Wallet {wallet_address[:8]}... added'}), 200
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Benchmark — bot_state hash layout vs the old whole-document JSON blob.
+
+Replays a wizard "keystroke" (merge one data field, keep the screen, clear the
+awaited input) for both layouts:
+
+  * legacy: GET → json decode → merge → SETEX of the whole document
+    (what ``set_state`` did before; reimplemented here as the baseline)
+  * hash:   ``bot_state.set_awaiting`` — HSET/HDEL + EXPIRE + HGETALL in one
+    MULTI/EXEC round trip
+
+and reports ops/sec, round trips and bytes written per op, plus lost updates
+when several threads write different fields of the same chat concurrently.
+
+Uses REDIS_URL by default; ``--memory-redis`` swaps in an in-process stand-in
+that sleeps ``--rtt-ms`` per round trip so the harness runs without Redis.
+
+Run:
+    python -m scripts.bot_state_benchmark --ops 2000 --threads 8
+    python -m scripts.bot_state_benchmark --memory-redis --rtt-ms 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from unittest.mock import patch
+
+CHAT = "bench-chat"
+BASE_DATA = {f"field_{i}": {"value": i, "label": f"wizard step {i}"} for i in range(12)}
+
+
+class _MemoryRedis:
+    """String + hash commands with a simulated network round trip per call."""
+
+    def __init__(self, rtt_s: float):
+        self.rtt_s = rtt_s
+        self.store = {}
+        self.lock = threading.RLock()
+        self.round_trips = 0
+        self.bytes_written = 0
+
+    def _trip(self):
+        with self.lock:
+            self.round_trips += 1
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    def _get(self, k):
+        return self.store.get(k)
+
+    def _setex(self, k, ttl, v):
+        self.bytes_written += len(v)
+        self.store[k] = v
+
+    def _hgetall(self, k):
+        return dict(self.store.get(k) or {})
+
+    def _hset(self, k, mapping):
+        self.bytes_written += sum(len(f) + len(v) for f, v in mapping.items())
+        self.store.setdefault(k, {}).update(mapping)
+
+    def _hdel(self, k, *fields):
+        for f in fields:
+            (self.store.get(k) or {}).pop(f, None)
+
+    def _expire(self, k, ttl):
+        return True
+
+    def _delete(self, k):
+        self.store.pop(k, None)
+
+    def __getattr__(self, name):
+        impl = getattr(self, f"_{name}", None)
+        if impl is None:
+            raise AttributeError(name)
+
+        def call(*a, **kw):
+            self._trip()
+            with self.lock:
+                return impl(*a, **kw)
+        return call
+
+    def hget(self, k, f):
+        self._trip()
+        return (self.store.get(k) or {}).get(f)
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((getattr(redis, f"_{name}"), a, kw))
+
+            def execute(self):
+                redis._trip()
+                with redis.lock:
+                    return [fn(*a, **kw) for fn, a, kw in ops]
+
+        return _Pipe()
+
+
+class _CountingRedis:
+    """Wraps a real client to count round trips and bytes written."""
+
+    def __init__(self, client):
+        self.client = client
+        self.round_trips = 0
+        self.bytes_written = 0
+        self.lock = threading.Lock()
+
+    def _count(self, written=0):
+        with self.lock:
+            self.round_trips += 1
+            self.bytes_written += written
+
+    def get(self, k):
+        self._count()
+        return self.client.get(k)
+
+    def setex(self, k, ttl, v):
+        self._count(len(v))
+        return self.client.setex(k, ttl, v)
+
+    def delete(self, k):
+        self._count()
+        return self.client.delete(k)
+
+    def hgetall(self, k):
+        self._count()
+        return self.client.hgetall(k)
+
+    def pipeline(self, transaction=True):
+        outer, pipe = self, self.client.pipeline(transaction=transaction)
+
+        class _Pipe:
+            written = 0
+
+            def hset(self, k, mapping):
+                _Pipe.written += sum(len(f) + len(v) for f, v in mapping.items())
+                return pipe.hset(k, mapping=mapping)
+
+            def __getattr__(self, name):
+                return getattr(pipe, name)
+
+            def execute(self):
+                outer._count(_Pipe.written)
+                return pipe.execute()
+
+        return _Pipe()
+
+
+def _legacy_set(redis, chat_id, data):
+    """The pre-hash set_awaiting: read, merge, rewrite the whole document."""
+    key = f"sifter:bot_state:{chat_id}"
+    raw = redis.get(key)
+    state = json.loads(raw) if raw else {"screen": "main", "awaiting": None, "data": {}}
+    state["awaiting"] = None
+    state["data"] = {**state.get("data", {}), **data}
+    state["updated_at"] = time.time()
+    redis.setex(key, 3600, json.dumps(state, default=str))
+
+
+def _legacy_data(redis, chat_id):
+    raw = redis.get(f"sifter:bot_state:{chat_id}")
+    return (json.loads(raw) if raw else {}).get("data", {})
+
+
+def _run(layout: str, redis, ops: int, threads: int):
+    from services import bot_state
+
+    def write(chat_id, data):
+        if layout == "legacy":
+            _legacy_set(redis, chat_id, data)
+        else:
+            bot_state.set_awaiting(chat_id, None, data=data)
+
+    with patch("services.bot_state.get_redis_client", return_value=redis):
+        redis.delete(f"sifter:bot_state:{CHAT}")
+        write(CHAT, BASE_DATA)
+
+        trips0, bytes0 = redis.round_trips, redis.bytes_written
+        t0 = time.perf_counter()
+        for i in range(ops):
+            write(CHAT, {"field_0": {"value": i, "label": "typing"}})
+        elapsed = time.perf_counter() - t0
+        trips = (redis.round_trips - trips0) / ops
+        written = (redis.bytes_written - bytes0) / ops
+
+        # Concurrent writers, each owning distinct fields of the same chat.
+        redis.delete(f"sifter:bot_state:{CHAT}")
+        per_thread = max(1, ops // (threads * 4))
+
+        def writer(n):
+            for i in range(per_thread):
+                write(CHAT, {f"t{n}_{i}": i})
+
+        workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        if layout == "legacy":
+            kept = len(_legacy_data(redis, CHAT))
+        else:
+            kept = len(bot_state.get_state(CHAT)["data"])
+        expected = per_thread * threads
+        redis.delete(f"sifter:bot_state:{CHAT}")
+
+    print(f"{layout:>6}: {ops / elapsed:>9,.0f} ops/s  {trips:.1f} round trips/op  "
+          f"{written:>6,.0f} B written/op  | concurrent: {expected - kept:>4} of {expected} updates lost")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ops", type=int, default=2000)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--memory-redis", action="store_true", help="in-process Redis stand-in")
+    ap.add_argument("--rtt-ms", type=float, default=0.5, help="simulated RTT with --memory-redis")
+    args = ap.parse_args()
+
+    if args.memory_redis:
+        make = lambda: _MemoryRedis(args.rtt_ms / 1000.0)  # noqa: E731
+        where = f"in-process, {args.rtt_ms}ms simulated RTT"
+    else:
+        from services.redis_pool import get_redis_client
+        client = get_redis_client()
+        client.ping()
+        make = lambda: _CountingRedis(client)  # noqa: E731
+        where = "REDIS_URL"
+
+    print(f"=== BOT STATE — {args.ops} keystrokes, {args.threads} concurrent writers ({where}) ===")
+    for layout in ("legacy", "hash"):
+        _run(layout, make(), args.ops, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Benchmark — weekly ClickHouse backup: full FINAL copy vs incremental window.
+
+Builds a wallet_aggregate_stats-shaped table of ``--rows`` wallets, of which
+``--changed-pct`` got a new version during the week, and backs it up three ways:
+
+  * full:        every row read into dicts (``named_results`` over FINAL) and
+                 upserted (the pre-watermark behaviour, reimplemented as the
+                 baseline)
+  * first run:   ``_backup_table`` with no checkpoint (copies everything, but
+                 streams blocks instead of materialising the table)
+  * incremental: ``_backup_table`` one week later, copying only the rows
+                 changed since the previous window
+
+Then it interrupts an incremental run halfway (one upsert fails) and runs it
+again, to show the resume re-sends nothing.
+
+ClickHouse is an in-memory stand-in that yields 65k-row blocks. Every Supabase
+upsert sleeps ``--rtt-ms`` plus the payload over ``--mbps``. Peak Python
+memory is tracked with tracemalloc, which also inflates the times. The first
+run moves the same rows as the full copy but comes out somewhat slower: it
+JSON-encodes each batch once more to count ``bytes_sent``. Its gains are peak
+memory and resumability; the time saving comes from the incremental runs.
+
+Run:
+    python -m scripts.clickhouse_backup_benchmark
+    python -m scripts.clickhouse_backup_benchmark --rows 500000 --changed-pct 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from tasks import clickhouse_backup
+from tasks.clickhouse_backup import BATCH_SIZE, TABLE_SPECS, _backup_table, _serialize_value
+
+SPEC = next(s for s in TABLE_SPECS if s["ch_table"] == "wallet_aggregate_stats")
+COLUMNS = SPEC["columns"]
+UPD = COLUMNS.index("updated_at")
+T0 = datetime(2026, 7, 6, 2, 0)
+BLOCK = 65_536
+
+
+def _dataset(args):
+    rng = random.Random(7)
+    rows = []
+    for i in range(args.rows):
+        week_old = T0 - timedelta(days=rng.uniform(7, 180))
+        rows.append((f"Wallet{i:08d}", rng.randint(1, 200), rng.randint(0, 50), rng.randint(0, 30),
+                     rng.randint(0, 30), round(rng.uniform(0, 100), 2), round(rng.uniform(0, 20), 3),
+                     round(rng.uniform(-5e3, 5e4), 2), round(rng.uniform(0, 100), 2),
+                     rng.choice("SABC"), round(rng.uniform(0, 100), 2), week_old))
+    return rows
+
+
+def _new_versions(rows, args, at):
+    rng = random.Random(8)
+    n = len(rows) * args.changed_pct // 100
+    return [r[:5] + (round(rng.uniform(0, 100), 2),) + r[6:UPD] + (at,) for r in rng.sample(rows, n)]
+
+
+class _CH:
+    """Window query (latest version per key, keyset after ``a0``) over a list."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def _latest(self, since, until, after=None):
+        latest = {}
+        for row in self.rows:
+            if since < row[UPD] <= until and (after is None or row[0] > after):
+                if row[0] not in latest or row[UPD] > latest[row[0]][UPD]:
+                    latest[row[0]] = row
+        return [latest[k] for k in sorted(latest)]
+
+    @contextmanager
+    def query_row_block_stream(self, sql, parameters=None):
+        out = self._latest(parameters["since"], parameters["until"], parameters.get("a0"))
+        yield (out[i:i + BLOCK] for i in range(0, len(out), BLOCK))
+
+    def query(self, sql):
+        rows = self._latest(datetime.min, datetime.max)
+        return MagicMock(named_results=lambda: [dict(zip(COLUMNS, r)) for r in rows])
+
+
+class _Redis:
+    def __init__(self):
+        self.h = {}
+
+    def hget(self, key, field):
+        return self.h.get((key, field))
+
+    def hset(self, key, field, value):
+        self.h[(key, field)] = value
+
+
+def _supabase(args, fail_at=None):
+    sb = MagicMock()
+    sent = {"calls": 0, "rows": 0, "bytes": 0}
+
+    def upsert(batch, on_conflict):
+        sent["calls"] += 1
+        if sent["calls"] == fail_at:
+            raise Exception("statement timeout")
+        size = len(json.dumps(batch))
+        time.sleep(args.rtt_ms / 1000.0 + size / (args.mbps * 125_000))
+        sent["rows"] += len(batch)
+        sent["bytes"] += size
+        return MagicMock()
+
+    sb.schema.return_value.table.return_value.upsert.side_effect = upsert
+    return sb, sent
+
+
+def _full(ch, sb):
+    rows = list(ch.query("SELECT ... FINAL").named_results())
+    table = sb.schema().table(SPEC["sb_table"])
+    for i in range(0, len(rows), BATCH_SIZE):
+        batch = [{k: _serialize_value(v) for k, v in r.items()} for r in rows[i:i + BATCH_SIZE]]
+        table.upsert(batch, on_conflict=SPEC["on_conflict"]).execute()
+
+
+def _measure(label, fn, sent):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:>12}: {elapsed:>7.2f}s  {sent['rows']:>9,} rows  {sent['bytes'] / 1e6:>8.1f} MB sent  "
+          f"{sent['rows'] / elapsed:>9,.0f} rows/s  peak {peak / 1e6:>6.1f} MB")
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000, help="wallets in the table")
+    ap.add_argument("--changed-pct", type=int, default=3, help="percent of wallets updated per week")
+    ap.add_argument("--rtt-ms", type=float, default=30.0, help="Supabase upsert round trip")
+    ap.add_argument("--mbps", type=float, default=200.0, help="link bandwidth for upsert bodies")
+    args = ap.parse_args()
+    logging.disable(logging.INFO)
+
+    rows = _dataset(args)
+    ch, r = _CH(rows), _Redis()
+    print(f"=== CLICKHOUSE BACKUP — {args.rows:,} rows, {args.changed_pct}% changed per week, "
+          f"upsert {args.rtt_ms}ms RTT, {args.mbps} Mbit/s ===")
+
+    sb, sent = _supabase(args)
+    full_s = _measure("full", lambda: _full(ch, sb), sent)
+
+    with patch.object(clickhouse_backup, "_utcnow", return_value=T0):
+        sb, sent = _supabase(args)
+        _measure("first run", lambda: _backup_table(ch, sb, SPEC, r), sent)
+
+    rows.extend(_new_versions(rows[:args.rows], args, T0 + timedelta(days=3)))
+    with patch.object(clickhouse_backup, "_utcnow", return_value=T0 + timedelta(days=7)):
+        sb, sent = _supabase(args)
+        inc_s = _measure("incremental", lambda: _backup_table(ch, sb, SPEC, r), sent)
+    print(f"incremental vs full: {full_s / inc_s:,.0f}x faster")
+
+    print("\n--- interrupted incremental run, then resume ---")
+    new = _new_versions(rows[:args.rows], args, T0 + timedelta(days=10))
+    rows.extend(new)
+    changed = len(new)
+    half = max(1, changed // BATCH_SIZE // 2 + 1)
+    with patch.object(clickhouse_backup, "_utcnow", return_value=T0 + timedelta(days=14)):
+        sb, sent_a = _supabase(args, fail_at=half)
+        a = _backup_table(ch, sb, SPEC, r)
+        sb, sent_b = _supabase(args)
+        b = _backup_table(ch, sb, SPEC, r)
+    print(f"interrupted: {a['rows_upserted']:,} rows before the failed batch (errors={a['errors']})")
+    print(f"resumed:     {b['rows_upserted']:,} rows (resumed={b['resumed']})")
+    total = a["rows_upserted"] + b["rows_upserted"]
+    print(f"total {total:,} of {changed:,} changed rows, "
+          f"{'none' if total == changed else total - changed} sent twice")
+
+
+if __name__ == "__main__":
+    main()
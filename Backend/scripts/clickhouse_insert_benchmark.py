@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Benchmark — per-call inserts vs the buffered columnar inserter.
+
+Pushes ``--rows`` synthetic token_scans rows through ``insert_token_scans``
+in calls of ``--call-rows`` rows (the size a qualification scan or discovery
+run sends), two ways:
+
+  * per-call: ``insert_token_scans(rows)`` — ``_dicts_to_rows`` then one
+              row-oriented INSERT per call (one new part each)
+  * buffered: ``insert_token_scans(rows, buffered=True)`` — rows appended to
+              column lists, one column-oriented INSERT per ``--flush-rows``
+
+and reports rows/sec, INSERT statements and parts created.
+
+Backends:
+  * ClickHouse (``--clickhouse``) — a scratch ``--database`` with the real
+    token_scans DDL. Parts are the level-0 (freshly inserted) parts in
+    system.parts, active or not. ``--async-insert`` also runs both paths with
+    server-side async inserts; "per-call + async" is how the acks_late
+    qualification tasks write (one small INSERT per scan, coalesced by the
+    server). Uses the usual CLICKHOUSE_* env vars.
+  * stand-in (default) — an in-process client that runs clickhouse-connect's
+    real Native encoder (lz4, as the app client compresses) on every insert,
+    and charges ``--rtt-ms`` plus the body over ``--mbps``. Every INSERT here
+    counts as one part, which matches the server for a single-partition batch.
+
+The stand-in has no server-side batching, so its buffered numbers only
+describe long-lived writers that batch in-process (token discovery), not the
+qualification tasks.
+
+On both backends the per-call run stops after ``--per-call-rows`` (it would
+take minutes at 1M rows, and on a server it would hit the too-many-parts
+limit). Its time and part count for the full ``--rows`` are projected from
+that sample.
+
+Run:
+    python -m scripts.clickhouse_insert_benchmark
+    python -m scripts.clickhouse_insert_benchmark --rows 1000000 --call-rows 50
+    python -m scripts.clickhouse_insert_benchmark --clickhouse --async-insert
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import patch
+
+from services import clickhouse_client
+from services.clickhouse_client import insert_token_scans
+from services.clickhouse_insert_buffer import ClickHouseInsertBuffer
+from services.clickhouse_schema import CREATE_TOKEN_SCANS_SQL
+
+SCAN_TS = datetime(2026, 7, 15, 12, 0)  # one partition, as a live scan batch would be
+
+
+def _columns():
+    body = CREATE_TOKEN_SCANS_SQL.split("(", 1)[1].rsplit(")", 1)[0]
+    body = body.split("\n)")[0]
+    cols = []
+    for line in body.strip().splitlines():
+        m = re.match(r"\s*(\w+)\s+(\w+(?:\([^)]*\))?)", line)
+        if m:
+            cols.append((m.group(1), m.group(2)))
+    return cols
+
+
+def _calls(args):
+    """Yield lists of ``--call-rows`` row dicts, ``--rows`` in total."""
+    n = 0
+    while n < args.rows:
+        size = min(args.call_rows, args.rows - n)
+        yield [{
+            "token_address": f"Mint{n + i:040d}", "scan_id": str(uuid.uuid4()), "discovered_via": "first",
+            "scan_timestamp": SCAN_TS, "launch_price": 0.0, "current_price": 1e-6 * (n + i),
+            "ath_price": 2e-6 * (n + i), "launch_to_ath_mult": 0.0, "launch_to_current_mult": 0.0,
+            "qualified_10x": 0, "qualified_30x": 0, "market_cap_usd": 1e5, "volume_24h_usd": 5e4,
+            "liquidity_usd": 2e4, "holder_count": 100 + i, "scan_window_days": 30,
+            "token_symbol": "SYM", "token_name": "Token", "updated_at": SCAN_TS,
+        } for i in range(size)]
+        n += size
+
+
+class _StandIn:
+    """Encodes each insert with clickhouse-connect's Native transform, then 'sends' it."""
+
+    def __init__(self, args):
+        from clickhouse_connect.datatypes.registry import get_from_name
+        self.types = {name: get_from_name(t) for name, t in _columns()}
+        self.args, self.inserts, self.bytes = args, 0, 0
+
+    def insert(self, table, data, column_names, database=None, column_oriented=False, settings=None):
+        from clickhouse_connect.driver.insert import InsertContext
+        from clickhouse_connect.driver.transform import NativeTransform
+        ctx = InsertContext(table, column_names, [self.types[c] for c in column_names], data,
+                            column_oriented=column_oriented, compression="lz4")
+        size = sum(len(chunk) for chunk in NativeTransform.build_insert(ctx))
+        time.sleep(self.args.rtt_ms / 1000.0 + size / (self.args.mbps * 125_000))
+        self.inserts += 1
+        self.bytes += size
+
+    def parts(self):
+        return self.inserts
+
+
+class _Server:
+    def __init__(self, args):
+        self.args = args
+        self.ch = clickhouse_client._connect(database=args.database, autogenerate_session_id=False)
+        self.ch.command("DROP TABLE IF EXISTS token_scans")
+        self.ch.command(CREATE_TOKEN_SCANS_SQL)
+        self.inserts = 0
+
+    def insert(self, **kw):
+        self.inserts += 1
+        return self.ch.insert(**kw)
+
+    def parts(self):
+        return self.ch.query(
+            "SELECT count() FROM system.parts WHERE database = {db:String} AND table = 'token_scans' AND level = 0",
+            parameters={"db": self.args.database},
+        ).first_row[0]
+
+
+def _run(label, args, backend, buffered, limit=None, async_insert=False):
+    rows = 0
+    t0 = time.perf_counter()
+    with patch.object(clickhouse_client, "CH_DATABASE", args.database if args.clickhouse else "bench"):
+        if buffered:
+            buf = ClickHouseInsertBuffer(flush_rows=args.flush_rows, flush_interval_s=60,
+                                         client_factory=lambda: backend, async_insert=async_insert)
+            with patch("services.clickhouse_insert_buffer.get_insert_buffer", return_value=buf), \
+                 patch("services.clickhouse_insert_buffer.CH_DATABASE", args.database):
+                for call in _calls(args):
+                    insert_token_scans(call, buffered=True)
+                    rows += len(call)
+                buf.close()
+        else:
+            with patch.object(clickhouse_client, "get_clickhouse_client", return_value=backend):
+                for call in _calls(args):
+                    insert_token_scans(call, async_insert=async_insert)
+                    rows += len(call)
+                    if limit and rows >= limit:
+                        break
+    elapsed = time.perf_counter() - t0
+    parts = backend.parts()
+    note = ""
+    if rows < args.rows:
+        note = (f"  (sample of {rows:,}; for {args.rows:,}: ~{args.rows / (rows / elapsed):,.0f}s, "
+                f"~{parts * args.rows // rows:,} parts)")
+    print(f"{label:>17}: {elapsed:>7.1f}s  {rows / elapsed:>10,.0f} rows/s  "
+          f"{backend.inserts:>7,} INSERTs  {parts:>7,} parts{note}")
+    return rows / elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--call-rows", type=int, default=20, help="rows per insert_token_scans call")
+    ap.add_argument("--flush-rows", type=int, default=50_000, help="buffer block size")
+    ap.add_argument("--rtt-ms", type=float, default=8.0, help="stand-in INSERT round trip")
+    ap.add_argument("--mbps", type=float, default=200.0, help="stand-in link bandwidth")
+    ap.add_argument("--clickhouse", action="store_true", help="run against a ClickHouse server")
+    ap.add_argument("--database", default="bench_inserts", help="scratch ClickHouse database")
+    ap.add_argument("--per-call-rows", type=int, default=40_000, help="rows sent per-call before projecting")
+    ap.add_argument("--async-insert", action="store_true", help="also run buffered with async_insert")
+    args = ap.parse_args()
+
+    print(f"=== CLICKHOUSE INSERTS — {args.rows:,} token_scans rows in {args.call_rows}-row calls, "
+          f"{args.flush_rows:,}-row blocks, {'ClickHouse' if args.clickhouse else 'stand-in'} ===")
+    if args.clickhouse:
+        clickhouse_client._connect(database="default").command(f"CREATE DATABASE IF NOT EXISTS `{args.database}`")
+        per_call = _run("per-call", args, _Server(args), buffered=False, limit=args.per_call_rows)
+        buffered = _run("buffered", args, _Server(args), buffered=True)
+        if args.async_insert:
+            _run("per-call + async", args, _Server(args), buffered=False, limit=args.per_call_rows,
+                 async_insert=True)
+            _run("buffered + async", args, _Server(args), buffered=True, async_insert=True)
+        clickhouse_client._connect(database="default").command(f"DROP DATABASE IF EXISTS `{args.database}`")
+    else:
+        per_call = _run("per-call", args, _StandIn(args), buffered=False, limit=args.per_call_rows)
+        buffered = _run("buffered", args, _StandIn(args), buffered=True)
+    print(f"buffered vs per-call: {buffered / per_call:,.1f}x rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Benchmark — wallet read queries: FINAL vs argMax / read models.
+
+Loads a scratch ``--database`` on a local ClickHouse with the real DDL from
+services/clickhouse_schema.py:
+
+  * wallet_token_stats: ``--wallets`` x ``--tokens-per-wallet`` keys, with
+    ``--versions`` versions each, inserted in separate batches so the parts
+    stay unmerged (as between background merges in production)
+  * wallet_aggregate_stats: one row per wallet per batch, via mv_wallet_aggregate
+  * wallet_aggregate_latest: fed by mv_wallet_aggregate_latest
+
+It then times each read two ways: the previous FINAL query (kept verbatim
+below as the baseline) and the one services/clickhouse_client.py now sends.
+Each query runs ``--repeat`` times, and the median, rows read and bytes read
+are reported. Results are compared, so a variant that disagrees with FINAL
+is flagged. mv_wallet_aggregate aggregates per insert block, so a wallet whose
+keys straddle two blocks of the same batch gets two versions with the same
+second. FINAL and argMax may pick different ones, which can show as a rare
+"NO" on wallet_stats or elite_100; that is a data tie, not a dedup bug.
+
+Needs a server: this has no in-process stand-in, because FINAL/argMax costs
+are specific to ClickHouse. Uses the usual CLICKHOUSE_* env vars; e.g.
+``docker run -p 8123:8123 clickhouse/clickhouse-server`` with
+CLICKHOUSE_PORT=8123 CLICKHOUSE_SECURE=false.
+
+Run:
+    python -m scripts.clickhouse_read_model_benchmark
+    python -m scripts.clickhouse_read_model_benchmark --wallets 200000 --versions 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+
+from services import clickhouse_client
+from services.clickhouse_schema import (
+    CREATE_MV_WALLET_AGGREGATE_LATEST_SQL,
+    CREATE_MV_WALLET_AGGREGATE_SQL,
+    CREATE_WALLET_AGGREGATE_LATEST_SQL,
+    CREATE_WALLET_AGGREGATE_STATS_SQL,
+    CREATE_WALLET_TOKEN_STATS_SQL,
+)
+
+TOKENS = 5_000
+
+FINAL_QUERIES = {
+    "wallet_stats": (
+        "SELECT * FROM wallet_aggregate_stats FINAL WHERE wallet_address = {addr:String}"
+    ),
+    "wallet_token": (
+        "SELECT * FROM wallet_token_stats FINAL "
+        "WHERE wallet_address = {wallet:String} AND token_address = {token:String}"
+    ),
+    "top20_for_tokens": """
+        SELECT wallet_address, count(DISTINCT token_address) AS tokens_hit,
+               avg(avg_entry_to_ath_mult) AS avg_entry_to_ath_mult, avg(total_roi_mult) AS avg_roi_mult
+        FROM wallet_token_stats FINAL
+        WHERE token_address IN ({token_list:Array(String)}) AND qualifies = 1
+        GROUP BY wallet_address ORDER BY avg_entry_to_ath_mult DESC, wallet_address LIMIT 20
+    """,
+    "elite_100": """
+        SELECT wallet_address, professional_score FROM wallet_aggregate_stats FINAL
+        WHERE tokens_qualified >= 1 ORDER BY professional_score DESC, wallet_address LIMIT 100
+    """,
+}
+
+
+def _new_queries():
+    return {
+        "wallet_stats": (
+            "SELECT * FROM wallet_aggregate_stats WHERE wallet_address = {addr:String} "
+            "ORDER BY updated_at DESC LIMIT 1"
+        ),
+        "wallet_token": (
+            "SELECT * FROM wallet_token_stats "
+            "WHERE wallet_address = {wallet:String} AND token_address = {token:String} "
+            "ORDER BY updated_at DESC LIMIT 1"
+        ),
+        "top20_for_tokens": """
+            SELECT wallet_address, count(DISTINCT token_address) AS tokens_hit,
+                   avg(avg_entry_to_ath_mult) AS avg_entry_to_ath_mult, avg(total_roi_mult) AS avg_roi_mult
+            FROM (
+                SELECT wallet_address, token_address,
+                       argMax(wallet_token_stats.qualifies, wallet_token_stats.updated_at) AS qualifies,
+                       argMax(wallet_token_stats.avg_entry_to_ath_mult, wallet_token_stats.updated_at) AS avg_entry_to_ath_mult,
+                       argMax(wallet_token_stats.total_roi_mult, wallet_token_stats.updated_at) AS total_roi_mult
+                FROM wallet_token_stats
+                WHERE token_address IN ({token_list:Array(String)})
+                GROUP BY wallet_address, token_address
+            )
+            WHERE qualifies = 1
+            GROUP BY wallet_address ORDER BY avg_entry_to_ath_mult DESC, wallet_address LIMIT 20
+        """,
+        # Full ranking as query_elite_100 sends it, with a name tiebreak for comparison.
+        "elite_100": clickhouse_client._ELITE_100_READ_MODEL_SQL.replace(
+            "ORDER BY professional_score DESC", "ORDER BY professional_score DESC, wallet_address"
+        ),
+        "elite_100 (argMax)": clickhouse_client._ELITE_100_ARGMAX_SQL.replace(
+            "ORDER BY professional_score DESC", "ORDER BY professional_score DESC, wallet_address"
+        ),
+    }
+
+
+def _client(database=None):
+    import clickhouse_connect
+    return clickhouse_connect.get_client(
+        host=os.environ.get('CLICKHOUSE_HOST', 'localhost'),
+        port=int(os.environ.get('CLICKHOUSE_PORT', 8123)),
+        username=os.environ.get('CLICKHOUSE_USER', 'default'),
+        password=os.environ.get('CLICKHOUSE_PASSWORD', ''),
+        secure=os.environ.get('CLICKHOUSE_SECURE', 'false').lower() == 'true',
+        database=database,
+        send_receive_timeout=600,
+    )
+
+
+def _load(args):
+    _client().command(f"CREATE DATABASE IF NOT EXISTS `{args.database}`")
+    ch = _client(args.database)
+    for name in ("mv_wallet_aggregate_latest", "mv_wallet_aggregate"):
+        ch.command(f"DROP VIEW IF EXISTS {name}")
+    for name in ("wallet_aggregate_latest", "wallet_aggregate_stats", "wallet_token_stats"):
+        ch.command(f"DROP TABLE IF EXISTS {name}")
+    for sql in (CREATE_WALLET_TOKEN_STATS_SQL, CREATE_WALLET_AGGREGATE_STATS_SQL,
+                CREATE_WALLET_AGGREGATE_LATEST_SQL, CREATE_MV_WALLET_AGGREGATE_SQL,
+                CREATE_MV_WALLET_AGGREGATE_LATEST_SQL):
+        ch.command(sql)
+    # Stop merges so every version stays in its own part, the worst case for FINAL.
+    for name in ("wallet_token_stats", "wallet_aggregate_stats", "wallet_aggregate_latest"):
+        ch.command(f"SYSTEM STOP MERGES {name}")
+
+    n = args.wallets * args.tokens_per_wallet
+    tpw = args.tokens_per_wallet  # tokens are spread so a wallet never repeats one
+    for v in range(args.versions):
+        ch.command(f"""
+            INSERT INTO wallet_token_stats
+                (wallet_address, token_address, scan_id, first_entry_price, first_entry_usd,
+                 first_entry_timestamp, avg_entry_price, avg_entry_to_ath_mult,
+                 entry_price_to_launch_mult, all_buys, all_sells, buy_count, sell_count,
+                 total_spent_usd, realized_pnl_usd, unrealized_pnl_usd, total_pnl_usd,
+                 realized_roi_mult, total_roi_mult, qualifies, outcome, disqualify_reason,
+                 wallet_source, updated_at)
+            SELECT concat('W', leftPad(toString(intDiv(number, {tpw})), 9, '0')),
+                   concat('T', toString((intDiv(number, {tpw}) * 7 + (number % {tpw}) * {TOKENS // tpw}) % {TOKENS})),
+                   toString({v}),
+                   rand() / 4e9, 100, toDateTime('2026-07-01 00:00:00'), rand() / 4e9,
+                   (cityHash64(number, {v}) % 500) / 10.0, 2, '[]', '[]', 1, 1,
+                   50 + number % 400, 10, 0, 10, (cityHash64(number, {v}) % 97) / 10.0,
+                   (cityHash64(number, {v}) % 97) / 10.0, (cityHash64(number, {v}) % 3) = 0,
+                   'win', '', 'top_traders',
+                   toDateTime('2026-07-01 00:00:00') + toIntervalHour({v})
+            FROM numbers({n})
+            SETTINGS max_insert_block_size = 1000000, min_insert_block_size_rows = 1000000
+        """)
+        time.sleep(1.1)  # mv_wallet_aggregate stamps now(); keep each batch's version distinct
+    parts = ch.query(
+        "SELECT table, count() FROM system.parts WHERE database = {db:String} AND active GROUP BY table",
+        parameters={"db": args.database},
+    ).result_rows
+    return ch, n, dict(parts)
+
+
+def _norm(rows):
+    return [tuple(round(v, 6) if isinstance(v, float) else v for v in r) for r in rows]
+
+
+def _time(ch, sql, params, repeat):
+    times, rows = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = ch.query(sql, parameters=params)
+        times.append(time.perf_counter() - t0)
+        rows = result.result_rows
+    summary = result.summary or {}
+    return statistics.median(times), rows, int(summary.get("read_rows", 0)), int(summary.get("read_bytes", 0))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--wallets", type=int, default=100_000)
+    ap.add_argument("--tokens-per-wallet", type=int, default=20)
+    ap.add_argument("--versions", type=int, default=3, help="versions per key, one insert batch each")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--database", default="bench_read_models", help="scratch ClickHouse database")
+    ap.add_argument("--keep", action="store_true", help="leave the scratch database in place")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    ch, n, parts = _load(args)
+    print(f"=== READ MODELS — {n:,} wallet_token_stats keys x {args.versions} versions, "
+          f"{args.wallets:,} wallets; loaded in {time.perf_counter() - t0:.1f}s; active parts {parts} ===")
+
+    wallet = f"W{args.wallets // 2:09d}"
+    token = ch.query(
+        "SELECT token_address FROM wallet_token_stats WHERE wallet_address = {w:String} LIMIT 1",
+        parameters={"w": wallet},
+    ).first_row[0]
+    params = {
+        "wallet_stats": {"addr": wallet},
+        "wallet_token": {"wallet": wallet, "token": token},
+        "top20_for_tokens": {"token_list": [f"T{i}" for i in range(0, TOKENS, TOKENS // 10)]},
+        "elite_100": {},
+        "elite_100 (argMax)": {},
+    }
+
+    print(f"{'query':>20} {'FINAL':>10} {'new':>10} {'speedup':>8} {'rows read':>23} {'MB read':>17}  same")
+    for name, sql in _new_queries().items():
+        base = FINAL_QUERIES[name.split(" ")[0]]
+        f_s, f_rows, f_read, f_bytes = _time(ch, base, params[name], args.repeat)
+        n_s, n_rows, n_read, n_bytes = _time(ch, sql, params[name], args.repeat)
+        if name.startswith("elite_100"):
+            f_rows = [r[:2] for r in f_rows]
+            n_rows = [r[:2] for r in n_rows]
+        print(f"{name:>20} {f_s * 1000:>8.1f}ms {n_s * 1000:>8.1f}ms {f_s / n_s:>7.1f}x "
+              f"{f_read:>11,} {n_read:>11,} {f_bytes / 1e6:>8.1f} {n_bytes / 1e6:>8.1f}  "
+              f"{'yes' if _norm(f_rows) == _norm(n_rows) else 'NO'}")
+
+    if not args.keep:
+        _client().command(f"DROP DATABASE IF EXISTS `{args.database}`")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Benchmark — generate_elite_100 full scan vs the server-side rollup.
+
+Builds ``--rows`` wallet_watchlist rows over ``--wallets`` distinct wallets
+(skewed: popular wallets sit on many watchlists) and measures two things.
+
+Generation (``Elite100Manager.generate_elite_100``):
+
+  * scan:   the rollup RPC is missing, so every watchlist row is selected and
+            folded in Python (the pre-rollup behaviour)
+  * rollup: ``elite_top_wallets`` returns the ranked top 100 only
+
+Both responses are JSON-encoded and decoded, as PostgREST would send them,
+and charged ``--rtt-ms`` plus payload size over ``--mbps``.
+
+Maintenance of the rollup table, on an in-memory SQLite port of
+``refresh_elite_agg`` (same grouping, same indexes; SQLite stands in for
+Postgres here, so compare the ratios rather than the absolute numbers):
+
+  * full rebuild of every wallet (what regeneration would cost without triggers)
+  * one daily-refresh chunk of 200 wallets (one statement trigger firing)
+  * a single watchlist add
+
+Run:
+    python -m scripts.elite_100_benchmark
+    python -m scripts.elite_100_benchmark --rows 100000 --wallets 20000 --mbps 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sqlite3
+import time
+from unittest.mock import MagicMock, patch
+
+
+def _dataset(args):
+    """Watchlist rows; metrics are per wallet, as the daily refresh writes them."""
+    rng = random.Random(11)
+    weights = [1.0 / (i + 1) ** 0.7 for i in range(args.wallets)]
+    wallets = [f"Wallet{i:06d}" for i in range(args.wallets)]
+    metrics = {w: {
+        "tier": rng.choice("SABC"),
+        "professional_score": round(rng.uniform(20, 95), 2),
+        "roi_30d": round(rng.uniform(-50, 600), 2),
+        "runners_30d": rng.randint(0, 25),
+        "win_rate_7d": round(rng.uniform(0, 100), 2),
+        "consistency_score": round(rng.uniform(0, 100), 2),
+        "last_trade_time": "2026-06-30T12:00:00",
+        "form": [rng.choice(("win", "loss", "draw")) for _ in range(5)],
+    } for w in wallets}
+    return [{"wallet_address": w, "user_id": f"user-{i:06d}", **metrics[w]}
+            for i, w in enumerate(rng.choices(wallets, weights, k=args.rows))]
+
+
+def _wire(data, args):
+    """JSON round trip plus simulated transfer; returns (decoded, bytes)."""
+    body = json.dumps(data).encode()
+    time.sleep(args.rtt_ms / 1000.0 + len(body) / (args.mbps * 125_000))
+    return json.loads(body), len(body)
+
+
+# ---------------------------------------------------------------------------
+# SQLite port of the rollup
+# ---------------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE wallet_watchlist (
+    id INTEGER PRIMARY KEY, user_id TEXT, wallet_address TEXT, tier TEXT,
+    professional_score REAL, roi_30d REAL, runners_30d REAL, win_rate_7d REAL,
+    consistency_score REAL, last_trade_time TEXT, form TEXT);
+CREATE INDEX idx_wallet_watchlist_address ON wallet_watchlist(wallet_address);
+CREATE TABLE wallet_watchlist_elite_agg (
+    wallet_address TEXT PRIMARY KEY, professional_score REAL, roi_30d REAL,
+    runners_30d REAL, times_added INTEGER, composite_score REAL, representative TEXT);
+CREATE INDEX idx_elite_agg_composite ON wallet_watchlist_elite_agg(composite_score DESC, wallet_address);
+CREATE TEMP TABLE touched (wallet_address TEXT PRIMARY KEY);
+"""
+
+# SQLite returns the bare columns from the row holding MAX(professional_score),
+# which stands in for the ARRAY_AGG(... ORDER BY ...)[1] pick in Postgres.
+_REFRESH = """
+INSERT OR REPLACE INTO wallet_watchlist_elite_agg
+SELECT wallet_address, ps, roi, runners, n,
+       ps * 0.40 + MIN(100, roi / 500 * 100) * 0.30 + MIN(100, runners / 20.0 * 100) * 0.20
+         + COALESCE(win_rate_7d, 0) * 0.10,
+       json_object('tier', tier, 'win_rate_7d', win_rate_7d, 'form', form)
+FROM (
+    SELECT wallet_address, MAX(COALESCE(professional_score, 0)) AS ps,
+           MAX(COALESCE(roi_30d, 0)) AS roi, MAX(COALESCE(runners_30d, 0)) AS runners,
+           COUNT(*) AS n, tier, win_rate_7d, form
+    FROM wallet_watchlist {where}
+    GROUP BY wallet_address)
+"""
+
+
+def _sqlite(rows):
+    db = sqlite3.connect(":memory:")
+    db.executescript(_SCHEMA)
+    db.executemany(
+        "INSERT INTO wallet_watchlist (user_id, wallet_address, tier, professional_score, roi_30d, "
+        "runners_30d, win_rate_7d, consistency_score, last_trade_time, form) VALUES (?,?,?,?,?,?,?,?,?,?)",
+        [(r["user_id"], r["wallet_address"], r["tier"], r["professional_score"], r["roi_30d"],
+          r["runners_30d"], r["win_rate_7d"], r["consistency_score"], r["last_trade_time"],
+          json.dumps(r["form"])) for r in rows])
+    db.commit()
+    return db
+
+
+def _refresh(db, wallets=None):
+    if wallets is None:
+        db.execute(_REFRESH.format(where=""))
+    else:
+        db.execute("DELETE FROM touched")
+        db.executemany("INSERT OR IGNORE INTO touched VALUES (?)", [(w,) for w in wallets])
+        db.execute(_REFRESH.format(where="WHERE wallet_address IN (SELECT wallet_address FROM touched)"))
+    db.commit()
+
+
+def _timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+def _generate(mode, args, rows, db):
+    supabase = MagicMock()
+    sent = {"bytes": 0}
+
+    def select_execute():
+        data, size = _wire([{k: r[k] for k in r if k != "user_id"} for r in rows], args)
+        sent["bytes"] += size
+        return MagicMock(data=data)
+
+    def rpc(name, params):
+        if mode == "scan":
+            raise Exception("function sifter_dev.elite_top_wallets does not exist")
+        cur = db.execute(
+            "SELECT wallet_address, professional_score, roi_30d, runners_30d, times_added, "
+            "composite_score, representative FROM wallet_watchlist_elite_agg "
+            "ORDER BY composite_score DESC, wallet_address LIMIT ?", (params["p_limit"],))
+        cols = [c[0] for c in cur.description]
+        out = [dict(zip(cols, r)) for r in cur.fetchall()]
+        for r in out:
+            r["representative"] = json.loads(r["representative"])
+        data, size = _wire(out, args)
+        sent["bytes"] += size
+        q = MagicMock()
+        q.execute.return_value = MagicMock(data=data)
+        return q
+
+    schema = supabase.schema.return_value
+    schema.table.return_value.select.return_value.execute.side_effect = select_execute
+    schema.rpc.side_effect = rpc
+
+    with patch("services.elite_100_manager.get_supabase_client", return_value=supabase):
+        from services.elite_100_manager import Elite100Manager
+        mgr = Elite100Manager()
+        mgr._cache_elite_100 = lambda *a, **kw: None
+
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            top = mgr.generate_elite_100()
+        elapsed = time.perf_counter() - t0
+
+    print(f"{mode:>6}: {elapsed * 1000:>9.1f}ms  {sent['bytes'] / 1e6:>7.2f} MB transferred  "
+          f"top={top[0]['wallet_address'] if top else '-'}  n={len(top)}")
+    return top
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000, help="wallet_watchlist rows")
+    ap.add_argument("--wallets", type=int, default=20_000, help="distinct wallets among those rows")
+    ap.add_argument("--rtt-ms", type=float, default=20.0, help="PostgREST round trip")
+    ap.add_argument("--mbps", type=float, default=100.0, help="link bandwidth for response bodies")
+    args = ap.parse_args()
+
+    rows = _dataset(args)
+    distinct = len({r["wallet_address"] for r in rows})
+    db = _sqlite(rows)
+    _refresh(db)
+
+    print(f"=== ELITE 100 — {args.rows:,} watchlist rows, {distinct:,} wallets, "
+          f"{args.rtt_ms}ms RTT, {args.mbps} Mbit/s ===")
+    scan = _generate("scan", args, rows, db)
+    rollup = _generate("rollup", args, rows, db)
+    same = [w["wallet_address"] for w in scan] == [w["wallet_address"] for w in rollup]
+    print(f"same top 100: {same}")
+
+    rng = random.Random(3)
+    all_wallets = sorted({r["wallet_address"] for r in rows})
+    chunk = rng.sample(all_wallets, min(200, len(all_wallets)))
+    one = [rng.choice(all_wallets)]
+
+    print("\n--- rollup maintenance (SQLite port) ---")
+    full = _timed(lambda: _refresh(db), repeat=3)
+    inc = _timed(lambda: _refresh(db, chunk))
+    single = _timed(lambda: _refresh(db, one))
+    print(f"full rebuild:        {full * 1000:>8.2f}ms")
+    print(f"200-wallet chunk:    {inc * 1000:>8.2f}ms  ({full / inc:,.0f}x less than a rebuild)")
+    print(f"single watchlist add:{single * 1000:>8.2f}ms  ({full / single:,.0f}x less than a rebuild)")
+
+
+if __name__ == "__main__":
+    main()
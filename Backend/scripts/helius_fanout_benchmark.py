@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Benchmark — Helius ``_process_signal`` latency vs watcher count.
+
+Runs one swap signal through:
+
+  * legacy: query ``wallet_watchlist``, then per watcher one notification
+    INSERT and one synchronous Telegram send (the pre-index loop,
+    reimplemented here as the baseline)
+  * indexed: ``helius_webhook._process_signal`` — watchers from the Redis
+    index, one bulk INSERT, one ``fanout_wallet_alerts.delay``
+
+for 1 / 100 / 1000 watchers. Database and Telegram calls are simulated with
+``--db-ms`` / ``--tg-ms`` sleeps and Redis with an in-process hash stand-in
+(``--redis-ms`` per round trip), so it runs without any backing services.
+
+Run:
+    python -m scripts.helius_fanout_benchmark
+    python -m scripts.helius_fanout_benchmark --db-ms 15 --tg-ms 80 --sizes 1 10 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from unittest.mock import MagicMock, patch
+
+WALLET = "BenchWa11et1111111111111111111111111111111"
+SIGNAL = {
+    "wallet_address": WALLET,
+    "token_address": "BenchMint11111111111111111111111111111111",
+    "token_ticker": "BENCH",
+    "tx_hash": "bench-sig",
+    "usd_value": 250.0,
+    "sol_amount": 1.5,
+    "wallet_tier": "S",
+}
+
+
+class _MemoryRedis:
+    """Hash commands with a simulated round trip per call / pipeline."""
+
+    def __init__(self, rtt_s: float):
+        self.rtt_s = rtt_s
+        self.data = {}
+
+    def _trip(self):
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    def register_script(self, _source):
+        def store(keys, args, client=None):
+            # The index's guarded store, minus the generation check.
+            self._trip()
+            fields = args[2:]
+            self.data[keys[0]] = dict(zip(fields[::2], fields[1::2]))
+            return 1
+
+        return store
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class _Pipe:
+            def hgetall(self, key):
+                ops.append(lambda: dict(redis.data.get(key) or {}))
+
+            def get(self, key):
+                ops.append(lambda: None)
+
+            def execute(self):
+                redis._trip()
+                return [op() for op in ops]
+
+        return _Pipe()
+
+
+class _SlowTable:
+    """Supabase table stub: every ``execute()`` costs one DB round trip."""
+
+    def __init__(self, rows, db_s: float, counters: dict):
+        self.rows, self.db_s, self.counters = rows, db_s, counters
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: self
+
+    def execute(self):
+        self.counters["db"] += 1
+        time.sleep(self.db_s)
+        return MagicMock(data=self.rows)
+
+
+def _supabase(rows, db_s, counters):
+    client = MagicMock()
+    client.schema.return_value.table.side_effect = lambda name: _SlowTable(rows, db_s, counters)
+    return client
+
+
+def _legacy(signal, supabase, send, counters):
+    """Pre-index _process_signal: serial insert + Telegram send per watcher."""
+    table = supabase.schema("x").table
+    watchers = table("wallet_watchlist").select("*").eq("wallet_address", signal["wallet_address"]).execute().data
+    for watcher in watchers:
+        table("wallet_notifications").insert({"user_id": watcher["user_id"]}).execute()
+        send(watcher["user_id"])
+
+
+def _run(mode, n, args):
+    from routes import helius_webhook
+
+    counters = {"db": 0, "tg": 0, "queued": 0}
+    rows = [{"user_id": f"user-{i:04d}", "wallet_address": WALLET, "min_trade_usd": 0,
+             "alert_on_buy": True} for i in range(n)]
+    supabase = _supabase(rows, args.db_ms / 1000.0, counters)
+    redis = _MemoryRedis(args.redis_ms / 1000.0)
+
+    def send(_user_id):
+        counters["tg"] += 1
+        time.sleep(args.tg_ms / 1000.0)
+
+    fanout = MagicMock()
+    fanout.delay.side_effect = lambda user_ids, data: counters.__setitem__("queued", len(user_ids))
+
+    with patch("services.wallet_watchers_index.get_redis_client", return_value=redis), \
+         patch("services.wallet_watchers_index.get_supabase_client", return_value=supabase), \
+         patch.object(helius_webhook, "get_supabase_client", return_value=supabase), \
+         patch.object(helius_webhook, "_maybe_record_paper_trades"), \
+         patch("services.tasks.fanout_wallet_alerts", fanout):
+        if mode == "indexed":
+            # Warm the index the way the 6-hourly rebuild / first signal would.
+            from services.wallet_watchers_index import get_watchers
+            get_watchers(WALLET)
+            counters["db"] = 0
+
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            if mode == "legacy":
+                _legacy(dict(SIGNAL), supabase, send, counters)
+            else:
+                helius_webhook._process_signal(dict(SIGNAL))
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    samples.sort()
+    per_run = {k: v / args.repeat for k, v in counters.items()}
+    print(f"{mode:>8} {n:>6} watchers: p50 {samples[len(samples) // 2]:>9.1f} ms  "
+          f"db calls {per_run['db']:>6.0f}  telegram sends inline {per_run['tg']:>6.0f}  "
+          f"queued for fan-out {counters['queued']:>5}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1000])
+    ap.add_argument("--db-ms", type=float, default=8.0, help="simulated PostgREST round trip")
+    ap.add_argument("--tg-ms", type=float, default=60.0, help="simulated Telegram sendMessage")
+    ap.add_argument("--redis-ms", type=float, default=0.5, help="simulated Redis round trip")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"=== HELIUS FAN-OUT — db {args.db_ms}ms, telegram {args.tg_ms}ms, "
+          f"redis {args.redis_ms}ms, {args.repeat} runs each ===")
+    for n in args.sizes:
+        for mode in ("legacy", "indexed"):
+            _run(mode, n, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Load test — aggregate rate enforced by the ingress limiter across processes.
+
+Starts ``--procs`` worker processes (standing in for gunicorn workers), each
+hammering a Flask route decorated with ``ingress_limiter.rate_limit`` from a
+single source IP for ``--duration`` seconds, and reports how many requests
+were let through in total versus the configured limit.
+
+For comparison, ``legacy`` runs the same load against the old per-process
+fixed-window dict limiter (reimplemented here as the baseline), whose real
+limit is ``procs`` times the configured one.
+
+Uses REDIS_URL by default; ``--memory-redis`` serves the GCRA script from a
+shared in-process stand-in over a multiprocessing manager (one clock, atomic
+per call — what Lua on a single Redis gives you), so it runs without Redis.
+
+Run:
+    python -m scripts.ingress_rate_limit_load --procs 4 --rate 100 --per 1
+    python -m scripts.ingress_rate_limit_load --memory-redis --duration 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing as mp
+import threading
+import time
+from multiprocessing.managers import BaseManager
+from unittest.mock import patch
+
+AUTHKEY = b"ingress-rate-limit-load"
+
+
+class _SharedGcra:
+    """The limiter's Lua script, run in one process under a lock."""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def run(self, keys, args):
+        interval, tolerance = int(args[0]), int(args[1])
+        with self.lock:
+            now = int(time.time() * 1_000_000)
+            tat, expires = self.data.get(keys[0], (now, 0))
+            tat = max(tat if expires > now else now, now)
+            if tat - now > tolerance:
+                return [0, tat - tolerance - now]
+            self.data[keys[0]] = (tat + interval, tat + interval)
+            return [1, 0]
+
+
+class _Manager(BaseManager):
+    pass
+
+
+_Manager.register("gcra", callable=lambda: _SHARED, exposed=["run"])
+_SHARED = _SharedGcra()
+
+
+class _ManagedRedis:
+    """Client-side shim: ``register_script`` forwards to the shared stand-in."""
+
+    def __init__(self, address):
+        manager = _Manager(address=address, authkey=AUTHKEY)
+        manager.connect()
+        self.remote = manager.gcra()
+
+    def register_script(self, source):
+        return lambda keys, args: self.remote.run(keys, args)
+
+
+def _worker(mode, args, address, ready, results):
+    from flask import Flask
+
+    from services import ingress_limiter
+
+    logging.getLogger("services.ingress_limiter").setLevel(logging.ERROR)  # one warning per reject
+    app = Flask(__name__)
+    if mode == "gcra":
+        @app.route("/hook", methods=["POST"])
+        @ingress_limiter.rate_limit("loadtest", args.rate, args.per, burst=args.burst)
+        def hook():
+            return "ok"
+    else:
+        window = {}
+
+        @app.route("/hook", methods=["POST"])
+        def hook():
+            # The pre-Redis limiter: a fixed window in this process only.
+            from flask import jsonify, request
+            ip, now = request.remote_addr, time.time()
+            count, start = window.get(ip, (0, now))
+            if now - start > args.per:
+                count, start = 0, now
+            if count >= args.rate:
+                return jsonify({"error": "Rate limit exceeded"}), 429
+            window[ip] = (count + 1, start)
+            return "ok"
+
+    redis = _ManagedRedis(address) if address else None
+    client = app.test_client()
+    allowed = sent = 0
+    with patch("services.ingress_limiter.get_redis_client", return_value=redis) if redis else _noop():
+        ready.wait()  # all workers imported and connected; start together
+        deadline = time.time() + args.duration
+        while time.time() < deadline:
+            sent += 1
+            if client.post("/hook").status_code == 200:
+                allowed += 1
+    results.put((sent, allowed))
+
+
+class _noop:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _run(mode, args, address):
+    if mode == "gcra" and not address:
+        from services.redis_pool import get_redis_client
+        get_redis_client().delete("sifter:rl:loadtest:127.0.0.1")
+
+    results = mp.Queue()
+    ready = mp.Barrier(args.procs)
+    procs = [mp.Process(target=_worker, args=(mode, args, address, ready, results))
+             for _ in range(args.procs)]
+    for p in procs:
+        p.start()
+    totals = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    sent = sum(t[0] for t in totals)
+    allowed = sum(t[1] for t in totals)
+    burst = args.burst if args.burst is not None else args.rate
+    if mode == "gcra":
+        expected = burst + args.rate * args.duration / args.per
+    else:
+        expected = args.rate * max(1.0, args.duration / args.per)
+    print(f"{mode:>6}: {sent:>8,} sent  {allowed:>7,} allowed  "
+          f"{allowed / args.duration:>8.1f}/s aggregate  "
+          f"(configured {args.rate / args.per:.1f}/s + burst; "
+          f"{allowed / expected:.2f}× of the configured allowance)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=4)
+    ap.add_argument("--rate", type=float, default=100, help="requests allowed per --per seconds")
+    ap.add_argument("--per", type=float, default=1.0)
+    ap.add_argument("--burst", type=int, default=10)
+    ap.add_argument("--duration", type=float, default=5.0)
+    ap.add_argument("--memory-redis", action="store_true", help="shared in-process Redis stand-in")
+    args = ap.parse_args()
+
+    manager = None
+    address = None
+    if args.memory_redis:
+        manager = _Manager(address=("127.0.0.1", 0), authkey=AUTHKEY)
+        manager.start()
+        address = manager.address
+        where = "in-process stand-in"
+    else:
+        where = "REDIS_URL"
+
+    print(f"=== INGRESS RATE LIMIT — {args.procs} processes, {args.rate:g} per {args.per:g}s, "
+          f"burst {args.burst}, {args.duration:g}s ({where}) ===")
+    for mode in ("legacy", "gcra"):
+        _run(mode, args, address)
+    if manager:
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
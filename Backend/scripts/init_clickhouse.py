@@ -2,6 +2,11 @@
 """
 Initialize ClickHouse database and tables for the KYS pipeline.
 Run once on first deployment: python scripts/init_clickhouse.py
+
+On a fresh database the read models (wallet_aggregate_latest,
+wallet_token_stats_by_token) are marked ready here. If their source tables
+already hold rows, run scripts/migrate_read_models.py afterwards to backfill
+them; until then reads stay on the source tables.
 """
 import sys
 import os
@@ -21,6 +26,12 @@ from services.clickhouse_schema import (
     CREATE_WALLET_WEEKLY_SNAPSHOTS_SQL,
     CREATE_LEADERBOARD_RESULTS_SQL,
     CREATE_MV_WALLET_AGGREGATE_SQL,
+    CREATE_WALLET_AGGREGATE_LATEST_SQL,
+    CREATE_MV_WALLET_AGGREGATE_LATEST_SQL,
+    MARK_WALLET_AGGREGATE_LATEST_READY_SQL,
+    CREATE_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+    CREATE_MV_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+    MARK_WALLET_TOKEN_STATS_BY_TOKEN_READY_SQL,
     # Telegram trading-bot analytics (bot rebuild)
     CREATE_BOT_SIGNAL_LOG_SQL,
     CREATE_BOT_TRADE_LOG_SQL,
@@ -69,6 +80,8 @@ def init():
         ("wallet_aggregate_stats", CREATE_WALLET_AGGREGATE_STATS_SQL),
         ("wallet_weekly_snapshots", CREATE_WALLET_WEEKLY_SNAPSHOTS_SQL),
         ("leaderboard_results", CREATE_LEADERBOARD_RESULTS_SQL),
+        ("wallet_aggregate_latest", CREATE_WALLET_AGGREGATE_LATEST_SQL),
+        ("wallet_token_stats_by_token", CREATE_WALLET_TOKEN_STATS_BY_TOKEN_SQL),
         # Telegram trading-bot analytics (bot rebuild)
         ("bot_signal_log", CREATE_BOT_SIGNAL_LOG_SQL),
         ("bot_trade_log", CREATE_BOT_TRADE_LOG_SQL),
@@ -85,6 +98,22 @@ def init():
     print("  Creating materialized view mv_wallet_aggregate...")
     ch.command(CREATE_MV_WALLET_AGGREGATE_SQL)
 
+    print("  Creating materialized view mv_wallet_aggregate_latest...")
+    ch.command(CREATE_MV_WALLET_AGGREGATE_LATEST_SQL)
+    # With the view in place, an empty source means nothing to backfill. On an
+    # existing deployment, run scripts/migrate_read_models.py instead.
+    if ch.query("SELECT count() FROM wallet_aggregate_stats").first_row[0] == 0:
+        ch.command(MARK_WALLET_AGGREGATE_LATEST_READY_SQL)
+    else:
+        print("    wallet_aggregate_stats has rows: run scripts/migrate_read_models.py to backfill.")
+
+    print("  Creating materialized view mv_wallet_token_stats_by_token...")
+    ch.command(CREATE_MV_WALLET_TOKEN_STATS_BY_TOKEN_SQL)
+    if ch.query("SELECT count() FROM wallet_token_stats").first_row[0] == 0:
+        ch.command(MARK_WALLET_TOKEN_STATS_BY_TOKEN_READY_SQL)
+    else:
+        print("    wallet_token_stats has rows: run scripts/migrate_read_models.py to backfill.")
+
     # Bot analytics materialized views (write into the *_agg tables above)
     for mv_name, mv_sql in [
         ("mv_user_bot_stats", CREATE_MV_USER_BOT_STATS_SQL),
@@ -96,10 +125,12 @@ def init():
 
     print(f"\nClickHouse initialized successfully (database: {CH_DATABASE}).")
     print("Tables: token_scans, wallet_token_stats, wallet_aggregate_stats,")
-    print("        wallet_weekly_snapshots, leaderboard_results,")
+    print("        wallet_weekly_snapshots, leaderboard_results, wallet_aggregate_latest,")
+    print("        wallet_token_stats_by_token,")
     print("        bot_signal_log, bot_trade_log, bot_fee_log,")
     print("        user_bot_stats_agg, fee_revenue_agg, fee_by_token_agg")
-    print("Views:  mv_wallet_aggregate, mv_user_bot_stats, mv_fee_revenue, mv_fee_by_token")
+    print("Views:  mv_wallet_aggregate, mv_wallet_aggregate_latest, mv_wallet_token_stats_by_token,")
+    print("        mv_user_bot_stats, mv_fee_revenue, mv_fee_by_token")
 
 
 if __name__ == '__main__':
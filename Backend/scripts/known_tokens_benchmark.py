@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Benchmark — known-token registry: unbounded SET vs rolling ZSET.
+
+Memory: replays ``--days`` of discovery runs (one every 5 minutes, each
+finding ``--new-per-run`` fresh mints) and reports registry size over time.
+
+  * legacy SET: every run re-arms the 30-day key expire, so the expire never
+    fires and the set holds every mint ever seen
+  * ZSET: ``known_tokens.claim`` trims members first seen more than 30 days
+    ago, so it levels off at 30 days of discoveries
+
+Sizes are member counts times a per-entry estimate for 44-byte mints. The
+estimate assumes a hashtable-encoded SET (~96 B/entry) and a skiplist ZSET
+(~160 B/entry). Pass ``--redis-url`` to measure MEMORY USAGE on a real server
+instead.
+
+Throughput: one discovery run over ``--feed`` candidate tokens, of which
+``--new-per-run`` are new. The legacy loop spends five Redis round trips per
+new token (SISMEMBER, SADD+EXPIRE twice) and one per known token, then a
+``.delay()`` per new token. The batched path uses ``claim()`` plus one pending
+pipeline, and groups of 100 publishes. Every Redis round trip sleeps
+``--redis-ms``.
+
+Run:
+    python -m scripts.known_tokens_benchmark
+    python -m scripts.known_tokens_benchmark --days 120 --new-per-run 60
+    python -m scripts.known_tokens_benchmark --redis-url redis://localhost:6379/15
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections import deque
+
+from services import known_tokens
+from services.known_tokens import KNOWN_TOKENS_KEY, KNOWN_TOKENS_RETENTION
+
+RUNS_PER_DAY = 288
+SET_ENTRY_BYTES = 96
+ZSET_ENTRY_BYTES = 160
+
+
+class _Redis:
+    """In-memory registry backend that counts (and optionally charges) round trips.
+
+    ZSET scores only ever arrive in increasing order here, so an insertion-
+    ordered deque stands in for the skiplist's range trim.
+    """
+
+    def __init__(self, rtt_s=0.0):
+        self.rtt_s, self.round_trips = rtt_s, 0
+        self.sets, self.zsets, self._order = {}, {}, {}
+
+    def _rt(self):
+        self.round_trips += 1
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    # single commands (one round trip each unless pipelined)
+    def type(self, key, _rt=True):
+        _rt and self._rt()
+        return "set" if key in self.sets else "zset" if key in self.zsets else "none"
+
+    def sismember(self, key, member, _rt=True):
+        _rt and self._rt()
+        return member in self.sets.get(key, ())
+
+    def sadd(self, key, *members, _rt=True):
+        _rt and self._rt()
+        self.sets.setdefault(key, set()).update(members)
+
+    def expire(self, key, ttl, _rt=True):
+        _rt and self._rt()
+        return True
+
+    def zadd(self, key, mapping, nx=False, _rt=True):
+        _rt and self._rt()
+        z = self.zsets.setdefault(key, {})
+        order = self._order.setdefault(key, deque())
+        added = 0
+        for member, score in mapping.items():
+            if member not in z:
+                added += 1
+                z[member] = score
+                order.append((score, member))
+            elif not nx:
+                z[member] = score
+        return added
+
+    def zremrangebyscore(self, key, lo, hi, _rt=True):
+        _rt and self._rt()
+        z, order = self.zsets.get(key, {}), self._order.get(key, deque())
+        while order and order[0][0] <= hi:
+            z.pop(order.popleft()[1], None)
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((name, a, kw))
+
+            def execute(self):
+                redis._rt()
+                return [getattr(redis, name)(*a, _rt=False, **kw) for name, a, kw in ops]
+
+        return _Pipe()
+
+
+def _memory(args):
+    print(f"--- registry size, {args.new_per_run} new mints per run, {RUNS_PER_DAY} runs/day ---")
+    real = None
+    if args.redis_url:
+        import redis
+        real = redis.Redis.from_url(args.redis_url, decode_responses=True)
+        real.delete("bench:legacy_known", KNOWN_TOKENS_KEY)
+
+    legacy, registry = _Redis(), _Redis()
+    known_tokens._legacy_checked = True
+    print(f"{'day':>5} {'SET members':>12} {'SET est.':>10} {'ZSET members':>13} {'ZSET est.':>10}")
+    seq = 0
+    for day in range(1, args.days + 1):
+        for run in range(RUNS_PER_DAY):
+            now = (day - 1) * 86400 + run * 300
+            mints = [f"{seq + i:044d}" for i in range(args.new_per_run)]
+            seq += args.new_per_run
+            legacy.sets.setdefault("legacy", set()).update(mints)
+            known_tokens.claim(registry, mints, now=now)
+            if real is not None:
+                real.sadd("bench:legacy_known", *mints)
+                known_tokens.claim(real, mints, now=now)
+        if day % max(1, args.days // 6) == 0 or day == args.days:
+            n_set = len(legacy.sets["legacy"])
+            n_z = len(registry.zsets[KNOWN_TOKENS_KEY])
+            if real is not None:
+                set_b = real.memory_usage("bench:legacy_known")
+                z_b = real.memory_usage(KNOWN_TOKENS_KEY)
+            else:
+                set_b, z_b = n_set * SET_ENTRY_BYTES, n_z * ZSET_ENTRY_BYTES
+            print(f"{day:>5} {n_set:>12,} {set_b / 1e6:>8.1f}MB {n_z:>13,} {z_b / 1e6:>8.1f}MB")
+    if real is not None:
+        real.delete("bench:legacy_known", KNOWN_TOKENS_KEY)
+    cap = args.new_per_run * RUNS_PER_DAY * KNOWN_TOKENS_RETENTION // 86400
+    print(f"ZSET steady state: {cap:,} members (30 days of discoveries); SET grows without bound")
+
+
+def _legacy_run(r, feed, dispatched):
+    for addr in feed:
+        if r.sismember("legacy_known", addr):
+            continue
+        r.sadd("legacy_known", addr)
+        r.expire("legacy_known", 86400 * 30)
+        r.sadd("pending", addr)
+        r.expire("pending", 86400 * 30)
+        dispatched.append(1)  # one .delay() per token
+
+
+def _batched_run(r, feed, dispatched):
+    new = known_tokens.claim(r, feed)
+    if new:
+        pipe = r.pipeline(transaction=False)
+        pipe.sadd("pending", *new)
+        pipe.expire("pending", 86400 * 30)
+        pipe.execute()
+    dispatched.extend([1] * (-(-len(new) // 100)))  # one group.apply_async per 100 tokens
+
+
+def _throughput(args):
+    print(f"\n--- one discovery run: {args.feed} candidates, {args.new_per_run} new, "
+          f"Redis {args.redis_ms}ms RTT ---")
+    seen = [f"K{i:043d}" for i in range(args.feed - args.new_per_run)]
+    fresh = [f"N{i:043d}" for i in range(args.new_per_run)]
+    for mode, fn in (("legacy", _legacy_run), ("batched", _batched_run)):
+        r = _Redis(args.redis_ms / 1000.0)
+        r.sets["legacy_known"] = set(seen)
+        r.zadd(KNOWN_TOKENS_KEY, {m: time.time() for m in seen}, _rt=False)
+        known_tokens._legacy_checked = True
+        r.round_trips, dispatched = 0, []
+        t0 = time.perf_counter()
+        fn(r, seen + fresh, dispatched)
+        elapsed = time.perf_counter() - t0
+        print(f"{mode:>8}: {elapsed * 1000:>8.1f}ms  {r.round_trips:>5} Redis round trips  "
+              f"{len(dispatched):>4} dispatch calls  "
+              f"{args.feed / elapsed:>10,.0f} candidates/s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--new-per-run", type=int, default=40, help="fresh mints per 5-minute run")
+    ap.add_argument("--feed", type=int, default=300, help="candidates per run (3 endpoints)")
+    ap.add_argument("--redis-ms", type=float, default=0.3)
+    ap.add_argument("--redis-url", default=None, help="measure MEMORY USAGE on a real Redis")
+    args = ap.parse_args()
+
+    print("=== KNOWN-TOKEN REGISTRY ===")
+    _memory(args)
+    _throughput(args)
+
+
+if __name__ == "__main__":
+    main()
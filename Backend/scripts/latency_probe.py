@@ -5,6 +5,11 @@
    sent" (the spinner stops). Target p95 < 200ms. This is the handler latency we
    control — real Telegram network round-trip is on top and un-measurable here.
 
+   BUTTON → SCREEN: dispatch → rendered screen sent for a settings tap, with
+   a simulated PostgREST round trip per query, run with the user-context
+   cache (services/bot_user_cache) on and off. Needs REDIS_URL, or
+   ``--memory-redis`` for an in-process stand-in.
+
 2. SIGNAL → FILL: time from queue_autonomous_trade() start to a filled position
    in paper mode. Target p95 < 5s (paper). On devnet this measures real swap
    latency.
@@ -58,6 +63,117 @@ def probe_button_ack(iterations: int) -> list:
     return samples
 
 
+class _MemoryRedis:
+    """In-process stand-in for the Redis calls bot_state/bot_user_cache make.
+
+    Covers bot_state's hash layout (HSET/HGETALL/HDEL and the replace-data
+    script) as well as the string keys bot_user_cache uses.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+    def expire(self, key, ttl):
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key) or {})
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            (self.data.get(key) or {}).pop(field, None)
+
+    def register_script(self, _lua):
+        """Python rendering of bot_state._REPLACE_DATA_LUA."""
+        def run(keys, args):
+            key, clear_awaiting, flat = keys[0], args[1], args[2:]
+            fields = self.data.setdefault(key, {})
+            for field in [f for f in fields if f.startswith("d:")]:
+                del fields[field]
+            if clear_awaiting == "1":
+                fields.pop("awaiting", None)
+            fields.update(dict(zip(flat[::2], flat[1::2])))
+            return [item for pair in fields.items() for item in pair]
+        return run
+
+    def pipeline(self, transaction=False):
+        redis, ops = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((name, a, kw))
+
+            def execute(self):
+                return [getattr(redis, name)(*a, **kw) for name, a, kw in ops]
+
+        return _Pipe()
+
+
+def probe_screen_render(iterations: int, db_ms: float, cache_on: bool, redis) -> tuple:
+    """Measure tap → settings screen sent, with ``db_ms`` per Supabase query.
+
+    Returns (samples_ms, cache hit ratio)."""
+    from unittest.mock import MagicMock, patch
+    from services import bot_handlers, bot_user_cache
+
+    row = {
+        "user_id": "probe-user", "telegram_username": "probe", "access_tier": "autotrader",
+        "auto_trade_enabled": True, "auto_trade_max_usd": 100, "paper_mode": True,
+    }
+
+    def table(name):
+        t = MagicMock()
+        q = t.select.return_value
+        q.eq.return_value = q
+        q.limit.return_value = q
+
+        def execute():
+            time.sleep(db_ms / 1000.0)
+            result = MagicMock()
+            result.data = [dict(row)] if name == "telegram_users" else [{"id": 1}]
+            return result
+
+        q.execute.side_effect = execute
+        return t
+
+    notifier = MagicMock()
+    notifier._is_operator.return_value = False
+    notifier._table.side_effect = table
+
+    samples = []
+    with patch("services.bot_state.get_redis_client", return_value=redis), \
+         patch("services.bot_user_cache.get_redis_client", return_value=redis), \
+         patch.object(bot_user_cache, "ENABLED", cache_on):
+        bot_user_cache.reset_stats()
+        bot_user_cache.invalidate("123")
+        for _ in range(iterations):
+            query = {"id": "q", "data": "nav|settings"}
+            t0 = time.perf_counter()
+            bot_handlers.handle_callback(notifier, "123", query, "nav", "settings", [])
+            samples.append((time.perf_counter() - t0) * 1000.0)
+        hit_ratio = bot_user_cache.stats()["hit_ratio"]
+    return samples, hit_ratio
+
+
 def probe_signal_to_fill(iterations: int) -> list:
     """Measure queue_autonomous_trade → filled position latency (paper mode).
 
@@ -108,6 +224,8 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--iterations", type=int, default=50)
     ap.add_argument("--skip-fill", action="store_true", help="only button ack")
+    ap.add_argument("--db-ms", type=float, default=40.0, help="simulated Supabase round trip")
+    ap.add_argument("--memory-redis", action="store_true", help="in-process Redis stand-in")
     args = ap.parse_args()
 
     try:
@@ -123,6 +241,26 @@ def main():
         status = "PASS" if p95 < 200 else "WARN"
         print(f"Button ack (n={len(ack)}): p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms  [{status} target<200ms]")
 
+    if args.memory_redis:
+        redis = _MemoryRedis()
+    else:
+        from services.redis_pool import get_redis_client
+        redis = get_redis_client()
+    try:
+        redis.get("sifter:latency_probe")
+    except Exception as exc:
+        print(f"Button → screen: SKIP (Redis unavailable: {exc}; use --memory-redis)")
+        redis = None
+    if redis is not None:
+        for cache_on in (False, True):
+            render, hit_ratio = probe_screen_render(args.iterations, args.db_ms, cache_on, redis)
+            p50, p95, p99 = _pcts(render)
+            status = "PASS" if p95 < 200 else "WARN"
+            label = "on " if cache_on else "off"
+            print(f"Button → screen, ctx cache {label} (n={len(render)}, db={args.db_ms:.0f}ms): "
+                  f"p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms hit_ratio={hit_ratio:.2f}  "
+                  f"[{status} target<200ms]")
+
     if not args.skip_fill:
         fill = probe_signal_to_fill(args.iterations)
         if fill:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark — leaderboard recency filter: per-wallet queries vs one batch.
+
+Filters ``--wallets`` candidates the way leaderboard_discovery_scan does:
+
+  * legacy: one Redis EXISTS and one ClickHouse ``max(updated_at) ... FINAL``
+    query per wallet (the pre-batch loop, reimplemented as the baseline)
+  * batch (cold): ``_filter_recent_wallets`` with an empty recency cache —
+    one Redis pipeline, one grouped query per 1000 wallets, one cache write
+  * batch (warm): the same call again, served from the recency cache
+
+Every ClickHouse query sleeps ``--ch-ms``; every Redis round trip (a single
+command or a whole pipeline) sleeps ``--redis-ms``.
+
+Run:
+    python -m scripts.leaderboard_recency_benchmark
+    python -m scripts.leaderboard_recency_benchmark --wallets 5000 --ch-ms 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+
+class _Redis:
+    def __init__(self, rtt_s):
+        self.rtt_s, self.data, self.round_trips = rtt_s, {}, 0
+
+    def _hit(self):
+        self.round_trips += 1
+        time.sleep(self.rtt_s)
+
+    def exists(self, key, _rtt=True):
+        _rtt and self._hit()
+        return int(key in self.data)
+
+    def get(self, key, _rtt=True):
+        _rtt and self._hit()
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value, _rtt=True):
+        _rtt and self._hit()
+        self.data[key] = str(value)
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a: ops.append((name, a))
+
+            def execute(self):
+                redis._hit()
+                return [getattr(redis, name)(*a, _rtt=False) for name, a in ops]
+
+        return _Pipe()
+
+
+class _ClickHouse:
+    def __init__(self, rtt_s, updated):
+        self.rtt_s, self.updated, self.queries = rtt_s, updated, 0
+
+    def query(self, sql, parameters=None):
+        self.queries += 1
+        time.sleep(self.rtt_s)
+        if "addrs" in parameters:
+            rows = [(w, self.updated[w]) for w in parameters["addrs"] if w in self.updated]
+        else:
+            rows = [(self.updated.get(parameters["addr"]),)]
+        return MagicMock(result_rows=rows)
+
+
+def _legacy(r, ch, wallets):
+    from tasks.leaderboard_discovery import LEADERBOARD_SEEN_PREFIX
+
+    out = []
+    for wallet_addr in wallets:
+        if r.exists(f"{LEADERBOARD_SEEN_PREFIX}{wallet_addr}"):
+            continue
+        result = ch.query(
+            "SELECT max(updated_at) FROM wallet_token_stats FINAL WHERE wallet_address = {addr:String}",
+            parameters={"addr": wallet_addr},
+        )
+        last = result.result_rows[0][0]
+        if last and (datetime.now(timezone.utc) - last.replace(tzinfo=timezone.utc)).total_seconds() < 86400:
+            continue
+        out.append(wallet_addr)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--wallets", type=int, default=3000)
+    ap.add_argument("--ch-ms", type=float, default=25.0, help="ClickHouse query round trip")
+    ap.add_argument("--redis-ms", type=float, default=0.3, help="Redis round trip")
+    args = ap.parse_args()
+
+    from tasks.leaderboard_discovery import _filter_recent_wallets
+
+    rng = random.Random(5)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    wallets = [f"Wallet{i:05d}" for i in range(args.wallets)]
+    # A third never scanned, a third fresh (<24h), a third stale.
+    updated = {w: now - timedelta(hours=rng.choice((2, 12, 40, 100)))
+               for i, w in enumerate(wallets) if i % 3}
+
+    print(f"=== LEADERBOARD RECENCY — {args.wallets} wallets, CH {args.ch_ms}ms, "
+          f"Redis {args.redis_ms}ms ===")
+    results = {}
+    shared = _Redis(args.redis_ms / 1000.0)  # warm run reuses the cold run's cache
+    for mode in ("legacy", "batch (cold)", "batch (warm)"):
+        ch = _ClickHouse(args.ch_ms / 1000.0, updated)
+        r_mode = _Redis(args.redis_ms / 1000.0) if mode == "legacy" else shared
+        r_mode.round_trips = 0
+        stats = {}
+        t0 = time.perf_counter()
+        kept = (_legacy(r_mode, ch, wallets) if mode == "legacy"
+                else _filter_recent_wallets(r_mode, ch, wallets, stats))
+        elapsed = time.perf_counter() - t0
+        results[mode] = kept
+        extra = f"  cache_hits={stats['recency_cache_hits']}" if stats else ""
+        print(f"{mode:>13}: {elapsed * 1000:>9.1f}ms  {ch.queries:>5} CH queries  "
+              f"{r_mode.round_trips:>5} Redis round trips  kept {len(kept)}{extra}")
+
+    same = results["legacy"] == results["batch (cold)"] == results["batch (warm)"]
+    print(f"same wallets kept: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Migration: create the read models and backfill them.
+
+  * wallet_aggregate_latest: the AggregatingMergeTree table that
+    query_elite_100 ranks from (argMax states of the leaderboard columns per
+    wallet), fed from wallet_aggregate_stats by mv_wallet_aggregate_latest.
+  * wallet_token_stats_by_token: a copy of the wallet_token_stats columns
+    that token-first queries need, ordered by (token_address, wallet_address)
+    and fed by mv_wallet_token_stats_by_token.
+
+Each view is created before its backfill, so nothing written in between is
+missed; rows seen by both are harmless (argMax states merge idempotently and
+ReplacingMergeTree keeps one row per key). Neither table serves reads until
+its backfill has finished and it is marked ready (its comment), so nothing
+reads a partial copy: until then query_elite_100 ranks with an argMax query
+over wallet_aggregate_stats and query_top20_for_tokens reads
+wallet_token_stats. Safe to re-run.
+
+Usage:
+    cd Backend && python scripts/migrate_read_models.py
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import clickhouse_connect
+from services.clickhouse_client import CH_DATABASE
+from services.clickhouse_schema import (
+    CREATE_WALLET_AGGREGATE_LATEST_SQL,
+    CREATE_MV_WALLET_AGGREGATE_LATEST_SQL,
+    BACKFILL_WALLET_AGGREGATE_LATEST_SQL,
+    MARK_WALLET_AGGREGATE_LATEST_READY_SQL,
+    CREATE_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+    CREATE_MV_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+    BACKFILL_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+    MARK_WALLET_TOKEN_STATS_BY_TOKEN_READY_SQL,
+)
+
+
+def migrate():
+    ch = clickhouse_connect.get_client(
+        host=os.environ.get('CLICKHOUSE_HOST', 'localhost'),
+        port=int(os.environ.get('CLICKHOUSE_PORT', 8443)),
+        username=os.environ.get('CLICKHOUSE_USER', 'default'),
+        password=os.environ.get('CLICKHOUSE_PASSWORD', ''),
+        database=CH_DATABASE,
+        secure=os.environ.get('CLICKHOUSE_SECURE', 'true').lower() == 'true',
+        verify=True,
+        connect_timeout=10,
+        send_receive_timeout=600,
+    )
+
+    print(f"Connected to ClickHouse ({CH_DATABASE})")
+
+    print("Creating wallet_aggregate_latest...")
+    ch.command(CREATE_WALLET_AGGREGATE_LATEST_SQL)
+    print("Creating mv_wallet_aggregate_latest...")
+    ch.command(CREATE_MV_WALLET_AGGREGATE_LATEST_SQL)
+
+    print("Backfilling from wallet_aggregate_stats...")
+    ch.command(BACKFILL_WALLET_AGGREGATE_LATEST_SQL)
+
+    wallets = ch.query("SELECT uniqExact(wallet_address) FROM wallet_aggregate_latest").first_row[0]
+    source = ch.query("SELECT uniqExact(wallet_address) FROM wallet_aggregate_stats").first_row[0]
+    print(f"  Done: {wallets} wallets in wallet_aggregate_latest ({source} in wallet_aggregate_stats).")
+
+    # Only now may query_elite_100 rank from it (clickhouse_client._read_model_ready).
+    ch.command(MARK_WALLET_AGGREGATE_LATEST_READY_SQL)
+    print("  Marked wallet_aggregate_latest ready.")
+
+    print("Creating wallet_token_stats_by_token...")
+    ch.command(CREATE_WALLET_TOKEN_STATS_BY_TOKEN_SQL)
+    print("Creating mv_wallet_token_stats_by_token...")
+    ch.command(CREATE_MV_WALLET_TOKEN_STATS_BY_TOKEN_SQL)
+
+    print("Backfilling from wallet_token_stats...")
+    ch.command(BACKFILL_WALLET_TOKEN_STATS_BY_TOKEN_SQL)
+
+    rows = ch.query("SELECT count() FROM wallet_token_stats_by_token").first_row[0]
+    source = ch.query("SELECT count() FROM wallet_token_stats").first_row[0]
+    print(f"  Done: {rows} rows in wallet_token_stats_by_token ({source} in wallet_token_stats).")
+
+    # Only now may token-first reads switch over (clickhouse_client._read_model_ready).
+    ch.command(MARK_WALLET_TOKEN_STATS_BY_TOKEN_READY_SQL)
+    print("  Marked wallet_token_stats_by_token ready.")
+
+
+if __name__ == "__main__":
+    migrate()
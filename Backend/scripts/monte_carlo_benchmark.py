@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark — Monte Carlo runs/sec as simulation_harness workers are added.
+
+Runs ``run_monte_carlo`` for the same ``--runs`` and ``--days`` with
+``--workers`` processes each (default: 1, 2, 4, … up to the core count).
+For each worker count it reports wall time, runs/sec, speedup over one
+worker, and peak RSS of the parent and of any one worker. It then checks
+that every configuration produced exactly the serial results
+(``elapsed_seconds`` aside).
+
+The harness's own output is suppressed. Runs publish to REDIS_URL or the
+Flask fallback as usual, so point REDIS_URL somewhere harmless.
+
+Run (from Backend/):
+    python -m scripts.monte_carlo_benchmark
+    python -m scripts.monte_carlo_benchmark --runs 200 --days 30 --workers 1 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import sys
+import time
+
+# The simulation modules import each other as top-level modules.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "simulation"))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import simulation_harness  # noqa: E402  (connects its publisher on import)
+
+
+def _default_workers():
+    cores, counts, n = os.cpu_count() or 1, [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=64)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--workers", type=int, nargs="+", default=None, help="worker counts to compare")
+    ap.add_argument("--chunksize", type=int, default=None)
+    args = ap.parse_args()
+    counts = args.workers or _default_workers()
+    if 1 not in counts:
+        counts = [1] + counts
+
+    print(f"=== MONTE CARLO SCALING — {args.runs} runs x {args.days} days, "
+          f"{os.cpu_count()} cores ===")
+    print(f"{'workers':>8} {'wall s':>8} {'runs/s':>8} {'speedup':>8} {'parent MB':>10} {'worker MB':>10}")
+
+    serial = serial_s = None
+    for workers in counts:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = simulation_harness.run_monte_carlo(
+                n_runs=args.runs, days=args.days, workers=workers, chunksize=args.chunksize,
+            )
+        wall = time.perf_counter() - t0
+        result.pop("elapsed_seconds")
+        if serial is None:
+            serial, serial_s = result, wall
+        identical = result == serial
+
+        parent_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        worker_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(f"{workers:>8} {wall:>8.1f} {args.runs / wall:>8.2f} {serial_s / wall:>7.2f}x "
+              f"{parent_mb:>10.0f} {worker_mb if workers > 1 else 0:>10.0f}"
+              f"{'' if identical else '   RESULTS DIFFER FROM SERIAL'}")
+        if not identical:
+            raise SystemExit(1)
+
+    print(f"\nall {len(counts)} configurations match the serial results "
+          f"({serial['runs_completed']} runs completed)")
+
+
+if __name__ == "__main__":
+    main()
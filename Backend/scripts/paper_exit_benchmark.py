@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Benchmark — PaperTrader.check_exits lock hold time and sweep time.
+
+Loads N synthetic open paper positions (default 500) into a PaperTrader with
+Supabase/runtime mocked out, and patches ``_fetch_token_snapshot`` to sleep for
+a simulated SolanaTracker round trip. Every Supabase write charges a simulated
+DB round trip too, so exits cost what they would against a real table. Compares:
+
+  * legacy   — lock held while fetching every snapshot serially and writing
+               each exit (old behaviour)
+  * two-phase — concurrent fetch outside the lock, in-memory apply phase inside
+               it, exit writes flushed after the lock is released
+
+While each sweep runs, a probe thread repeatedly acquires ``trader.lock`` the
+way ``process_signal`` would and records the worst wait — that's the entry
+latency a live signal pays during an exit sweep.
+
+Run:
+    python -m scripts.paper_exit_benchmark --positions 500 --latency-ms 20 --db-latency-ms 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+
+class _SlowQuery:
+    """Query-builder stand-in whose ``execute`` costs one simulated DB round trip."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def insert(self, *_args, **_kwargs):
+        return self
+
+    def update(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, *_args, **_kwargs):
+        return self
+
+    def execute(self):
+        time.sleep(self.latency_s)
+        return MagicMock(data=[])
+
+
+def _make_trader(positions: int, workers: int, db_latency_s: float):
+    from services.paper_trader import PaperPosition, PaperTrader
+
+    with patch("services.paper_trader.get_supabase_client", return_value=MagicMock()), \
+         patch("services.paper_trader.get_paper_trade_runtime", return_value=MagicMock()), \
+         patch("services.paper_trader.PaperExecutionAdapter", return_value=MagicMock()), \
+         patch.object(PaperTrader, "_load_state", lambda self: None):
+        trader = PaperTrader(starting_balance_usd=10_000)
+    trader.exit_fetch_workers = workers
+    trader._table = lambda _name: _SlowQuery(db_latency_s)
+    now = time.time()
+    for i in range(positions):
+        token = f"Bench{i:05d}" + "x" * 34
+        trader.open_positions[token] = PaperPosition(
+            token_address=token, token_ticker=f"B{i}", entry_price=1.0,
+            entry_size_usd=20.0, token_amount=20.0, wallet_count=2,
+            signal_type="double", signal_key=f"bench:{token}", opened_at=now,
+        )
+    return trader
+
+
+def _snapshot_fn(latency_s: float):
+    def _fetch(token_address):
+        time.sleep(latency_s)
+        # Every 10th token hits the 5x take-profit so the apply phase does real exit work.
+        price = 5.5 if int(token_address[5:10]) % 10 == 0 else 1.1
+        return {"price": price, "liquidity": 50_000, "safe": True, "reason": "ok", "ticker": "B"}
+    return _fetch
+
+
+def _legacy_sweep(trader):
+    """The pre-two-phase loop: lock held across every serial fetch and exit write."""
+    t0 = time.perf_counter()
+    with trader.lock:
+        for token in list(trader.open_positions.keys()):
+            position = trader.open_positions.get(token)
+            snapshot = trader._fetch_token_snapshot(token)
+            if position is not None and snapshot:
+                writes = []
+                trader._apply_exit_rules_locked(position, snapshot["price"], writes)
+                trader._flush_exit_writes(writes)
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    return {"sweep_ms": elapsed, "lock_ms": elapsed}
+
+
+def _measure(label, trader, sweep):
+    waits = []
+    stop = threading.Event()
+
+    def _probe():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            with trader.lock:
+                pass
+            waits.append((time.perf_counter() - t0) * 1000.0)
+            time.sleep(0.001)
+
+    probe = threading.Thread(target=_probe, daemon=True)
+    probe.start()
+    stats = sweep()
+    stop.set()
+    probe.join()
+    print(f"{label:<10} sweep={stats['sweep_ms']:8.1f}ms  lock_hold={stats['lock_ms']:8.1f}ms  "
+          f"worst_entry_wait={max(waits, default=0):8.1f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--positions", type=int, default=500)
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="simulated snapshot RTT")
+    ap.add_argument("--db-latency-ms", type=float, default=15.0,
+                    help="simulated Supabase RTT per exit write")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+    db_latency_s = args.db_latency_ms / 1000.0
+
+    fetch = _snapshot_fn(args.latency_ms / 1000.0)
+    print(f"=== PAPER EXIT BENCHMARK — {args.positions} positions, "
+          f"{args.latency_ms:.0f}ms snapshot RTT, {args.db_latency_ms:.0f}ms DB RTT ===")
+
+    legacy = _make_trader(args.positions, workers=1, db_latency_s=db_latency_s)
+    with patch.object(legacy, "_fetch_token_snapshot", side_effect=fetch):
+        _measure("legacy", legacy, lambda: _legacy_sweep(legacy))
+
+    trader = _make_trader(args.positions, workers=args.workers, db_latency_s=db_latency_s)
+    with patch.object(trader, "_fetch_token_snapshot", side_effect=fetch):
+        def _two_phase():
+            trader.check_exits()
+            return trader.last_exit_sweep
+        _measure("two-phase", trader, _two_phase)
+    print(f"(two-phase workers={args.workers}; exits applied={trader.last_exit_sweep.get('exits')}; "
+          f"writes={trader.last_exit_sweep.get('writes')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Timing harness — PaperTradingManager.check_exits on synthetic portfolios.
+
+Builds synthetic ``paper_portfolio`` rows (N positions spread over M distinct
+mints, i.e. many users holding the same tokens), mocks Supabase with a
+call-counting fake, and patches ``_fetch_token_price`` with a simulated
+SolanaTracker round trip. For each shape it reports:
+
+  * price fetches (one per distinct mint) vs positions
+  * Supabase write calls (batched close + per-partial updates + one log insert)
+  * sweep wall time, and the serial per-position lower bound for comparison
+
+Run:
+    python -m scripts.paper_sweep_benchmark --latency-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+# (positions, distinct mints)
+SHAPES = [(100, 100), (500, 50), (2000, 100), (5000, 200)]
+
+
+class _CountingTable:
+    """Minimal chainable fake for ``supabase.schema().table()`` that counts calls."""
+
+    def __init__(self, rows, counter):
+        self._rows = rows
+        self._counter = counter
+        self._op = "select"
+
+    def select(self, *a, **kw):
+        self._op = "select"
+        return self
+
+    def update(self, *a, **kw):
+        self._op = "update"
+        return self
+
+    def insert(self, *a, **kw):
+        self._op = "insert"
+        return self
+
+    def eq(self, *a, **kw):
+        return self
+
+    def in_(self, *a, **kw):
+        return self
+
+    def execute(self):
+        with self._counter["lock"]:
+            self._counter[self._op] += 1
+        result = MagicMock()
+        result.data = self._rows if self._op == "select" else [{"id": "ok"}]
+        return result
+
+
+def _portfolio(positions: int, mints: int):
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(positions):
+        mint = i % mints
+        rows.append({
+            "id": f"pos-{i}",
+            "user_id": f"user-{i // 5}",
+            "token_address": f"Mint{mint:05d}" + "x" * 35,
+            "token_symbol": f"M{mint}",
+            "avg_entry_price": 1.0,
+            "total_invested_usd": 50.0,
+            "current_value_usd": 55.0,
+            "opened_at": (now - timedelta(days=1)).isoformat(),
+            "metadata": {},
+        })
+    return rows
+
+
+def _price_fn(latency_s: float):
+    def _fetch(token_address):
+        time.sleep(latency_s)
+        mint = int(token_address[4:9])
+        # ~10% of mints stop out, ~10% hit the 5x tier, the rest hold.
+        return 0.2 if mint % 10 == 1 else 5.5 if mint % 10 == 2 else 1.2
+    return _fetch
+
+
+def run_shape(positions: int, mints: int, latency_s: float, workers: int):
+    from services.paper_trading_manager import PaperTradingManager
+
+    counter = {"lock": threading.Lock(), "select": 0, "update": 0, "insert": 0}
+    rows = _portfolio(positions, mints)
+    sb = MagicMock()
+    sb.schema.return_value.table.side_effect = lambda name: _CountingTable(rows, counter)
+
+    with patch("services.paper_trading_manager.get_supabase_client", return_value=sb):
+        mgr = PaperTradingManager()
+    mgr.EXIT_FETCH_WORKERS = workers
+    with patch.object(mgr, "_fetch_token_price", side_effect=_price_fn(latency_s)), \
+         patch.object(mgr, "_get_notifier", return_value=MagicMock()):
+        stats = mgr.check_exits()
+
+    serial_floor_ms = positions * latency_s * 1000.0
+    print(f"{positions:>6} pos / {mints:>4} mints | fetches={stats['price_fetches']:>4} "
+          f"writes={counter['update'] + counter['insert']:>4} "
+          f"exits={stats['tp_exits'] + stats['sl_exits'] + stats['age_exits']:>5} | "
+          f"sweep={stats['duration_ms']:>8.1f}ms  (serial per-position floor {serial_floor_ms:>8.0f}ms)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="simulated price RTT")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    print(f"=== PAPER EXIT SWEEP — {args.latency_ms:.0f}ms price RTT, {args.workers} workers ===")
+    for positions, mints in SHAPES:
+        run_shape(positions, mints, args.latency_ms / 1000.0, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Benchmark — bytes and µs per payload for the Redis value codecs.
+
+For each payload family stored in Redis, measures four encodings:
+
+  * json       ``json.dumps``/``json.loads`` text, the format before redis_codec
+  * orjson     redis_codec, REDIS_CODEC=orjson
+  * zstd       redis_codec, REDIS_CODEC=zstd without a dictionary
+  * zstd+dict  redis_codec, REDIS_CODEC=zstd with a dictionary trained on a
+               separate sample of every family (one dictionary, as deployed)
+
+For each, it reports the mean stored size and the mean encode and decode
+time per payload. Times are the best of ``--repeat`` passes over the
+held-out sample.
+
+Payloads are synthetic by default. They are shaped like the real ones, with
+random base58 addresses and prices so they don't compress unrealistically
+well:
+
+  pnl_positions    SolanaTracker /pnl/{wallet}   (st:v2:*)
+  runners          wallet runner history         (runners:*)
+  job_result       phase-1 top traders / buyers  (job_result:*)
+  token_info       token metadata                (token_info:*)
+  pnl              per wallet/token PnL          (pnl:*)
+  token_ath        ATH                           (token_ath:*)
+
+``--from-redis`` samples those key patterns from REDIS_URL instead.
+
+Run:
+    python -m scripts.redis_codec_benchmark
+    python -m scripts.redis_codec_benchmark --samples 500 --dict-kb 64
+    python -m scripts.redis_codec_benchmark --from-redis
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from services.redis_codec import RedisCodec, load_dictionaries, train_dictionary
+
+PATTERNS = {
+    "pnl_positions": "st:v2:*",
+    "runners": "runners:*",
+    "job_result": "job_result:*",
+    "token_info": "token_info:*",
+    "pnl": "pnl:*",
+    "token_ath": "token_ath:*",
+}
+
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _addr(rng):
+    return "".join(rng.choice(_B58) for _ in range(44))
+
+
+def _price(rng):
+    return rng.uniform(1e-8, 1e-2)
+
+
+def _token_info(rng):
+    return {"symbol": f"T{rng.randint(0, 99999)}", "name": f"Token {rng.randint(0, 99999)}",
+            "address": _addr(rng), "liquidity": rng.uniform(1e3, 1e6), "volume_24h": rng.uniform(0, 1e7),
+            "price": _price(rng), "holders": rng.randint(10, 50000), "age_days": rng.uniform(0, 90),
+            "age": f"{rng.randint(0, 90)}d", "creation_time": rng.randint(1.6e9, 1.8e9)}
+
+
+def _runner(rng):
+    info = _token_info(rng)
+    return {"symbol": info["symbol"], "ticker": info["symbol"], "name": info["name"],
+            "address": info["address"], "chain": "solana", "multiplier": round(rng.uniform(5, 500), 2),
+            "period_days": rng.choice([7, 14, 30]), "lowest_price": _price(rng), "highest_price": _price(rng),
+            "current_price": _price(rng), "ath_price": _price(rng), "ath_time": rng.randint(1.6e9, 1.8e9),
+            "liquidity": info["liquidity"], "volume_24h": info["volume_24h"], "holders": info["holders"],
+            "token_age_days": round(info["age_days"], 1), "age": info["age"], "pair_address": _addr(rng),
+            "qualified_at": rng.randint(1.6e9, 1.8e9), "momentum_score": rng.uniform(0, 100),
+            "security": {"mint_revoked": True, "liquidity_locked": rng.random() < 0.5,
+                         "has_social": True, "social_count": rng.randint(0, 4)}}
+
+
+def _position(rng):
+    invested = rng.uniform(10, 5000)
+    return {"holding": rng.uniform(0, 1e7), "held": rng.uniform(0, 1e7), "sold": rng.uniform(0, 1e7),
+            "realized": rng.uniform(-invested, invested * 20), "unrealized": rng.uniform(0, invested),
+            "total": rng.uniform(-invested, invested * 20), "total_sold": rng.uniform(0, 1e4),
+            "total_invested": invested, "average_buy_amount": rng.uniform(1, 500),
+            "current_value": rng.uniform(0, 1e4), "cost_basis": _price(rng),
+            "first_buy_time": rng.randint(1.6e12, 1.8e12), "last_buy_time": rng.randint(1.6e12, 1.8e12),
+            "last_sell_time": rng.randint(1.6e12, 1.8e12), "last_trade_time": rng.randint(1.6e12, 1.8e12),
+            "buy_transactions": rng.randint(1, 40), "sell_transactions": rng.randint(0, 40),
+            "total_transactions": rng.randint(1, 80)}
+
+
+def _synthetic(family, rng):
+    if family == "pnl_positions":
+        tokens = {_addr(rng): _position(rng) for _ in range(rng.randint(20, 150))}
+        return {"tokens": tokens, "summary": {"realized": rng.uniform(-1e4, 1e5), "unrealized": rng.uniform(0, 1e4),
+                                              "total": rng.uniform(-1e4, 1e5), "totalInvested": rng.uniform(0, 1e5),
+                                              "winPercentage": rng.uniform(0, 100), "totalWins": rng.randint(0, 99),
+                                              "totalLosses": rng.randint(0, 99)}}
+    if family == "runners":
+        runs = [_runner(rng) for _ in range(rng.randint(0, 12))]
+        stats = {"total_other_runners": len(runs), "success_rate": rng.random(), "avg_roi": rng.uniform(1, 50)}
+        return {"runners_7d": runs[:3], "runners_14d": runs[:6], "runners_30d": runs,
+                "stats_7d": stats, "stats_14d": stats, "stats_30d": stats, "other_runners": runs, "stats": stats}
+    if family == "job_result":
+        wallets = []
+        for _ in range(rng.randint(30, 100)):
+            p = _position(rng)
+            wallets.append({"wallet": _addr(rng), "source": rng.choice(["top_traders", "first_buyers"]),
+                            "pnl_data": {"pnl": {"token": {"realized": p["realized"], "unrealized": p["unrealized"]}},
+                                         "invested": p["total_invested"], "averages": {"buy": p["cost_basis"]},
+                                         "timing": {"firstBuy": p["first_buy_time"]},
+                                         "counts": {"buys": p["buy_transactions"], "sells": p["sell_transactions"]}}})
+        return {"success": True, "token": _addr(rng), "wallets": wallets, "total": len(wallets)}
+    if family == "token_info":
+        return _token_info(rng)
+    if family == "pnl":
+        p = _position(rng)
+        return {"realized": p["realized"], "unrealized": p["unrealized"], "total_invested": p["total_invested"],
+                "entry_price": p["cost_basis"], "first_buy_time": p["first_buy_time"]}
+    return {"highest_price": _price(rng), "timestamp": rng.randint(1.6e9, 1.8e9)}  # token_ath
+
+
+def _from_redis(family, limit):
+    from services import redis_codec
+    from services.redis_pool import get_redis_binary_client
+    r = get_redis_binary_client()
+    values = []
+    for key in r.scan_iter(PATTERNS[family], count=1000):
+        try:
+            value = redis_codec.loads(r.get(key))
+        except Exception:
+            continue
+        if value is not None:
+            values.append(value)
+        if len(values) >= limit:
+            break
+    return values
+
+
+class _Json:
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value).encode()
+
+    @staticmethod
+    def loads(raw):
+        return json.loads(raw)
+
+
+def _time(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(items) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--samples", type=int, default=200, help="payloads per family, each for training and measuring")
+    ap.add_argument("--dict-kb", type=int, default=32, help="zstd dictionary size")
+    ap.add_argument("--level", type=int, default=3, help="zstd level")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--from-redis", action="store_true", help="sample real payloads from REDIS_URL")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    train, test = {}, {}
+    for family in PATTERNS:
+        if args.from_redis:
+            values = _from_redis(family, 2 * args.samples)
+            train[family], test[family] = values[::2], values[1::2]
+        else:
+            train[family] = [_synthetic(family, rng) for _ in range(args.samples)]
+            test[family] = [_synthetic(family, rng) for _ in range(args.samples)]
+    train = {f: v for f, v in train.items() if v and test[f]}
+
+    t0 = time.perf_counter()
+    with tempfile.NamedTemporaryFile(suffix=".zdict", delete=False) as f:
+        f.write(train_dictionary([v for values in train.values() for v in values], args.dict_kb * 1024))
+    dictionaries = load_dictionaries([f.name])
+    os.unlink(f.name)
+    train_s = time.perf_counter() - t0
+
+    codecs = {
+        "json": _Json,
+        "orjson": RedisCodec("orjson"),
+        "zstd": RedisCodec("zstd", level=args.level),
+        "zstd+dict": RedisCodec("zstd", level=args.level, dictionaries=dictionaries),
+    }
+    source = "REDIS_URL" if args.from_redis else "synthetic"
+    print(f"=== REDIS CODECS — {source} payloads, {args.samples} per family; "
+          f"{args.dict_kb} KB dictionary trained in {train_s:.1f}s ===")
+    print(f"{'family':>14} {'codec':>10} {'bytes':>9} {'ratio':>6} {'enc µs':>8} {'dec µs':>8}")
+    totals = {name: [0, 0.0, 0.0] for name in codecs}
+    for family in train:
+        values = test[family]
+        json_bytes = None
+        for name, codec in codecs.items():
+            encoded = [codec.dumps(v) for v in values]
+            assert all(codec.loads(e) == json.loads(json.dumps(v)) for e, v in zip(encoded, values))
+            size = sum(map(len, encoded)) / len(encoded)
+            json_bytes = json_bytes or size
+            enc = _time(codec.dumps, values, args.repeat)
+            dec = _time(codec.loads, encoded, args.repeat)
+            totals[name][0] += size
+            totals[name][1] += enc
+            totals[name][2] += dec
+            print(f"{family:>14} {name:>10} {size:>9,.0f} {json_bytes / size:>5.1f}x {enc:>8.1f} {dec:>8.1f}")
+        print()
+
+    print("sum of per-family means (one payload of each family):")
+    for name, (size, enc, dec) in totals.items():
+        print(f"{'':>14} {name:>10} {size:>9,.0f} {totals['json'][0] / size:>5.1f}x {enc:>8.1f} {dec:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
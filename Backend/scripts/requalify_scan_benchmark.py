@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Benchmark — requalify_existing_data paging: OFFSET over FINAL vs keyset.
+
+Generates a ``--rows`` wallet_token_stats table with ``--dup-pct`` of the keys
+carrying a second, newer unmerged version, then reads it page by page two ways:
+
+  * offset: ``SELECT ... FINAL ORDER BY wallet, token LIMIT n OFFSET k``
+            (the pre-keyset loop)
+  * keyset: ``_requalify_page_query`` — seek past the last (wallet, token),
+            latest version via LIMIT 1 BY, streamed with query_row_block_stream
+
+Each method times pages sampled at 0/25/50/75/99% of the table and projects a
+full run from them. The keyset walk is also run end to end, and its row count
+is checked against the number of distinct keys. Reads only; nothing is
+re-inserted.
+
+Backends:
+  * ClickHouse (``--clickhouse``) — the real thing. Builds the table in a
+    scratch database ``--database`` from ``numbers()`` on the server and
+    drops it afterwards. Uses the usual CLICKHOUSE_* env vars; point them at a
+    local server, e.g. ``docker run -p 8123:8123 clickhouse/clickhouse-server``
+    with CLICKHOUSE_PORT=8123 CLICKHOUSE_SECURE=false.
+  * SQLite (default) — an in-process stand-in with the same sort key, for
+    machines without a server. It shows the shape (OFFSET cost grows with
+    depth, keyset stays flat), not ClickHouse numbers.
+
+Run:
+    python -m scripts.requalify_scan_benchmark
+    python -m scripts.requalify_scan_benchmark --rows 2000000
+    python -m scripts.requalify_scan_benchmark --clickhouse --rows 5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import time
+
+from tasks.wallet_qualification import REQUALIFY_COLUMNS, _requalify_page_query
+
+TOKENS_PER_WALLET = 20
+
+
+# ---------------------------------------------------------------------------
+# ClickHouse
+# ---------------------------------------------------------------------------
+
+def _ch_generate_sql(n: int, dup_pct: int | None = None) -> str:
+    """Base rows, or (with ``dup_pct``) newer versions of that share of keys."""
+    dup_only = dup_pct is not None
+    wallet = f"concat('W', leftPad(toString(intDiv(number, {TOKENS_PER_WALLET})), 10, '0'))"
+    where = f"WHERE number % 100 < {dup_pct}" if dup_only else ""
+    return f"""
+        INSERT INTO wallet_token_stats
+            (wallet_address, token_address, scan_id, first_entry_price, first_entry_usd,
+             first_entry_timestamp, avg_entry_price, avg_entry_to_ath_mult,
+             entry_price_to_launch_mult, all_buys, all_sells, buy_count, sell_count,
+             total_spent_usd, realized_pnl_usd, unrealized_pnl_usd, total_pnl_usd,
+             realized_roi_mult, total_roi_mult, qualifies, outcome, disqualify_reason,
+             wallet_source, updated_at)
+        SELECT {wallet}, concat('T', toString(number % {TOKENS_PER_WALLET})), toString(number),
+               rand() / 4e9, 100, now() - toIntervalDay(number % 180), rand() / 4e9, 10, 2,
+               '[]', '[]', 1, 1, 50 + number % 400, 10, 0, 10,
+               (number % 97) / 10.0, (number % 97) / 10.0, 0, 'loss', '', 'top_traders',
+               now() - toIntervalSecond({0 if dup_only else 3600})
+        FROM numbers({n}) {where}
+    """
+
+
+def _ch_client(database=None):
+    import clickhouse_connect
+    return clickhouse_connect.get_client(
+        host=os.environ.get('CLICKHOUSE_HOST', 'localhost'),
+        port=int(os.environ.get('CLICKHOUSE_PORT', 8123)),
+        username=os.environ.get('CLICKHOUSE_USER', 'default'),
+        password=os.environ.get('CLICKHOUSE_PASSWORD', ''),
+        secure=os.environ.get('CLICKHOUSE_SECURE', 'false').lower() == 'true',
+        database=database,
+        send_receive_timeout=600,
+    )
+
+
+def _ch_setup(args):
+    from services.clickhouse_schema import CREATE_WALLET_TOKEN_STATS_SQL
+
+    _ch_client().command(f"CREATE DATABASE IF NOT EXISTS `{args.database}`")
+    ch = _ch_client(args.database)
+    ch.command("DROP TABLE IF EXISTS wallet_token_stats")
+    ch.command(CREATE_WALLET_TOKEN_STATS_SQL)
+    ch.command(_ch_generate_sql(args.rows))
+    ch.command(_ch_generate_sql(args.rows, dup_pct=args.dup_pct))
+    return ch
+
+
+def _ch_offset_page(ch, offset, size):
+    result = ch.query(
+        f"SELECT {', '.join(REQUALIFY_COLUMNS)} FROM wallet_token_stats FINAL "
+        f"ORDER BY wallet_address, token_address LIMIT {size} OFFSET {offset}"
+    )
+    rows = result.result_rows
+    return len(rows), (rows[-1][0], rows[-1][1]) if rows else None
+
+
+def _ch_keyset_page(ch, after, size):
+    sql, params = _requalify_page_query(after, size)
+    n, last = 0, None
+    with ch.query_row_block_stream(sql, parameters=params) as stream:
+        for block in stream:
+            n += len(block)
+            if block:
+                last = (block[-1][0], block[-1][1])
+    return n, last
+
+
+def _ch_key_at(ch, offset):
+    row = ch.query(
+        "SELECT wallet_address, token_address FROM wallet_token_stats "
+        "GROUP BY wallet_address, token_address ORDER BY wallet_address, token_address "
+        f"LIMIT 1 OFFSET {max(offset - 1, 0)}"
+    ).first_row
+    return (row[0], row[1]) if offset else None
+
+
+# ---------------------------------------------------------------------------
+# SQLite stand-in
+# ---------------------------------------------------------------------------
+
+_SQLITE_COLS = "wallet_address, token_address, realized_roi_mult, total_spent_usd, outcome, qualifies"
+
+
+def _sqlite_setup(args):
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "CREATE TABLE wallet_token_stats (wallet_address TEXT, token_address TEXT, updated_at INTEGER, "
+        "realized_roi_mult REAL, total_spent_usd REAL, outcome TEXT, qualifies INTEGER, "
+        "PRIMARY KEY (wallet_address, token_address, updated_at)) WITHOUT ROWID"
+    )
+
+    def rows(dup_only):
+        for i in range(args.rows):
+            if dup_only and i % 100 >= args.dup_pct:
+                continue
+            yield (f"W{i // TOKENS_PER_WALLET:010d}", f"T{i % TOKENS_PER_WALLET}", 2 if dup_only else 1,
+                   (i % 97) / 10.0, 50 + i % 400, "loss", 0)
+
+    for dup_only in (False, True):
+        db.executemany("INSERT INTO wallet_token_stats VALUES (?,?,?,?,?,?,?)", rows(dup_only))
+    db.commit()
+    return db
+
+
+# Latest version per key, as FINAL / LIMIT 1 BY would give: SQLite takes the
+# bare columns from the MAX(updated_at) row. The GROUP BY follows the primary
+# key, so it streams in key order.
+_SQLITE_DEDUP = (
+    f"SELECT {_SQLITE_COLS}, MAX(updated_at) FROM wallet_token_stats {{where}} "
+    "GROUP BY wallet_address, token_address "
+    "ORDER BY wallet_address, token_address LIMIT {limit}"
+)
+
+
+def _sqlite_offset_page(db, offset, size):
+    rows = db.execute(_SQLITE_DEDUP.format(where="", limit=f"{size} OFFSET {offset}")).fetchall()
+    return len(rows), (rows[-1][0], rows[-1][1]) if rows else None
+
+
+def _sqlite_keyset_page(db, after, size):
+    where, params = "", ()
+    if after:
+        where = "WHERE wallet_address >= ? AND (wallet_address > ? OR token_address > ?)"
+        params = (after[0], after[0], after[1])
+    cur = db.execute(_SQLITE_DEDUP.format(where=where, limit=size), params)
+    n, last = 0, None
+    while True:
+        block = cur.fetchmany(1024)
+        if not block:
+            break
+        n += len(block)
+        last = (block[-1][0], block[-1][1])
+    return n, last
+
+
+def _sqlite_key_at(db, offset):
+    if not offset:
+        return None
+    row = db.execute(
+        "SELECT DISTINCT wallet_address, token_address FROM wallet_token_stats "
+        "ORDER BY wallet_address, token_address LIMIT 1 OFFSET ?", (offset - 1,)
+    ).fetchone()
+    return (row[0], row[1])
+
+
+# ---------------------------------------------------------------------------
+
+def _timed(fn, *a):
+    t0 = time.perf_counter()
+    out = fn(*a)
+    return time.perf_counter() - t0, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2_000_000, help="distinct (wallet, token) keys")
+    ap.add_argument("--dup-pct", type=int, default=10, help="percent of keys with an unmerged newer version")
+    ap.add_argument("--batch", type=int, default=5000, help="page size (requalify batch_size)")
+    ap.add_argument("--clickhouse", action="store_true", help="run against a ClickHouse server")
+    ap.add_argument("--database", default="bench_requalify", help="scratch ClickHouse database")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    if args.clickhouse:
+        ch = _ch_setup(args)
+        offset_page, keyset_page, key_at = (lambda *a: _ch_offset_page(ch, *a),
+                                            lambda *a: _ch_keyset_page(ch, *a),
+                                            lambda o: _ch_key_at(ch, o))
+        backend = "ClickHouse"
+    else:
+        db = _sqlite_setup(args)
+        offset_page, keyset_page, key_at = (lambda *a: _sqlite_offset_page(db, *a),
+                                            lambda *a: _sqlite_keyset_page(db, *a),
+                                            lambda o: _sqlite_key_at(db, o))
+        backend = "SQLite stand-in"
+    setup_s = time.perf_counter() - t0
+
+    pages = -(-args.rows // args.batch)
+    print(f"=== REQUALIFY SCAN — {backend}, {args.rows:,} keys (+{args.dup_pct}% unmerged versions), "
+          f"{args.batch:,}-row pages, {pages:,} pages; generated in {setup_s:.1f}s ===")
+
+    print(f"{'depth':>6} {'offset page':>12} {'keyset page':>12}")
+    offset_times, keyset_times = [], []
+    for pct in (0, 25, 50, 75, 99):
+        at = (args.rows * pct // 100) // args.batch * args.batch
+        o_s, (o_n, o_last) = _timed(offset_page, at, args.batch)
+        k_s, (k_n, k_last) = _timed(keyset_page, key_at(at), args.batch)
+        assert (o_n, o_last) == (k_n, k_last), f"page mismatch at {pct}%"
+        offset_times.append(o_s)
+        keyset_times.append(k_s)
+        print(f"{pct:>5}% {o_s * 1000:>10.1f}ms {k_s * 1000:>10.1f}ms")
+
+    # OFFSET cost is linear in depth, so the mean of the evenly spaced samples
+    # projects the full run; keyset pages cost the same at any depth.
+    proj_offset = sum(offset_times) / len(offset_times) * pages
+    proj_keyset = sum(keyset_times) / len(keyset_times) * pages
+    print(f"projected full run: offset {proj_offset:,.1f}s   keyset {proj_keyset:,.1f}s "
+          f"({proj_offset / proj_keyset:,.1f}x)")
+
+    t0 = time.perf_counter()
+    after, total = None, 0
+    while True:
+        n, after = keyset_page(after, args.batch)
+        total += n
+        if n < args.batch:
+            break
+    print(f"keyset full walk: {time.perf_counter() - t0:,.1f}s, {total:,} rows "
+          f"({'matches' if total == args.rows else 'MISMATCH vs'} {args.rows:,} distinct keys)")
+
+    if args.clickhouse:
+        ch.command(f"DROP DATABASE IF EXISTS `{args.database}`")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Stress test for the multi-wallet signal window scheduler.
+
+Opens N concurrent token windows (default 10,000) on a single
+SignalWindowScheduler, each receiving a few buffered wallet buys, and reports:
+
+  * live thread count while every window is open (must stay flat — the old
+    per-token threading.Timer design needed one OS thread per window)
+  * Python heap growth (tracemalloc) for the buffered state
+  * firing jitter: actual fire time minus scheduled deadline (p50/p95/p99/max)
+
+Redis persistence is off by default; pass --redis to exercise the ZSET path
+against REDIS_URL.
+
+Run:
+    python -m scripts.signal_window_stress --windows 10000 --window-s 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+import tracemalloc
+
+
+def _pcts(samples_ms):
+    if not samples_ms:
+        return (0, 0, 0)
+    s = sorted(samples_ms)
+    p50 = s[len(s) // 2]
+    p95 = s[min(len(s) - 1, int(len(s) * 0.95))]
+    p99 = s[min(len(s) - 1, int(len(s) * 0.99))]
+    return (p50, p95, p99)
+
+
+def run(windows: int, window_s: float, buys_per_window: int, use_redis: bool) -> int:
+    from services.signal_windows import SignalWindowScheduler
+
+    redis_client = None
+    if use_redis:
+        from services.redis_pool import get_redis_client
+        redis_client = get_redis_client()
+
+    jitter_ms = []
+    fired = threading.Event()
+    lock = threading.Lock()
+    deadlines = {}
+
+    def on_fire(key, entries):
+        now = time.time()
+        with lock:
+            jitter_ms.append((now - deadlines[key]) * 1000.0)
+            if len(jitter_ms) == windows:
+                fired.set()
+
+    sched = SignalWindowScheduler(on_fire=on_fire, window_s=window_s, redis_client=redis_client)
+    threads_before = threading.active_count()
+
+    tracemalloc.start()
+    mem_before, _ = tracemalloc.get_traced_memory()
+    t0 = time.perf_counter()
+    for i in range(windows):
+        key = f"StressToken{i:06d}" + "x" * 28
+        for b in range(buys_per_window):
+            opened_at = time.time()
+            if sched.add(key, [{"wallet": f"W{b}", "tier": "A", "usd_value": 100.0}]):
+                deadlines[key] = opened_at + window_s
+    enqueue_s = time.perf_counter() - t0
+    mem_open, mem_peak = tracemalloc.get_traced_memory()
+    threads_open = threading.active_count()
+
+    print(f"=== SIGNAL WINDOW STRESS — {windows} windows x {buys_per_window} buys ===")
+    print(f"Enqueue: {windows * buys_per_window} adds in {enqueue_s:.2f}s "
+          f"({windows * buys_per_window / max(enqueue_s, 1e-9):,.0f}/s)")
+    print(f"Threads: before={threads_before} open={threads_open} "
+          f"(+{threads_open - threads_before}; per-token Timers would be +{windows})")
+    print(f"Memory:  +{(mem_open - mem_before) / 1024 / 1024:.1f} MiB buffered "
+          f"(peak {mem_peak / 1024 / 1024:.1f} MiB)")
+
+    ok = fired.wait(timeout=window_s + 60)
+    tracemalloc.stop()
+    sched.stop()
+
+    p50, p95, p99 = _pcts(jitter_ms)
+    print(f"Fired:   {len(jitter_ms)}/{windows}")
+    print(f"Jitter:  p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms "
+          f"max={max(jitter_ms, default=0):.1f}ms")
+    return 0 if ok else 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, default=10_000)
+    ap.add_argument("--window-s", type=float, default=2.0)
+    ap.add_argument("--buys", type=int, default=3, help="buffered buys per window")
+    ap.add_argument("--redis", action="store_true", help="persist windows to Redis")
+    args = ap.parse_args()
+    raise SystemExit(run(args.windows, args.window_s, args.buys, args.redis))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Load test — TelegramDelivery against a local fake Bot API.
+
+Starts an in-process HTTP server that speaks enough of the Bot API
+(``/bot<token>/sendMessage``) and enforces Telegram's limits itself: 30 msg/s
+per bot and 1 msg/s per chat, answering 429 + ``retry_after`` when exceeded.
+Then fires a burst of alerts from several worker threads through
+``TelegramDelivery`` while a drainer re-sends due retries, and reports:
+
+  * messages delivered / fake-API 429s / local deferrals
+  * worker time blocked per send (should be ~RTT; nothing sleeps)
+  * send latency p50/p95/p99 and peak delay-queue depth
+
+Uses REDIS_URL for the delay queue; ``--memory-queue`` swaps in a small
+in-process ZSET so the harness runs on a laptop without Redis (pacing then
+uses the per-process fallback pacers).
+
+Run:
+    python -m scripts.telegram_delivery_load --messages 2000 --chats 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import concurrent.futures as cf
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _FakeBotAPI(BaseHTTPRequestHandler):
+    """sendMessage endpoint with Telegram-style global and per-chat limits."""
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    window: list = []
+    last_per_chat: dict = {}
+    delivered: dict = defaultdict(int)
+    rejected = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        chat = str(body.get("chat_id"))
+        now = time.monotonic()
+        with self.lock:
+            self.window[:] = [t for t in self.window if now - t < 1.0]
+            too_fast_chat = now - self.last_per_chat.get(chat, -10) < 0.9
+            if len(self.window) >= 30 or too_fast_chat:
+                type(self).rejected += 1
+                payload = {"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}
+            else:
+                self.window.append(now)
+                self.last_per_chat[chat] = now
+                self.delivered[chat] += 1
+                payload = {"ok": True, "result": {"message_id": sum(self.delivered.values())}}
+        raw = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class _MemoryZSet:
+    """Just enough of redis.Redis for the delay queue (zadd/zrangebyscore/zrem/zcard)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scores = {}
+        self._sorted = []
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            for member, score in mapping.items():
+                if member in self._scores:
+                    self._sorted.remove((self._scores[member], member))
+                self._scores[member] = score
+                bisect.insort(self._sorted, (score, member))
+
+    def zrangebyscore(self, key, lo, hi, start=0, num=None, withscores=False):
+        with self._lock:
+            due = [(m, s) if withscores else m for s, m in self._sorted if lo <= s <= hi]
+        return due[start:start + num] if num else due
+
+    def zrem(self, key, member):
+        with self._lock:
+            score = self._scores.pop(member, None)
+            if score is None:
+                return 0
+            self._sorted.remove((score, member))
+            return 1
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._scores)
+
+
+def _pcts(samples):
+    if not samples:
+        return (0, 0, 0)
+    s = sorted(samples)
+    return (s[len(s) // 2], s[min(len(s) - 1, int(len(s) * 0.95))], s[min(len(s) - 1, int(len(s) * 0.99))])
+
+
+def run(messages: int, chats: int, workers: int, memory_queue: bool) -> int:
+    from services.telegram_delivery import DELAY_QUEUE_KEY, TelegramDelivery
+
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeBotAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    if memory_queue:
+        redis_client = _MemoryZSet()
+    else:
+        from services.redis_pool import get_redis_client
+        redis_client = get_redis_client()
+        redis_client.delete(DELAY_QUEUE_KEY)
+
+    delivery = TelegramDelivery("LOADTEST", redis_client=redis_client, api_base=api_base)
+    blocked_ms = []
+    peak_depth = 0
+    done = threading.Event()
+
+    def fire(i):
+        t0 = time.perf_counter()
+        delivery.call("sendMessage", {"chat_id": 1000 + (i % chats), "text": f"alert {i}"}, defer=True)
+        blocked_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    def drainer():
+        nonlocal peak_depth
+        while not done.is_set():
+            peak_depth = max(peak_depth, delivery.queue_depth())
+            delivery.drain_due()
+            time.sleep(0.1)
+
+    print(f"=== TELEGRAM DELIVERY LOAD — {messages} messages, {chats} chats, {workers} workers ===")
+    drain_thread = threading.Thread(target=drainer, daemon=True)
+    drain_thread.start()
+    t0 = time.perf_counter()
+    with cf.ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(fire, range(messages)))
+    burst_s = time.perf_counter() - t0
+
+    deadline = time.time() + max(60, messages / 20)
+    while sum(_FakeBotAPI.delivered.values()) < messages and time.time() < deadline:
+        time.sleep(0.2)
+    total_s = time.perf_counter() - t0
+    done.set()
+    drain_thread.join()
+    server.shutdown()
+
+    delivered = sum(_FakeBotAPI.delivered.values())
+    metrics = delivery.metrics()
+    b50, b95, b99 = _pcts(blocked_ms)
+    print(f"Burst accepted in {burst_s:.2f}s; all delivered in {total_s:.1f}s "
+          f"({delivered / total_s:.1f} msg/s, Telegram cap 30/s)")
+    print(f"Delivered: {delivered}/{messages}  fake-API 429s: {_FakeBotAPI.rejected}  "
+          f"local deferrals: {metrics['deferred']}  dropped: {metrics['dropped']}")
+    print(f"Worker blocked per call: p50={b50:.1f}ms p95={b95:.1f}ms p99={b99:.1f}ms")
+    print(f"Send latency: p50={metrics['send_ms_p50']}ms p95={metrics['send_ms_p95']}ms "
+          f"p99={metrics['send_ms_p99']}ms  peak queue depth={peak_depth}")
+    return 0 if delivered == messages else 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=2000)
+    ap.add_argument("--chats", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--memory-queue", action="store_true", help="in-process delay queue (no Redis)")
+    args = ap.parse_args()
+    raise SystemExit(run(args.messages, args.chats, args.workers, args.memory_queue))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Load test — replay synthetic webhook updates through UpdateDispatcher.
+
+Generates a burst of Telegram updates (messages, repeated button presses,
+and a slice of redeliveries with the same ``update_id``) across many chats,
+submits them from several "request" threads the way Flask would, and runs a
+handler that sleeps for a simulated downstream round trip. Reports:
+
+  * ack latency (time the webhook spends in ``submit``) p50/p99
+  * end-to-end drain time, peak queue depth, peak live threads
+  * per-chat order violations (should be 0)
+  * duplicate / collapsed / shed / overflow counts
+
+``--baseline`` replays the same updates with the old thread-per-update
+handling for comparison (peak threads and order violations).
+
+Run:
+    python -m scripts.telegram_update_load --updates 5000 --chats 500 --handler-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+
+
+def _updates(n: int, chats: int, seed: int = 7):
+    rng = random.Random(seed)
+    out = []
+    uid = 0
+    while len(out) < n:
+        chat = rng.randrange(chats)
+        roll = rng.random()
+        uid += 1
+        if roll < 0.65:
+            out.append({"update_id": uid, "message": {"chat": {"id": chat}, "text": f"m{uid}"}})
+        elif roll < 0.95:
+            # Impatient user: the same button pressed a few times in a row.
+            screen = uid
+            for _ in range(rng.randint(1, 4)):
+                out.append({"update_id": uid, "callback_query": {
+                    "id": str(uid), "from": {"id": chat}, "data": "menu|refresh",
+                    "message": {"message_id": screen, "chat": {"id": chat}},
+                }})
+                uid += 1
+        else:
+            # Telegram redelivering an update we were slow to acknowledge.
+            out.append(dict(out[rng.randrange(len(out))]) if out else
+                       {"update_id": uid, "message": {"chat": {"id": chat}, "text": "x"}})
+    out = out[:n]
+    for i, update in enumerate(out):
+        update["_seq"] = i
+    return out
+
+
+def _chat_of(update):
+    if "callback_query" in update:
+        return update["callback_query"]["from"]["id"]
+    return update["message"]["chat"]["id"]
+
+
+def _pcts(samples):
+    if not samples:
+        return (0.0, 0.0)
+    s = sorted(samples)
+    return (s[len(s) // 2], s[min(len(s) - 1, int(len(s) * 0.99))])
+
+
+def run(n: int, chats: int, handler_ms: float, workers: int, submitters: int, baseline: bool) -> int:
+    from services.telegram_update_dispatcher import UpdateDispatcher
+
+    updates = _updates(n, chats)
+    last_seen = defaultdict(lambda: -1)
+    violations = 0
+    handled = 0
+    lock = threading.Lock()
+    peak_threads = threading.active_count()
+
+    def handler(update):
+        nonlocal violations, handled, peak_threads
+        time.sleep(handler_ms / 1000.0)
+        chat, i = _chat_of(update), update["_seq"]
+        with lock:
+            if i < last_seen[chat]:
+                violations += 1
+            last_seen[chat] = i
+            handled += 1
+            peak_threads = max(peak_threads, threading.active_count())
+
+    dispatcher = UpdateDispatcher(handler, workers=workers, max_pending=max(n, 1))
+    ack_ms = []
+
+    def submit_slice(k):
+        # Each chat is owned by one submitter, so submit order per chat == replay order.
+        for update in updates:
+            if _chat_of(update) % submitters != k:
+                continue
+            t0 = time.perf_counter()
+            if baseline:
+                threading.Thread(target=handler, args=(update,), daemon=True).start()
+            else:
+                dispatcher.submit(update)
+            ack_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    mode = "thread-per-update (baseline)" if baseline else f"UpdateDispatcher ({workers} workers)"
+    print(f"=== TELEGRAM WEBHOOK LOAD — {n} updates, {chats} chats, {handler_ms:.0f}ms handler, {mode} ===")
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=submit_slice, args=(k,)) for k in range(submitters)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    burst_s = time.perf_counter() - t0
+
+    if baseline:
+        while threading.active_count() > 1 and time.perf_counter() - t0 < 120:
+            time.sleep(0.05)
+        expected = n
+    else:
+        dispatcher.stop(timeout=300)
+        m = dispatcher.metrics()
+        expected = m["queued"]
+    total_s = time.perf_counter() - t0
+
+    a50, a99 = _pcts(ack_ms)
+    print(f"Ack latency: p50={a50:.3f}ms p99={a99:.3f}ms  (burst submitted in {burst_s:.2f}s)")
+    print(f"Handled {handled}/{expected} in {total_s:.2f}s  peak live threads={peak_threads}  "
+          f"order violations={violations}")
+    if not baseline:
+        print(f"Duplicates={m['duplicate']} collapsed={m['collapsed']} shed={m['shed']} "
+              f"overflow={m['overflow']}  peak depth={m['peak_pending']}  "
+              f"queue wait p50={m['wait_ms_p50']}ms p99={m['wait_ms_p99']}ms")
+    return 0 if baseline or (violations == 0 and handled == expected) else 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--updates", type=int, default=5000)
+    ap.add_argument("--chats", type=int, default=500)
+    ap.add_argument("--handler-ms", type=float, default=5.0, help="simulated handler round trip")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--submitters", type=int, default=8, help="concurrent webhook request threads")
+    ap.add_argument("--baseline", action="store_true", help="old thread-per-update handling")
+    args = ap.parse_args()
+    raise SystemExit(run(args.updates, args.chats, args.handler_ms, args.workers,
+                         args.submitters, args.baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Benchmark — replay a cache key trace through WalletPumpAnalyzer's cache tiers.
+
+A trace is one lookup per line, ``<unix ts> <family> <key>``. The analyzer
+writes one when ANALYZER_CACHE_TRACE=/path/to/trace is set. Without
+``--trace``, a synthetic trace is generated: ``--lookups`` lookups over
+``--span-s`` seconds. Each family's keys are Zipf-distributed, and the family
+mix leans on token info / ATH the way an analysis run does.
+``--save-trace`` writes it out for reuse.
+
+Each lookup is replayed as ``TieredCache.get_or_load`` with the analyzer's
+real CACHE_POLICIES and DUCKDB_BINDINGS, against the analyzer's DuckDB
+tables (in memory). The cache clock follows the trace timestamps, so TTLs,
+L1 expiry and refresh-ahead behave as they would have live. A miss
+everywhere "fetches" a synthetic value of a realistic size for its family,
+after ``--api-ms``. Two configurations are compared:
+
+  * redis+duckdb: no L1, DuckDB written on every store — the old path
+  * tiered:       ``--l1-mb`` L1, DuckDB written behind in batches
+
+For each, the report gives wall time, mean µs per lookup, Redis round trips,
+origin loads and per-tier hit rates per family.
+
+Redis is an in-process stand-in that sleeps ``--rtt-ms`` per round trip
+(``--redis`` uses REDIS_URL instead, under a scratch key prefix).
+
+Run:
+    python -m scripts.tiered_cache_replay_benchmark
+    python -m scripts.tiered_cache_replay_benchmark --lookups 200000 --rtt-ms 0.3
+    ANALYZER_CACHE_TRACE=/tmp/keys.trace <run the app>;
+        python -m scripts.tiered_cache_replay_benchmark --trace /tmp/keys.trace
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import duckdb
+
+from services.tiered_cache import TieredCache
+from services.wallet_analyzer import CACHE_POLICIES, DUCKDB_BINDINGS, WalletPumpAnalyzer
+
+# family: (share of lookups, distinct keys)
+MIX = {
+    "token_info":     (0.30, 4_000),
+    "token_ath":      (0.15, 4_000),
+    "token_security": (0.10, 4_000),
+    "launch_price":   (0.08, 4_000),
+    "token_runner":   (0.07, 4_000),
+    "pnl":            (0.20, 60_000),
+    "runners":        (0.07, 15_000),
+}
+
+
+class _MemoryRedis:
+    """GET/SETEX/DEL/TTL/pipeline on the trace clock, ``rtt_s`` per round trip."""
+
+    def __init__(self, rtt_s, clock):
+        self.rtt_s = rtt_s
+        self.clock = clock
+        self.store = {}
+        self.round_trips = 0
+        self.lock = threading.Lock()
+
+    def _trip(self):
+        with self.lock:
+            self.round_trips += 1
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    def _get(self, k):
+        v = self.store.get(k)
+        return v[0] if v and v[1] > self.clock() else None
+
+    def _ttl(self, k):
+        v = self.store.get(k)
+        return int(v[1] - self.clock()) if v else -2
+
+    def get(self, k):
+        self._trip()
+        return self._get(k)
+
+    def setex(self, k, ttl, v):
+        self._trip()
+        self.store[k] = (v, self.clock() + ttl)
+
+    def delete(self, k):
+        self._trip()
+        self.store.pop(k, None)
+
+    def pipeline(self, transaction=False):
+        redis, calls = self, []
+
+        class _Pipe:
+            def get(self, k):
+                calls.append(lambda: redis._get(k))
+
+            def ttl(self, k):
+                calls.append(lambda: redis._ttl(k))
+
+            def execute(self):
+                redis._trip()
+                return [c() for c in calls]
+
+        return _Pipe()
+
+
+class _PrefixedRedis:
+    """A real Redis under a scratch prefix, counting round trips."""
+
+    def __init__(self, client, prefix):
+        self.client = client
+        self.prefix = prefix
+        self.round_trips = 0
+
+    def get(self, k):
+        self.round_trips += 1
+        return self.client.get(self.prefix + k)
+
+    def setex(self, k, ttl, v):
+        self.round_trips += 1
+        return self.client.setex(self.prefix + k, ttl, v)
+
+    def delete(self, k):
+        self.round_trips += 1
+        return self.client.delete(self.prefix + k)
+
+    def pipeline(self, transaction=False):
+        pipe, outer = self.client.pipeline(transaction=transaction), self
+
+        class _Pipe:
+            def get(self, k):
+                pipe.get(outer.prefix + k)
+
+            def ttl(self, k):
+                pipe.ttl(outer.prefix + k)
+
+            def execute(self):
+                outer.round_trips += 1
+                return pipe.execute()
+
+        return _Pipe()
+
+    def cleanup(self):
+        for k in self.client.scan_iter(self.prefix + "*", count=1000):
+            self.client.delete(k)
+
+
+def _zipf_sampler(rng, n, s=1.1):
+    weights = [1 / (i + 1) ** s for i in range(n)]
+    total = sum(weights)
+    cum, acc = [], 0.0
+    for w in weights:
+        acc += w / total
+        cum.append(acc)
+
+    import bisect
+
+    def sample():
+        return min(bisect.bisect_left(cum, rng.random()), n - 1)
+    return sample
+
+
+def _synthetic_trace(args):
+    rng = random.Random(args.seed)
+    families = list(MIX)
+    shares = [MIX[f][0] for f in families]
+    samplers = {f: _zipf_sampler(rng, MIX[f][1]) for f in families}
+    start = 1_760_000_000.0
+    trace = []
+    for i in range(args.lookups):
+        fam = rng.choices(families, shares)[0]
+        k = samplers[fam]()
+        if fam == "pnl":
+            key = f"W{k // 20:043d}:M{k % 400:043d}"
+        elif fam == "runners":
+            key = f"W{k:043d}"
+        else:
+            key = f"M{k:043d}"
+        trace.append((start + args.span_s * i / args.lookups, fam, key))
+    return trace
+
+
+def _load_trace(path):
+    trace = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split(" ", 2)
+            if len(parts) == 3 and parts[1] in CACHE_POLICIES:
+                trace.append((float(parts[0]), parts[1], parts[2].rstrip("\n")))
+    return trace
+
+
+def _value(family, key):
+    """A synthetic API result shaped (and sized) like the family's real one."""
+    h = hash(key) & 0xFFFF
+    if family == "pnl":
+        return {"realized": h * 1.5, "unrealized": h * 0.2, "total_invested": 100.0 + h,
+                "entry_price": 1e-6 * (h + 1), "first_buy_time": 1_700_000_000 + h}
+    if family == "launch_price":
+        return {"price": 1e-7 * (h + 1)}
+    if family == "token_ath":
+        return {"highest_price": 1e-4 * (h + 1), "timestamp": 1_700_000_000 + h}
+    if family == "token_info":
+        return {"symbol": f"S{h}", "name": f"Token {h}", "address": key, "liquidity": 5e4 + h,
+                "volume_24h": 1e5 + h, "price": 1e-5 * (h + 1), "holders": h, "age_days": 3.5,
+                "age": "3.5d", "creation_time": 1_700_000_000 + h}
+    if family == "token_security":
+        return {"is_mint_revoked": True, "is_liquidity_locked": h % 2 == 0, "freeze_revoked": True,
+                "has_social": True, "social_count": 2, "socials": {"twitter": "x", "website": "y"},
+                "passes_security": h % 2 == 0}
+    if family == "token_runner":
+        return {"symbol": f"S{h}", "ticker": f"S{h}", "address": key, "multiplier": 5.0 + h % 50}
+    runner = {"address": f"M{h:043d}", "symbol": f"S{h}", "multiplier": 12.5, "roi": 4.2,
+              "entry_price": 1e-6, "ath_price": 1e-4, "invested": 250.0, "realized": 900.0}
+    stats = {"total_other_runners": 12, "success_rate": 0.6, "avg_roi": 4.2}
+    return {"runners_7d": [runner] * 3, "runners_14d": [runner] * 6, "runners_30d": [runner] * 12,
+            "stats_7d": stats, "stats_14d": stats, "stats_30d": stats,
+            "other_runners": [runner] * 12, "stats": stats}  # runners
+
+
+def _run(name, trace, args, l1_bytes, write_behind_rows):
+    clock = {"now": trace[0][0]}
+    now = lambda: clock["now"]  # noqa: E731
+    if args.redis:
+        from services.redis_pool import get_redis_client
+        redis = _PrefixedRedis(get_redis_client(), f"bench:tiered:{name}:")
+    else:
+        redis = _MemoryRedis(args.rtt_ms / 1000.0, now)
+    con = duckdb.connect(":memory:")
+    WalletPumpAnalyzer._init_db(SimpleNamespace(con=con, worker_mode=False))
+
+    cache = TieredCache(
+        CACHE_POLICIES, redis=lambda: redis, duckdb=lambda: con, bindings=DUCKDB_BINDINGS,
+        l3_writable=True, l1_bytes=l1_bytes, write_behind_rows=write_behind_rows, clock=now,
+    )
+    origin = {"loads": 0}
+
+    def loader(family, key):
+        def load():
+            origin["loads"] += 1
+            if args.api_ms:
+                time.sleep(args.api_ms / 1000.0)
+            return _value(family, key)
+        return load
+
+    t0 = time.perf_counter()
+    for ts, family, key in trace:
+        clock["now"] = ts
+        cache.get_or_load(family, key, loader(family, key))
+    cache.close()
+    elapsed = time.perf_counter() - t0
+
+    stats = cache.stats()
+    if args.redis:
+        redis.cleanup()
+    print(f"\n--- {name}: {elapsed:.2f}s, {elapsed / len(trace) * 1e6:.1f} µs/lookup, "
+          f"{redis.round_trips:,} Redis round trips, {origin['loads']:,} origin loads, "
+          f"{stats['l3_writes']:,} DuckDB rows written, {stats['refreshes']} refresh-ahead reloads")
+    print(f"    L1 {stats['l1']['entries']:,} entries / {stats['l1']['bytes'] / 1e6:.1f} MB, "
+          f"{stats['evictions']:,} evictions")
+    print(f"    {'family':>15} {'lookups':>9} {'L1 hit':>7} {'L2 hit':>7} {'L3 hit':>7} {'origin':>7} "
+          f"{'L1 µs':>7} {'L2 µs':>7}")
+    for family, tiers in sorted(stats["families"].items()):
+        l1 = tiers.get("l1", {"hits": 0, "misses": 0, "avg_ms": 0})
+        lookups = l1["hits"] + l1["misses"]
+        served = {t: tiers.get(t, {}).get("hits", 0) for t in ("l1", "l2", "l3", "origin")}
+        pct = {t: 100 * v / lookups if lookups else 0 for t, v in served.items()}
+        print(f"    {family:>15} {lookups:>9,} {pct['l1']:>6.1f}% {pct['l2']:>6.1f}% {pct['l3']:>6.1f}% "
+              f"{pct['origin']:>6.1f}% {l1['avg_ms'] * 1000:>7.1f} "
+              f"{tiers.get('l2', {}).get('avg_ms', 0) * 1000:>7.1f}")
+    return elapsed, redis.round_trips
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trace", help="recorded trace (ANALYZER_CACHE_TRACE output)")
+    ap.add_argument("--save-trace", help="write the synthetic trace here")
+    ap.add_argument("--lookups", type=int, default=100_000)
+    ap.add_argument("--span-s", type=float, default=6 * 3600, help="time the synthetic trace covers")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--l1-mb", type=float, default=32)
+    ap.add_argument("--rtt-ms", type=float, default=0.2, help="stand-in Redis round trip")
+    ap.add_argument("--api-ms", type=float, default=0.0, help="simulated API latency per origin load")
+    ap.add_argument("--redis", action="store_true", help="use REDIS_URL instead of the stand-in")
+    args = ap.parse_args()
+
+    if args.trace:
+        trace = _load_trace(args.trace)
+        source = args.trace
+    else:
+        trace = _synthetic_trace(args)
+        source = f"synthetic, {args.span_s / 3600:.1f}h"
+        if args.save_trace:
+            with open(args.save_trace, "w") as f:
+                f.writelines(f"{ts:.3f} {fam} {key}\n" for ts, fam, key in trace)
+    where = "REDIS_URL" if args.redis else f"stand-in Redis, {args.rtt_ms}ms RTT"
+    print(f"=== TIERED CACHE REPLAY — {len(trace):,} lookups ({source}; {where}) ===")
+
+    base_s, base_trips = _run("redis+duckdb", trace, args, l1_bytes=0, write_behind_rows=1)
+    tier_s, tier_trips = _run("tiered", trace, args, l1_bytes=int(args.l1_mb * 1024 * 1024),
+                              write_behind_rows=200)
+    print(f"\ntiered vs redis+duckdb: {base_s / tier_s:.2f}x faster, "
+          f"{100 * (1 - tier_trips / max(base_trips, 1)):.0f}% fewer Redis round trips")
+
+
+if __name__ == "__main__":
+    main()
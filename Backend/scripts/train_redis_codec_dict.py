@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Train the zstd dictionary that redis_codec compresses small payloads with.
+
+Samples up to ``--per-pattern`` values for each cached key pattern from
+REDIS_URL. Every tenth one is held out; the dictionary is trained on the
+rest and written to ``--out``. The report shows each pattern's mean size
+as orjson and compressed with and without the new dictionary. A dictionary
+that doesn't beat "no dict" on the small families isn't worth deploying.
+
+Deploy by pointing REDIS_CODEC_DICT at the file on every web and worker
+host. To replace a dictionary, list the new one first and keep the old one
+after it (``new.zdict,old.zdict``) until every value written with the old
+one has expired.
+
+Run:
+    python -m scripts.train_redis_codec_dict --out /etc/sifter/redis-codec-v2.zdict
+    python -m scripts.train_redis_codec_dict --out d.zdict --per-pattern 5000 --size-kb 64
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import orjson
+
+from services import redis_codec
+from services.redis_codec import RedisCodec, load_dictionaries, train_dictionary
+from services.redis_pool import get_redis_binary_client
+
+PATTERNS = (
+    "pnl:*", "runners:*", "token_runner:*", "token_ath:*", "token_info:*",
+    "token_security:*", "launch_price:*", "trending_qual:*", "job_result:*", "st:v2:*",
+)
+
+
+def _sample(r, pattern, limit):
+    values = []
+    for key in r.scan_iter(pattern, count=1000):
+        try:
+            value = redis_codec.loads(r.get(key))
+        except Exception:
+            continue  # expired between SCAN and GET, or needs a dictionary we don't have
+        if value is not None:
+            values.append(value)
+        if len(values) >= limit:
+            break
+    return values
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", required=True, help="where to write the dictionary")
+    ap.add_argument("--per-pattern", type=int, default=2000, help="values sampled per key pattern")
+    ap.add_argument("--size-kb", type=int, default=32, help="dictionary size")
+    args = ap.parse_args()
+
+    r = get_redis_binary_client()
+    train, held_out = [], {}
+    for pattern in PATTERNS:
+        values = _sample(r, pattern, args.per_pattern)
+        train += [v for i, v in enumerate(values) if i % 10]
+        held_out[pattern] = values[::10]
+        print(f"{pattern:<24} {len(values):>7,} values")
+    if len(train) < 100:
+        raise SystemExit(f"only {len(train)} values sampled; too few to train on")
+
+    content = train_dictionary(train, args.size_kb * 1024)
+    with open(args.out, "wb") as f:
+        f.write(content)
+    dictionaries = load_dictionaries([args.out])
+    print(f"\nwrote {args.out}: {len(content):,} bytes, dictionary id {next(iter(dictionaries))}")
+
+    plain, with_dict = RedisCodec(), RedisCodec(dictionaries=dictionaries)
+    print(f"\n{'pattern':<24} {'orjson':>9} {'zstd':>9} {'zstd+dict':>10}")
+    for pattern, values in held_out.items():
+        if not values:
+            continue
+        sizes = [sum(map(len, (fn(v) for v in values))) / len(values)
+                 for fn in (lambda v: orjson.dumps(v), plain.dumps, with_dict.dumps)]
+        print(f"{pattern:<24} {sizes[0]:>9,.0f} {sizes[1]:>9,.0f} {sizes[2]:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
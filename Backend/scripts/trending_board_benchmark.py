@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Benchmark — trending leaderboard as one Redis blob vs ZSETs + runner hashes.
+
+Compares the two layouts of one ``MAX_RUNNERS`` leaderboard:
+
+  * blob:  ``trending_leaderboard:{window}``, the whole ranked list through
+           redis_codec. A read is GET + decode of everything, even for the
+           top 10; every update is a SETEX of the whole list.
+  * board: services.trending_board, with ZREVRANGE over a per-window ZSET
+           and one redis_codec payload per runner in a runners hash. A
+           top-10 read HMGETs ten runners, and an update sends only the
+           runners that changed (after a WATCH, a ZRANGE of each rank ZSET
+           and an HKEYS of the runners hash, which guard against concurrent
+           writers).
+
+Reads: the mean µs, round trips and bytes off the wire for a full read and
+a top-10 read (the watchlist and auto-discovery callers ask for 5 and 10).
+Writes: the bytes sent and round trips for
+
+  * find:     a trending pass where ``--changed`` runners re-pumped and one
+              was displaced by a new runner
+  * refresh:  a Live refresh, where every runner gets a new price, volume,
+              momentum score and rank
+
+Redis is an in-process stand-in that sleeps ``--rtt-ms`` per round trip and
+counts the bytes each command carries.
+
+Run:
+    python -m scripts.trending_board_benchmark
+    python -m scripts.trending_board_benchmark --rtt-ms 0.3 --changed 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+
+import orjson
+
+from services import redis_codec
+from services.trending_board import TrendingBoard
+from services.wallet_analyzer import CACHE_TTL_QUAL, MAX_RUNNERS
+
+WINDOW = "7_5.0_50000_secure"
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _size(value):
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_size(k) + _size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(map(_size, value))
+    return len(str(value)) if value is not None else 0
+
+
+class _MemoryRedis:
+    """The string, hash and sorted-set commands the two layouts use, ``rtt_s`` per round trip."""
+
+    def __init__(self, rtt_s):
+        self.rtt_s = rtt_s
+        self.data = {}
+        self.reset()
+
+    def reset(self, count_bytes=True):
+        self.round_trips = self.bytes_in = self.bytes_out = 0
+        self.count_bytes = count_bytes
+
+    def _trip(self):
+        self.round_trips += 1
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    def _do(self, name, args, kwargs):
+        result = getattr(self, "_" + name)(*args, **kwargs)
+        if self.count_bytes:
+            self.bytes_out += _size(args) + _size(kwargs)
+            self.bytes_in += _size(result)
+        return result
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            self._trip()
+            return self._do(name, args, kwargs)
+        return command
+
+    def pipeline(self, transaction=True):
+        redis, calls = self, []
+
+        class _Pipe:
+            queueing = True
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def watch(self, *keys):
+                redis._trip()
+                self.queueing = False
+
+            def multi(self):
+                self.queueing = True
+
+            def __getattr__(self, name):
+                if not self.queueing:
+                    return getattr(redis, name)
+                return lambda *a, **kw: calls.append((name, a, kw))
+
+            def execute(self):
+                redis._trip()
+                return [redis._do(name, a, kw) for name, a, kw in calls]
+
+        return _Pipe()
+
+    def _get(self, k):
+        return self.data.get(k)
+
+    def _setex(self, k, ttl, v):
+        self.data[k] = v
+
+    def _delete(self, *keys):
+        for k in keys:
+            self.data.pop(k, None)
+
+    def _expire(self, k, ttl):
+        return k in self.data
+
+    def _hset(self, k, mapping):
+        h = self.data.setdefault(k, {})
+        for f, v in mapping.items():
+            h[f.encode()] = v if isinstance(v, bytes) else str(v).encode()
+
+    def _hdel(self, k, *fields):
+        for f in fields:
+            self.data.get(k, {}).pop(f.encode(), None)
+
+    def _hgetall(self, k):
+        return dict(self.data.get(k, {}))
+
+    def _hkeys(self, k):
+        return list(self.data.get(k, {}))
+
+    def _hmget(self, k, fields):
+        h = self.data.get(k, {})
+        return [h.get(f.encode()) for f in fields]
+
+    def _zadd(self, k, mapping):
+        self.data.setdefault(k, {}).update(mapping)
+
+    def _zrem(self, k, member):
+        self.data.get(k, {}).pop(member, None)
+
+    def _zrange(self, k, start, stop):
+        ranked = sorted(self.data.get(k, {}).items(), key=lambda kv: kv[1])
+        ranked = ranked[start:] if stop == -1 else ranked[start:stop + 1]
+        return [m.encode() for m, _ in ranked]
+
+    def _zrevrange(self, k, start, stop):
+        ranked = sorted(self.data.get(k, {}).items(), key=lambda kv: -kv[1])
+        ranked = ranked[start:] if stop == -1 else ranked[start:stop + 1]
+        return [m.encode() for m, _ in ranked]
+
+
+def _runner(rng):
+    mint = "".join(rng.choice(_B58) for _ in range(44))
+    symbol = f"T{rng.randint(0, 99999)}"
+    return {"symbol": symbol, "ticker": symbol, "name": f"Token {symbol}", "address": mint,
+            "chain": "solana", "multiplier": round(rng.uniform(5, 500), 2), "period_days": 7,
+            "lowest_price": rng.uniform(1e-8, 1e-4), "highest_price": rng.uniform(1e-4, 1e-2),
+            "current_price": rng.uniform(1e-6, 1e-2), "ath_price": rng.uniform(1e-4, 1e-2),
+            "ath_time": rng.randint(1.6e9, 1.8e9), "liquidity": rng.uniform(5e4, 1e6),
+            "volume_24h": rng.uniform(0, 1e7), "holders": rng.randint(10, 50000),
+            "token_age_days": round(rng.uniform(0, 90), 1), "age": f"{rng.randint(0, 90)}d",
+            "pair_address": mint[::-1], "qualified_at": rng.randint(1.6e9, 1.8e9),
+            "security": {"mint_revoked": True, "liquidity_locked": rng.random() < 0.5,
+                         "has_social": True, "social_count": rng.randint(0, 4)}}
+
+
+def _find_update(board, rng, changed):
+    """A trending pass: ``changed`` runners re-pump and the weakest is displaced."""
+    board = copy.deepcopy(board)
+    for runner in rng.sample(board, changed):
+        runner["multiplier"] = round(runner["multiplier"] * rng.uniform(1.1, 2), 2)
+        runner["highest_price"] *= 1.5
+        runner["qualified_at"] += 3600
+    board.remove(min(board, key=lambda r: r["multiplier"]))
+    board.append(_runner(rng))
+    return sorted(board, key=lambda r: r["multiplier"], reverse=True)
+
+
+def _refresh(board, rng):
+    """A Live refresh: new market data and momentum rank for every runner."""
+    board = copy.deepcopy(board)
+    for runner in board:
+        runner["current_price"] *= rng.uniform(0.8, 1.2)
+        runner["volume_24h"] *= rng.uniform(0.8, 1.2)
+        runner["holders"] += rng.randint(0, 50)
+        runner["momentum_score"] = round(rng.uniform(0, 100), 2)
+    board.sort(key=lambda r: r["momentum_score"], reverse=True)
+    for idx, runner in enumerate(board, 1):
+        runner["rank_change"] = runner.get("rank", idx) - idx
+        runner["rank"] = idx
+    return board
+
+
+def _measure(redis, fn, repeat):
+    """Mean µs per call (bytes not counted while timing), then one counted call."""
+    redis.reset(count_bytes=False)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    us = (time.perf_counter() - t0) / repeat * 1e6
+    redis.reset()
+    fn()
+    return us, redis.round_trips, redis.bytes_in, redis.bytes_out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runners", type=int, default=MAX_RUNNERS, help="leaderboard size")
+    ap.add_argument("--changed", type=int, default=3, help="runners that re-pump in a find update")
+    ap.add_argument("--top", type=int, default=10, help="runners in a top-N read")
+    ap.add_argument("--rtt-ms", type=float, default=0.0, help="simulated Redis round trip")
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    initial = sorted((_runner(rng) for _ in range(args.runners)),
+                     key=lambda r: r["multiplier"], reverse=True)
+    found = _find_update(initial, rng, args.changed)
+    refreshed = _refresh(found, rng)
+
+    blob_redis, board_redis = _MemoryRedis(args.rtt_ms / 1000), _MemoryRedis(args.rtt_ms / 1000)
+    board = TrendingBoard(lambda: board_redis, ttl=CACHE_TTL_QUAL)
+    blob_key = f"trending_leaderboard:{WINDOW}"
+
+    def blob_write(runners):
+        blob_redis.setex(blob_key, CACHE_TTL_QUAL, redis_codec.dumps(runners))
+
+    def blob_read(limit=None):
+        return (redis_codec.loads(blob_redis.get(blob_key)) or [])[:limit]
+
+    blob_write(initial)
+    board.write(WINDOW, initial)
+    assert [r["address"] for r in board.read(WINDOW).runners] == [r["address"] for r in initial]
+    assert orjson.loads(orjson.dumps(board.read(WINDOW, args.top).runners)) == blob_read(args.top)
+
+    print(f"=== TRENDING LEADERBOARD — {args.runners} runners, "
+          f"{args.rtt_ms} ms RTT, {args.repeat} repeats ===")
+    print(f"{'operation':>16} {'layout':>6} {'µs':>9} {'trips':>6} {'bytes in':>10} {'bytes out':>10}")
+
+    def row(op, layout, stats):
+        us, trips, b_in, b_out = stats
+        print(f"{op:>16} {layout:>6} {us:>9,.1f} {trips:>6.0f} {b_in:>10,.0f} {b_out:>10,.0f}")
+
+    for op, limit in (("read all", None), (f"read top {args.top}", args.top)):
+        row(op, "blob", _measure(blob_redis, lambda: blob_read(limit), args.repeat))
+        row(op, "board", _measure(board_redis, lambda: board.read(WINDOW, limit), args.repeat))
+
+    # Writes replay one transition each; they go stateful, so each is measured once.
+    for op, before, after, order in (
+        (f"find ({args.changed}+1 chg)", initial, found, "multiplier"),
+        ("refresh", found, refreshed, "momentum"),
+    ):
+        row(op, "blob", _measure(blob_redis, lambda: blob_write(after), 1))
+        row(op, "board", _measure(board_redis, lambda: board.write(WINDOW, after, before, order=order), 1))
+
+    assert [r["address"] for r in board.read(WINDOW).runners] == [r["address"] for r in refreshed]
+    assert board.read(WINDOW).runners == orjson.loads(orjson.dumps(refreshed))
+
+
+if __name__ == "__main__":
+    main()
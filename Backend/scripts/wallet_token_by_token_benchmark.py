@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark — token-first wallet_token_stats reads: base table vs by-token copy.
+
+wallet_token_stats is ordered by (wallet_address, token_address), so
+query_top20_for_tokens, which filters on a handful of tokens, cannot use the
+primary index and scans every granule. wallet_token_stats_by_token holds the
+columns that query needs ordered by (token_address, wallet_address).
+
+Loads a scratch ``--database`` on a local ClickHouse with the real DDL from
+services/clickhouse_schema.py (``--rows`` wallet_token_stats rows, copied into
+wallet_token_stats_by_token by mv_wallet_token_stats_by_token as they land),
+then runs the top-20 query as services/clickhouse_client.py builds it against
+each table for ``--tokens`` tokens. Reports granules selected by the primary
+index (``EXPLAIN indexes = 1``), rows and bytes read, median latency over
+``--repeat`` runs, and whether both tables return the same leaderboard. Also
+prints each table's on-disk size, i.e. what the copy costs in storage.
+
+Needs a server (index selection is specific to ClickHouse). Uses the usual
+CLICKHOUSE_* env vars; e.g. ``docker run -p 8123:8123
+clickhouse/clickhouse-server`` with CLICKHOUSE_PORT=8123 CLICKHOUSE_SECURE=false.
+
+Run:
+    python -m scripts.wallet_token_by_token_benchmark
+    python -m scripts.wallet_token_by_token_benchmark --rows 100000000 --tokens 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import time
+from unittest.mock import MagicMock, patch
+
+from services import clickhouse_client
+from services.clickhouse_schema import (
+    CREATE_MV_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+    CREATE_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+    CREATE_WALLET_TOKEN_STATS_SQL,
+)
+
+TOKENS = 200_000
+
+
+def _client(database=None):
+    import clickhouse_connect
+    return clickhouse_connect.get_client(
+        host=os.environ.get('CLICKHOUSE_HOST', 'localhost'),
+        port=int(os.environ.get('CLICKHOUSE_PORT', 8123)),
+        username=os.environ.get('CLICKHOUSE_USER', 'default'),
+        password=os.environ.get('CLICKHOUSE_PASSWORD', ''),
+        secure=os.environ.get('CLICKHOUSE_SECURE', 'false').lower() == 'true',
+        database=database,
+        send_receive_timeout=1800,
+    )
+
+
+def _load(args):
+    _client().command(f"CREATE DATABASE IF NOT EXISTS `{args.database}`")
+    ch = _client(args.database)
+    ch.command("DROP VIEW IF EXISTS mv_wallet_token_stats_by_token")
+    for name in ("wallet_token_stats_by_token", "wallet_token_stats"):
+        ch.command(f"DROP TABLE IF EXISTS {name}")
+    for sql in (CREATE_WALLET_TOKEN_STATS_SQL, CREATE_WALLET_TOKEN_STATS_BY_TOKEN_SQL,
+                CREATE_MV_WALLET_TOKEN_STATS_BY_TOKEN_SQL):
+        ch.command(sql)
+
+    # Wallets trade a few tokens each; token popularity is skewed like real launches.
+    ch.command(f"""
+        INSERT INTO wallet_token_stats
+            (wallet_address, token_address, scan_id, first_entry_price, first_entry_usd,
+             first_entry_timestamp, avg_entry_price, avg_entry_to_ath_mult,
+             entry_price_to_launch_mult, all_buys, all_sells, buy_count, sell_count,
+             total_spent_usd, realized_pnl_usd, unrealized_pnl_usd, total_pnl_usd,
+             realized_roi_mult, total_roi_mult, qualifies, outcome, disqualify_reason,
+             wallet_source, updated_at)
+        SELECT concat('W', leftPad(toString(intDiv(number, 8)), 10, '0')),
+               concat('T', toString(toUInt64(pow(cityHash64(number) % 1000000 / 1e6, 2) * {TOKENS}))),
+               '1', rand() / 4e9, 100, toDateTime('2026-07-01 00:00:00'), rand() / 4e9,
+               (cityHash64(number, 1) % 500) / 10.0, 2, '[]', '[]', 1, 1,
+               50 + number % 400, 10, 0, 10, (cityHash64(number, 2) % 97) / 10.0,
+               (cityHash64(number, 2) % 97) / 10.0, (cityHash64(number, 3) % 3) = 0,
+               'win', '', 'top_traders', toDateTime('2026-07-01 00:00:00') + toIntervalSecond(number % 86400)
+        FROM numbers({args.rows})
+    """)
+    for name in ("wallet_token_stats", "wallet_token_stats_by_token"):
+        ch.command(f"OPTIMIZE TABLE {name} FINAL")
+    sizes = ch.query(
+        "SELECT table, sum(rows), sum(bytes_on_disk) FROM system.parts "
+        "WHERE database = {db:String} AND active GROUP BY table",
+        parameters={"db": args.database},
+    ).result_rows
+    return ch, {t: (rows, size) for t, rows, size in sizes}
+
+
+def _top20_sql(source):
+    """The SQL query_top20_for_tokens sends, with its source pinned to ``source``."""
+    ch = MagicMock()
+    with patch.object(clickhouse_client, "get_clickhouse_client", return_value=ch), \
+            patch.object(clickhouse_client, "_wallet_token_source", return_value=source):
+        clickhouse_client.query_top20_for_tokens(["_"])
+    return ch.query.call_args.args[0]
+
+
+def _granules(ch, sql, params):
+    plan = "\n".join(r[0] for r in ch.query("EXPLAIN indexes = 1 " + sql, parameters=params).result_rows)
+    m = re.search(r"PrimaryKey.*?Granules: (\d+)/(\d+)", plan, re.S)
+    return (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+
+
+def _norm(rows):
+    return [tuple(round(v, 6) if isinstance(v, float) else v for v in r) for r in rows]
+
+
+def _time(ch, sql, params, repeat):
+    times, rows = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = ch.query(sql, parameters=params)
+        times.append(time.perf_counter() - t0)
+        rows = result.result_rows
+    summary = result.summary or {}
+    return statistics.median(times), rows, int(summary.get("read_rows", 0)), int(summary.get("read_bytes", 0))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000_000, help="wallet_token_stats rows to load")
+    ap.add_argument("--tokens", type=int, default=20, help="tokens passed to the top-20 query")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--database", default="bench_by_token", help="scratch ClickHouse database")
+    ap.add_argument("--keep", action="store_true", help="leave the scratch database in place")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    ch, sizes = _load(args)
+    print(f"=== TOKEN-FIRST READS — {args.rows:,} wallet_token_stats rows, "
+          f"loaded in {time.perf_counter() - t0:.1f}s ===")
+    for table, (rows, size) in sorted(sizes.items()):
+        print(f"  {table:<28} {rows:>14,} rows {size / 1e6:>10.1f} MB on disk")
+
+    # Spread picks across the popularity curve: a few hot tokens, most cold.
+    params = {"token_list": [f"T{(i * 7919) % TOKENS}" for i in range(args.tokens)]}
+    print(f"\n{'table':>28} {'granules':>17} {'rows read':>13} {'MB read':>9} {'median':>10}")
+    results = {}
+    for source in ("wallet_token_stats", "wallet_token_stats_by_token"):
+        sql = _top20_sql(source)
+        hit, total = _granules(ch, sql, params)
+        secs, rows, read_rows, read_bytes = _time(ch, sql, params, args.repeat)
+        results[source] = (secs, rows)
+        print(f"{source:>28} {hit:>8,}/{total:<8,} {read_rows:>13,} {read_bytes / 1e6:>9.1f} "
+              f"{secs * 1000:>8.1f}ms")
+    (b_s, b_rows), (t_s, t_rows) = results.values()
+    print(f"\nspeedup {b_s / t_s:.1f}x; same leaderboard: {'yes' if _norm(b_rows) == _norm(t_rows) else 'NO'}")
+
+    if not args.keep:
+        _client().command(f"DROP DATABASE IF EXISTS `{args.database}`")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark — daily_stats_refresh wall time and PostgREST request count.
+
+Builds a synthetic watchlist of ``--rows`` (user, wallet) rows over
+``--wallets`` distinct wallets and runs the daily refresh two ways:
+
+  * legacy: metrics computed serially per distinct wallet, then one PATCH per
+    (user, wallet) row (the pre-engine loop, reimplemented as the baseline)
+  * engine: ``WatchlistStatsUpdater.daily_stats_refresh`` — metrics on a
+    thread pool, results through the chunked bulk-refresh RPC
+
+Every PostgREST call sleeps ``--db-ms``; metric computation costs two
+activity queries per wallet, as ``_refresh_wallet_metrics`` does.
+
+Run:
+    python -m scripts.watchlist_refresh_benchmark
+    python -m scripts.watchlist_refresh_benchmark --rows 5000 --wallets 400 --db-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+
+class _Counter:
+    def __init__(self, db_s: float):
+        self.db_s = db_s
+        self.lock = threading.Lock()
+        self.counts = {"select": 0, "activity": 0, "patch": 0, "rpc": 0}
+
+    def hit(self, kind: str):
+        with self.lock:
+            self.counts[kind] += 1
+        time.sleep(self.db_s)
+
+
+class _Query:
+    """Chainable PostgREST stub; ``execute()`` costs one round trip."""
+
+    def __init__(self, counter, kind, data=None):
+        self.counter, self.kind, self.data = counter, kind, data
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: self
+
+    def execute(self):
+        self.counter.hit(self.kind)
+        return MagicMock(data=self.data)
+
+
+def _supabase(counter, rows):
+    schema = MagicMock()
+
+    def table(name):
+        t = MagicMock()
+        t.select.side_effect = lambda *a, **kw: _Query(counter, "select", rows)
+        t.update.side_effect = lambda *a, **kw: _Query(counter, "patch")
+        return t
+
+    schema.table.side_effect = table
+    schema.rpc.side_effect = lambda *a, **kw: _Query(counter, "rpc")
+    client = MagicMock()
+    client.schema.return_value = schema
+    return client
+
+
+def _metrics(counter):
+    def refresh(wallet_address, added_at=None):
+        counter.hit("activity")  # 7d trades
+        counter.hit("activity")  # 30d trades
+        return {"roi_7d": 12.5, "roi_30d": 40.0, "runners_7d": 1, "runners_30d": 3,
+                "win_rate_7d": 50.0, "professional_score": 71.0, "consistency_score": 64.0}
+    return refresh
+
+
+def _legacy(updater):
+    """The pre-engine daily_stats_refresh body."""
+    result = updater._table("wallet_watchlist").select("wallet_address, user_id, added_at").execute()
+    unique = {}
+    for row in result.data:
+        unique.setdefault(row["wallet_address"], []).append(row["user_id"])
+    for addr, user_ids in unique.items():
+        metrics = updater.manager._refresh_wallet_metrics(addr, added_at=None)
+        update_data = {"last_updated": datetime.utcnow().isoformat(),
+                       **{k: v for k, v in metrics.items() if v is not None}}
+        for user_id in user_ids:
+            updater._table("wallet_watchlist").update(update_data).eq(
+                "user_id", user_id).eq("wallet_address", addr).execute()
+
+
+def _run(mode, args):
+    rows = [{"wallet_address": f"Wallet{i % args.wallets:05d}", "user_id": f"user-{i // args.wallets:05d}",
+             "added_at": None} for i in range(args.rows)]
+    counter = _Counter(args.db_ms / 1000.0)
+    with patch("services.watchlist_stats_updater.get_supabase_client", return_value=_supabase(counter, rows)), \
+         patch("services.watchlist_manager.get_supabase_client"):
+        from services.watchlist_stats_updater import WatchlistStatsUpdater
+        updater = WatchlistStatsUpdater()
+        updater.REFRESH_WORKERS = args.workers
+        updater.manager = MagicMock()
+        updater.manager._refresh_wallet_metrics.side_effect = _metrics(counter)
+
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "legacy":
+                _legacy(updater)
+            else:
+                updater.daily_stats_refresh()
+        elapsed = time.perf_counter() - t0
+
+    c = counter.counts
+    writes = c["select"] + c["patch"] + c["rpc"]
+    print(f"{mode:>6}: {elapsed:>8.2f}s wall  {writes:>6} watchlist requests "
+          f"(select {c['select']}, patch {c['patch']}, rpc {c['rpc']})  "
+          f"+ {c['activity']} activity queries")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2000, help="wallet_watchlist rows (user, wallet)")
+    ap.add_argument("--wallets", type=int, default=200, help="distinct wallets among those rows")
+    ap.add_argument("--db-ms", type=float, default=10.0, help="simulated PostgREST round trip")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    print(f"=== DAILY STATS REFRESH — {args.rows} rows, {args.wallets} wallets, "
+          f"{args.db_ms}ms per request, {args.workers} workers ===")
+    for mode in ("legacy", "engine"):
+        _run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Benchmark — weekly rerank with the shared per-run trade cache.
+
+Builds ``--users`` watchlists of ``--per-user`` wallets drawn (skewed towards
+popular wallets) from a pool of ``--wallets``, then runs
+``WatchlistStatsUpdater.weekly_rerank_all`` two ways:
+
+  * legacy: three ``wallet_activity`` fetches per (user, wallet) — 7d and
+    30d for metrics, 30d/limit 50 for form — with no reuse across users
+    (the pre-cache behaviour, reimplemented as the baseline)
+  * cached: the current code — one 30-day fetch per distinct wallet for the
+    whole run, every view cut in memory
+
+Every PostgREST call sleeps ``--db-ms``. Watchlist reads and saves are the
+same in both modes and are reported separately.
+
+Run:
+    python -m scripts.watchlist_rerank_benchmark
+    python -m scripts.watchlist_rerank_benchmark --users 200 --wallets 1000 --db-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+
+class _Counter:
+    def __init__(self, db_s: float):
+        self.db_s = db_s
+        self.lock = threading.Lock()
+        self.counts = {"activity": 0, "watchlist_read": 0, "watchlist_write": 0}
+
+    def hit(self, kind: str):
+        with self.lock:
+            self.counts[kind] += 1
+        if self.db_s:
+            time.sleep(self.db_s)
+
+
+class _Query:
+    def __init__(self, counter, kind, resolve):
+        self.counter, self.kind, self.resolve, self.filters = counter, kind, resolve, {}
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: self
+
+    def execute(self):
+        self.counter.hit(self.kind)
+        return MagicMock(data=self.resolve(self.filters))
+
+
+def _supabase(counter, trades, watchlists):
+    def table(name):
+        t = MagicMock()
+        if name == "wallet_activity":
+            t.select.side_effect = lambda *a, **kw: _Query(
+                counter, "activity", lambda f: trades.get(f.get("wallet_address"), []))
+        else:
+            t.select.side_effect = lambda *a, **kw: _Query(
+                counter, "watchlist_read",
+                lambda f: [dict(w) for w in watchlists.get(f.get("user_id"), [])]
+                if "user_id" in f else [{"user_id": u} for u in watchlists])
+            t.update.side_effect = lambda *a, **kw: _Query(counter, "watchlist_write", lambda f: None)
+        return t
+
+    client = MagicMock()
+    client.schema.return_value.table.side_effect = table
+    return client
+
+
+def _dataset(args):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    wallets = [f"Wallet{i:05d}" for i in range(args.wallets)]
+    trades = {}
+    for w in wallets:
+        rows = []
+        for j in range(args.trades):
+            rows.append({
+                "wallet_address": w, "token_address": f"Tok{j % 6}", "token_ticker": f"T{j % 6}",
+                "side": "buy" if j % 3 else "sell",
+                "price_per_token": rng.uniform(0.5, 40.0), "usd_value": rng.uniform(20, 400),
+                "price_multiplier": rng.uniform(1, 4), "launch_to_ath_multiplier": rng.uniform(5, 60),
+                "block_time": (now - timedelta(hours=rng.uniform(0, 29 * 24))).isoformat(),
+            })
+        trades[w] = sorted(rows, key=lambda r: r["block_time"], reverse=True)
+    weights = [1.0 / (i + 1) ** 0.8 for i in range(args.wallets)]  # a few popular wallets
+    watchlists = {}
+    for u in range(args.users):
+        picked = set()
+        while len(picked) < args.per_user:
+            picked.add(rng.choices(wallets, weights)[0])
+        watchlists[f"user-{u:05d}"] = [
+            {"user_id": f"user-{u:05d}", "wallet_address": w, "position": i + 1, "added_at": None}
+            for i, w in enumerate(picked)
+        ]
+    return trades, watchlists
+
+
+def _legacy_manager_class():
+    from services.watchlist_manager import WatchlistLeagueManager
+
+    class LegacyManager(WatchlistLeagueManager):
+        """Pre-cache fetch pattern: every view is its own query, nothing reused."""
+
+        @contextlib.contextmanager
+        def trade_cache(self):
+            yield None
+
+        def _get_recent_trades(self, wallet_address, days=7, limit=None, since=None):
+            trades = self._filter_trades(self._fetch_trades(wallet_address, days) or [], days=days, since=since)
+            return trades[:limit] if limit else trades
+
+        def _refresh_wallet_metrics(self, wallet_address, added_at=None):
+            self._get_recent_trades(wallet_address, days=7, since=added_at)  # the separate 7d query
+            return super()._refresh_wallet_metrics(wallet_address, added_at=added_at)
+
+    return LegacyManager
+
+
+def _run(mode, args, trades, watchlists):
+    counter = _Counter(args.db_ms / 1000.0)
+    supabase = _supabase(counter, trades, watchlists)
+    with patch("services.watchlist_stats_updater.get_supabase_client", return_value=supabase), \
+         patch("services.watchlist_manager.get_supabase_client", return_value=supabase):
+        from services.watchlist_manager import WatchlistLeagueManager
+        from services.watchlist_stats_updater import WatchlistStatsUpdater
+        updater = WatchlistStatsUpdater()
+        updater.manager = (_legacy_manager_class() if mode == "legacy" else WatchlistLeagueManager)()
+        updater.manager._generate_promotion_queue = MagicMock()
+
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = updater.weekly_rerank_all()
+        elapsed = time.perf_counter() - t0
+
+    c = counter.counts
+    print(f"{mode:>6}: {elapsed:>8.2f}s  {c['activity']:>7,} activity fetches  "
+          f"({c['watchlist_read']:,} watchlist reads, {c['watchlist_write']:,} saves)  "
+          f"reranked {result['success']}/{len(watchlists)}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--wallets", type=int, default=5000)
+    ap.add_argument("--per-user", type=int, default=10, help="wallets per watchlist")
+    ap.add_argument("--trades", type=int, default=24, help="trades per wallet in the 30-day window")
+    ap.add_argument("--db-ms", type=float, default=0.5, help="simulated PostgREST round trip")
+    args = ap.parse_args()
+
+    trades, watchlists = _dataset(args)
+    distinct = len({w["wallet_address"] for wl in watchlists.values() for w in wl})
+    print(f"=== WEEKLY RERANK — {args.users} users × {args.per_user} wallets "
+          f"({distinct} distinct of {args.wallets}), {args.db_ms}ms per request ===")
+    for mode in ("legacy", "cached"):
+        _run(mode, args, trades, watchlists)
+
+
+if __name__ == "__main__":
+    main()
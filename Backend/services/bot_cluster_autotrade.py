@@ -224,12 +224,13 @@ def route_manual_cluster_signal(signal: Dict[str, Any], *, supabase=None) -> int
         return 0
 
     try:
-        from config import Config
-        from services.telegram_notifier import TelegramNotifier
-        notifier = TelegramNotifier(Config.TELEGRAM_BOT_TOKEN)
+        from services.telegram_notifier import get_telegram_notifier
+        notifier = get_telegram_notifier()
     except Exception as exc:
         logger.error("[MANUAL ROUTE] notifier init failed: %s", exc)
         return 0
+    if notifier is None:
+        return 0
 
     sent = 0
     for user_id in recipients:
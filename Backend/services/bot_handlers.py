@@ -23,7 +23,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from services import bot_screens, bot_state
+from services import bot_screens, bot_state, bot_user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -71,11 +71,23 @@ def _risk_metric(value: Any) -> Dict[str, Optional[float]]:
 
 # ── data fetch helpers ──────────────────────────────────────────────────────
 
-def _load_user_ctx(notifier, chat_id: str) -> Optional[Dict[str, Any]]:
+def _load_user_ctx(notifier, chat_id: str, *, fresh: bool = False) -> Optional[Dict[str, Any]]:
     """Fetch the telegram_users row + derived context for screen rendering.
 
+    Served from ``bot_user_cache`` when possible; ``fresh=True`` skips the
+    cache read and re-populates it (used to warm the cache on /start).
     Returns None when the chat isn't linked to an account yet.
     """
+    generation = -1
+    if bot_user_cache.ENABLED:
+        if fresh:
+            _, generation = bot_user_cache.lookup(chat_id)
+        else:
+            cached, generation = bot_user_cache.lookup(chat_id)
+            if cached is not None:
+                cached["is_operator"] = notifier._is_operator(chat_id)
+                return cached
+
     try:
         res = (
             notifier._table("telegram_users")
@@ -117,6 +129,8 @@ def _load_user_ctx(notifier, chat_id: str) -> Optional[Dict[str, Any]]:
     row["connected"] = True
     row["has_wallet"] = has_wallet
     row["username"] = row.get("telegram_username")
+    if bot_user_cache.ENABLED:
+        bot_user_cache.store(chat_id, row, generation)
     row["is_operator"] = notifier._is_operator(chat_id)
     return row
 
@@ -517,6 +531,7 @@ def _update_user(notifier, user_id: str, fields: Dict[str, Any]) -> None:
         notifier._table("telegram_users").update(fields).eq("user_id", user_id).execute()
     except Exception as exc:
         logger.error("[BOT_HANDLERS] telegram_users update failed: %s", exc)
+    bot_user_cache.invalidate_user(user_id)
 
 
 def _load_blacklist(notifier, user_id: str) -> List[Dict[str, Any]]:
@@ -1187,6 +1202,7 @@ def _create_wallet_via_email(notifier, chat_id: str) -> None:
             "encrypted_private_key": encrypted,
             "wallet_type": "email",
         }, on_conflict="user_id").execute()
+        bot_user_cache.invalidate(chat_id)
 
         # Email the secret key (base58) so the user can back it up / import elsewhere.
         secret_b58 = base58.b58encode(secret_bytes).decode()
@@ -2323,6 +2339,7 @@ def _handle_confirm_delete(notifier, chat_id: str, text: str) -> None:
         except Exception as exc:
             logger.error("[BOT_HANDLERS] delete from %s failed: %s", table, exc)
     bot_state.clear_state(chat_id)
+    bot_user_cache.invalidate(chat_id)
     notifier.send_message(chat_id, "🗑️ <b>Account Deleted</b>\n\nAll your data has been removed. Your on-chain wallets are untouched. Goodbye.")
 
 
@@ -2602,6 +2619,7 @@ def _handle_seed_phrase(notifier, chat_id: str, text: str, message: dict) -> Non
             "encrypted_private_key": encrypted,
             "wallet_type": "seed_phrase",
         }, on_conflict="user_id").execute()
+        bot_user_cache.invalidate(chat_id)
 
         notifier.send_message(
             chat_id,
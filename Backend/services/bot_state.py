@@ -5,10 +5,19 @@ Redis so the bot knows how to interpret the next message and survives process
 restarts. This replaces the in-memory ``_wallet_import_pending`` dict in
 ``telegram_notifier.py`` (which was lost on every restart).
 
-Key:    sifter:bot_state:{chat_id}
-Value:  {"screen": str, "awaiting": str|None, "data": dict, "updated_at": float}
+Key:    sifter:bot_state:{chat_id}   (HASH)
+Fields: screen, awaiting (absent = None), updated_at, and one ``d:<name>``
+        field per ``data`` entry holding its JSON-encoded value.
 TTL:    3600 seconds (1 hour) — abandoned flows auto-clear, refreshed on write.
 
+Writes are field-level: ``set_state`` / ``set_awaiting`` / ``push_screen``
+send HSET/HDEL + EXPIRE + HGETALL as one MULTI/EXEC round trip instead of
+GET → decode → merge → SETEX of the whole document, so two callback handlers
+touching different fields of the same chat no longer clobber each other.
+Replacing ``data`` wholesale (``merge_data=False``) runs as a Lua script.
+States written in the old single-JSON-string layout are still read, and are
+converted to the hash layout on their next write.
+
 State is shared across webhook threads and Celery workers via Redis. All reads
 are defensive: a missing or corrupt value returns a fresh default rather than
 raising, so a bad state can never wedge a user.
@@ -34,25 +43,56 @@ def _key(chat_id: Any) -> str:
     return f"{STATE_PREFIX}{chat_id}"
 
 
+_DATA_PREFIX = "d:"
+
+# Replace ``data`` wholesale: drop every d:* field, then HSET the new fields,
+# refresh the TTL and return the resulting hash — atomically, in one call.
+# KEYS[1] = state key; ARGV[1] = ttl; ARGV[2] = "1" to clear awaiting;
+# ARGV[3..] = field, value pairs.
+_REPLACE_DATA_LUA = """
+for _, f in ipairs(redis.call('HKEYS', KEYS[1])) do
+    if string.sub(f, 1, 2) == 'd:' then redis.call('HDEL', KEYS[1], f) end
+end
+if ARGV[2] == '1' then redis.call('HDEL', KEYS[1], 'awaiting') end
+if #ARGV > 2 then redis.call('HSET', KEYS[1], unpack(ARGV, 3)) end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+
 def _default_state() -> Dict[str, Any]:
     return {"screen": DEFAULT_SCREEN, "awaiting": None, "data": {}}
 
 
-def get_state(chat_id: Any) -> Dict[str, Any]:
-    """Return the user's current state, or a fresh default if absent/corrupt.
+def _is_wrongtype(exc: Exception) -> bool:
+    # A key still holding the pre-hash JSON string layout.
+    return "WRONGTYPE" in str(exc)
 
-    Never raises — a Redis error or malformed JSON yields the default state so
-    navigation degrades gracefully instead of breaking the conversation.
-    """
-    try:
-        raw = get_redis_client().get(_key(chat_id))
-    except Exception as exc:  # pragma: no cover - redis unavailable
-        logger.warning("[BOT_STATE] get failed for %s: %s", chat_id, exc)
+
+def _decode_hash(chat_id: Any, fields: Dict[str, str]) -> Dict[str, Any]:
+    if not fields:
         return _default_state()
+    state = _default_state()
+    state["screen"] = fields.get("screen") or DEFAULT_SCREEN
+    state["awaiting"] = fields.get("awaiting") or None
+    if fields.get("updated_at"):
+        try:
+            state["updated_at"] = float(fields["updated_at"])
+        except ValueError:
+            pass
+    for field, raw in fields.items():
+        if not field.startswith(_DATA_PREFIX):
+            continue
+        try:
+            state["data"][field[len(_DATA_PREFIX):]] = json.loads(raw)
+        except (ValueError, TypeError):
+            logger.warning("[BOT_STATE] corrupt field %s for %s, dropping", field, chat_id)
+    return state
+
 
+def _decode_legacy(chat_id: Any, raw: Optional[str]) -> Dict[str, Any]:
     if not raw:
         return _default_state()
-
     try:
         state = json.loads(raw)
         if not isinstance(state, dict):
@@ -70,16 +110,96 @@ def get_state(chat_id: Any) -> Dict[str, Any]:
     return state
 
 
-def _write(chat_id: Any, state: Dict[str, Any]) -> Dict[str, Any]:
-    state["updated_at"] = time.time()
+def _encode_fields(
+    screen: Optional[str],
+    awaiting: Optional[str],
+    data: Optional[Dict[str, Any]],
+) -> Dict[str, str]:
+    fields = {"updated_at": repr(time.time())}
+    if screen is not None:
+        fields["screen"] = screen
+    if awaiting is not None:
+        fields["awaiting"] = awaiting
+    for name, value in (data or {}).items():
+        fields[f"{_DATA_PREFIX}{name}"] = json.dumps(value, default=str)
+    return fields
+
+
+def _migrate_legacy(client, key: str, chat_id: Any) -> None:
+    """Rewrite a JSON-string state as a hash so field-level writes can apply."""
+    state = _decode_legacy(chat_id, client.get(key))
+    pipe = client.pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.hset(key, mapping=_encode_fields(state["screen"], state["awaiting"], state["data"]))
+    pipe.expire(key, STATE_TTL_SECONDS)
+    pipe.execute()
+
+
+def get_state(chat_id: Any) -> Dict[str, Any]:
+    """Return the user's current state, or a fresh default if absent/corrupt.
+
+    Never raises — a Redis error or malformed JSON yields the default state so
+    navigation degrades gracefully instead of breaking the conversation.
+    """
+    key = _key(chat_id)
     try:
-        get_redis_client().setex(
-            _key(chat_id),
-            STATE_TTL_SECONDS,
-            json.dumps(state, default=str),
-        )
+        client = get_redis_client()
+        return _decode_hash(chat_id, client.hgetall(key))
+    except Exception as exc:
+        if not _is_wrongtype(exc):  # pragma: no cover - redis unavailable
+            logger.warning("[BOT_STATE] get failed for %s: %s", chat_id, exc)
+            return _default_state()
+    try:
+        return _decode_legacy(chat_id, client.get(key))
     except Exception as exc:  # pragma: no cover - redis unavailable
-        logger.warning("[BOT_STATE] write failed for %s: %s", chat_id, exc)
+        logger.warning("[BOT_STATE] get failed for %s: %s", chat_id, exc)
+        return _default_state()
+
+
+def _write(
+    chat_id: Any,
+    *,
+    screen: Optional[str],
+    awaiting: Optional[str],
+    data: Optional[Dict[str, Any]],
+    replace_data: bool = False,
+) -> Dict[str, Any]:
+    """Apply a field-level update + TTL refresh in one round trip; return the new state."""
+    key = _key(chat_id)
+    fields = _encode_fields(screen, awaiting, data)
+    for attempt in range(2):
+        try:
+            client = get_redis_client()
+            if replace_data:
+                flat = [item for pair in fields.items() for item in pair]
+                script = client.register_script(_REPLACE_DATA_LUA)
+                result = script(keys=[key], args=[STATE_TTL_SECONDS, "1" if awaiting is None else "0", *flat])
+                current = dict(zip(result[::2], result[1::2]))
+            else:
+                pipe = client.pipeline(transaction=True)
+                pipe.hset(key, mapping=fields)
+                if awaiting is None:
+                    pipe.hdel(key, "awaiting")
+                pipe.expire(key, STATE_TTL_SECONDS)
+                pipe.hgetall(key)
+                current = pipe.execute()[-1]
+            return _decode_hash(chat_id, current)
+        except Exception as exc:
+            if attempt == 0 and _is_wrongtype(exc):
+                try:
+                    _migrate_legacy(client, key, chat_id)
+                    continue
+                except Exception as migrate_exc:  # pragma: no cover - redis unavailable
+                    exc = migrate_exc
+            logger.warning("[BOT_STATE] write failed for %s: %s", chat_id, exc)
+            break
+
+    # Redis unavailable: report what the caller asked for so flows still render.
+    state = _default_state()
+    if screen is not None:
+        state["screen"] = screen
+    state["awaiting"] = awaiting
+    state["data"] = dict(data or {})
     return state
 
 
@@ -98,21 +218,13 @@ def set_state(
     the ``data`` dict is shallow-merged into the existing one; otherwise it
     replaces it.
     """
-    state = get_state(chat_id)
-
-    if screen is not None:
-        state["screen"] = screen
-    state["awaiting"] = awaiting
-
-    if data is not None:
-        if merge_data:
-            merged = dict(state.get("data") or {})
-            merged.update(data)
-            state["data"] = merged
-        else:
-            state["data"] = dict(data)
-
-    return _write(chat_id, state)
+    return _write(
+        chat_id,
+        screen=screen,
+        awaiting=awaiting,
+        data=data,
+        replace_data=data is not None and not merge_data,
+    )
 
 
 def set_awaiting(
@@ -126,13 +238,7 @@ def set_awaiting(
     e.g. ``set_awaiting(chat_id, "wallet_private_key")`` tells the router that
     the next plain-text message is the wallet key. Pass ``None`` to clear.
     """
-    state = get_state(chat_id)
-    state["awaiting"] = awaiting
-    if data is not None:
-        merged = dict(state.get("data") or {})
-        merged.update(data)
-        state["data"] = merged
-    return _write(chat_id, state)
+    return _write(chat_id, screen=None, awaiting=awaiting, data=data)
 
 
 def push_screen(
@@ -157,7 +263,13 @@ def clear_state(chat_id: Any) -> None:
 def is_awaiting(chat_id: Any, awaiting: Optional[str] = None) -> bool:
     """True if the user is in any awaited-input mode, or in the specific
     ``awaiting`` mode when one is given."""
-    current = get_state(chat_id).get("awaiting")
+    try:
+        current = get_redis_client().hget(_key(chat_id), "awaiting") or None
+    except Exception as exc:
+        if not _is_wrongtype(exc):  # pragma: no cover - redis unavailable
+            logger.warning("[BOT_STATE] get failed for %s: %s", chat_id, exc)
+            return False
+        current = get_state(chat_id).get("awaiting")
     if awaiting is None:
         return current is not None
     return current == awaiting
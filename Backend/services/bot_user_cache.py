@@ -0,0 +1,150 @@
+"""Redis cache for the bot's per-chat user context.
+
+``bot_handlers._load_user_ctx`` reads the ``telegram_users`` row and probes
+``bot_wallets`` on every tap — two PostgREST round trips before a screen can
+render. This module caches the assembled context next to the ``bot_state``
+navigation state so repeat taps are a single Redis read.
+
+Keys:
+    sifter:user_ctx:{chat_id}      {"gen": int, "ctx": {...}}   TTL 300s
+    sifter:user_ctx:gen:{chat_id}  generation counter           TTL 1 day
+    sifter:user_ctx:uid:{user_id}  chat_id (for invalidate_user)  TTL 300s
+
+Entries are versioned: a cached context is only served while its ``gen``
+matches the chat's current generation, and every invalidation bumps the
+generation. A load that read the DB before a concurrent settings write
+therefore can't re-populate the cache with the old row — its entry carries
+the old generation and is ignored.
+
+Like ``bot_state``, every call is defensive: a Redis error is a cache miss,
+never an exception, so the bot keeps working straight off the database.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from services.redis_pool import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+CTX_PREFIX = "sifter:user_ctx:"
+CTX_TTL_SECONDS = 300
+GEN_TTL_SECONDS = 86400
+
+# Flip off to measure (or bypass) the uncached path.
+ENABLED = os.environ.get("BOT_USER_CTX_CACHE", "1") != "0"
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "errors": 0}
+
+
+def _ctx_key(chat_id: Any) -> str:
+    return f"{CTX_PREFIX}{chat_id}"
+
+
+def _gen_key(chat_id: Any) -> str:
+    return f"{CTX_PREFIX}gen:{chat_id}"
+
+
+def _uid_key(user_id: Any) -> str:
+    return f"{CTX_PREFIX}uid:{user_id}"
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def lookup(chat_id: Any) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Return ``(ctx, generation)``; ``ctx`` is None on a miss.
+
+    Pass the returned generation to ``store`` after loading from the DB.
+    """
+    try:
+        raw, gen = get_redis_client().mget(_ctx_key(chat_id), _gen_key(chat_id))
+        gen = int(gen or 0)
+    except Exception as exc:  # pragma: no cover - redis unavailable
+        logger.warning("[USER_CTX] lookup failed for %s: %s", chat_id, exc)
+        _count("errors")
+        _count("misses")
+        return None, -1
+
+    if raw:
+        try:
+            entry = json.loads(raw)
+            if isinstance(entry, dict) and entry.get("gen") == gen and isinstance(entry.get("ctx"), dict):
+                _count("hits")
+                return entry["ctx"], gen
+        except (ValueError, TypeError):
+            pass
+    _count("misses")
+    return None, gen
+
+
+def store(chat_id: Any, ctx: Dict[str, Any], generation: int) -> None:
+    """Cache ``ctx`` for ``chat_id`` as of ``generation`` (from ``lookup``)."""
+    if generation < 0:
+        return
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.setex(_ctx_key(chat_id), CTX_TTL_SECONDS,
+                   json.dumps({"gen": generation, "ctx": ctx}, default=str))
+        if ctx.get("user_id"):
+            pipe.setex(_uid_key(ctx["user_id"]), CTX_TTL_SECONDS, str(chat_id))
+        pipe.execute()
+        _count("stores")
+    except Exception as exc:  # pragma: no cover - redis unavailable
+        logger.warning("[USER_CTX] store failed for %s: %s", chat_id, exc)
+        _count("errors")
+
+
+def invalidate(chat_id: Any) -> None:
+    """Drop the cached context for ``chat_id`` and bump its generation."""
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.incr(_gen_key(chat_id))
+        pipe.expire(_gen_key(chat_id), GEN_TTL_SECONDS)
+        pipe.delete(_ctx_key(chat_id))
+        pipe.execute()
+        _count("invalidations")
+    except Exception as exc:  # pragma: no cover - redis unavailable
+        logger.warning("[USER_CTX] invalidate failed for %s: %s", chat_id, exc)
+        _count("errors")
+
+
+def invalidate_user(user_id: Any) -> None:
+    """Invalidate by account id (settings writes that only know the user_id).
+
+    Only chats with a cached context have a mapping; anything else has
+    nothing to invalidate.
+    """
+    if not user_id:
+        return
+    try:
+        chat_id = get_redis_client().get(_uid_key(user_id))
+    except Exception as exc:  # pragma: no cover - redis unavailable
+        logger.warning("[USER_CTX] uid lookup failed for %s: %s", user_id, exc)
+        _count("errors")
+        return
+    if chat_id:
+        invalidate(chat_id)
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        snapshot = dict(_stats)
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_ratio"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+    snapshot["enabled"] = ENABLED
+    return snapshot
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
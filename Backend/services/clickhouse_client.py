@@ -2,11 +2,22 @@
 ClickHouse client singleton for the KYS analytics pipeline.
 All writes happen inside Celery tasks, never in API handlers.
 API reads go through Redis first, ClickHouse only on cache miss.
+The insert_* helpers write immediately; writers that don't read their rows back
+straight away pass ``buffered=True`` to batch through clickhouse_insert_buffer.
+Writers that must not return before their rows are stored (acks_late tasks)
+pass ``async_insert=True`` instead: the server coalesces small inserts from
+every process, and the call still waits until the rows are written.
 """
 import logging
 import os
+import time
 import clickhouse_connect
 
+from services.clickhouse_schema import (
+    READ_MODEL_READY_COMMENT,
+    WALLET_AGGREGATE_LATEST_COLUMNS,
+    WALLET_TOKEN_STATS_BY_TOKEN_COLUMNS,
+)
 from services.telemetry import get_tracer
 
 logger = logging.getLogger(__name__)
@@ -16,29 +27,85 @@ _client = None
 CH_DATABASE = os.environ.get('CLICKHOUSE_DATABASE', 'sifter-kys')
 
 
+def _connect(**overrides):
+    """Open a new ClickHouse client from the CLICKHOUSE_* environment."""
+    return clickhouse_connect.get_client(**{
+        'host': os.environ.get('CLICKHOUSE_HOST', 'localhost'),
+        'port': int(os.environ.get('CLICKHOUSE_PORT', 8443)),
+        'username': os.environ.get('CLICKHOUSE_USER', 'default'),
+        'password': os.environ.get('CLICKHOUSE_PASSWORD', ''),
+        'database': CH_DATABASE,
+        'secure': os.environ.get('CLICKHOUSE_SECURE', 'true').lower() == 'true',
+        'verify': True,
+        'compress': True,
+        'connect_timeout': 10,
+        'send_receive_timeout': 60,
+        **overrides,
+    })
+
+
 def get_clickhouse_client():
     """Return a singleton ClickHouse client, or None if connection fails."""
     global _client
     if _client is None:
         try:
-            _client = clickhouse_connect.get_client(
-                host=os.environ.get('CLICKHOUSE_HOST', 'localhost'),
-                port=int(os.environ.get('CLICKHOUSE_PORT', 8443)),
-                username=os.environ.get('CLICKHOUSE_USER', 'default'),
-                password=os.environ.get('CLICKHOUSE_PASSWORD', ''),
-                database=CH_DATABASE,
-                secure=os.environ.get('CLICKHOUSE_SECURE', 'true').lower() == 'true',
-                verify=True,
-                compress=True,
-                connect_timeout=10,
-                send_receive_timeout=60,
-            )
+            _client = _connect()
         except Exception as e:
             logger.error(f"ClickHouse connection failed: {e}")
             return None
     return _client
 
 
+# Read models are created and backfilled by migrations, so a process may start
+# before one is complete. A table only serves reads once its migration has set
+# the READ_MODEL_READY_COMMENT marker; until then it may be half backfilled.
+# Remember "ready" for good, re-check "not ready" every few minutes.
+_READ_MODEL_RECHECK_S = 300
+_read_models_ready: dict[str, tuple[bool, float]] = {}
+
+
+def _read_model_ready(ch, table: str) -> bool:
+    seen = _read_models_ready.get(table)
+    if seen and (seen[0] or time.monotonic() - seen[1] < _READ_MODEL_RECHECK_S):
+        return seen[0]
+    try:
+        ready = int(ch.command(
+            "SELECT count() FROM system.tables"
+            " WHERE database = {db:String} AND name = {table:String} AND comment = {marker:String}",
+            parameters={'db': CH_DATABASE, 'table': table, 'marker': READ_MODEL_READY_COMMENT},
+        ) or 0) > 0
+    except Exception as e:
+        logger.warning(f"ClickHouse read model check for {table} failed: {e}")
+        ready = False
+    _read_models_ready[table] = (ready, time.monotonic())
+    return ready
+
+
+def _wallet_token_source(ch, columns: set[str], by_token: bool) -> str:
+    """Table to read wallet_token_stats rows from.
+
+    Queries filtering on token_address without a wallet go to the
+    token-ordered wallet_token_stats_by_token when it has every column they
+    need and its backfill is done; everything else uses wallet_token_stats and
+    its (wallet, token) index.
+    """
+    if by_token and columns <= set(WALLET_TOKEN_STATS_BY_TOKEN_COLUMNS) \
+            and _read_model_ready(ch, 'wallet_token_stats_by_token'):
+        return 'wallet_token_stats_by_token'
+    return 'wallet_token_stats'
+
+
+_TOP20_COLUMNS = {
+    'wallet_address', 'token_address', 'qualifies', 'avg_entry_to_ath_mult',
+    'entry_price_to_launch_mult', 'total_roi_mult', 'updated_at',
+}
+
+
+# Server-side batching. wait_for_async_insert=1 keeps the INSERT synchronous for
+# the caller: it returns once the server has flushed the rows to a part.
+ASYNC_INSERT_SETTINGS = {"async_insert": 1, "wait_for_async_insert": 1}
+
+
 def _dicts_to_rows(rows: list[dict]) -> tuple[list[list], list[str]]:
     """Convert list of dicts to (data, column_names) for clickhouse-connect insert()."""
     columns = list(rows[0].keys())
@@ -46,10 +113,19 @@ def _dicts_to_rows(rows: list[dict]) -> tuple[list[list], list[str]]:
     return data, columns
 
 
-def insert_token_scans(rows: list[dict]):
+def _buffer_rows(table: str, rows: list[dict]):
+    """Queue rows on the process-wide insert buffer instead of inserting now."""
+    from services.clickhouse_insert_buffer import get_insert_buffer
+    get_insert_buffer().add(table, rows)
+
+
+def insert_token_scans(rows: list[dict], buffered: bool = False, async_insert: bool = False):
     """Bulk insert token scan records."""
     if not rows:
         return
+    if buffered:
+        _buffer_rows('token_scans', rows)
+        return
     with _tracer.start_as_current_span("clickhouse.insert", attributes={"db.table": "token_scans", "db.row_count": len(rows)}):
         try:
             ch = get_clickhouse_client()
@@ -57,16 +133,20 @@ def insert_token_scans(rows: list[dict]):
                 logger.error(f"ClickHouse insert failed ({len(rows)} rows): client unavailable")
                 return
             data, columns = _dicts_to_rows(rows)
-            ch.insert(table='token_scans', data=data, database=CH_DATABASE, column_names=columns)
+            ch.insert(table='token_scans', data=data, database=CH_DATABASE, column_names=columns,
+                      settings=ASYNC_INSERT_SETTINGS if async_insert else None)
         except Exception as e:
             logger.error(f"ClickHouse insert failed ({len(rows)} rows): {e}")
         # Don't crash — data can be re-inserted on next pipeline run
 
 
-def insert_wallet_token_stats(rows: list[dict]):
+def insert_wallet_token_stats(rows: list[dict], buffered: bool = False):
     """Bulk insert wallet-token stats. Fires mv_wallet_aggregate materialized view."""
     if not rows:
         return
+    if buffered:
+        _buffer_rows('wallet_token_stats', rows)
+        return
     with _tracer.start_as_current_span("clickhouse.insert", attributes={"db.table": "wallet_token_stats", "db.row_count": len(rows)}):
         try:
             ch = get_clickhouse_client()
@@ -79,10 +159,40 @@ def insert_wallet_token_stats(rows: list[dict]):
             logger.error(f"ClickHouse insert failed ({len(rows)} rows): {e}")
 
 
-def insert_weekly_snapshots(rows: list[dict]):
+def insert_wallet_token_stats_columns(columns: dict[str, list], buffered: bool = False,
+                                      async_insert: bool = False):
+    """Insert wallet-token stats given as columns (name -> equal-length list).
+
+    Takes build_wallet_token_stats_columns output as is, with no per-row
+    dicts in between; the block goes to ClickHouse column-oriented.
+    """
+    n = len(next(iter(columns.values()), []))
+    if not n:
+        return
+    if buffered:
+        from services.clickhouse_insert_buffer import get_insert_buffer
+        get_insert_buffer().add_columns('wallet_token_stats', columns)
+        return
+    with _tracer.start_as_current_span("clickhouse.insert", attributes={"db.table": "wallet_token_stats", "db.row_count": n}):
+        try:
+            ch = get_clickhouse_client()
+            if ch is None:
+                logger.error(f"ClickHouse insert failed ({n} rows): client unavailable")
+                return
+            ch.insert(table='wallet_token_stats', data=list(columns.values()), database=CH_DATABASE,
+                      column_names=list(columns), column_oriented=True,
+                      settings=ASYNC_INSERT_SETTINGS if async_insert else None)
+        except Exception as e:
+            logger.error(f"ClickHouse insert failed ({n} rows): {e}")
+
+
+def insert_weekly_snapshots(rows: list[dict], buffered: bool = False):
     """Bulk insert weekly snapshot rows."""
     if not rows:
         return
+    if buffered:
+        _buffer_rows('wallet_weekly_snapshots', rows)
+        return
     with _tracer.start_as_current_span("clickhouse.insert", attributes={"db.table": "wallet_weekly_snapshots", "db.row_count": len(rows)}):
         try:
             ch = get_clickhouse_client()
@@ -95,10 +205,13 @@ def insert_weekly_snapshots(rows: list[dict]):
             logger.error(f"ClickHouse insert failed ({len(rows)} rows): {e}")
 
 
-def insert_leaderboard_results(rows: list[dict]):
+def insert_leaderboard_results(rows: list[dict], buffered: bool = False):
     """Bulk insert leaderboard result rows."""
     if not rows:
         return
+    if buffered:
+        _buffer_rows('leaderboard_results', rows)
+        return
     with _tracer.start_as_current_span("clickhouse.insert", attributes={"db.table": "leaderboard_results", "db.row_count": len(rows)}):
         try:
             ch = get_clickhouse_client()
@@ -118,8 +231,11 @@ def get_wallet_stats(wallet_address: str) -> dict | None:
             ch = get_clickhouse_client()
             if ch is None:
                 return None
+            # Newest version of the one key: reads only that wallet's granules, no merge-on-read.
             result = ch.query(
-                "SELECT * FROM wallet_aggregate_stats FINAL WHERE wallet_address = {addr:String}",
+                """SELECT * FROM wallet_aggregate_stats
+                   WHERE wallet_address = {addr:String}
+                   ORDER BY updated_at DESC LIMIT 1""",
                 parameters={'addr': wallet_address}
             )
             return result.first_row if result.result_rows else None
@@ -136,9 +252,10 @@ def get_wallet_token_stats_for_token(wallet_address: str, token_address: str) ->
             if ch is None:
                 return None
             result = ch.query(
-                """SELECT * FROM wallet_token_stats FINAL
+                """SELECT * FROM wallet_token_stats
                    WHERE wallet_address = {wallet:String}
-                     AND token_address = {token:String}""",
+                     AND token_address = {token:String}
+                   ORDER BY updated_at DESC LIMIT 1""",
                 parameters={'wallet': wallet_address, 'token': token_address}
             )
             return result.first_row if result.result_rows else None
@@ -154,6 +271,7 @@ def query_top20_for_tokens(token_list: list[str]) -> list:
             ch = get_clickhouse_client()
             if ch is None:
                 return []
+            source = _wallet_token_source(ch, _TOP20_COLUMNS, by_token=True)
             result = ch.query(
                 """SELECT
                     wallet_address,
@@ -173,9 +291,20 @@ def query_top20_for_tokens(token_list: list[str]) -> list:
                             / nullIf(avg(entry_price_to_launch_mult), 0)
                         ) * 100) * 0.10
                     ) AS professional_score
-                FROM wallet_token_stats FINAL
-                WHERE token_address IN ({token_list:Array(String)})
-                  AND qualifies = 1
+                FROM (
+                    -- newest version per (wallet, token), deduplicated with argMax
+                    SELECT
+                        wallet_address,
+                        token_address,
+                        argMax(s.qualifies, s.updated_at)                  AS qualifies,
+                        argMax(s.avg_entry_to_ath_mult, s.updated_at)      AS avg_entry_to_ath_mult,
+                        argMax(s.entry_price_to_launch_mult, s.updated_at) AS entry_price_to_launch_mult,
+                        argMax(s.total_roi_mult, s.updated_at)             AS total_roi_mult
+                    FROM """ + source + """ AS s
+                    WHERE token_address IN ({token_list:Array(String)})
+                    GROUP BY wallet_address, token_address
+                )
+                WHERE qualifies = 1
                 GROUP BY wallet_address
                 HAVING tokens_hit >= 1
                 ORDER BY professional_score DESC
@@ -188,35 +317,64 @@ def query_top20_for_tokens(token_list: list[str]) -> list:
             return []
 
 
+_ELITE_100_COLUMNS = [name for name, _ in WALLET_AGGREGATE_LATEST_COLUMNS]
+
+# Ranked from the wallet_aggregate_latest read model (argMax states per wallet).
+_ELITE_100_READ_MODEL_SQL = """
+SELECT wallet_address, {cols}
+FROM (
+    SELECT
+        wallet_address,
+        {merges}
+    FROM wallet_aggregate_latest
+    GROUP BY wallet_address
+)
+WHERE tokens_qualified >= 1
+ORDER BY professional_score DESC
+LIMIT 100
+""".format(
+    cols=", ".join(_ELITE_100_COLUMNS),
+    merges=",\n        ".join(
+        f"argMaxMerge(wallet_aggregate_latest.{c}) AS {c}" for c in _ELITE_100_COLUMNS
+    ),
+)
+
+# Same ranking straight off wallet_aggregate_stats, deduplicated with argMax
+# (used until the read model is backfilled).
+_ELITE_100_ARGMAX_SQL = """
+SELECT wallet_address, {cols}
+FROM (
+    SELECT
+        wallet_address,
+        {latest}
+    FROM wallet_aggregate_stats
+    GROUP BY wallet_address
+)
+WHERE tokens_qualified >= 1
+ORDER BY professional_score DESC
+LIMIT 100
+""".format(
+    cols=", ".join(_ELITE_100_COLUMNS),
+    latest=",\n        ".join(
+        f"argMax(wallet_aggregate_stats.{c}, wallet_aggregate_stats.updated_at) AS {c}"
+        for c in _ELITE_100_COLUMNS
+    ),
+)
+
+
 def query_elite_100() -> list:
     """Elite 100 wallets across ALL tokens (Section 8.2)."""
-    with _tracer.start_as_current_span("clickhouse.query", attributes={"db.table": "wallet_aggregate_stats", "db.operation": "elite_100"}):
+    with _tracer.start_as_current_span("clickhouse.query", attributes={"db.table": "wallet_aggregate_latest", "db.operation": "elite_100"}):
+        ch = get_clickhouse_client()
+        if ch is None:
+            return []
+        if _read_model_ready(ch, 'wallet_aggregate_latest'):
+            try:
+                return ch.query(_ELITE_100_READ_MODEL_SQL).named_results()
+            except Exception as e:
+                logger.warning(f"wallet_aggregate_latest unavailable, ranking from wallet_aggregate_stats: {e}")
         try:
-            ch = get_clickhouse_client()
-            if ch is None:
-                return []
-            result = ch.query(
-                """SELECT
-                    wallet_address,
-                    professional_score,
-                    tier,
-                    avg_entry_to_ath_mult,
-                    avg_roi_mult,
-                    consistency_score,
-                    tokens_qualified,
-                    tokens_traded_30d,
-                    win_rate,
-                    total_pnl_usd,
-                    total_realized_pnl_usd,
-                    total_unrealized_pnl_usd,
-                    avg_hold_time_secs,
-                    last_active_at
-                FROM wallet_aggregate_stats FINAL
-                WHERE tokens_qualified >= 1
-                ORDER BY professional_score DESC
-                LIMIT 100"""
-            )
-            return result.named_results()
+            return ch.query(_ELITE_100_ARGMAX_SQL).named_results()
         except Exception as e:
             logger.warning(f"ClickHouse unavailable: {e}")
             return []
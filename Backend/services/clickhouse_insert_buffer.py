@@ -0,0 +1,252 @@
+"""Buffered, column-oriented inserts into ClickHouse.
+
+Every ``insert_*`` helper in clickhouse_client used to send its rows as a
+separate INSERT, and a qualification scan sends a one-row ``token_scans``
+insert per token. Each INSERT becomes a new part on the server, so lots of
+tiny inserts mean lots of tiny parts and more background merge work.
+
+``ClickHouseInsertBuffer`` collects rows per (table, column set) as column
+lists. It sends one ``column_oriented`` insert for a block when either:
+
+  * the block reaches ``flush_rows`` rows (sent by the caller's thread), or
+  * it has been open for ``flush_interval_s`` (sent by the buffer's daemon
+    thread, which sleeps until the oldest block is due).
+
+``close()`` flushes everything. The process-wide buffer from
+``get_insert_buffer()`` is closed at interpreter exit and when a Celery pool
+process shuts down. ``async_insert=True`` adds ClickHouse's server-side
+async-insert settings, so inserts from many processes are coalesced too.
+
+Rows sit in process memory until their block is sent, so the buffer is for
+writers that can lose a few seconds of rows with the process (token
+discovery). acks_late tasks insert with ``async_insert=True`` on the
+insert_* helpers instead, which returns only once the rows are stored.
+
+The buffer talks to ClickHouse through its own session-less client, so the
+flush thread never shares a session with queries on the main client.
+
+Usage:
+    insert_token_scans([scan_row], buffered=True)
+    # or directly
+    get_insert_buffer().add("token_scans", [scan_row])
+    get_insert_buffer().add_columns("wallet_token_stats", columns)
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from celery.signals import worker_process_shutdown
+
+from services.clickhouse_client import ASYNC_INSERT_SETTINGS, CH_DATABASE, _connect
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_ROWS = int(os.environ.get("CLICKHOUSE_INSERT_BUFFER_ROWS", 50_000))
+DEFAULT_FLUSH_INTERVAL_S = float(os.environ.get("CLICKHOUSE_INSERT_BUFFER_SECONDS", 5.0))
+ASYNC_INSERT = os.environ.get("CLICKHOUSE_ASYNC_INSERT", "false").lower() == "true"
+
+
+class _Block:
+    __slots__ = ("columns", "data", "rows", "opened_at")
+
+    def __init__(self, columns: Tuple[str, ...]) -> None:
+        self.columns = columns
+        self.data: List[list] = [[] for _ in columns]
+        self.rows = 0
+        self.opened_at = time.monotonic()
+
+
+def _default_client():
+    return _connect(autogenerate_session_id=False)
+
+
+class ClickHouseInsertBuffer:
+    """Accumulate rows per table and send them as column-oriented blocks."""
+
+    def __init__(
+        self,
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+        client_factory: Callable = _default_client,
+        async_insert: bool = ASYNC_INSERT,
+        name: str = "ch-insert-buffer",
+    ) -> None:
+        self.flush_rows = flush_rows
+        self.flush_interval_s = flush_interval_s
+        self.async_insert = async_insert
+        self.name = name
+        self._client_factory = client_factory
+        self._client = None
+
+        self._blocks: Dict[Tuple[str, Tuple[str, ...]], _Block] = {}
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.rows_buffered = 0
+        self.rows_sent = 0
+        self.rows_failed = 0
+        self.inserts = 0
+
+    # ── public API ───────────────────────────────────────────────────────────
+    def add(self, table: str, rows: List[dict]) -> None:
+        """Buffer ``rows`` for ``table``; sends the block now if it is full."""
+        if not rows:
+            return
+        full = []
+        with self._cond:
+            for row in rows:
+                key = (table, tuple(row))
+                block = self._blocks.get(key)
+                if block is None:
+                    block = self._blocks[key] = _Block(key[1])
+                for col, value in zip(block.data, row.values()):
+                    col.append(value)
+                block.rows += 1
+                if block.rows >= self.flush_rows:
+                    full.append((table, self._blocks.pop(key)))
+            self.rows_buffered += len(rows)
+            self._ensure_thread()
+            self._cond.notify()
+        for table_name, block in full:
+            self._send(table_name, block)
+
+    def add_columns(self, table: str, columns: Dict[str, Sequence]) -> None:
+        """Buffer a column block (name -> equal-length values) for ``table``.
+
+        Shares a block with ``add`` when the column names and order match, so
+        columnar and row-wise writers of a table still go out as one insert.
+        """
+        rows = len(next(iter(columns.values()), ()))
+        if not rows:
+            return
+        key = (table, tuple(columns))
+        with self._cond:
+            block = self._blocks.get(key)
+            if block is None:
+                block = self._blocks[key] = _Block(key[1])
+            for col, values in zip(block.data, columns.values()):
+                col.extend(values)
+            block.rows += rows
+            full = self._blocks.pop(key) if block.rows >= self.flush_rows else None
+            self.rows_buffered += rows
+            self._ensure_thread()
+            self._cond.notify()
+        if full is not None:
+            self._send(table, full)
+
+    def flush(self, table: Optional[str] = None) -> int:
+        """Send every buffered block (or just ``table``'s) now. Returns rows sent."""
+        with self._cond:
+            keys = [k for k in self._blocks if table is None or k[0] == table]
+            due = [(k[0], self._blocks.pop(k)) for k in keys]
+        return sum(self._send(t, block) for t, block in due)
+
+    def close(self, timeout: float = 5.0) -> int:
+        """Stop the flush thread and send whatever is still buffered."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        return self.flush()
+
+    def pending_rows(self) -> int:
+        with self._cond:
+            return sum(b.rows for b in self._blocks.values())
+
+    def stats(self) -> Dict:
+        return {
+            "pending_rows": self.pending_rows(),
+            "rows_buffered": self.rows_buffered,
+            "rows_sent": self.rows_sent,
+            "rows_failed": self.rows_failed,
+            "inserts": self.inserts,
+        }
+
+    # ── flush thread ─────────────────────────────────────────────────────────
+    def _ensure_thread(self) -> None:
+        """Start the flush thread if needed. Caller holds ``self._cond``."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._blocks:
+                        self._cond.wait()
+                        continue
+                    oldest = min(b.opened_at for b in self._blocks.values())
+                    delay = oldest + self.flush_interval_s - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(timeout=delay)
+                if not self._running:
+                    return
+                cutoff = time.monotonic() - self.flush_interval_s
+                keys = [k for k, b in self._blocks.items() if b.opened_at <= cutoff]
+                due = [(k[0], self._blocks.pop(k)) for k in keys]
+            for table, block in due:
+                self._send(table, block)
+
+    def _send(self, table: str, block: _Block) -> int:
+        settings = ASYNC_INSERT_SETTINGS if self.async_insert else None
+        with self._send_lock:
+            try:
+                if self._client is None:
+                    self._client = self._client_factory()
+                self._client.insert(
+                    table=table,
+                    data=block.data,
+                    column_names=list(block.columns),
+                    database=CH_DATABASE,
+                    column_oriented=True,
+                    settings=settings,
+                )
+            except Exception as e:
+                self._client = None  # reconnect on the next send
+                self.rows_failed += block.rows
+                logger.error(f"ClickHouse buffered insert failed ({table}, {block.rows} rows): {e}")
+                # Don't crash — data can be re-inserted on next pipeline run
+                return 0
+            self.rows_sent += block.rows
+            self.inserts += 1
+        return block.rows
+
+
+_buffer: Optional[ClickHouseInsertBuffer] = None
+_buffer_pid: Optional[int] = None
+_buffer_lock = threading.Lock()
+
+
+def get_insert_buffer() -> ClickHouseInsertBuffer:
+    """The process-wide buffer. A forked child gets a fresh one, not its parent's rows."""
+    global _buffer, _buffer_pid
+    with _buffer_lock:
+        if _buffer is None or _buffer_pid != os.getpid():
+            _buffer = ClickHouseInsertBuffer()
+            _buffer_pid = os.getpid()
+        return _buffer
+
+
+def close_insert_buffer(**_kwargs) -> None:
+    """Flush the process-wide buffer (atexit / Celery pool-process shutdown hook)."""
+    if _buffer is not None and _buffer_pid == os.getpid():
+        _buffer.close()
+
+
+atexit.register(close_insert_buffer)
+worker_process_shutdown.connect(close_insert_buffer, weak=False)
@@ -1,7 +1,8 @@
 """
 ClickHouse DDL statements for the KYS pipeline.
 All tables use ReplacingMergeTree — INSERT new rows, never UPDATE.
-Use SELECT ... FINAL to read deduplicated data.
+Read deduplicated data with SELECT ... FINAL, or (on hot read paths) from the
+AggregatingMergeTree read models below / argMax(col, updated_at) per key.
 """
 
 CREATE_TOKEN_SCANS_SQL = """
@@ -257,6 +258,124 @@ GROUP BY wallet_address
 
 DROP_MV_WALLET_AGGREGATE_SQL = "DROP VIEW IF EXISTS mv_wallet_aggregate"
 
+# ── Token-ordered companion of wallet_token_stats ──
+# wallet_token_stats is ORDER BY (wallet_address, token_address), so a filter
+# on token_address alone can't use the primary index and reads every granule.
+# This narrow copy is ordered by (token_address, wallet_address) and kept in
+# sync by mv_wallet_token_stats_by_token. Token-first queries that only need
+# these columns read it instead (see clickhouse_client._wallet_token_source).
+# Same ReplacingMergeTree(updated_at) versioning, so argMax/FINAL dedup carries over.
+
+WALLET_TOKEN_STATS_BY_TOKEN_COLUMNS = (
+    "wallet_address", "token_address", "qualifies", "outcome",
+    "avg_entry_to_ath_mult", "entry_price_to_launch_mult", "total_roi_mult",
+    "total_spent_usd", "total_pnl_usd", "first_entry_timestamp", "updated_at",
+)
+
+CREATE_WALLET_TOKEN_STATS_BY_TOKEN_SQL = """
+CREATE TABLE IF NOT EXISTS wallet_token_stats_by_token
+(
+    wallet_address              String,
+    token_address               String,
+    qualifies                   UInt8,
+    outcome                     String,
+    avg_entry_to_ath_mult       Float64,
+    entry_price_to_launch_mult  Float64,
+    total_roi_mult              Float64,
+    total_spent_usd             Float64,
+    total_pnl_usd               Float64,
+    first_entry_timestamp       DateTime,
+    updated_at                  DateTime
+)
+ENGINE = ReplacingMergeTree(updated_at)
+ORDER BY (token_address, wallet_address)
+"""
+
+_WALLET_TOKEN_STATS_BY_TOKEN_SELECT = (
+    "\nSELECT " + ", ".join(WALLET_TOKEN_STATS_BY_TOKEN_COLUMNS) + "\nFROM wallet_token_stats\n"
+)
+
+CREATE_MV_WALLET_TOKEN_STATS_BY_TOKEN_SQL = (
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS mv_wallet_token_stats_by_token\n"
+    "TO wallet_token_stats_by_token\nAS" + _WALLET_TOKEN_STATS_BY_TOKEN_SELECT
+)
+
+# One-off fill from existing rows (scripts/migrate_read_models.py).
+BACKFILL_WALLET_TOKEN_STATS_BY_TOKEN_SQL = (
+    "INSERT INTO wallet_token_stats_by_token" + _WALLET_TOKEN_STATS_BY_TOKEN_SELECT
+)
+
+# Set by the migration once the backfill has finished. The table exists (and
+# the view feeds it) long before that, so reads route on this comment, not on
+# the table existing.
+READ_MODEL_READY_COMMENT = "backfilled"
+MARK_WALLET_TOKEN_STATS_BY_TOKEN_READY_SQL = (
+    f"ALTER TABLE wallet_token_stats_by_token MODIFY COMMENT '{READ_MODEL_READY_COMMENT}'"
+)
+
+# ── Read model: latest wallet_aggregate_stats per wallet, without FINAL ──
+# mv_wallet_aggregate writes a new wallet_aggregate_stats version per insert
+# batch. This AggregatingMergeTree keeps argMax(col, updated_at) states for the
+# leaderboard columns, so ranking every wallet merges compact states instead
+# of running FINAL over all versions of every column. Chained off
+# wallet_aggregate_stats, so it sees every version mv_wallet_aggregate writes.
+
+WALLET_AGGREGATE_LATEST_COLUMNS = [
+    ("professional_score",       "Float64"),
+    ("tier",                     "String"),
+    ("avg_entry_to_ath_mult",    "Float64"),
+    ("avg_roi_mult",             "Float64"),
+    ("consistency_score",        "Float64"),
+    ("tokens_qualified",         "UInt32"),
+    ("tokens_traded_30d",        "UInt32"),
+    ("win_rate",                 "Float64"),
+    ("total_pnl_usd",            "Float64"),
+    ("total_realized_pnl_usd",   "Float64"),
+    ("total_unrealized_pnl_usd", "Float64"),
+    ("avg_hold_time_secs",       "Float64"),
+    ("last_active_at",           "DateTime"),
+]
+
+CREATE_WALLET_AGGREGATE_LATEST_SQL = """
+CREATE TABLE IF NOT EXISTS wallet_aggregate_latest
+(
+    wallet_address              String,
+{states},
+    updated_at                  SimpleAggregateFunction(max, DateTime)
+)
+ENGINE = AggregatingMergeTree
+ORDER BY (wallet_address)
+""".format(states=",\n".join(
+    f"    {name:<27} AggregateFunction(argMax, {ch_type}, DateTime)"
+    for name, ch_type in WALLET_AGGREGATE_LATEST_COLUMNS
+))
+
+_WALLET_AGGREGATE_LATEST_SELECT = """
+SELECT
+    wallet_address,
+{states},
+    max(wallet_aggregate_stats.updated_at) AS updated_at
+FROM wallet_aggregate_stats
+GROUP BY wallet_address
+""".format(states=",\n".join(
+    f"    argMaxState(wallet_aggregate_stats.{name}, wallet_aggregate_stats.updated_at) AS {name}"
+    for name, _ in WALLET_AGGREGATE_LATEST_COLUMNS
+))
+
+CREATE_MV_WALLET_AGGREGATE_LATEST_SQL = (
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS mv_wallet_aggregate_latest\n"
+    "TO wallet_aggregate_latest\nAS" + _WALLET_AGGREGATE_LATEST_SELECT
+)
+
+# One-off fill from existing wallet_aggregate_stats rows (scripts/migrate_read_models.py).
+BACKFILL_WALLET_AGGREGATE_LATEST_SQL = "INSERT INTO wallet_aggregate_latest" + _WALLET_AGGREGATE_LATEST_SELECT
+
+# query_elite_100 ranks from the table only once this is set (see
+# READ_MODEL_READY_COMMENT).
+MARK_WALLET_AGGREGATE_LATEST_READY_SQL = (
+    f"ALTER TABLE wallet_aggregate_latest MODIFY COMMENT '{READ_MODEL_READY_COMMENT}'"
+)
+
 
 # ════════════════════════════════════════════════════════════════════════════
 # Telegram trading-bot analytics (bot rebuild). Additive — never alters the
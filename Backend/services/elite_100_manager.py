@@ -5,17 +5,22 @@ Data sources (priority order):
   1. Redis  — weekly_rerank_all caches the full Elite 100 at kys:elite100 (7-day TTL)
   2. ClickHouse — wallet_aggregate_stats FINAL has the authoritative scores
   3. Supabase wallet_watchlist — fallback with user-watchlisted wallets only
+
+generate_elite_100 ranks from the wallet_watchlist_elite_agg rollup (see the
+elite_wallet_rollup migration) and only scans wallet_watchlist if it is missing.
 """
 import json
 import os
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 from services.supabase_client import get_supabase_client, SCHEMA_NAME
 
 
 class Elite100Manager:
     """Manages Elite 100 and Community Top 100 rankings"""
 
+    ELITE_SIZE = 100
+
     def __init__(self):
         self.supabase = get_supabase_client()
         self.schema = SCHEMA_NAME
@@ -49,71 +54,27 @@ class Elite100Manager:
         """
         Generate Elite 100 - Top 100 wallets by professional performance
         Aggregates across ALL users' watchlists
-        
+
+        Reads the ranked top 100 from the wallet_watchlist_elite_agg rollup
+        (kept current by triggers on wallet_watchlist). Falls back to folding
+        the whole wallet_watchlist table in Python if the rollup is unavailable.
+
         Args:
             sort_by: 'score', 'roi', 'runners'
         """
         print(f"\n[ELITE 100] Generating rankings (sort_by={sort_by})...")
         
         try:
-            # Get ALL wallets from all users' watchlists
-            result = self._table('wallet_watchlist').select(
-                'wallet_address, tier, professional_score, roi_30d, '
-                'runners_30d, win_rate_7d, consistency_score, '
-                'last_trade_time, form'
-            ).execute()
-            
-            wallets = result.data
-            
-            if not wallets:
+            elite_wallets = self._get_elite_from_rollup(sort_by, self.ELITE_SIZE)
+            if elite_wallets is None:
+                elite_wallets = self._aggregate_watchlist(sort_by)
+
+            if not elite_wallets:
                 print("[ELITE 100] No wallets found")
                 return []
             
-            # Aggregate by wallet_address (same wallet may be in multiple watchlists)
-            wallet_map = {}
-            
-            for w in wallets:
-                addr = w['wallet_address']
-                
-                if addr not in wallet_map:
-                    wallet_map[addr] = {
-                        'wallet_address': addr,
-                        'tier': w['tier'],
-                        'professional_score': w['professional_score'] or 0,
-                        'roi_30d': w['roi_30d'] or 0,
-                        'runners_30d': w['runners_30d'] or 0,
-                        'win_rate_7d': w['win_rate_7d'] or 0,
-                        'consistency_score': w['consistency_score'] or 0,
-                        'last_trade_time': w['last_trade_time'],
-                        'form': w.get('form', []),
-                        'times_added': 1
-                    }
-                else:
-                    # Wallet is in multiple watchlists - take best metrics
-                    existing = wallet_map[addr]
-                    existing['professional_score'] = max(existing['professional_score'], w['professional_score'] or 0)
-                    existing['roi_30d'] = max(existing['roi_30d'], w['roi_30d'] or 0)
-                    existing['runners_30d'] = max(existing['runners_30d'], w['runners_30d'] or 0)
-                    existing['times_added'] += 1
-            
-            # Convert to list
-            elite_wallets = list(wallet_map.values())
-            
-            # Calculate composite score for each wallet
-            for wallet in elite_wallets:
-                wallet['composite_score'] = self._calculate_composite_score(wallet)
-                wallet['win_streak'] = self._calculate_win_streak(wallet.get('form', []))
-            
-            # Sort based on preference
-            if sort_by == 'roi':
-                elite_wallets.sort(key=lambda x: x['roi_30d'], reverse=True)
-            elif sort_by == 'runners':
-                elite_wallets.sort(key=lambda x: x['runners_30d'], reverse=True)
-            else:  # 'score' (default)
-                elite_wallets.sort(key=lambda x: x['composite_score'], reverse=True)
-            
             # Take top 100 and assign stable 1-based ranks for web/mobile clients.
-            top_100 = elite_wallets[:100]
+            top_100 = elite_wallets[:self.ELITE_SIZE]
             for rank, wallet in enumerate(top_100, 1):
                 wallet['rank'] = rank
                 wallet['runner_hits_30d'] = wallet.get('runners_30d', 0)
@@ -135,6 +96,89 @@ class Elite100Manager:
             import traceback
             traceback.print_exc()
             return []
+
+    def _get_elite_from_rollup(self, sort_by: str, limit: int) -> Optional[List[Dict]]:
+        """Ranked top-N from the elite_top_wallets RPC, or None if the RPC failed."""
+        try:
+            result = self.supabase.schema(self.schema).rpc(
+                'elite_top_wallets', {'p_sort': sort_by, 'p_limit': limit}
+            ).execute()
+        except Exception as e:
+            print(f"[ELITE 100] Rollup unavailable, scanning wallet_watchlist: {e}")
+            return None
+
+        wallets = []
+        for row in result.data or []:
+            rep = row.get('representative') or {}
+            wallet = {
+                'wallet_address': row['wallet_address'],
+                'tier': rep.get('tier'),
+                'professional_score': row.get('professional_score') or 0,
+                'roi_30d': row.get('roi_30d') or 0,
+                'runners_30d': row.get('runners_30d') or 0,
+                'win_rate_7d': rep.get('win_rate_7d') or 0,
+                'consistency_score': rep.get('consistency_score') or 0,
+                'last_trade_time': rep.get('last_trade_time'),
+                'form': rep.get('form') or [],
+                'times_added': row.get('times_added') or 0,
+                'composite_score': row.get('composite_score') or 0,
+            }
+            wallet['win_streak'] = self._calculate_win_streak(wallet['form'])
+            wallets.append(wallet)
+        return wallets
+
+    def _aggregate_watchlist(self, sort_by: str) -> List[Dict]:
+        """Full-scan fallback: fold every wallet_watchlist row per wallet and sort."""
+        # Get ALL wallets from all users' watchlists
+        result = self._table('wallet_watchlist').select(
+            'wallet_address, tier, professional_score, roi_30d, '
+            'runners_30d, win_rate_7d, consistency_score, '
+            'last_trade_time, form'
+        ).execute()
+
+        # Aggregate by wallet_address (same wallet may be in multiple watchlists)
+        wallet_map = {}
+
+        for w in result.data or []:
+            addr = w['wallet_address']
+
+            if addr not in wallet_map:
+                wallet_map[addr] = {
+                    'wallet_address': addr,
+                    'tier': w['tier'],
+                    'professional_score': w['professional_score'] or 0,
+                    'roi_30d': w['roi_30d'] or 0,
+                    'runners_30d': w['runners_30d'] or 0,
+                    'win_rate_7d': w['win_rate_7d'] or 0,
+                    'consistency_score': w['consistency_score'] or 0,
+                    'last_trade_time': w['last_trade_time'],
+                    'form': w.get('form', []),
+                    'times_added': 1
+                }
+            else:
+                # Wallet is in multiple watchlists - take best metrics
+                existing = wallet_map[addr]
+                existing['professional_score'] = max(existing['professional_score'], w['professional_score'] or 0)
+                existing['roi_30d'] = max(existing['roi_30d'], w['roi_30d'] or 0)
+                existing['runners_30d'] = max(existing['runners_30d'], w['runners_30d'] or 0)
+                existing['times_added'] += 1
+
+        elite_wallets = list(wallet_map.values())
+
+        # Calculate composite score for each wallet
+        for wallet in elite_wallets:
+            wallet['composite_score'] = self._calculate_composite_score(wallet)
+            wallet['win_streak'] = self._calculate_win_streak(wallet.get('form', []))
+
+        # Sort based on preference
+        if sort_by == 'roi':
+            elite_wallets.sort(key=lambda x: x['roi_30d'], reverse=True)
+        elif sort_by == 'runners':
+            elite_wallets.sort(key=lambda x: x['runners_30d'], reverse=True)
+        else:  # 'score' (default)
+            elite_wallets.sort(key=lambda x: x['composite_score'], reverse=True)
+
+        return elite_wallets
     
     def _calculate_composite_score(self, wallet: Dict) -> float:
         """
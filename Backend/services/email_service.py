@@ -146,6 +146,8 @@ class EmailService:
                     supabase.schema(SCHEMA_NAME).table("telegram_users").update(
                         {"anti_phishing_phrase": phrase}
                     ).eq("user_id", row["user_id"]).execute()
+                    from services.bot_user_cache import invalidate_user
+                    invalidate_user(row["user_id"])
                 except Exception:
                     pass
             return (phrase, chat_id)
@@ -0,0 +1,111 @@
+"""Redis-backed GCRA rate limiter for webhook ingress routes.
+
+Flask-Limiter covers the authenticated API blueprints; webhook receivers need
+something different: a limit that holds across every gunicorn worker, answers
+the sender in the sender's protocol (Helius wants a 200 either way), and
+doesn't keep a per-source dict in process memory.
+
+Each limited key is one Redis string holding its GCRA "theoretical arrival
+time" (microseconds), updated by a Lua script so check-and-set is atomic
+across processes. The script reads the Redis server clock, so workers with
+skewed clocks still share one timeline, and sets a PX expiry equal to the
+time until the bucket is full again — idle keys disappear on their own.
+
+Key:    sifter:rl:{name}:{key}   (STRING, TTL ≤ per)
+
+Usage:
+    @rate_limit("helius", rate=100, per=60, on_limited=lambda retry: ...)
+    def helius_wallet_alert(): ...
+
+Redis errors fail open (the request is allowed and a warning logged), the
+same choice ``ingest_helius_signal`` makes for its tracked-wallet gate.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import math
+from typing import Callable, Optional, Tuple
+
+from flask import jsonify, request
+
+from services.redis_pool import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "sifter:rl:"
+
+# KEYS[1] = limiter key; ARGV[1] = emission interval (µs); ARGV[2] = burst
+# tolerance (µs). Returns {allowed (0/1), retry_after (µs)}.
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+if tat - now > tolerance then
+    return {0, tat - tolerance - now}
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return {1, 0}
+"""
+
+
+def _key(name: str, key: str) -> str:
+    return f"{KEY_PREFIX}{name}:{key}"
+
+
+def check(name: str, key: str, rate: float, per: float = 60.0,
+          burst: Optional[int] = None) -> Tuple[bool, float]:
+    """Count one request for ``key`` against ``rate`` per ``per`` seconds.
+
+    ``burst`` is how many requests may arrive back to back (defaults to
+    ``rate``, i.e. a full window's worth). Returns ``(allowed, retry_after_s)``.
+    """
+    interval_us = int(per * 1_000_000 / rate)
+    tolerance_us = interval_us * (max(1, burst if burst is not None else int(rate)) - 1)
+    try:
+        script = get_redis_client().register_script(_GCRA_LUA)
+        allowed, retry_us = script(keys=[_key(name, key)], args=[interval_us, tolerance_us])
+    except Exception as exc:
+        logger.warning("[RATE_LIMIT] action=check status=redis_fail name=%s error=%s", name, exc)
+        return True, 0.0
+    return bool(allowed), int(retry_us) / 1_000_000
+
+
+def _default_limited(retry_after: float):
+    response = jsonify({"error": "Rate limit exceeded"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def rate_limit(
+    name: str,
+    rate: float,
+    per: float = 60.0,
+    *,
+    burst: Optional[int] = None,
+    key_func: Optional[Callable[[], str]] = None,
+    on_limited: Optional[Callable[[float], object]] = None,
+):
+    """Decorate a Flask view with a shared per-key GCRA limit.
+
+    ``key_func`` defaults to the client IP; ``on_limited(retry_after_s)``
+    builds the rejection response (default: 429 with ``Retry-After``).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = key_func() if key_func else (request.remote_addr or "unknown")
+            allowed, retry_after = check(name, key, rate, per, burst)
+            if not allowed:
+                logger.warning("[RATE_LIMIT] action=reject name=%s key=%s retry_after=%.2f",
+                               name, key, retry_after)
+                return (on_limited or _default_limited)(retry_after)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,78 @@
+"""Bounded registry of token mints that token discovery has already seen.
+
+``discover_new_tokens`` used to keep every mint it had ever seen in one Redis
+SET and push a 30-day expire on it every run, so the set only grew until it
+was dropped wholesale, after which the next run re-enqueued every token.
+
+Key:    kys:known_tokens   (ZSET, member = mint, score = first-seen unix ts)
+Trim:   members first seen more than KNOWN_TOKENS_RETENTION ago are removed on
+        every ``claim()``, so the key holds a rolling window and never needs a
+        key-level expire.
+
+``claim()`` registers a whole batch with ZADD NX in one pipeline and returns
+only the mints that were not there yet. ZADD NX is decided by Redis, so two
+overlapping discovery runs can't both claim the same token.
+
+Older deployments stored a plain SET at the same key. The first ``claim()`` or
+``is_known()`` in a process converts it in place, scoring existing members as
+first seen now, so nothing is re-enqueued by the upgrade.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+KNOWN_TOKENS_KEY = "kys:known_tokens"
+KNOWN_TOKENS_RETENTION = 86400 * 30
+_CONVERT_CHUNK = 1000
+
+_legacy_checked = False
+
+
+def _convert_legacy_set(r, now: float) -> None:
+    """Rewrite a pre-ZSET ``kys:known_tokens`` SET as a ZSET, once per process."""
+    global _legacy_checked
+    if _legacy_checked:
+        return
+    try:
+        if r.type(KNOWN_TOKENS_KEY) == "set":
+            members = list(r.smembers(KNOWN_TOKENS_KEY))
+            pipe = r.pipeline()  # MULTI/EXEC: readers never see the key missing
+            pipe.delete(KNOWN_TOKENS_KEY)
+            for i in range(0, len(members), _CONVERT_CHUNK):
+                pipe.zadd(KNOWN_TOKENS_KEY, {m: now for m in members[i:i + _CONVERT_CHUNK]})
+            pipe.execute()
+            logger.info("[KNOWN TOKENS] action=convert_legacy_set members=%d", len(members))
+    except Exception as exc:
+        # Another worker converting at the same time turns SMEMBERS into WRONGTYPE.
+        logger.warning("[KNOWN TOKENS] action=convert_legacy_set error=%s", exc)
+    _legacy_checked = True
+
+
+def claim(r, addresses: Iterable[str], now: Optional[float] = None) -> List[str]:
+    """Register ``addresses`` and return those not seen before, in input order.
+
+    Also trims entries older than the retention window. One round trip.
+    """
+    addresses = list(dict.fromkeys(a for a in addresses if a))
+    if not addresses:
+        return []
+    now = time.time() if now is None else now
+    _convert_legacy_set(r, now)
+
+    pipe = r.pipeline(transaction=False)
+    pipe.zremrangebyscore(KNOWN_TOKENS_KEY, "-inf", now - KNOWN_TOKENS_RETENTION)
+    for addr in addresses:
+        pipe.zadd(KNOWN_TOKENS_KEY, {addr: now}, nx=True)
+    replies = pipe.execute()
+    return [addr for addr, added in zip(addresses, replies[1:]) if added]
+
+
+def is_known(r, address: str) -> bool:
+    """True if discovery has seen ``address`` within the retention window."""
+    _convert_legacy_set(r, time.time())
+    return r.zscore(KNOWN_TOKENS_KEY, address) is not None
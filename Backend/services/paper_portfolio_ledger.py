@@ -0,0 +1,291 @@
+"""In-memory portfolio ledger for the paper trader.
+
+``PaperTrader`` used to answer every entry decision from the database:
+``_portfolio_state`` selected every position row, ``_count_recent_entries``
+ran two count queries, and ``_load_state`` pulled every closed token at
+startup. All three got slower as paper history accumulated.
+
+``PortfolioLedger`` is hydrated once and then updated incrementally by the
+trader on entry, take-profit and close:
+
+* realized PnL is a running total;
+* recent entry timestamps live in a 24h deque (hourly/daily caps);
+* closed tokens are a bounded, insertion-ordered set of the most recent
+  closes. If hydration hit the bound, older closes are confirmed with a
+  single-row DB lookup instead of being held in memory.
+
+``reconcile()`` recomputes the totals from the DB and records any drift; the
+trader calls it periodically from the exit sweep. The DB reads happen in
+``fetch_totals()``, which the trader runs outside its lock; only applying
+the result needs the lock. Realized PnL is summed in the database by the
+``paper_realized_pnl_total`` RPC.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DAY_S = 86400
+_LATENCY_SAMPLES = 512
+_PAGE_ROWS = 1000   # PostgREST's max-rows cap; a larger .limit() is silently cut to this
+
+
+def _parse_ts(value) -> Optional[float]:
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class PortfolioLedger:
+    """Running portfolio totals and dedup state for ``PaperTrader``."""
+
+    def __init__(self, table: Callable, *, rpc: Optional[Callable] = None,
+                 closed_capacity: int = 50_000) -> None:
+        self._table = table
+        self._rpc = rpc
+        self.closed_capacity = closed_capacity
+        self.realized_pnl_usd = 0.0
+        self.closed_tokens: "OrderedDict[str, None]" = OrderedDict()
+        self.closed_truncated = False
+        self.entry_times: Deque[float] = deque()
+        self._realized_recorded = 0.0   # running sum of record_realized(), to replay over a fetch
+
+        self._latency_ms: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._latency_lock = threading.Lock()
+        self.decisions = 0
+        self.hydrated_at: Optional[float] = None
+        self.hydrate_ms = 0.0
+        self.last_reconcile: Dict = {}
+
+    # ── hydration / reconciliation ───────────────────────────────────────────
+    def hydrate(self) -> None:
+        """Load totals, recent entries and the most recent closed tokens from the DB."""
+        t0 = time.perf_counter()
+        totals = self.fetch_totals()
+        closed = self._fetch_closed_tokens()
+        self._apply_totals(totals)
+        if closed is not None:
+            self.closed_tokens, self.closed_truncated = closed
+
+        self.hydrated_at = time.time()
+        self.hydrate_ms = (time.perf_counter() - t0) * 1000.0
+        logger.info(
+            "[LEDGER] action=hydrate realized_usd=%.2f closed=%d truncated=%s entries_24h=%d ms=%.1f",
+            self.realized_pnl_usd, len(self.closed_tokens), self.closed_truncated,
+            len(self.entry_times), self.hydrate_ms,
+        )
+
+    def fetch_totals(self) -> Dict:
+        """Read realized PnL and the last 24h of entries from the DB. Mutates nothing,
+        so it can run without the trader's lock; pass the result to ``reconcile``."""
+        started_at = time.time()
+        realized_mark = self._realized_recorded
+        return {
+            "started_at": started_at,
+            "realized_mark": realized_mark,
+            "realized": self._fetch_realized_total(),
+            "entry_times": self._fetch_entry_times(),
+        }
+
+    def reconcile(self, totals: Optional[Dict] = None) -> Dict:
+        """Correct drift in realized PnL and 24h entries against ``fetch_totals()``
+        (fetched now if not given)."""
+        totals = totals or self.fetch_totals()
+        before_realized = self.realized_pnl_usd
+        before_entries = self.count_recent_entries(_DAY_S)
+        self._apply_totals(totals)
+        report = {
+            "at": time.time(),
+            "realized_drift_usd": 0.0,
+            "entries_drift": 0,
+            "ok": totals["realized"] is not None and totals["entry_times"] is not None,
+        }
+        if totals["realized"] is not None:
+            report["realized_drift_usd"] = round(self.realized_pnl_usd - before_realized, 2)
+        if totals["entry_times"] is not None:
+            report["entries_drift"] = len(self.entry_times) - before_entries
+        if abs(report["realized_drift_usd"]) >= 0.01 or report["entries_drift"]:
+            logger.warning(
+                "[LEDGER] action=reconcile realized_drift_usd=%.2f entries_drift=%d",
+                report["realized_drift_usd"], report["entries_drift"],
+            )
+        self.last_reconcile = report
+        return report
+
+    def _apply_totals(self, totals: Dict) -> None:
+        """Adopt fetched totals, replaying what the trader recorded while they were fetched."""
+        if totals["realized"] is not None:
+            self.realized_pnl_usd = totals["realized"] + (self._realized_recorded - totals["realized_mark"])
+        if totals["entry_times"] is not None:
+            started_at = totals["started_at"]
+            self.entry_times = deque(sorted(
+                [ts for ts in totals["entry_times"] if ts < started_at]
+                + [ts for ts in self.entry_times if ts >= started_at]
+            ))
+
+    def _fetch_realized_total(self) -> Optional[float]:
+        if self._rpc is not None:
+            try:
+                data = self._rpc("paper_realized_pnl_total").execute().data
+                if isinstance(data, list) and data:
+                    data = next(iter(data[0].values())) if isinstance(data[0], dict) else data[0]
+                if isinstance(data, (int, float, str)):
+                    return float(data)
+                if data is None:
+                    return 0.0
+            except Exception as exc:
+                logger.warning("[LEDGER] action=fetch_realized_rpc status=error error=%s", str(exc)[:200])
+        # Without the RPC (not yet migrated): page through the column.
+        rows = self._fetch_pages(lambda: self._table("paper_trade_positions").select("realized_pnl_usd").order("id"))
+        if rows is None:
+            return None
+        return sum(float(row.get("realized_pnl_usd") or 0) for row in rows)
+
+    def _fetch_closed_tokens(self) -> Optional[Tuple["OrderedDict[str, None]", bool]]:
+        rows = self._fetch_pages(
+            lambda: (
+                self._table("paper_trade_positions")
+                .select("token_address")
+                .neq("status", "open")
+                .order("closed_at", desc=True)
+                .order("id", desc=True)
+            ),
+            max_rows=self.closed_capacity + 1,
+        )
+        if rows is None:
+            return None
+        closed: "OrderedDict[str, None]" = OrderedDict()
+        # Oldest first so eviction order matches close order.
+        for row in reversed(rows[: self.closed_capacity]):
+            if row.get("token_address"):
+                closed[row["token_address"]] = None
+        return closed, len(rows) > self.closed_capacity
+
+    def _fetch_pages(self, query: Callable, max_rows: Optional[int] = None) -> Optional[List[Dict]]:
+        """Run ``query()`` a page at a time with ``.range()`` until a short page
+        (or ``max_rows``). None if any page fails.
+
+        ``query()`` must order by a unique key (end with ``id``), or rows that
+        tie on the sort column can be skipped or repeated across pages."""
+        rows: List[Dict] = []
+        while max_rows is None or len(rows) < max_rows:
+            size = _PAGE_ROWS if max_rows is None else min(_PAGE_ROWS, max_rows - len(rows))
+            try:
+                page = query().range(len(rows), len(rows) + size - 1).execute().data or []
+            except Exception as exc:
+                logger.error("[LEDGER] action=fetch_page status=error error=%s", str(exc)[:200])
+                return None
+            rows.extend(page)
+            if len(page) < size:
+                break
+        return rows
+
+    def _fetch_entry_times(self) -> Optional[Deque[float]]:
+        since = datetime.fromtimestamp(time.time() - _DAY_S, tz=timezone.utc).isoformat()
+        rows = self._fetch_pages(
+            lambda: (
+                self._table("paper_trade_events")
+                .select("created_at")
+                .eq("event_type", "entry")
+                .gte("created_at", since)
+                .order("created_at")
+                .order("id")
+            )
+        )
+        if rows is None:
+            return None
+        return deque(sorted(ts for ts in (_parse_ts(row.get("created_at")) for row in rows) if ts))
+
+    # ── incremental updates ──────────────────────────────────────────────────
+    def record_entry(self, at: Optional[float] = None) -> None:
+        self.entry_times.append(at or time.time())
+
+    def record_realized(self, pnl_usd: float) -> None:
+        self.realized_pnl_usd += pnl_usd
+        self._realized_recorded += pnl_usd
+
+    def record_close(self, token_address: str) -> None:
+        self.closed_tokens[token_address] = None
+        self.closed_tokens.move_to_end(token_address)
+        while len(self.closed_tokens) > self.closed_capacity:
+            self.closed_tokens.popitem(last=False)
+            self.closed_truncated = True
+
+    # ── queries ──────────────────────────────────────────────────────────────
+    def count_recent_entries(self, seconds: int) -> int:
+        now = time.time()
+        while self.entry_times and self.entry_times[0] < now - _DAY_S:
+            self.entry_times.popleft()
+        cutoff = now - seconds
+        return sum(1 for ts in self.entry_times if ts >= cutoff)
+
+    def is_closed(self, token_address: str) -> bool:
+        if token_address in self.closed_tokens:
+            return True
+        if not self.closed_truncated:
+            return False
+        try:
+            rows = (
+                self._table("paper_trade_positions")
+                .select("token_address")
+                .eq("token_address", token_address)
+                .neq("status", "open")
+                .limit(1)
+                .execute()
+                .data
+            )
+        except Exception:
+            return False
+        if rows:
+            self.record_close(token_address)
+            return True
+        return False
+
+    def deployed_usd(self, positions: Iterable) -> float:
+        deployed = 0.0
+        for position in positions:
+            if position.token_amount > 0:
+                deployed += position.entry_size_usd * (position.remaining_amount / position.token_amount)
+            else:
+                deployed += position.entry_size_usd
+        return deployed
+
+    # ── metrics ──────────────────────────────────────────────────────────────
+    def record_decision_latency(self, ms: float) -> None:
+        with self._latency_lock:
+            self._latency_ms.append(ms)
+            self.decisions += 1
+
+    def metrics(self) -> Dict:
+        with self._latency_lock:
+            samples = sorted(self._latency_ms)
+            decisions = self.decisions
+
+        def _pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+        return {
+            "decisions": decisions,
+            "decision_ms_p50": _pct(0.50),
+            "decision_ms_p95": _pct(0.95),
+            "decision_ms_p99": _pct(0.99),
+            "closed_tokens_cached": len(self.closed_tokens),
+            "closed_tokens_truncated": self.closed_truncated,
+            "entries_24h": len(self.entry_times),
+            "hydrate_ms": round(self.hydrate_ms, 1),
+            "last_reconcile": self.last_reconcile,
+        }
@@ -6,6 +6,7 @@ import logging
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
@@ -16,6 +17,7 @@ logger = logging.getLogger(__name__)
 
 from config import Config
 from services.execution_adapters import NormalizedTradeSignal, PaperExecutionAdapter
+from services.paper_portfolio_ledger import PortfolioLedger
 from services.paper_trade_runtime import get_paper_trade_runtime
 from services.supabase_client import SCHEMA_NAME, get_supabase_client
 from services.trading_rules import (
@@ -77,12 +79,19 @@ class PaperTrader:
         self.execution_adapter = PaperExecutionAdapter()
         self.lock = threading.Lock()
         self.open_positions: Dict[str, PaperPosition] = {}
-        self.closed_token_set: set[str] = set()
+        self.ledger = PortfolioLedger(self._table, rpc=self._rpc)
+        self.ledger_reconcile_s = int(os.environ.get("PAPER_LEDGER_RECONCILE_S", "900"))
+        self._last_reconcile = time.time()
+        self.exit_fetch_workers = int(os.environ.get("PAPER_EXIT_FETCH_WORKERS", "8"))
+        self.last_exit_sweep: Dict = {}
         self._load_state()
 
     def _table(self, name: str):
         return self.supabase.schema(self.schema).table(name)
 
+    def _rpc(self, name: str, params: Optional[Dict] = None):
+        return self.supabase.schema(self.schema).rpc(name, params or {})
+
     def _load_state(self):
         try:
             open_rows = (
@@ -111,20 +120,9 @@ class PaperTrader:
                     exits_taken=tuple(row.get("exits_taken") or []),
                     peak_multiple=float(row.get("peak_multiple") or 1),
                 )
-
-            closed_rows = (
-                self._table("paper_trade_positions")
-                .select("token_address")
-                .neq("status", "open")
-                .execute()
-                .data
-                or []
-            )
-            self.closed_token_set = {
-                row["token_address"] for row in closed_rows if row.get("token_address")
-            }
         except Exception as exc:
             print(f"[PAPER TRADER] State restore failed: {exc}")
+        self.ledger.hydrate()
 
     # Sources this paper trader will simulate. ``cluster`` is the new co-entry path;
     # ``elite15`` is kept for backward compatibility (single-wallet legacy); ``single``/
@@ -154,45 +152,124 @@ class PaperTrader:
             return
 
         with self.lock:
+            t0 = time.perf_counter()
             outcome = self._evaluate_signal_locked(signal)
+            self.ledger.record_decision_latency((time.perf_counter() - t0) * 1000.0)
             self._log_event(signal, outcome)
             if outcome["status"] != "entered":
                 return
 
             position = outcome["position"]
             self.open_positions[token_address] = position
+            self.ledger.record_entry(position.opened_at)
             self._persist_new_position(position, signal, outcome)
 
     def check_exits(self):
+        """Two-phase exit sweep.
+
+        Phase 1 fetches one snapshot per open mint concurrently *outside* the
+        lock, so entries in ``process_signal`` aren't blocked for the whole
+        price sweep. Phase 2 re-takes the lock only to evaluate exits and
+        mutate in-memory state; the Supabase event/position writes it queues
+        run after the lock is released.
+        """
+        if time.time() - self._last_reconcile >= self.ledger_reconcile_s:
+            self.reconcile_ledger()
+
+        sweep_start = time.perf_counter()
         with self.lock:
-            for token_address in list(self.open_positions.keys()):
-                position = self.open_positions[token_address]
-                snapshot = self._fetch_token_snapshot(token_address)
-                if not snapshot:
-                    continue
-
-                current_price = snapshot["price"]
-                if current_price <= 0 or position.entry_price <= 0:
-                    continue
+            tokens = list(self.open_positions.keys())
+        if not tokens:
+            return
 
-                multiple = current_price / position.entry_price
-                position.peak_multiple = max(position.peak_multiple, multiple)
+        snapshots = self._fetch_snapshots(tokens)
+        fetch_ms = (time.perf_counter() - sweep_start) * 1000.0
 
-                if multiple <= 0.30:
-                    self._close_position(position, current_price, "dead_token", multiple)
-                    continue
-
-                age_days = (time.time() - position.opened_at) / 86400
-                if age_days >= 14:
-                    self._close_position(position, current_price, "max_age", multiple)
+        exits = 0
+        writes: List = []
+        with self.lock:
+            lock_start = time.perf_counter()
+            for token_address in tokens:
+                # Closed (or replaced) while we were fetching — skip.
+                position = self.open_positions.get(token_address)
+                snapshot = snapshots.get(token_address)
+                if position is None or not snapshot:
                     continue
+                if self._apply_exit_rules_locked(position, snapshot["price"], writes):
+                    exits += 1
+            lock_ms = (time.perf_counter() - lock_start) * 1000.0
+
+        write_failures = self._flush_exit_writes(writes)
+
+        self.last_exit_sweep = {
+            "positions": len(tokens),
+            "snapshots": len(snapshots),
+            "exits": exits,
+            "writes": len(writes),
+            "write_failures": write_failures,
+            "fetch_ms": round(fetch_ms, 1),
+            "lock_ms": round(lock_ms, 1),
+            "sweep_ms": round((time.perf_counter() - sweep_start) * 1000.0, 1),
+        }
+        logger.info(
+            "[PAPER] action=exit_sweep positions=%d exits=%d fetch_ms=%.1f lock_ms=%.1f",
+            len(tokens), exits, fetch_ms, lock_ms,
+        )
 
-                for target in TAKE_PROFIT_MULTIPLIERS:
-                    if target in position.exits_taken or multiple < target:
-                        continue
-                    self._take_profit(position, current_price, multiple, target)
-                    if position.remaining_amount <= 0:
-                        break
+    def _fetch_snapshots(self, tokens: List[str]) -> Dict[str, Dict]:
+        """Fetch snapshots for distinct mints concurrently. Failed fetches are omitted."""
+        distinct = list(dict.fromkeys(tokens))
+        workers = max(1, min(self.exit_fetch_workers, len(distinct)))
+        if workers == 1:
+            results = [(token, self._fetch_token_snapshot(token)) for token in distinct]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(zip(distinct, pool.map(self._fetch_token_snapshot, distinct)))
+        return {token: snapshot for token, snapshot in results if snapshot}
+
+    def _flush_exit_writes(self, writes: List) -> int:
+        """Execute queued exit writes in order. Returns the number that failed."""
+        failures = 0
+        for query in writes:
+            try:
+                query.execute()
+            except Exception as exc:
+                failures += 1
+                logger.warning("[PAPER] action=exit_write status=error error=%s", exc)
+        return failures
+
+    def _apply_exit_rules_locked(
+        self, position: PaperPosition, current_price: float, writes: List
+    ) -> bool:
+        """Apply stop/age/take-profit rules at ``current_price``. Returns True if anything exited.
+
+        Only in-memory state is mutated here; the matching Supabase writes are
+        appended to ``writes`` for the caller to execute outside the lock.
+        """
+        if current_price <= 0 or position.entry_price <= 0:
+            return False
+
+        multiple = current_price / position.entry_price
+        position.peak_multiple = max(position.peak_multiple, multiple)
+
+        if multiple <= 0.30:
+            self._close_position(position, current_price, "dead_token", multiple, writes)
+            return True
+
+        age_days = (time.time() - position.opened_at) / 86400
+        if age_days >= 14:
+            self._close_position(position, current_price, "max_age", multiple, writes)
+            return True
+
+        exited = False
+        for target in TAKE_PROFIT_MULTIPLIERS:
+            if target in position.exits_taken or multiple < target:
+                continue
+            self._take_profit(position, current_price, multiple, target, writes)
+            exited = True
+            if position.remaining_amount <= 0:
+                break
+        return exited
 
     def get_summary(self) -> Dict:
         try:
@@ -221,6 +298,7 @@ class PaperTrader:
                 "realized_pnl_usd": round(realized, 2),
             },
             "skip_breakdown": _count_by(skipped, "reason"),
+            "ledger": self.ledger.metrics(),
             "recent_positions": rows[:20],
         }
 
@@ -283,7 +361,7 @@ class PaperTrader:
         token_address = signal["token_address"]
         total_exposure = sum(pos.entry_size_usd for pos in self.open_positions.values())
 
-        if token_address in self.open_positions or token_address in self.closed_token_set:
+        if token_address in self.open_positions or self.ledger.is_closed(token_address):
             return {"event_type": "skipped", "status": "skipped", "reason": "duplicate_token"}
 
         if self._count_recent_entries(3600) >= self.hourly_limit:
@@ -458,39 +536,12 @@ class PaperTrader:
             return None
 
     def _count_recent_entries(self, seconds: int) -> int:
-        since = datetime.fromtimestamp(time.time() - seconds, tz=timezone.utc).isoformat()
-        try:
-            rows = (
-                self._table("paper_trade_events")
-                .select("id", count="exact")
-                .eq("event_type", "entry")
-                .gte("created_at", since)
-                .execute()
-            )
-            return rows.count or 0
-        except Exception:
-            return 0
+        return self.ledger.count_recent_entries(seconds)
 
     def _portfolio_state(self) -> Dict:
-        try:
-            rows = self._table("paper_trade_positions").select("*").execute().data or []
-        except Exception as exc:
-            logger.error("[PORTFOLIO] action=fetch status=error error=%s", str(exc)[:200])
-            rows = []
-
-        realized = sum(float(row.get("realized_pnl_usd") or 0) for row in rows)
-
-        deployed = 0.0
-        for row in rows:
-            if row.get("status") != "open":
-                continue
-            entry_size = float(row.get("entry_size_usd") or 0)
-            token_amount = float(row.get("token_amount") or 0)
-            remaining = float(row.get("remaining_amount") or 0)
-            if token_amount > 0:
-                deployed += entry_size * (remaining / token_amount)
-            else:
-                deployed += entry_size
+        """Portfolio totals from the in-memory ledger (no DB round trip)."""
+        realized = self.ledger.realized_pnl_usd
+        deployed = self.ledger.deployed_usd(self.open_positions.values())
 
         available = self.starting_balance_usd + realized - deployed
         portfolio_total = max(self.starting_balance_usd + realized, 0.0)
@@ -514,6 +565,18 @@ class PaperTrader:
             ) if self.starting_balance_usd else 0.0,
         }
 
+    def reconcile_ledger(self) -> Dict:
+        """Correct ledger drift against the DB (realized PnL + recent entries).
+
+        The DB reads run before taking the lock so entries and exits aren't
+        held up behind them; only applying the result is locked.
+        """
+        totals = self.ledger.fetch_totals()
+        with self.lock:
+            report = self.ledger.reconcile(totals)
+            self._last_reconcile = time.time()
+        return report
+
     def _persist_new_position(self, position: PaperPosition, signal: Dict, outcome: Dict):
         self._table("paper_trade_positions").insert(
             {
@@ -576,7 +639,10 @@ class PaperTrader:
         )
         self.runtime.update_active_run_summary(self.get_summary())
 
-    def _take_profit(self, position: PaperPosition, current_price: float, multiple: float, target: float):
+    def _take_profit(
+        self, position: PaperPosition, current_price: float, multiple: float, target: float,
+        writes: List,
+    ):
         sell_fraction = EXIT_FRACTIONS[target]
         amount_to_sell = position.remaining_amount if target == 30.0 else position.remaining_amount * sell_fraction
         proceeds = amount_to_sell * current_price
@@ -584,6 +650,7 @@ class PaperTrader:
         pnl = proceeds - cost_basis
         position.remaining_amount = max(0.0, position.remaining_amount - amount_to_sell)
         position.realized_pnl_usd += pnl
+        self.ledger.record_realized(pnl)
         position.exits_taken = tuple(sorted((*position.exits_taken, target)))
 
         logger.info(
@@ -593,7 +660,7 @@ class PaperTrader:
             round(proceeds, 2), round(pnl, 2), position.remaining_amount,
         )
 
-        self._table("paper_trade_events").insert(
+        writes.append(self._table("paper_trade_events").insert(
             {
                 "token_address": position.token_address,
                 "token_ticker": position.token_ticker,
@@ -610,9 +677,9 @@ class PaperTrader:
                     "pnl_usd": pnl,
                 },
             }
-        ).execute()
+        ))
 
-        self._table("paper_trade_positions").update(
+        writes.append(self._table("paper_trade_positions").update(
             {
                 "remaining_amount": position.remaining_amount,
                 "realized_pnl_usd": round(position.realized_pnl_usd, 2),
@@ -620,17 +687,21 @@ class PaperTrader:
                 "peak_multiple": round(position.peak_multiple, 4),
                 "exits_taken": list(position.exits_taken),
             }
-        ).eq("signal_key", position.signal_key).eq("status", "open").execute()
+        ).eq("signal_key", position.signal_key).eq("status", "open"))
 
         if position.remaining_amount <= 0:
-            self._close_position(position, current_price, "tp_30x", multiple)
+            self._close_position(position, current_price, "tp_30x", multiple, writes)
 
-    def _close_position(self, position: PaperPosition, current_price: float, reason: str, multiple: float):
+    def _close_position(
+        self, position: PaperPosition, current_price: float, reason: str, multiple: float,
+        writes: List,
+    ):
         if position.remaining_amount > 0:
             proceeds = position.remaining_amount * current_price
             cost_basis = position.remaining_amount * position.entry_price
             pnl = proceeds - cost_basis
             position.realized_pnl_usd += pnl
+            self.ledger.record_realized(pnl)
 
             logger.info(
                 "[PAPER] action=close status=ok token=%s reason=%s multiple=%.2f "
@@ -639,7 +710,7 @@ class PaperTrader:
                 round(pnl, 2), position.peak_multiple,
             )
 
-            self._table("paper_trade_events").insert(
+            writes.append(self._table("paper_trade_events").insert(
                 {
                     "token_address": position.token_address,
                     "token_ticker": position.token_ticker,
@@ -655,9 +726,9 @@ class PaperTrader:
                         "pnl_usd": pnl,
                     },
                 }
-            ).execute()
+            ))
 
-        self._table("paper_trade_positions").update(
+        writes.append(self._table("paper_trade_positions").update(
             {
                 "status": "closed",
                 "closed_at": _utc_now_iso(),
@@ -668,9 +739,9 @@ class PaperTrader:
                 "peak_multiple": round(position.peak_multiple, 4),
                 "exits_taken": list(position.exits_taken),
             }
-        ).eq("signal_key", position.signal_key).eq("status", "open").execute()
+        ).eq("signal_key", position.signal_key).eq("status", "open"))
 
-        self.closed_token_set.add(position.token_address)
+        self.ledger.record_close(position.token_address)
         self.open_positions.pop(position.token_address, None)
 
     def _log_event(self, signal: Dict, outcome: Dict):
@@ -6,7 +6,11 @@ and position lifecycle for users following Elite wallets.
 
 import json
 import logging
+import os
+import time
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
@@ -69,6 +73,15 @@ class PaperTradingManager:
             logger.error("[PAPER] action=fetch_price status=failed token=%s error=%s", token_address[:16], str(exc)[:200])
         return None
 
+    def _log_row(self, user_id: str, event_type: str, details: dict) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "event_type": event_type,
+            "details": details,
+            "created_at": self._now_iso(),
+        }
+
     def _log_event(
         self,
         user_id: str,
@@ -77,13 +90,7 @@ class PaperTradingManager:
     ) -> None:
         """Insert a row into paper_trade_logs."""
         try:
-            self._table("paper_trade_logs").insert({
-                "id": str(uuid.uuid4()),
-                "user_id": user_id,
-                "event_type": event_type,
-                "details": details,
-                "created_at": self._now_iso(),
-            }).execute()
+            self._table("paper_trade_logs").insert(self._log_row(user_id, event_type, details)).execute()
         except Exception as exc:
             logger.error("[PAPER] action=log_event status=failed user=%s error=%s", user_id[:8], str(exc)[:200])
 
@@ -477,13 +484,21 @@ class PaperTradingManager:
     TP_TIERS = [(5.0, 25), (10.0, 33), (20.0, 50), (30.0, 100)]
     STOP_LOSS_MULT = 0.30   # close if price drops to 30% of entry
     MAX_AGE_DAYS = 14       # close after 14 days regardless
+    EXIT_FETCH_WORKERS = int(os.environ.get("PAPER_EXIT_FETCH_WORKERS", "8"))
+    # PostgREST puts in_() ids in the query string; keep each close update well
+    # under URL/request limits so one oversized sweep can't fail every close.
+    EXIT_CLOSE_CHUNK = int(os.environ.get("PAPER_EXIT_CLOSE_CHUNK", "150"))
 
     def check_exits(self) -> dict:
         """Check all open positions for take-profit, stop-loss, and max-age exits.
 
-        Called every 2 minutes by the Celery beat task.
+        Called every 2 minutes by the Celery beat task. The sweep is grouped
+        by mint: one price fetch per distinct token (run concurrently), exit
+        decisions evaluated in memory, full closes written in chunked batch
+        updates, and notifications drained through one shared notifier.
         Returns summary of actions taken.
         """
+        sweep_start = time.perf_counter()
         stats = {"checked": 0, "tp_exits": 0, "sl_exits": 0, "age_exits": 0, "errors": 0}
 
         try:
@@ -501,132 +516,199 @@ class PaperTradingManager:
         if not positions:
             return stats
 
-        now = datetime.now(timezone.utc)
-
+        by_mint: Dict[str, List[dict]] = defaultdict(list)
         for pos in positions:
-            stats["checked"] += 1
-            token_address = pos.get("token_address", "")
-            user_id = pos.get("user_id", "")
-            symbol = pos.get("token_symbol", "???")
+            by_mint[pos.get("token_address", "")].append(pos)
+        prices = self._fetch_prices(list(by_mint.keys()))
+        fetch_ms = (time.perf_counter() - sweep_start) * 1000.0
 
-            try:
-                # Fetch current price
-                current_price = self._fetch_token_price(token_address)
+        now = datetime.now(timezone.utc)
+        closes: List[tuple] = []
+        partials: List[tuple] = []
+        for token_address, mint_positions in by_mint.items():
+            current_price = prices.get(token_address)
+            for pos in mint_positions:
+                stats["checked"] += 1
                 if current_price is None or current_price <= 0:
                     continue
-
-                avg_entry = float(pos.get("avg_entry_price", 0))
-                if avg_entry <= 0:
+                try:
+                    decision = self._exit_decision(pos, current_price, now)
+                except Exception as exc:
+                    stats["errors"] += 1
+                    symbol = pos.get("token_symbol", "???")
+                    logger.error("[PAPER] action=check_exit status=failed token=%s error=%s", symbol, str(exc)[:200])
+                    alert(P1, "EXIT_CHECKER", f"Error checking position {symbol}: {exc}",
+                          details={"token": token_address, "user_id": pos.get("user_id", "")})
                     continue
-
-                multiplier = current_price / avg_entry
-
-                # Check stop-loss
-                if multiplier <= self.STOP_LOSS_MULT:
-                    self._close_position_by_id(pos, reason="stop_loss")
-                    stats["sl_exits"] += 1
-                    logger.info("[PAPER] action=sl_exit token=%s mult=%.2f", symbol, multiplier)
-                    # Notify user of stop-loss
-                    try:
-                        import os
-                        bot_token = os.environ.get("TELEGRAM_BOT_TOKEN")
-                        if bot_token:
-                            from services.telegram_notifier import TelegramNotifier
-                            tn = TelegramNotifier(bot_token)
-                            tn._notify_paper_trade_event(user_id, "sl_exit", {
-                                "token_symbol": symbol, "multiplier": multiplier,
-                            })
-                    except Exception:
-                        pass
+                if decision is None:
                     continue
+                stats[decision["stat"]] += 1
+                if decision["pct"] == 100:
+                    closes.append((pos, decision))
+                else:
+                    partials.append((pos, decision))
 
-                # Check max age
-                opened_at_str = pos.get("opened_at", "")
-                if opened_at_str:
-                    try:
-                        opened_at = datetime.fromisoformat(opened_at_str.replace("Z", "+00:00"))
-                        age_days = (now - opened_at).total_seconds() / 86400
-                        if age_days >= self.MAX_AGE_DAYS:
-                            self._close_position_by_id(pos, reason="max_age")
-                            stats["age_exits"] += 1
-                            logger.info("[PAPER] action=age_exit token=%s days=%.1f", symbol, age_days)
-                            # Notify user of age exit
-                            try:
-                                import os
-                                bot_token = os.environ.get("TELEGRAM_BOT_TOKEN")
-                                if bot_token:
-                                    from services.telegram_notifier import TelegramNotifier
-                                    tn = TelegramNotifier(bot_token)
-                                    tn._notify_paper_trade_event(user_id, "age_exit", {
-                                        "token_symbol": symbol, "multiplier": multiplier,
-                                    })
-                            except Exception:
-                                pass
-                            continue
-                    except (ValueError, TypeError):
-                        pass
-
-                # Check take-profit tiers (highest first)
-                # Track triggered tiers via metadata to avoid repeated sells
-                triggered_tiers = set()
-                meta = pos.get("metadata") or {}
-                if isinstance(meta, str):
-                    try:
-                        import json as _json
-                        meta = _json.loads(meta)
-                    except Exception:
-                        meta = {}
-                triggered_tiers = set(meta.get("tp_tiers_triggered", []))
-
-                for tp_mult, tp_pct in reversed(self.TP_TIERS):
-                    tier_key = f"{tp_mult}x"
-                    if tier_key in triggered_tiers:
-                        continue  # Already sold at this tier
-                    if multiplier >= tp_mult:
-                        if tp_pct == 100:
-                            self._close_position_by_id(pos, reason=f"tp_{tp_mult}x")
-                        else:
-                            self.partial_close_position(
-                                user_id, token_address, tp_pct,
-                                reason=f"tp_{tp_mult}x_{tp_pct}pct",
-                            )
-                            # Record that this tier was triggered
-                            triggered_tiers.add(tier_key)
-                            try:
-                                self._table("paper_portfolio").update({
-                                    "metadata": {"tp_tiers_triggered": list(triggered_tiers)},
-                                }).eq("id", pos["id"]).execute()
-                            except Exception:
-                                pass
-                        stats["tp_exits"] += 1
-                        logger.info("[PAPER] action=tp_exit token=%s mult=%.1f pct=%d", symbol, multiplier, tp_pct)
-                        # Notify user of take-profit exit
-                        try:
-                            import os
-                            bot_token = os.environ.get("TELEGRAM_BOT_TOKEN")
-                            if bot_token:
-                                from services.telegram_notifier import TelegramNotifier
-                                tn = TelegramNotifier(bot_token)
-                                tn._notify_paper_trade_event(user_id, "tp_exit", {
-                                    "token_symbol": symbol, "multiplier": multiplier,
-                                })
-                        except Exception:
-                            pass
-                        break
+        stats["errors"] += self._apply_exit_batch(closes, partials)
+        stats["mints"] = len(by_mint)
+        stats["price_fetches"] = len(by_mint)
+        stats["fetch_ms"] = round(fetch_ms, 1)
+        stats["duration_ms"] = round((time.perf_counter() - sweep_start) * 1000.0, 1)
 
-            except Exception as exc:
-                stats["errors"] += 1
-                logger.error("[PAPER] action=check_exit status=failed token=%s error=%s", symbol, str(exc)[:200])
-                alert(P1, "EXIT_CHECKER", f"Error checking position {symbol}: {exc}",
-                      details={"token": token_address, "user_id": user_id})
-
-        logger.info("[PAPER] action=check_exits checked=%d tp=%d sl=%d age=%d errors=%d",
-                    stats["checked"], stats["tp_exits"], stats["sl_exits"], stats["age_exits"], stats["errors"])
+        logger.info("[PAPER] action=check_exits checked=%d mints=%d tp=%d sl=%d age=%d errors=%d ms=%.1f",
+                    stats["checked"], stats["mints"], stats["tp_exits"], stats["sl_exits"],
+                    stats["age_exits"], stats["errors"], stats["duration_ms"])
         if stats["errors"] > 0 and stats["errors"] >= stats["checked"] // 2:
             alert(P0, "EXIT_CHECKER", f"High error rate: {stats['errors']}/{stats['checked']} positions failed",
                   details=stats)
         return stats
 
+    def _fetch_prices(self, mints: List[str]) -> Dict[str, Optional[float]]:
+        """Fetch one price per distinct mint, ``EXIT_FETCH_WORKERS`` at a time."""
+        workers = max(1, min(self.EXIT_FETCH_WORKERS, len(mints)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(mints, pool.map(self._fetch_token_price, mints)))
+
+    def _exit_decision(self, pos: dict, current_price: float, now: datetime) -> Optional[dict]:
+        """Decide which exit (if any) applies to ``pos`` at ``current_price``.
+
+        Returns ``{"stat", "event", "reason", "pct", "multiplier", "tier"}`` or None.
+        """
+        avg_entry = float(pos.get("avg_entry_price", 0))
+        if avg_entry <= 0:
+            return None
+        multiplier = current_price / avg_entry
+
+        if multiplier <= self.STOP_LOSS_MULT:
+            return {"stat": "sl_exits", "event": "sl_exit", "reason": "stop_loss",
+                    "pct": 100, "multiplier": multiplier, "tier": None}
+
+        opened_at_str = pos.get("opened_at", "")
+        if opened_at_str:
+            try:
+                opened_at = datetime.fromisoformat(opened_at_str.replace("Z", "+00:00"))
+                age_days = (now - opened_at).total_seconds() / 86400
+                if age_days >= self.MAX_AGE_DAYS:
+                    return {"stat": "age_exits", "event": "age_exit", "reason": "max_age",
+                            "pct": 100, "multiplier": multiplier, "tier": None}
+            except (ValueError, TypeError):
+                pass
+
+        # Tiers already sold are tracked in metadata to avoid repeated sells
+        meta = pos.get("metadata") or {}
+        if isinstance(meta, str):
+            try:
+                meta = json.loads(meta)
+            except Exception:
+                meta = {}
+        triggered_tiers = set(meta.get("tp_tiers_triggered", []))
+
+        for tp_mult, tp_pct in reversed(self.TP_TIERS):
+            tier_key = f"{tp_mult}x"
+            if tier_key in triggered_tiers or multiplier < tp_mult:
+                continue
+            reason = f"tp_{tp_mult}x" if tp_pct == 100 else f"tp_{tp_mult}x_{tp_pct}pct"
+            return {"stat": "tp_exits", "event": "tp_exit", "reason": reason, "pct": tp_pct,
+                    "multiplier": multiplier, "tier": tier_key,
+                    "triggered": sorted(triggered_tiers | {tier_key})}
+        return None
+
+    def _apply_exit_batch(self, closes: List[tuple], partials: List[tuple]) -> int:
+        """Write one sweep's exits. Returns the number of positions that failed to apply."""
+        errors = 0
+        now = self._now_iso()
+        log_rows: List[dict] = []
+        notifications: List[tuple] = []
+
+        chunk_size = max(1, self.EXIT_CLOSE_CHUNK)
+        for start in range(0, len(closes), chunk_size):
+            chunk = closes[start:start + chunk_size]
+            try:
+                self._table("paper_portfolio").update({
+                    "status": "closed",
+                    "closed_at": now,
+                }).in_("id", [pos.get("id") for pos, _ in chunk]).execute()
+            except Exception as exc:
+                errors += len(chunk)
+                logger.error("[PAPER] action=close_batch status=failed offset=%d count=%d error=%s",
+                             start, len(chunk), str(exc)[:200])
+                continue
+            for pos, decision in chunk:
+                log_rows.append(self._log_row(pos.get("user_id", ""), "trade", {
+                    "action": "close_position",
+                    "reason": decision["reason"],
+                    "token_address": pos.get("token_address"),
+                    "token_symbol": pos.get("token_symbol"),
+                }))
+                notifications.append((pos, decision))
+
+        for pos, decision in partials:
+            invested = float(pos.get("total_invested_usd", 0))
+            current_value = float(pos.get("current_value_usd", 0))
+            # If current_value is stale, estimate from the sweep price
+            if current_value <= 0 and invested > 0:
+                current_value = invested * decision["multiplier"]
+            fraction = decision["pct"] / 100.0
+            sold_value = current_value * fraction
+            try:
+                updated = self._table("paper_portfolio").update({
+                    "total_invested_usd": round(invested * (1 - fraction), 2),
+                    "current_value_usd": round(current_value * (1 - fraction), 2),
+                    "metadata": {"tp_tiers_triggered": decision["triggered"]},
+                }).eq("id", pos["id"]).eq("status", "open").execute()
+            except Exception as exc:
+                errors += 1
+                logger.error("[PAPER] action=partial_close status=failed token=%s error=%s",
+                             pos.get("token_symbol"), str(exc)[:200])
+                continue
+            if not updated.data:
+                alert(P0, "TRADE", "Race condition detected in partial_close: position no longer open",
+                      details={"user_id": pos.get("user_id"), "token": pos.get("token_address"),
+                               "pct": decision["pct"]})
+                continue
+            log_rows.append(self._log_row(pos.get("user_id", ""), "trade", {
+                "action": "partial_close",
+                "pct": decision["pct"],
+                "reason": decision["reason"],
+                "token_address": pos.get("token_address"),
+                "token_symbol": pos.get("token_symbol"),
+                "sold_value_usd": round(sold_value, 2),
+            }))
+            notifications.append((pos, decision))
+
+        if log_rows:
+            try:
+                self._table("paper_trade_logs").insert(log_rows).execute()
+            except Exception as exc:
+                logger.error("[PAPER] action=log_batch status=failed count=%d error=%s",
+                             len(log_rows), str(exc)[:200])
+
+        for pos, decision in notifications:
+            logger.info("[PAPER] action=%s token=%s mult=%.2f pct=%d", decision["event"],
+                        pos.get("token_symbol", "???"), decision["multiplier"], decision["pct"])
+        self._notify_exits(notifications)
+        return errors
+
+    def _notify_exits(self, notifications: List[tuple]) -> None:
+        """Drain one sweep's exit notifications through a single shared notifier."""
+        if not notifications:
+            return
+        notifier = self._get_notifier()
+        if notifier is None:
+            return
+        for pos, decision in notifications:
+            try:
+                notifier._notify_paper_trade_event(pos.get("user_id", ""), decision["event"], {
+                    "token_symbol": pos.get("token_symbol", "???"),
+                    "multiplier": decision["multiplier"],
+                })
+            except Exception:
+                pass
+
+    def _get_notifier(self):
+        """The process-wide notifier shared by every exit sweep (None if no bot token)."""
+        from services.telegram_notifier import get_telegram_notifier
+        return get_telegram_notifier()
+
     def _close_position_by_id(self, pos: dict, reason: str = "manual") -> bool:
         """Close a position using its row data directly."""
         try:
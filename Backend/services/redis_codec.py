@@ -0,0 +1,174 @@
+"""Binary encoding for JSON-shaped values cached in Redis.
+
+The analyzer caches, the pipeline's ``job_result:*`` hand-offs and the
+SolanaTracker response cache used to store ``json.dumps`` text. ``dumps``
+writes a version byte followed by the payload instead:
+
+  0x01  orjson
+  0x02  zstd-compressed orjson. The zstd frame records the id of the
+        dictionary it was compressed with, if any.
+
+JSON text never starts with a byte below 0x09, so ``loads`` also reads
+entries written before this module existed. A value stored under one setting
+stays readable after any other.
+
+Values are bytes, so the Redis client that reads them must be created without
+``decode_responses`` (see ``redis_pool.get_redis_binary_client``).
+
+Configuration (read at import):
+
+  REDIS_CODEC        ``zstd`` (default), ``orjson``, or ``json``. ``json``
+                     writes the old text format, for rolling back or while a
+                     fleet still has readers that predate this module.
+  REDIS_CODEC_LEVEL  zstd level (default 3).
+  REDIS_CODEC_DICT   Comma-separated paths of zstd dictionaries trained by
+                     ``scripts/train_redis_codec_dict.py``. The first one
+                     compresses; all of them can decompress, so the next
+                     dictionary can be rolled out before the previous one is
+                     retired. Without one, frames are compressed without a
+                     dictionary.
+
+Small payloads are stored as plain orjson. Without a dictionary, zstd
+saves little on anything under COMPRESS_MIN_BYTES_NO_DICT. A dictionary
+roughly halves payloads down to COMPRESS_MIN_BYTES. It is not used above
+DICT_MAX_BYTES: it no longer improves the ratio there, and it slows
+compression down.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import orjson
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    from backports import zstd
+
+logger = logging.getLogger(__name__)
+
+ORJSON = 0x01
+ZSTD = 0x02
+
+COMPRESS_MIN_BYTES = 64
+COMPRESS_MIN_BYTES_NO_DICT = 512
+DICT_MAX_BYTES = 16 * 1024
+
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def load_dictionaries(paths):
+    """Read zstd dictionaries from ``paths``, keyed by dictionary id, in order."""
+    dicts = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            d = zstd.ZstdDict(f.read())
+        dicts[d.dict_id] = d
+    return dicts
+
+
+def train_dictionary(values, dict_size=32 * 1024):
+    """Train a zstd dictionary on sample values; returns its bytes, for a file."""
+    samples = [orjson.dumps(v, option=_ORJSON_OPTS) for v in values]
+    return zstd.train_dict(samples, dict_size).dict_content
+
+
+class RedisCodec:
+    """Encodes values for Redis with one codec, and decodes every format."""
+
+    def __init__(self, codec='zstd', level=3, dictionaries=None):
+        if codec not in ('zstd', 'orjson', 'json'):
+            raise ValueError(f"unknown Redis codec {codec!r}")
+        self.codec = codec
+        self.level = level
+        self.dictionaries = dict(dictionaries or {})
+        self.dictionary = next(iter(self.dictionaries.values()), None)
+        self._local = threading.local()
+
+    def _compressor(self, use_dict):
+        local = self._local
+        if not hasattr(local, 'compressors'):
+            local.compressors = {}
+        c = local.compressors.get(use_dict)
+        if c is None:
+            zdict = self.dictionary if use_dict else None
+            c = local.compressors[use_dict] = zstd.ZstdCompressor(self.level, zstd_dict=zdict)
+        return c
+
+    def dumps(self, value):
+        """Encode ``value`` (anything ``json.dumps`` takes) for a Redis SET."""
+        if self.codec == 'json':
+            return json.dumps(value).encode()
+        try:
+            body = orjson.dumps(value, option=_ORJSON_OPTS)
+        except orjson.JSONEncodeError:
+            # e.g. an int beyond 64 bits: keep the old text format for this one
+            return json.dumps(value).encode()
+        use_dict = self.dictionary is not None and len(body) <= DICT_MAX_BYTES
+        min_bytes = COMPRESS_MIN_BYTES if use_dict else COMPRESS_MIN_BYTES_NO_DICT
+        if self.codec == 'orjson' or len(body) < min_bytes:
+            return b'\x01' + body
+        return b'\x02' + self._compressor(use_dict).compress(body, zstd.ZstdCompressor.FLUSH_FRAME)
+
+    def loads(self, raw):
+        """Decode a Redis value written by ``dumps`` or as JSON text; None for a missing key."""
+        if not raw:
+            return None
+        if isinstance(raw, str):
+            return json.loads(raw)
+        tag = raw[0]
+        if tag == ORJSON:
+            return orjson.loads(memoryview(raw)[1:])
+        if tag == ZSTD:
+            frame = memoryview(raw)[1:]
+            dict_id = zstd.get_frame_info(frame).dictionary_id
+            zdict = self.dictionaries.get(dict_id) if dict_id else None
+            if dict_id and zdict is None:
+                raise ValueError(f"Redis value needs zstd dictionary {dict_id}, which is not loaded")
+            return orjson.loads(zstd.ZstdDecompressor(zstd_dict=zdict).decompress(frame))
+        return json.loads(raw)
+
+    @staticmethod
+    def payload_size(raw):
+        """Length of the uncompressed JSON in ``raw``, without decoding it."""
+        if isinstance(raw, str):
+            return len(raw)
+        if raw[0] == ZSTD:
+            return zstd.get_frame_info(memoryview(raw)[1:]).decompressed_size or len(raw)
+        if raw[0] == ORJSON:
+            return len(raw) - 1
+        return len(raw)
+
+
+def _from_env():
+    paths = [p for p in os.environ.get('REDIS_CODEC_DICT', '').split(',') if p.strip()]
+    dictionaries = {}
+    try:
+        dictionaries = load_dictionaries(p.strip() for p in paths)
+    except Exception as e:
+        logger.error("[REDIS CODEC] Could not load zstd dictionaries %s: %s", paths, e)
+    return RedisCodec(
+        codec=os.environ.get('REDIS_CODEC', 'zstd'),
+        level=int(os.environ.get('REDIS_CODEC_LEVEL', 3)),
+        dictionaries=dictionaries,
+    )
+
+
+_codec = _from_env()
+
+
+def dumps(value):
+    """Encode ``value`` with the process-wide codec."""
+    return _codec.dumps(value)
+
+
+def loads(raw):
+    """Decode a Redis value with the process-wide codec."""
+    return _codec.loads(raw)
+
+
+def payload_size(raw):
+    """Length of the uncompressed JSON in ``raw``, without decoding it."""
+    return RedisCodec.payload_size(raw)
@@ -10,6 +10,7 @@ import os
 import redis
 
 _pool = None
+_binary_pool = None
 
 
 def get_redis_client() -> redis.Redis:
@@ -22,3 +23,14 @@ def get_redis_client() -> redis.Redis:
             decode_responses=True,
         )
     return redis.Redis(connection_pool=_pool)
+
+
+def get_redis_binary_client() -> redis.Redis:
+    """Return a Redis client that returns raw bytes, for ``redis_codec`` values."""
+    global _binary_pool
+    if _binary_pool is None:
+        _binary_pool = redis.ConnectionPool.from_url(
+            os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+            max_connections=20,
+        )
+    return redis.Redis(connection_pool=_binary_pool)
@@ -0,0 +1,287 @@
+"""Single-thread scheduler for buffered multi-wallet signal windows.
+
+``WalletActivityMonitor`` used to start one ``threading.Timer`` per token it
+buffered, so a busy market meant hundreds of live OS threads each sleeping on
+its own 60s window. ``SignalWindowScheduler`` owns every open window instead:
+a min-heap of ``(deadline, key)`` drained by one daemon thread that waits on a
+condition variable until the earliest deadline.
+
+Optionally backed by Redis (a ZSET of deadlines plus a list of entries per
+key) so windows opened before a restart are rehydrated and still fire, unless
+their deadline passed more than ``_HYDRATE_GRACE_S`` ago: those are stale
+(their prices and alerts are out of date) and are deleted instead. Every
+web worker shares that ZSET, so a persisted window is claimed before it
+fires: only the process whose ZREM removes the deadline fires it, with the
+entries every process pushed to the shared list. Every push re-adds its
+window's deadline (ZADD NX), so entries pushed after another worker claimed
+the key still have a deadline for the next claim.
+
+Usage:
+    sched = SignalWindowScheduler(on_fire=flush, window_s=60.0)
+    sched.add("TokenMint...", [{"wallet": "...", "tier": "A"}])
+    # ~60s later, flush("TokenMint...", [...entries]) runs on the scheduler thread
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+_REDIS_PREFIX = "sifter:monitor:window:"      # entries:   <prefix><key> -> LIST of JSON
+_REDIS_DEADLINES = "sifter:monitor:windows"   # deadlines: ZSET key -> unix deadline
+_REDIS_ENTRY_TTL_S = 3600                     # orphan guard if a process dies mid-window
+_HYDRATE_GRACE_S = 120                        # older closed windows are dropped, not fired
+
+
+class SignalWindowScheduler:
+    """Buffer entries per key and fire each key once, ``window_s`` after it opened."""
+
+    def __init__(
+        self,
+        on_fire: Callable[[str, List[Dict]], None],
+        window_s: float = 60.0,
+        redis_client=None,
+        name: str = "signal-windows",
+    ) -> None:
+        self.on_fire = on_fire
+        self.window_s = window_s
+        self.name = name
+        self._redis = redis_client
+
+        self._heap: List[tuple] = []
+        self._entries: Dict[str, List[Dict]] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._persisted: set = set()   # keys whose window is in Redis, so must be claimed
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Firing lag = actual fire time - scheduled deadline (ms).
+        self.fired = 0
+        self.lag_total_ms = 0.0
+        self.lag_max_ms = 0.0
+
+    # ── public API ───────────────────────────────────────────────────────────
+    def add(self, key: str, entries: List[Dict]) -> bool:
+        """Append ``entries`` to the window for ``key``. Returns True if a new window opened."""
+        with self._cond:
+            opened = key not in self._entries
+            if opened:
+                self._deadlines[key] = time.time() + self.window_s
+                self._entries[key] = []
+                heapq.heappush(self._heap, (self._deadlines[key], key))
+            deadline = self._deadlines[key]
+            self._entries[key].extend(entries)
+            self._ensure_thread()
+            if opened and self._heap[0][1] == key:
+                self._cond.notify()
+        # Outside the lock: the timer thread and other producers don't wait on Redis.
+        self._persist_add(key, entries, deadline)
+        return opened
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def start(self) -> None:
+        """Rehydrate persisted windows (if Redis-backed) and start the scheduler thread."""
+        self._hydrate()
+        with self._cond:
+            self._ensure_thread()
+
+    def stop(self, flush: bool = False, timeout: float = 5.0) -> None:
+        """Stop the scheduler thread. ``flush=True`` fires every open window first."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread:
+            thread.join(timeout=timeout)
+        if flush:
+            with self._cond:
+                keys = [key for _, key in sorted(self._heap)]
+            for key in keys:
+                self._fire(key, scheduled=None)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            pending = len(self._entries)
+        return {
+            "pending_windows": pending,
+            "fired": self.fired,
+            "lag_avg_ms": round(self.lag_total_ms / self.fired, 2) if self.fired else 0.0,
+            "lag_max_ms": round(self.lag_max_ms, 2),
+        }
+
+    # ── scheduler thread ─────────────────────────────────────────────────────
+    def _ensure_thread(self) -> None:
+        """Start the scheduler thread if needed. Caller holds ``self._cond``."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(timeout=delay)
+                if not self._running:
+                    return
+                deadline, key = heapq.heappop(self._heap)
+            self._fire(key, scheduled=deadline)
+
+    def _fire(self, key: str, scheduled: Optional[float]) -> None:
+        with self._cond:
+            entries = self._entries.pop(key, None)
+            self._deadlines.pop(key, None)
+            persisted = key in self._persisted
+            self._persisted.discard(key)
+            if scheduled is None:
+                self._heap = [item for item in self._heap if item[1] != key]
+                heapq.heapify(self._heap)
+        if entries is None:
+            return
+        if persisted:
+            entries = self._claim(key, entries)
+            if entries is None:
+                return  # another process claimed and fired this window
+        if scheduled is not None:
+            lag_ms = max(0.0, (time.time() - scheduled) * 1000.0)
+            with self._cond:
+                self.fired += 1
+                self.lag_total_ms += lag_ms
+                self.lag_max_ms = max(self.lag_max_ms, lag_ms)
+
+        try:
+            self.on_fire(key, entries)
+        except Exception as e:
+            print(f"[{self.name}] on_fire failed for {key[:8]}...: {e}")
+
+    # ── optional Redis persistence ───────────────────────────────────────────
+    def _persist_add(self, key: str, entries: List[Dict], deadline: float) -> None:
+        if self._redis is None:
+            return
+        try:
+            pipe = self._redis.pipeline()
+            # Also on appends: another worker may have claimed (and removed)
+            # the key since this window opened.
+            pipe.zadd(_REDIS_DEADLINES, {key: deadline}, nx=True)
+            if entries:
+                pipe.rpush(_REDIS_PREFIX + key, *[json.dumps(e, default=str) for e in entries])
+                pipe.expire(_REDIS_PREFIX + key, _REDIS_ENTRY_TTL_S)
+            pipe.execute()
+        except Exception as e:
+            print(f"[{self.name}] Redis persist failed for {key[:8]}...: {e}")
+            return
+        with self._cond:
+            still_open = key in self._entries
+            if still_open:
+                self._persisted.add(key)
+        if not still_open:
+            # Fired before the persist landed; don't leave it for a later hydrate.
+            self._persist_remove(key)
+
+    def _persist_remove(self, key: str) -> None:
+        try:
+            pipe = self._redis.pipeline()
+            pipe.zrem(_REDIS_DEADLINES, key)
+            pipe.delete(_REDIS_PREFIX + key)
+            pipe.execute()
+        except Exception as e:
+            print(f"[{self.name}] Redis cleanup failed for {key[:8]}...: {e}")
+
+    def _claim(self, key: str, entries: List[Dict]) -> Optional[List[Dict]]:
+        """Take a persisted window out of Redis. Returns its entries, or None if
+        another process's ZREM got there first and left nothing behind. If
+        Redis is unreachable the window fires from this process's entries
+        rather than being dropped."""
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.lrange(_REDIS_PREFIX + key, 0, -1)
+            pipe.zrem(_REDIS_DEADLINES, key)
+            pipe.delete(_REDIS_PREFIX + key)
+            raw, removed, _ = pipe.execute()
+        except Exception as e:
+            print(f"[{self.name}] Redis claim failed for {key[:8]}...: {e}")
+            return entries
+        if removed != 1:
+            # Entries pushed without a deadline would otherwise be orphaned;
+            # the DEL above took them, so fire them here.
+            return self._decode(raw) if raw else None
+        return self._decode(raw) if raw else entries
+
+    @staticmethod
+    def _decode(raw) -> List[Dict]:
+        entries = []
+        for item in raw:
+            try:
+                entries.append(json.loads(item))
+            except (TypeError, ValueError):
+                continue
+        return entries
+
+    def _hydrate(self) -> None:
+        """Reload windows left in Redis by a previous process (or another worker).
+
+        Windows whose deadline is more than ``_HYDRATE_GRACE_S`` in the past
+        are removed from Redis rather than fired.
+        """
+        if self._redis is None:
+            return
+        try:
+            persisted = self._redis.zrange(_REDIS_DEADLINES, 0, -1, withscores=True)
+        except Exception as e:
+            print(f"[{self.name}] Redis hydrate failed: {e}")
+            return
+        cutoff = time.time() - _HYDRATE_GRACE_S
+        loaded = []
+        expired = []
+        for key, deadline in persisted or []:
+            if isinstance(key, bytes):
+                key = key.decode()
+            if float(deadline) < cutoff:
+                expired.append(key)
+                continue
+            try:
+                raw = self._redis.lrange(_REDIS_PREFIX + key, 0, -1) or []
+            except Exception:
+                raw = []
+            loaded.append((key, float(deadline), self._decode(raw)))
+        if expired:
+            self._drop_expired(expired)
+        restored = 0
+        with self._cond:
+            for key, deadline, entries in loaded:
+                if key in self._entries:
+                    continue
+                self._entries[key] = entries
+                self._deadlines[key] = deadline
+                self._persisted.add(key)
+                heapq.heappush(self._heap, (deadline, key))
+                restored += 1
+            self._cond.notify()
+        if restored:
+            print(f"[{self.name}] Rehydrated {restored} open window(s) from Redis")
+
+    def _drop_expired(self, keys: List[str]) -> None:
+        try:
+            pipe = self._redis.pipeline()
+            pipe.zrem(_REDIS_DEADLINES, *keys)
+            pipe.delete(*[_REDIS_PREFIX + key for key in keys])
+            pipe.execute()
+        except Exception as e:
+            print(f"[{self.name}] Redis cleanup of expired windows failed: {e}")
+            return
+        print(f"[{self.name}] Dropped {len(keys)} expired window(s) from Redis")
@@ -23,7 +23,8 @@ from typing import Any
 
 from config import Config
 from services.http_session import get_http_session
-from services.redis_pool import get_redis_client
+from services import redis_codec
+from services.redis_pool import get_redis_binary_client
 
 logger = logging.getLogger(__name__)
 
@@ -144,20 +145,20 @@ class SolanaTrackerClient:
         ``force_refresh`` skips the cache READ (so a manual Refresh pulls live
         data) but still WRITES the fresh value back."""
         key = self._cache_key(path, params)
-        redis = get_redis_client()
+        redis = get_redis_binary_client()
         if not force_refresh:
             try:
                 cached = redis.get(key)
                 if cached is not None:
                     logger.debug("SolanaTracker cache hit: %s", key)
-                    return json.loads(cached)
+                    return redis_codec.loads(cached)
             except Exception:
                 logger.debug("Redis read failed for %s, falling through to API", key)
 
         data = self._get(path, params)
 
         try:
-            redis.setex(key, ttl, json.dumps(data))
+            redis.setex(key, ttl, redis_codec.dumps(data))
         except Exception:
             logger.debug("Redis write failed for %s", key)
 
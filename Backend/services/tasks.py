@@ -258,9 +258,11 @@ def flush_redis_to_duckdb():
         import json
         import duckdb
         import time
+        from services import redis_codec
 
         redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
         r = redis_lib.from_url(redis_url, decode_responses=True, socket_timeout=10)
+        rb = redis_lib.from_url(redis_url, socket_timeout=10)  # values are redis_codec payloads
 
         duckdb_path = 'wallet_analytics.duckdb'
         con = duckdb.connect(duckdb_path)
@@ -287,10 +289,10 @@ def flush_redis_to_duckdb():
 
         for key in pnl_keys:
             try:
-                raw = r.get(key)
+                raw = rb.get(key)
                 if not raw:
                     continue
-                data = json.loads(raw)
+                data = redis_codec.loads(raw)
 
                 parts = key.split(':', 2)
                 if len(parts) != 3:
@@ -325,10 +327,10 @@ def flush_redis_to_duckdb():
 
         for key in runner_keys:
             try:
-                raw = r.get(key)
+                raw = rb.get(key)
                 if not raw:
                     continue
-                data = json.loads(raw)
+                data = redis_codec.loads(raw)
 
                 wallet = key.split(':', 1)[1]
 
@@ -356,10 +358,10 @@ def flush_redis_to_duckdb():
 
         for key in token_runner_keys:
             try:
-                raw = r.get(key)
+                raw = rb.get(key)
                 if not raw:
                     continue
-                data = json.loads(raw)
+                data = redis_codec.loads(raw)
 
                 token = key.split(':', 1)[1]
 
@@ -382,10 +384,10 @@ def flush_redis_to_duckdb():
 
         for key in ath_keys:
             try:
-                raw = r.get(key)
+                raw = rb.get(key)
                 if not raw:
                     continue
-                data = json.loads(raw)
+                data = redis_codec.loads(raw)
 
                 token = key.split(':', 1)[1]
 
@@ -413,10 +415,10 @@ def flush_redis_to_duckdb():
 
         for key in info_keys:
             try:
-                raw = r.get(key)
+                raw = rb.get(key)
                 if not raw:
                     continue
-                data = json.loads(raw)
+                data = redis_codec.loads(raw)
 
                 token = key.split(':', 1)[1]
 
@@ -450,10 +452,10 @@ def flush_redis_to_duckdb():
 
         for key in security_keys:
             try:
-                raw = r.get(key)
+                raw = rb.get(key)
                 if not raw:
                     continue
-                data = json.loads(raw)
+                data = redis_codec.loads(raw)
 
                 token = key.split(':', 1)[1]
 
@@ -476,10 +478,10 @@ def flush_redis_to_duckdb():
 
         for key in launch_keys:
             try:
-                raw = r.get(key)
+                raw = rb.get(key)
                 if not raw:
                     continue
-                data = json.loads(raw)
+                data = redis_codec.loads(raw)
 
                 token = key.split(':', 1)[1]
                 price = data.get('price')
@@ -556,9 +558,11 @@ def invalidate_stale_ath_caches():
     try:
         import redis as redis_lib
         import json
+        from services import redis_codec
 
         redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
         r = redis_lib.from_url(redis_url, decode_responses=True, socket_timeout=10)
+        rb = redis_lib.from_url(redis_url, socket_timeout=10)  # token_ath:* values are redis_codec payloads
 
         from services.supabase_client import get_supabase_client, SCHEMA_NAME
         supabase = get_supabase_client()
@@ -580,12 +584,12 @@ def invalidate_stale_ath_caches():
                 token_address = key.split('cache:token:', 1)[1]
 
                 # Current ATH from Redis (written by pipeline / analyzer)
-                current_ath_raw = r.get(f"token_ath:{token_address}")
+                current_ath_raw = rb.get(f"token_ath:{token_address}")
                 if not current_ath_raw:
                     stats['no_ath_data'] += 1
                     continue
 
-                current_ath_price = json.loads(current_ath_raw).get('highest_price', 0)
+                current_ath_price = redis_codec.loads(current_ath_raw).get('highest_price', 0)
                 if not current_ath_price:
                     stats['no_ath_data'] += 1
                     continue
@@ -786,10 +790,10 @@ def send_telegram_alert_async(user_id: str, alert_type: str, alert_data: dict):
         if not bot_token:
             return {'status': 'skipped', 'reason': 'no_token'}
 
-        from services.telegram_notifier import TelegramNotifier
+        from services.telegram_notifier import get_telegram_notifier
         from services.supabase_client import get_supabase_client, SCHEMA_NAME
 
-        telegram_notifier = TelegramNotifier(bot_token)
+        telegram_notifier = get_telegram_notifier()
         supabase = get_supabase_client()
         tg_settings = {}
         try:
@@ -985,9 +989,9 @@ def _notify_bot_queue_result(queue_id: int, result: dict, supabase):
         if not (prefs.get('alerts_enabled', True) and prefs.get('notif_trade_open', True)):
             return
         trade_result = result.get('result') or {}
-        from services.telegram_notifier import TelegramNotifier
+        from services.telegram_notifier import get_telegram_notifier
 
-        TelegramNotifier(bot_token).send_auto_trade_confirmation(
+        get_telegram_notifier().send_auto_trade_confirmation(
             row['user_id'],
             {
                 'token_ticker': row.get('token_ticker'),
@@ -1081,15 +1085,17 @@ def _fire_price_alert(sb, alert, current_mc):
     # Telegram
     if alert.get("notify_telegram"):
         try:
-            from services.telegram_notifier import TelegramNotifier
+            from services.telegram_notifier import get_telegram_notifier
             tg = sb.schema(SCHEMA_NAME).table("telegram_users").select(
                 "telegram_chat_id").eq("user_id", user_id).limit(1).execute()
-            if tg.data and tg.data[0].get("telegram_chat_id"):
-                TelegramNotifier().send_message(
+            notifier = get_telegram_notifier()
+            if notifier and tg.data and tg.data[0].get("telegram_chat_id"):
+                notifier.send_message(
                     str(tg.data[0]["telegram_chat_id"]),
                     f"🔔 <b>Price Alert</b>\n\n{alert.get('token_symbol') or 'Token'} "
                     f"hit ${float(alert.get('target_mc_usd') or 0):,.0f} MC "
                     f"(now ${current_mc:,.0f}).",
+                    defer=True,
                 )
         except Exception:
             pass
@@ -1159,13 +1165,15 @@ def _fire_reminder(sb, note):
     body = note.get("body") or "Reminder"
     if note.get("notify_telegram", True):
         try:
-            from services.telegram_notifier import TelegramNotifier
+            from services.telegram_notifier import get_telegram_notifier
             tg = sb.schema(SCHEMA_NAME).table("telegram_users").select(
                 "telegram_chat_id").eq("user_id", user_id).limit(1).execute()
-            if tg.data and tg.data[0].get("telegram_chat_id"):
-                TelegramNotifier().send_message(
+            notifier = get_telegram_notifier()
+            if notifier and tg.data and tg.data[0].get("telegram_chat_id"):
+                notifier.send_message(
                     str(tg.data[0]["telegram_chat_id"]),
                     f"⏰ <b>Reminder</b>\n\n{body}",
+                    defer=True,
                 )
         except Exception:
             pass
@@ -1413,6 +1421,9 @@ def sync_elite_15_to_monitor():
             except Exception as e:
                 print(f"[ELITE SYNC] Error removing {addr[:12]}...: {e}")
 
+        from services.wallet_watchers_index import invalidate as invalidate_watchers
+        invalidate_watchers(*to_add, *to_remove)
+
         # 5. Sync Helius webhook with updated wallet list
         helius_synced = False
         if to_add or to_remove:
@@ -1483,12 +1494,14 @@ def _send_elite_replacement_notification(to_add, to_remove, elite_15, supabase):
         lines.append("Use /menu → Elite 15 to manage your selections.")
 
         msg = "\n".join(lines)
-        from services.telegram_notifier import TelegramNotifier
-        tn = TelegramNotifier()
+        from services.telegram_notifier import get_telegram_notifier
+        tn = get_telegram_notifier()
+        if tn is None:
+            return
         sent = 0
         for row in users_res.data[:100]:  # cap at 100 to avoid rate limits
             try:
-                tn.send_message(str(row["telegram_chat_id"]), msg)
+                tn.send_message(str(row["telegram_chat_id"]), msg, defer=True)
                 sent += 1
             except Exception:
                 pass
@@ -1650,7 +1663,6 @@ def ingest_helius_signal(signal: dict):
         wallet_address = signal.get("wallet_address", "")
 
         from services.redis_pool import get_redis_client
-        from services.supabase_client import get_supabase_client, SCHEMA_NAME
         r = get_redis_client()
 
         # Gate: only ingest signals from wallets the bot actually tracks — the
@@ -1663,11 +1675,8 @@ def ingest_helius_signal(signal: dict):
             if get_copytrade_config().is_tracked_wallet(wallet_address):
                 is_tracked = True
             else:
-                sb = get_supabase_client()
-                result = sb.schema(SCHEMA_NAME).table("wallet_watchlist").select("wallet_address").eq(
-                    "wallet_address", wallet_address
-                ).limit(1).execute()
-                is_tracked = bool(result.data)
+                from services.wallet_watchers_index import is_watched
+                is_tracked = is_watched(wallet_address)
         except Exception:
             is_tracked = True  # fail open on error — don't block legitimate signals
 
@@ -1676,8 +1685,9 @@ def ingest_helius_signal(signal: dict):
             return {"status": "rejected", "reason": "wallet_not_tracked"}
 
         # Token qualification gate — annotate signal (soft gate)
+        from services.known_tokens import is_known as is_known_token
         is_qualified = r.sismember("kys:qualified_tokens", token_address)
-        is_known = r.sismember("kys:known_tokens", token_address) or r.sismember("kys:pending_tokens", token_address)
+        is_known = is_known_token(r, token_address) or r.sismember("kys:pending_tokens", token_address)
         signal["token_qualified"] = bool(is_qualified)
         signal["token_known"] = bool(is_known)
 
@@ -1759,3 +1769,89 @@ def flush_signal_aggregator():
     except Exception as exc:
         logger.error("[AGGREGATOR] action=flush status=error error=%s", str(exc)[:200])
         return {"status": "error", "error": str(exc)}
+
+
+@celery.task(name='tasks.drain_telegram_delivery')
+def drain_telegram_delivery():
+    """Called every 5s by Celery beat. Re-sends Telegram messages whose retry is due."""
+    try:
+        bot_token = os.environ.get('TELEGRAM_BOT_TOKEN')
+        if not bot_token:
+            return {"status": "skipped", "reason": "no_token"}
+
+        from services.telegram_delivery import get_telegram_delivery
+
+        delivery = get_telegram_delivery(bot_token)
+        sent = delivery.drain_due()
+        metrics = delivery.metrics()
+        if sent or metrics["queue_depth"]:
+            logger.info(
+                "[TELEGRAM] action=drain sent=%d queue_depth=%d send_ms_p95=%.1f",
+                sent, metrics["queue_depth"], metrics["send_ms_p95"],
+            )
+        return {"status": "ok", "sent": sent, **metrics}
+
+    except Exception as exc:
+        logger.error("[TELEGRAM] action=drain status=error error=%s", str(exc)[:200])
+        return {"status": "error", "error": str(exc)}
+
+
+WALLET_ALERT_FANOUT_CHUNK = 100
+
+
+@celery.task(name='tasks.fanout_wallet_alerts')
+def fanout_wallet_alerts(user_ids: list, alert_data: dict):
+    """Send one wallet-activity alert to many watchers off the webhook path.
+
+    Large audiences are split into chunks that run as separate tasks, so a
+    wallet with 1,000 watchers spreads over the alerts workers. Chat ids are
+    resolved with one query per chunk; sends go through the paced
+    TelegramDelivery queue.
+    """
+    try:
+        from services.telegram_notifier import get_telegram_notifier
+        from services.supabase_client import get_supabase_client, SCHEMA_NAME
+
+        if len(user_ids) > WALLET_ALERT_FANOUT_CHUNK:
+            for i in range(0, len(user_ids), WALLET_ALERT_FANOUT_CHUNK):
+                fanout_wallet_alerts.delay(user_ids[i:i + WALLET_ALERT_FANOUT_CHUNK], alert_data)
+            return {"status": "split", "chunks": -(-len(user_ids) // WALLET_ALERT_FANOUT_CHUNK)}
+
+        notifier = get_telegram_notifier()
+        if notifier is None:
+            return {"status": "skipped", "reason": "no_token"}
+
+        rows = (
+            get_supabase_client().schema(SCHEMA_NAME).table('telegram_users')
+            .select('user_id, telegram_chat_id')
+            .in_('user_id', user_ids)
+            .eq('alerts_enabled', True)
+            .execute()
+            .data or []
+        )
+        sent = 0
+        for row in rows:
+            if not row.get('telegram_chat_id'):
+                continue
+            try:
+                if notifier.send_wallet_alert(row['user_id'], alert_data, chat_id=row['telegram_chat_id']):
+                    sent += 1
+            except Exception as exc:
+                logger.error("[HELIUS] action=telegram_alert status=failed user=%s error=%s",
+                             str(row['user_id'])[:8], str(exc)[:200])
+        return {"status": "ok", "recipients": len(user_ids), "sent": sent}
+
+    except Exception as exc:
+        logger.error("[HELIUS] action=fanout status=error error=%s", str(exc)[:200])
+        return {"status": "error", "error": str(exc)}
+
+
+@celery.task(name='tasks.rebuild_wallet_watchers_index')
+def rebuild_wallet_watchers_index():
+    """Called every 6h by Celery beat. Recomputes the Redis wallet → watchers index."""
+    try:
+        from services.wallet_watchers_index import rebuild
+        return {"status": "ok", **rebuild()}
+    except Exception as exc:
+        logger.error("[WATCHERS] action=rebuild status=error error=%s", str(exc)[:200])
+        return {"status": "error", "error": str(exc)}
@@ -0,0 +1,357 @@
+"""Pooled, rate-limited delivery for Telegram Bot API calls.
+
+``TelegramNotifier._make_request`` used to ``requests.post`` on a fresh
+connection and ``time.sleep`` through every 429, and most alert paths built
+a new notifier per message. ``TelegramDelivery`` is the shared send path:
+
+* one pooled ``requests.Session`` (keep-alive, no TLS handshake per message);
+* pacing against a global budget (Telegram: ~30 msg/s per bot) and one
+  per chat (1 msg/s for private chats, 20/min for groups). The slots live
+  in Redis, so every gunicorn and Celery process books from the same
+  budget; if Redis is unreachable each process falls back to local pacers;
+* background alerts opt in with ``defer=True``: when they can't go now
+  (paced, 429, connection error) they are parked in a Redis delay queue
+  (ZSET scored by due time) instead of sleeping, and
+  ``tasks.drain_telegram_delivery`` re-sends due jobs every few seconds.
+
+Everything else — bot replies, answerCallbackQuery, editMessageText — is
+only useful immediately, so it is never queued. Replies wait inline for
+their paced slot when it is at most ``MAX_INLINE_WAIT_S`` away. A reply
+whose slot is further out books nothing and gets back a 429-shaped result
+(``{"ok": False, "error_code": 429, "rate_limited": True, "parameters":
+{"retry_after": ...}}``), so it neither sends ahead of the backlog nor holds
+a slot it won't use. Other calls are sent straight away (still counted
+against the pacers). All of them return Telegram's response as-is.
+
+Keys:  sifter:tg:delay                     (ZSET: job JSON -> due unix time)
+       sifter:tg:rate:{bot}:global         (STRING: next free slot, µs)
+       sifter:tg:rate:{bot}:chat:{chat_id} (STRING: next free slot, µs)
+
+Usage:
+    delivery = get_telegram_delivery(bot_token)
+    delivery.call("sendMessage", {"chat_id": 1, "text": "hi"})              # reply
+    delivery.call("sendMessage", {"chat_id": 1, "text": "alert"}, defer=True)
+    delivery.drain_due()   # from the Celery beat task
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DELAY_QUEUE_KEY = "sifter:tg:delay"   # ZSET: job JSON -> due unix time
+RATE_KEY_PREFIX = "sifter:tg:rate:"
+
+GLOBAL_RATE_PER_S = float(os.environ.get("TELEGRAM_GLOBAL_RATE_PER_S", "30"))
+PRIVATE_CHAT_RATE_PER_S = 1.0
+GROUP_CHAT_RATE_PER_S = 20 / 60.0
+MAX_ATTEMPTS = 5
+MAX_INLINE_WAIT_S = 3.0
+
+# Outbound messages: paced per chat, and queueable when the caller opts in.
+DEFERRABLE_METHODS = frozenset({"sendMessage", "sendPhoto"})
+
+_LATENCY_SAMPLES = 1024
+_PACER_SWEEP_S = 600
+_SLOT_GRACE_S = 0.5
+
+# KEYS = pacer keys in booking order (chat first, then global); ARGV = each
+# key's emission interval (µs), then the longest acceptable wait (µs, -1 for
+# no limit). Books the next free slot on every key, none earlier than the
+# previous key's, and returns µs until the last one. If that is beyond the
+# limit nothing is booked and the wait is returned negated. Uses the Redis
+# clock so every process shares one timeline; keys expire once idle.
+_RESERVE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local max_wait = tonumber(ARGV[#KEYS + 1] or -1)
+local at = now
+if max_wait >= 0 then
+    for _, key in ipairs(KEYS) do
+        local tat = tonumber(redis.call('GET', key) or 0)
+        if tat > at then at = tat end
+    end
+    if at - now > max_wait then return now - at end
+    at = now
+end
+for i, key in ipairs(KEYS) do
+    local tat = tonumber(redis.call('GET', key) or 0)
+    if tat > at then at = tat end
+    local new_tat = at + tonumber(ARGV[i])
+    redis.call('SET', key, string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+end
+return at - now
+"""
+
+
+class _Pacer:
+    """Slot-reserving rate limiter (GCRA).
+
+    ``reserve()`` always books the next free slot and returns how long until
+    it (0.0 = send now). Messages deferred for local pacing therefore get
+    distinct, evenly spaced due times instead of all retrying at once.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.interval = 1.0 / rate_per_second
+        self.tolerance = self.interval * (burst - 1)
+        self.tat = 0.0  # theoretical arrival time of the next conforming message
+
+    def peek(self, now: float) -> float:
+        """Seconds until the next free slot, without booking it."""
+        return max(0.0, max(self.tat, now) - self.tolerance - now)
+
+    def reserve(self, now: float) -> float:
+        start = max(self.tat, now)
+        self.tat = start + self.interval
+        return max(0.0, start - self.tolerance - now)
+
+    def idle(self, now: float) -> bool:
+        return self.tat <= now
+
+
+class TelegramDelivery:
+    """Shared Bot API sender with pooled HTTP, pacing and a Redis retry queue."""
+
+    def __init__(
+        self,
+        bot_token: str,
+        *,
+        redis_client=None,
+        session: Optional[requests.Session] = None,
+        api_base: Optional[str] = None,
+        global_rate: float = GLOBAL_RATE_PER_S,
+    ) -> None:
+        self.base_url = f"{api_base or os.environ.get('TELEGRAM_API_BASE', 'https://api.telegram.org')}/bot{bot_token}"
+        self._redis = redis_client
+        self._rate_prefix = f"{RATE_KEY_PREFIX}{bot_token.split(':', 1)[0]}:"
+        self._global_interval_us = int(1_000_000 / global_rate)
+        self._reserve_script = None
+        self.session = session or self._build_session()
+        self._lock = threading.Lock()
+        self._global = _Pacer(global_rate)
+        self._chats: Dict[str, _Pacer] = {}
+        self._last_sweep = time.time()
+
+        self._latency_ms: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self.counters = {"sent": 0, "deferred": 0, "rate_limited": 0, "failed": 0, "dropped": 0}
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _r(self):
+        if self._redis is None:
+            from services.redis_pool import get_redis_client
+            self._redis = get_redis_client()
+        return self._redis
+
+    # ── rate limiting ────────────────────────────────────────────────────────
+    def _reserve(self, chat_id, max_wait: Optional[float] = None) -> float:
+        """Book a global + per-chat slot. Returns seconds until the booked slot (0.0 = now).
+
+        With ``max_wait``, a slot further away than that is not booked; the
+        returned wait is then greater than ``max_wait``.
+        """
+        keys, intervals = [], []
+        if chat_id is not None:
+            key = str(chat_id)
+            rate = GROUP_CHAT_RATE_PER_S if key.startswith("-") else PRIVATE_CHAT_RATE_PER_S
+            keys.append(f"{self._rate_prefix}chat:{key}")
+            intervals.append(int(1_000_000 / rate))
+        keys.append(f"{self._rate_prefix}global")
+        intervals.append(self._global_interval_us)
+        try:
+            if self._reserve_script is None:
+                self._reserve_script = self._r().register_script(_RESERVE_LUA)
+            limit_us = -1 if max_wait is None else int(max_wait * 1_000_000)
+            return abs(int(self._reserve_script(keys=keys, args=[*intervals, limit_us]))) / 1_000_000
+        except Exception as exc:
+            logger.warning("[TELEGRAM] action=reserve status=redis_fail error=%s", exc)
+            return self._reserve_local(chat_id, max_wait)
+
+    def _reserve_local(self, chat_id, max_wait: Optional[float] = None) -> float:
+        """Process-local fallback for ``_reserve`` while Redis is unreachable."""
+        with self._lock:
+            now = time.time()
+            if now - self._last_sweep > _PACER_SWEEP_S:
+                # Idle pacers carry no state worth keeping.
+                self._chats = {k: p for k, p in self._chats.items() if not p.idle(now)}
+                self._last_sweep = now
+            pacer = None
+            if chat_id is not None:
+                key = str(chat_id)
+                pacer = self._chats.get(key)
+                if pacer is None:
+                    rate = GROUP_CHAT_RATE_PER_S if key.startswith("-") else PRIVATE_CHAT_RATE_PER_S
+                    pacer = self._chats[key] = _Pacer(rate)
+            if max_wait is not None:
+                chat_wait = pacer.peek(now) if pacer else 0.0
+                wait = chat_wait + self._global.peek(now + chat_wait)
+                if wait > max_wait:
+                    return wait
+            chat_wait = pacer.reserve(now) if pacer else 0.0
+            # Book the global slot no earlier than the chat slot.
+            global_wait = self._global.reserve(now + chat_wait)
+            return chat_wait + global_wait
+
+    # ── sending ──────────────────────────────────────────────────────────────
+    def call(self, method: str, data: Optional[dict] = None, *, defer: bool = False,
+             attempt: int = 0, reserved: bool = False) -> dict:
+        """Send one Bot API call.
+
+        ``defer=True`` (background alerts only) queues a message that can't go
+        now instead of waiting for it; without it a message waits inline for
+        its paced slot. ``reserved`` marks a drained job that already holds one.
+        """
+        data = data or {}
+        is_message = method in DEFERRABLE_METHODS
+        deferrable = defer and is_message
+        chat_id = data.get("chat_id")
+
+        if not reserved:
+            inline = is_message and not deferrable
+            wait = self._reserve(chat_id, MAX_INLINE_WAIT_S if inline else None)
+            if wait > 0.001 and deferrable:
+                # Pacing isn't a failure: keep the attempt count, keep the slot.
+                return self._defer(method, data, attempt, wait, reason="paced", reserved=True)
+            if inline and wait > MAX_INLINE_WAIT_S:
+                # Nothing was booked: hand the backlog back rather than jump it.
+                self.counters["rate_limited"] += 1
+                logger.warning("[TELEGRAM] action=reply status=rate_limited chat=%s wait_s=%.1f",
+                               chat_id, wait)
+                return {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: paced by the local delivery budget",
+                    "parameters": {"retry_after": math.ceil(wait)},
+                    "rate_limited": True,
+                }
+            if wait > 0.001 and inline:
+                time.sleep(wait)
+
+        t0 = time.perf_counter()
+        try:
+            response = self.session.post(f"{self.base_url}/{method}", json=data, timeout=10)
+            result = response.json()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if deferrable:
+                return self._defer(method, data, attempt + 1, 2 ** attempt, reason="connection_error")
+            logger.error(f"[TELEGRAM] API error: {e}")
+            self.counters["failed"] += 1
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"[TELEGRAM] API error: {e}")
+            self.counters["failed"] += 1
+            return {"ok": False, "error": str(e)}
+        self._latency_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        if not result.get("ok") and result.get("error_code") == 429:
+            self.counters["rate_limited"] += 1
+            retry_after = int((result.get("parameters") or {}).get("retry_after", 2 ** attempt))
+            if deferrable:
+                return self._defer(method, data, attempt + 1, retry_after, reason="telegram_429")
+            return result
+
+        self.counters["sent" if result.get("ok") else "failed"] += 1
+        return result
+
+    def _defer(self, method: str, data: dict, attempt: int, delay_s: float, reason: str,
+               reserved: bool = False) -> dict:
+        if attempt >= MAX_ATTEMPTS:
+            self.counters["dropped"] += 1
+            logger.error("[TELEGRAM] action=drop method=%s chat=%s attempts=%d reason=%s",
+                         method, data.get("chat_id"), attempt, reason)
+            return {"ok": False, "error": f"max_retries_exceeded:{reason}"}
+        job = json.dumps({
+            "method": method,
+            "data": data,
+            "attempt": attempt,
+            "reserved": reserved,
+            "enqueued_at": time.time(),
+        }, sort_keys=True, default=str)
+        try:
+            self._r().zadd(DELAY_QUEUE_KEY, {job: time.time() + max(delay_s, 0.0)})
+        except Exception as exc:
+            self.counters["failed"] += 1
+            logger.error("[TELEGRAM] action=defer status=redis_fail reason=%s error=%s", reason, exc)
+            return {"ok": False, "error": reason}
+        self.counters["deferred"] += 1
+        return {"ok": True, "queued": True, "reason": reason}
+
+    def drain_due(self, limit: int = 500) -> int:
+        """Re-send queued jobs whose due time has passed. Safe to run from several workers."""
+        now = time.time()
+        try:
+            due = self._r().zrangebyscore(DELAY_QUEUE_KEY, 0, now, start=0, num=limit, withscores=True)
+        except Exception as exc:
+            logger.error("[TELEGRAM] action=drain status=redis_fail error=%s", exc)
+            return 0
+        sent = 0
+        for raw, due_at in due or []:
+            # ZREM is the claim: only the worker that removes the member sends it.
+            if not self._r().zrem(DELAY_QUEUE_KEY, raw):
+                continue
+            try:
+                job = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            # A paced slot only holds if we're close to it; late jobs are re-paced
+            # so a backlog drained in one pass doesn't burst one chat.
+            reserved = bool(job.get("reserved")) and now - float(due_at) < _SLOT_GRACE_S
+            result = self.call(job["method"], job["data"], defer=True,
+                               attempt=int(job.get("attempt", 0)), reserved=reserved)
+            if result.get("ok") and not result.get("queued"):
+                sent += 1
+        return sent
+
+    # ── metrics ──────────────────────────────────────────────────────────────
+    def queue_depth(self) -> int:
+        try:
+            return int(self._r().zcard(DELAY_QUEUE_KEY) or 0)
+        except Exception:
+            return -1
+
+    def metrics(self) -> Dict:
+        samples = sorted(self._latency_ms)
+
+        def _pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 1)
+
+        return {
+            **self.counters,
+            "queue_depth": self.queue_depth(),
+            "send_ms_p50": _pct(0.50),
+            "send_ms_p95": _pct(0.95),
+            "send_ms_p99": _pct(0.99),
+        }
+
+
+_deliveries: Dict[str, TelegramDelivery] = {}
+_deliveries_lock = threading.Lock()
+
+
+def get_telegram_delivery(bot_token: str) -> TelegramDelivery:
+    """Return the process-wide ``TelegramDelivery`` for ``bot_token``."""
+    with _deliveries_lock:
+        delivery = _deliveries.get(bot_token)
+        if delivery is None:
+            delivery = _deliveries[bot_token] = TelegramDelivery(bot_token)
+        return delivery
@@ -13,10 +13,10 @@ import secrets
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
-import requests
-
+from services import bot_user_cache
 from services.supabase_client import SCHEMA_NAME, get_supabase_client
 from services.paper_trade_runtime import get_paper_trade_runtime, is_operator_chat_id
+from services.telegram_delivery import get_telegram_delivery
 
 logger = logging.getLogger(__name__)
 
@@ -145,6 +145,7 @@ class TelegramNotifier:
         self.supabase = get_supabase_client()
         self.schema = SCHEMA_NAME
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.delivery = get_telegram_delivery(bot_token)
         print("[TELEGRAM] Notifier ready")
 
     def configure_bot_ui(self) -> None:
@@ -184,30 +185,15 @@ class TelegramNotifier:
     def _table(self, name: str):
         return self.supabase.schema(self.schema).table(name)
 
-    def _make_request(self, method: str, data: dict = None) -> dict:
-        """Call Telegram Bot API with exponential-backoff retries."""
-        import time as _time
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = requests.post(f"{self.base_url}/{method}", json=data, timeout=10)
-                result = response.json()
-                # If Telegram rate-limits us, wait and retry
-                if not result.get("ok") and result.get("error_code") == 429:
-                    retry_after = int(result.get("parameters", {}).get("retry_after", 2 ** attempt))
-                    _time.sleep(retry_after)
-                    continue
-                return result
-            except (requests.ConnectionError, requests.Timeout) as e:
-                if attempt < max_retries - 1:
-                    _time.sleep(2 ** attempt)
-                    continue
-                logger.error(f"[TELEGRAM] API error after {max_retries} retries: {e}")
-                return {"ok": False, "error": str(e)}
-            except Exception as e:
-                logger.error(f"[TELEGRAM] API error: {e}")
-                return {"ok": False, "error": str(e)}
-        return {"ok": False, "error": "max_retries_exceeded"}
+    def _make_request(self, method: str, data: dict = None, *, defer: bool = False) -> dict:
+        """Call the Telegram Bot API through the shared pooled, rate-limited sender.
+
+        With ``defer=True`` (background alerts) a message that is paced, rate
+        limited or hits a connection error is parked in the Redis delay queue
+        (see services/telegram_delivery.py) rather than blocking this worker.
+        Interactive replies leave it off and go out inline.
+        """
+        return self.delivery.call(method, data, defer=defer)
 
     def _is_operator(self, chat_id: str) -> bool:
         """Check if chat_id belongs to an operator."""
@@ -235,7 +221,8 @@ class TelegramNotifier:
         from services.redis_pool import get_redis_client
         return get_redis_client()
 
-    def send_message(self, chat_id: str, text: str, reply_markup: dict = None) -> bool:
+    def send_message(self, chat_id: str, text: str, reply_markup: dict = None, *,
+                     defer: bool = False) -> bool:
         payload = {
             "chat_id": chat_id,
             "text": text,
@@ -244,14 +231,13 @@ class TelegramNotifier:
         }
         if reply_markup:
             payload["reply_markup"] = reply_markup
-        return self._make_request("sendMessage", payload).get("ok", False)
+        return self._make_request("sendMessage", payload, defer=defer).get("ok", False)
 
     def send_document(self, chat_id: str, file_bytes: bytes, filename: str = "file.csv") -> bool:
         """Send a file via Telegram Bot API sendDocument (multipart/form-data)."""
-        import requests as _requests
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendDocument"
+        url = f"{self.delivery.base_url}/sendDocument"
         try:
-            resp = _requests.post(
+            resp = self.delivery.session.post(
                 url,
                 data={"chat_id": chat_id, "parse_mode": "HTML"},
                 files={"document": (filename, file_bytes, "text/csv")},
@@ -287,6 +273,10 @@ class TelegramNotifier:
                 {"used": True, "telegram_id": int(telegram_chat_id)}
             ).eq("token", token).execute()
 
+            # The chat (and the user's previous chat, if any) changes owner.
+            bot_user_cache.invalidate(telegram_chat_id)
+            bot_user_cache.invalidate_user(user_id)
+
             # Unlink this chat_id from any other user first (unique constraint)
             self._table("telegram_users").update({
                 "telegram_chat_id": None,
@@ -355,6 +345,7 @@ class TelegramNotifier:
             return None
 
     def disconnect_user(self, user_id: str) -> bool:
+        bot_user_cache.invalidate_user(user_id)
         try:
             result = self._table("telegram_users").delete().eq("user_id", user_id).execute()
             return len(result.data) > 0
@@ -370,8 +361,8 @@ class TelegramNotifier:
         except Exception:
             return False
 
-    def send_trade_alert(self, user_id: str, trades: List[Dict]) -> bool:
-        chat_id = self.get_user_chat_id(user_id)
+    def send_trade_alert(self, user_id: str, trades: List[Dict], chat_id: Optional[str] = None) -> bool:
+        chat_id = chat_id or self.get_user_chat_id(user_id)
         if not chat_id or not trades:
             return False
 
@@ -406,11 +397,12 @@ class TelegramNotifier:
                 {"text": "View Chart", "url": f"https://dexscreener.com/solana/{token_address}"},
             ]]
         }
-        return self.send_message(chat_id, "\n".join(lines), buttons)
+        return self.send_message(chat_id, "\n".join(lines), buttons, defer=True)
 
-    def send_wallet_alert(self, user_id: str, alert_data: Dict, activity_id: int = None) -> bool:
+    def send_wallet_alert(self, user_id: str, alert_data: Dict, activity_id: int = None,
+                          chat_id: Optional[str] = None) -> bool:
         trades = [{"wallet": alert_data.get("wallet", {}), "trade": alert_data.get("trade", {})}]
-        return self.send_trade_alert(user_id, trades)
+        return self.send_trade_alert(user_id, trades, chat_id=chat_id)
 
     def send_watchlist_alert(self, user_id: str, payload: dict) -> bool:
         chat_id = self.get_user_chat_id(user_id)
@@ -437,7 +429,7 @@ class TelegramNotifier:
                 {"text": "Solscan", "url": links.get("solscan", "#")},
             ]]
         }
-        return self.send_message(chat_id, text, buttons)
+        return self.send_message(chat_id, text, buttons, defer=True)
 
     def send_elite15_alert(self, user_id: str, payload: dict) -> bool:
         chat_id = self.get_user_chat_id(user_id)
@@ -478,7 +470,7 @@ class TelegramNotifier:
                 {"text": "Solscan", "url": links.get("solscan", "#")},
             ]]
         }
-        return self.send_message(chat_id, text, buttons)
+        return self.send_message(chat_id, text, buttons, defer=True)
 
     def send_multi_wallet_signal_alert(self, user_id: str, signal: Dict) -> bool:
         chat_id = self.get_user_chat_id(user_id)
@@ -514,7 +506,7 @@ class TelegramNotifier:
                 f"Tier {html.escape(str(wallet.get('tier', 'C')))} "
                 f"${float(wallet.get('usd_value', 0) or 0):,.2f}"
             )
-        return self.send_message(chat_id, "\n".join(lines))
+        return self.send_message(chat_id, "\n".join(lines), defer=True)
 
     def send_manual_cluster_signal(self, user_id: str, signal: Dict) -> bool:
         """Advisory alert to a manual trader when a manual cluster co-enters a
@@ -552,7 +544,7 @@ class TelegramNotifier:
                 f"Tier {html.escape(str(wallet.get('tier', 'C')))}"
             )
         lines += ["", "<i>Advisory only — act manually.</i>"]
-        return self.send_message(chat_id, "\n".join(lines))
+        return self.send_message(chat_id, "\n".join(lines), defer=True)
 
     def send_auto_trade_confirmation(self, user_id: str, trade: dict, txid: str) -> bool:
         chat_id = self.get_user_chat_id(user_id)
@@ -564,7 +556,7 @@ class TelegramNotifier:
             f"Amount: <b>${float(trade.get('usd_amount', 0) or 0):,.2f}</b>\n"
             f"<a href='https://solscan.io/tx/{txid}'>View transaction</a>"
         )
-        return self.send_message(chat_id, text)
+        return self.send_message(chat_id, text, defer=True)
 
     def send_auto_trade_failed(self, user_id: str, trade: dict, error: str) -> bool:
         chat_id = self.get_user_chat_id(user_id)
@@ -575,7 +567,7 @@ class TelegramNotifier:
             f"Token: <b>${html.escape(trade.get('token_ticker', 'UNKNOWN'))}</b>\n"
             f"Reason: <code>{html.escape(str(error)[:200])}</code>"
         )
-        return self.send_message(chat_id, text)
+        return self.send_message(chat_id, text, defer=True)
 
     def execute_auto_trade_for_user(
         self,
@@ -787,8 +779,9 @@ class TelegramNotifier:
             try:
                 from services import bot_handlers, bot_state
                 # If user is already linked, restore their session instead of
-                # kicking them back to Welcome.
-                ctx = bot_handlers._load_user_ctx(self, chat_id)
+                # kicking them back to Welcome. Read through to the DB so the
+                # user-context cache starts warm for the taps that follow.
+                ctx = bot_handlers._load_user_ctx(self, chat_id, fresh=True)
                 if ctx:
                     # Resume the user where they left off (last screen in Redis),
                     # falling back to the main menu for fresh/transient screens.
@@ -853,12 +846,14 @@ class TelegramNotifier:
                     self.send_message(chat_id, "\u26a0\ufe0f No bot wallet registered in the dashboard yet.")
                     return
                 self._table("telegram_users").update({"auto_trade_enabled": True}).eq("user_id", user_id).execute()
+                bot_user_cache.invalidate(chat_id)
                 self.send_message(
                     chat_id,
                     f"\u2705 <b>Auto-trading enabled</b>\nMax per trade: <b>${float(row.get('auto_trade_max_usd', 100)):.0f}</b>",
                 )
             elif action == "off":
                 self._table("telegram_users").update({"auto_trade_enabled": False}).eq("user_id", user_id).execute()
+                bot_user_cache.invalidate(chat_id)
                 self.send_message(chat_id, "\U0001f6d1 <b>Auto-trading disabled</b>")
             else:
                 enabled = row.get("auto_trade_enabled", False)
@@ -894,6 +889,7 @@ class TelegramNotifier:
             self._table("telegram_users").update({"auto_trade_max_usd": amount}).eq(
                 "user_id", result.data[0]["user_id"]
             ).execute()
+            bot_user_cache.invalidate(chat_id)
             self.send_message(chat_id, f"\u2705 Max trade amount set to <b>${amount:,.0f}</b>")
             return
 
@@ -1054,6 +1050,7 @@ class TelegramNotifier:
             self._table("telegram_users").update({"auto_trade_enabled": False}).eq(
                 "user_id", result.data[0]["user_id"]
             ).execute()
+            bot_user_cache.invalidate(chat_id)
             self.send_message(chat_id, "🛑 <b>Auto-trading disabled.</b> Use /autotrade on to re-enable.")
             return
 
@@ -1075,6 +1072,7 @@ class TelegramNotifier:
             self._table("telegram_users").update({"auto_trade_max_usd": amount}).eq(
                 "user_id", result.data[0]["user_id"]
             ).execute()
+            bot_user_cache.invalidate(chat_id)
             self.send_message(chat_id, f"✅ Max trade amount set to <b>${amount:,.0f}</b>")
             return
 
@@ -1599,3 +1597,21 @@ class TelegramNotifier:
             f"PnL: <b>${float(portfolio.get('realized_pnl_usd', 0) or 0):,.2f}</b>",
         ]
         self.send_message(chat_id, "\n".join(lines))
+
+
+_shared_notifier: Optional[TelegramNotifier] = None
+
+
+def get_telegram_notifier() -> Optional[TelegramNotifier]:
+    """Return a process-wide notifier for TELEGRAM_BOT_TOKEN (None if unset).
+
+    Background tasks should use this instead of building a notifier per
+    message, so they share one Supabase client and one pooled sender.
+    """
+    global _shared_notifier
+    if _shared_notifier is None:
+        bot_token = os.environ.get("TELEGRAM_BOT_TOKEN")
+        if not bot_token:
+            return None
+        _shared_notifier = TelegramNotifier(bot_token)
+    return _shared_notifier
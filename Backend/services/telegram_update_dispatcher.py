@@ -0,0 +1,253 @@
+"""Bounded worker pool for Telegram webhook updates.
+
+``telegram_webhook`` used to start a raw ``threading.Thread`` per update, so
+a burst of button presses (or Telegram redelivering after a slow response)
+meant one OS thread per update and no ordering within a chat: two messages
+from the same user could be handled in either order.
+
+``UpdateDispatcher`` runs a fixed pool of worker threads over per-chat
+queues:
+
+* updates for one chat are handled strictly in arrival order, one at a time;
+  different chats run in parallel across the pool;
+* a chat is scheduled once per update (round-robin), so one noisy chat can't
+  starve the others;
+* redelivered updates (same ``update_id``) are dropped — an id is only
+  remembered once the update is accepted, so a refused update's redelivery
+  still gets in;
+* a callback query identical to one already waiting in that chat's queue
+  (same message, same button) is collapsed into it;
+* past ``max_pending`` queued updates, callback queries are shed and
+  messages are refused (``"overflow"``) so the webhook can answer non-2xx and
+  let Telegram redeliver later — backpressure instead of unbounded memory.
+
+Collapsed and shed callback queries are handed to ``on_discard`` so the
+caller can still answer them (otherwise the button spins until Telegram
+times it out).
+
+Usage:
+    dispatcher = UpdateDispatcher(handle_update, workers=8, on_discard=answer_query)
+    status = dispatcher.submit(update)   # "queued" | "duplicate" | "collapsed" | "shed" | "overflow"
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.environ.get("TELEGRAM_UPDATE_WORKERS", "8"))
+DEFAULT_MAX_PENDING = int(os.environ.get("TELEGRAM_UPDATE_MAX_PENDING", "2000"))
+DEFAULT_MAX_PER_CHAT = 50
+
+_SEEN_UPDATE_IDS = 10_000
+_LATENCY_SAMPLES = 2048
+
+
+def _chat_key(update: dict) -> str:
+    """Ordering key: the chat an update belongs to ("_" if it can't be determined)."""
+    if "callback_query" in update:
+        query = update["callback_query"] or {}
+        chat = ((query.get("message") or {}).get("chat") or {}).get("id")
+        if chat is None:
+            chat = (query.get("from") or {}).get("id")
+    else:
+        message = update.get("message") or update.get("edited_message") or {}
+        chat = (message.get("chat") or {}).get("id")
+    return "_" if chat is None else str(chat)
+
+
+def _callback_signature(update: dict) -> Optional[tuple]:
+    query = update.get("callback_query")
+    if not query:
+        return None
+    return ((query.get("message") or {}).get("message_id"), query.get("data"))
+
+
+def _pct(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+
+class UpdateDispatcher:
+    """Per-chat ordered, cross-chat parallel update processing on a fixed pool."""
+
+    def __init__(
+        self,
+        handler: Callable[[dict], None],
+        *,
+        workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_per_chat: int = DEFAULT_MAX_PER_CHAT,
+        on_discard: Optional[Callable[[dict, str], None]] = None,
+        name: str = "tg-updates",
+    ) -> None:
+        self.handler = handler
+        self.on_discard = on_discard
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.max_per_chat = max_per_chat
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[tuple]] = {}  # chat -> (enqueued_at, update)
+        self._ready: Deque[str] = deque()           # chats with queued work and no active worker
+        self._active: Set[str] = set()
+        self._pending = 0
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+        self.counters = {
+            "queued": 0, "processed": 0, "failed": 0,
+            "duplicate": 0, "collapsed": 0, "shed": 0, "overflow": 0,
+        }
+        self.peak_pending = 0
+        self._ack_ms: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._wait_ms: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._handle_ms: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+    # ── public API ───────────────────────────────────────────────────────────
+    def submit(self, update: dict) -> str:
+        """Queue ``update`` for its chat. Never blocks on the handler."""
+        status = self._enqueue(update)
+        if status in ("collapsed", "shed") and self.on_discard is not None:
+            try:
+                self.on_discard(update, status)
+            except Exception as exc:
+                logger.error("[TELEGRAM WEBHOOK] action=discard status=error error=%s", str(exc)[:200])
+        return status
+
+    def record_ack(self, ms: float) -> None:
+        """Webhook response time, recorded by the route."""
+        self._ack_ms.append(ms)
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return self._pending
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the workers once the queues drain (or ``timeout`` passes)."""
+        deadline = time.monotonic() + timeout
+        while self.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def metrics(self) -> Dict:
+        with self._cond:
+            pending, chats, active = self._pending, len(self._queues), len(self._active)
+            counters = dict(self.counters)
+        ack, wait, handle = sorted(self._ack_ms), sorted(self._wait_ms), sorted(self._handle_ms)
+        return {
+            **counters,
+            "workers": self.workers,
+            "pending": pending,
+            "peak_pending": self.peak_pending,
+            "chats_queued": chats,
+            "chats_active": active,
+            "ack_ms_p50": _pct(ack, 0.50),
+            "ack_ms_p99": _pct(ack, 0.99),
+            "wait_ms_p50": _pct(wait, 0.50),
+            "wait_ms_p99": _pct(wait, 0.99),
+            "handle_ms_p50": _pct(handle, 0.50),
+            "handle_ms_p99": _pct(handle, 0.99),
+        }
+
+    # ── internals ────────────────────────────────────────────────────────────
+    def _enqueue(self, update: dict) -> str:
+        key = _chat_key(update)
+        update_id = update.get("update_id")
+        with self._cond:
+            if update_id is not None and update_id in self._seen:
+                self.counters["duplicate"] += 1
+                return "duplicate"
+
+            queue = self._queues.get(key)
+            signature = _callback_signature(update)
+            if signature is not None and queue:
+                if any(_callback_signature(queued) == signature for _, queued in queue):
+                    self.counters["collapsed"] += 1
+                    self._remember(update_id)
+                    return "collapsed"
+
+            if self._pending >= self.max_pending or (queue and len(queue) >= self.max_per_chat):
+                # A stale button press is worthless; a message must be redelivered,
+                # so its id is not remembered.
+                status = "shed" if signature is not None else "overflow"
+                self.counters[status] += 1
+                return status
+
+            self._remember(update_id)
+            if queue is None:
+                queue = self._queues[key] = deque()
+            queue.append((time.perf_counter(), update))
+            if len(queue) == 1 and key not in self._active:
+                self._ready.append(key)
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+            self.counters["queued"] += 1
+            self._ensure_workers()
+            self._cond.notify()
+        return "queued"
+
+    def _remember(self, update_id: Optional[int]) -> None:
+        """Record an accepted ``update_id`` for redelivery dedup. Caller holds ``_cond``."""
+        if update_id is None:
+            return
+        self._seen[update_id] = None
+        if len(self._seen) > _SEEN_UPDATE_IDS:
+            self._seen.popitem(last=False)
+
+    def _ensure_workers(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._ready:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                self._active.add(key)
+                enqueued_at, update = self._queues[key].popleft()
+
+            started = time.perf_counter()
+            self._wait_ms.append((started - enqueued_at) * 1000.0)
+            try:
+                self.handler(update)
+                failed = False
+            except Exception as exc:
+                failed = True
+                logger.error("[TELEGRAM WEBHOOK] action=handle status=error chat=%s error=%s",
+                             key, str(exc)[:200])
+            self._handle_ms.append((time.perf_counter() - started) * 1000.0)
+
+            with self._cond:
+                self._active.discard(key)
+                self._pending -= 1
+                self.counters["failed" if failed else "processed"] += 1
+                if self._queues[key]:
+                    self._ready.append(key)
+                    self._cond.notify()
+                else:
+                    del self._queues[key]
@@ -0,0 +1,377 @@
+"""Three-tier read-through cache for WalletPumpAnalyzer.
+
+Each family of cached values (PnL per wallet/token, wallet runners, token
+info, ATH, security, ...) used to be read with its own hand-written block:
+Redis GET + JSON decode, then a DuckDB query, then the API. The TTLs were
+scattered as constants. This module does that walk once, for every family:
+
+  * L1 — in-process LRU of decoded values, bounded by ``l1_bytes`` (the
+    size of each value's uncompressed JSON encoding). A hit costs no network round trip
+    and no decode.
+  * L2 — Redis, shared by every worker. Values are ``redis_codec`` payloads
+    under ``{family}:{key}``, the same keys as before, so the hourly
+    flush_redis_to_duckdb task and the existing entries keep working. The
+    ``redis`` client must return bytes.
+  * L3 — DuckDB, the persistent cold tier. Each family has a
+    ``DuckDBBinding`` for its table. Only the Flask-side analyzer opens it;
+    worker-mode analyzers run with L1 + L2.
+
+Reads promote: an L2 hit is copied into L1, and an L3 hit into L2 and L1.
+Writes go to L1 and L2 straight away. L3 writes are write-behind: they are
+queued and sent as one executemany per family once ``write_behind_rows``
+are pending or the oldest is ``write_behind_s`` old (checked on each
+foreground write), and on ``flush()``. Refresh-ahead reloads run on a pool
+thread and only queue their rows: the DuckDB connection is shared with
+request threads and is not thread-safe, so the next foreground write or
+``flush()`` sends them.
+
+``CachePolicy`` holds a family's TTLs. ``refresh_ahead`` is the fraction of
+``ttl`` at the end of a value's life in which ``get_or_load`` still returns
+the cached value but reloads it on a background thread. Hot keys are then
+refreshed before they expire rather than missing.
+
+L1 hands back the cached object itself, not a copy; callers must not
+mutate it.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services import redis_codec
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("l1", "l2", "l3", "origin")
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: int                    # seconds a value is fresh (L3 last_updated cutoff)
+    redis_ttl: int              # Redis key TTL: ttl plus slack for the hourly flush
+    l1_ttl: float               # seconds this process trusts its own copy
+    refresh_ahead: float = 0.0  # reload in the background within this fraction of ttl
+
+
+@dataclass(frozen=True)
+class DuckDBBinding:
+    """How a family maps onto its DuckDB table.
+
+    ``load(con, key, min_updated)`` returns ``(value, last_updated)`` or None.
+    ``store_params(key, value, now)`` returns the parameters for ``store_sql``.
+    """
+    load: Callable[[Any, str, float], Optional[Tuple[Any, float]]]
+    store_sql: str
+    store_params: Callable[[str, Any, float], list]
+
+
+class _Entry:
+    __slots__ = ("value", "size", "written_at", "expires_at")
+
+    def __init__(self, value, size, written_at, expires_at):
+        self.value = value
+        self.size = size
+        self.written_at = written_at
+        self.expires_at = expires_at
+
+
+class TieredCache:
+    """L1 LRU → Redis → DuckDB, with read-through promotion and write-behind."""
+
+    def __init__(
+        self,
+        policies: Dict[str, CachePolicy],
+        redis: Callable[[], Any],
+        duckdb: Callable[[], Any] = lambda: None,
+        bindings: Optional[Dict[str, DuckDBBinding]] = None,
+        l3_writable: bool = False,
+        l1_bytes: int = 32 * 1024 * 1024,
+        write_behind_rows: int = 200,
+        write_behind_s: float = 30.0,
+        clock: Callable[[], float] = time.time,
+        trace: Optional[Any] = None,
+    ) -> None:
+        self.policies = policies
+        self._redis = redis
+        self._duckdb = duckdb
+        self.bindings = bindings or {}
+        self.l3_writable = l3_writable
+        self.l1_bytes = l1_bytes
+        self.write_behind_rows = write_behind_rows
+        self.write_behind_s = write_behind_s
+        self._clock = clock
+        self._trace = trace  # file-like; one "ts family key" line per lookup
+
+        self._l1: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._l1_used = 0
+        self._lock = threading.Lock()
+
+        self._pending: List[Tuple[str, list]] = []
+        self._pending_since = 0.0
+        self._l3_lock = threading.Lock()
+
+        self._refreshing: set = set()
+        self._refresher: Optional[ThreadPoolExecutor] = None
+
+        self._stats_lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "seconds": 0.0}
+        )
+        self._events = {"evictions": 0, "refreshes": 0, "l3_writes": 0, "errors": 0}
+
+    # ── public API ───────────────────────────────────────────────────────────
+    def get(self, family: str, key: str) -> Any:
+        """Cached value or None. Promotes L2/L3 hits into the faster tiers."""
+        hit = self._lookup(family, key)
+        return hit[0] if hit else None
+
+    def get_or_load(self, family: str, key: str, loader: Callable[[], Any]) -> Any:
+        """Cached value, or ``loader()`` stored in every tier (unless None)."""
+        hit = self._lookup(family, key)
+        if hit is not None:
+            value, written_at = hit
+            policy = self.policies[family]
+            if policy.refresh_ahead and self._clock() - written_at >= policy.ttl * (1 - policy.refresh_ahead):
+                self._refresh(family, key, loader)
+            return value
+        t0 = time.perf_counter()
+        value = loader()
+        self._record(family, "origin", value is not None, t0)
+        if value is not None:
+            self.set(family, key, value)
+        return value
+
+    def set(self, family: str, key: str, value: Any) -> None:
+        self._store(family, key, value, flush_due=True)
+
+    def _store(self, family: str, key: str, value: Any, flush_due: bool) -> None:
+        """Write ``value`` to L1/L2 and queue its L3 row.
+
+        ``flush_due=False`` (background refreshes) never writes to DuckDB from
+        this thread, even when the write-behind queue is due.
+        """
+        policy = self.policies[family]
+        now = self._clock()
+        raw = redis_codec.dumps(value)
+        self._l1_put(family, key, value, redis_codec.payload_size(raw), now, policy)
+        r = self._redis()
+        if r is not None:
+            try:
+                r.setex(f"{family}:{key}", policy.redis_ttl, raw)
+            except Exception as e:
+                self._event("errors")
+                logger.warning(f"[CACHE] Redis SET {family}:{key} failed: {e}")
+        binding = self.bindings.get(family)
+        if binding is not None and self.l3_writable and self._duckdb() is not None:
+            self._queue_l3(family, binding.store_params(key, value, now), now, flush_due)
+
+    def delete(self, family: str, key: str) -> None:
+        with self._lock:
+            entry = self._l1.pop((family, key), None)
+            if entry is not None:
+                self._l1_used -= entry.size
+        r = self._redis()
+        if r is not None:
+            try:
+                r.delete(f"{family}:{key}")
+            except Exception as e:
+                logger.warning(f"[CACHE] Redis DEL {family}:{key} failed: {e}")
+
+    def flush(self) -> int:
+        """Write every queued L3 row now. Returns rows written."""
+        with self._l3_lock:
+            pending, self._pending = self._pending, []
+        con = self._duckdb()
+        if not pending or con is None:
+            return 0
+        by_family: Dict[str, List[list]] = defaultdict(list)
+        for family, params in pending:
+            by_family[family].append(params)
+        written = 0
+        for family, rows in by_family.items():
+            try:
+                con.executemany(self.bindings[family].store_sql, rows)
+                written += len(rows)
+            except Exception as e:
+                self._event("errors")
+                logger.warning(f"[CACHE] DuckDB write-behind for {family} failed ({len(rows)} rows): {e}")
+        with self._stats_lock:
+            self._events["l3_writes"] += written
+        return written
+
+    def close(self) -> None:
+        if self._refresher is not None:
+            self._refresher.shutdown(wait=True)
+            self._refresher = None
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits, misses, hit rate and mean latency per family and tier."""
+        with self._stats_lock:
+            families: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+            for (family, tier), c in sorted(self._counts.items()):
+                lookups = c["hits"] + c["misses"]
+                families[family][tier] = {
+                    "hits": int(c["hits"]),
+                    "misses": int(c["misses"]),
+                    "hit_rate": round(c["hits"] / lookups, 4) if lookups else 0.0,
+                    "avg_ms": round(c["seconds"] * 1000 / lookups, 4) if lookups else 0.0,
+                }
+            events = dict(self._events)
+        with self._lock:
+            l1 = {"entries": len(self._l1), "bytes": self._l1_used, "budget": self.l1_bytes}
+        with self._l3_lock:
+            events["l3_pending"] = len(self._pending)
+        return {"families": dict(families), "l1": l1, **events}
+
+    # ── tiers ────────────────────────────────────────────────────────────────
+    def _lookup(self, family: str, key: str) -> Optional[Tuple[Any, float]]:
+        """``(value, written_at)`` from the first tier that has it, or None."""
+        if self._trace is not None:
+            self._trace.write(f"{self._clock():.3f} {family} {key}\n")
+        policy = self.policies[family]
+
+        t0 = time.perf_counter()
+        now = self._clock()
+        with self._lock:
+            entry = self._l1.get((family, key))
+            if entry is not None and entry.expires_at > now:
+                self._l1.move_to_end((family, key))
+                hit = (entry.value, entry.written_at)
+            else:
+                hit = None
+        self._record(family, "l1", hit is not None, t0)
+        if hit is not None:
+            return hit
+
+        t0 = time.perf_counter()
+        found = self._l2_get(family, key, policy, now)
+        self._record(family, "l2", found is not None, t0)
+        if found is not None:
+            value, size, written_at = found
+            self._l1_put(family, key, value, size, written_at, policy)
+            return value, written_at
+
+        binding = self.bindings.get(family)
+        con = self._duckdb() if binding is not None else None
+        if con is None:
+            return None
+        t0 = time.perf_counter()
+        try:
+            row = binding.load(con, key, now - policy.ttl)
+        except Exception as e:
+            self._event("errors")
+            logger.warning(f"[CACHE] DuckDB read {family}:{key} failed: {e}")
+            row = None
+        self._record(family, "l3", row is not None, t0)
+        if row is None:
+            return None
+        value, written_at = row
+        raw = redis_codec.dumps(value)
+        self._l1_put(family, key, value, redis_codec.payload_size(raw), written_at, policy)
+        r = self._redis()
+        if r is not None:
+            try:
+                remaining = int(written_at + policy.redis_ttl - now)
+                if remaining > 0:
+                    r.setex(f"{family}:{key}", remaining, raw)
+            except Exception as e:
+                self._event("errors")
+                logger.warning(f"[CACHE] Redis promote {family}:{key} failed: {e}")
+        return value, written_at
+
+    def _l2_get(self, family, key, policy, now) -> Optional[Tuple[Any, int, float]]:
+        r = self._redis()
+        if r is None:
+            return None
+        name = f"{family}:{key}"
+        try:
+            if policy.refresh_ahead:
+                # The key's remaining TTL tells us when it was written.
+                pipe = r.pipeline(transaction=False)
+                pipe.get(name)
+                pipe.ttl(name)
+                raw, remaining = pipe.execute()
+                written_at = now - (policy.redis_ttl - remaining) if remaining and remaining > 0 else now
+            else:
+                raw = r.get(name)
+                written_at = now
+            if not raw:
+                return None
+            return redis_codec.loads(raw), redis_codec.payload_size(raw), written_at
+        except Exception as e:
+            self._event("errors")
+            logger.warning(f"[CACHE] Redis GET {name} failed: {e}")
+            return None
+
+    def _l1_put(self, family, key, value, size, written_at, policy) -> None:
+        if size > self.l1_bytes or policy.l1_ttl <= 0:
+            return
+        expires_at = min(self._clock() + policy.l1_ttl, written_at + policy.redis_ttl)
+        with self._lock:
+            old = self._l1.pop((family, key), None)
+            if old is not None:
+                self._l1_used -= old.size
+            self._l1[(family, key)] = _Entry(value, size, written_at, expires_at)
+            self._l1_used += size
+            evicted = 0
+            while self._l1_used > self.l1_bytes:
+                _, dropped = self._l1.popitem(last=False)
+                self._l1_used -= dropped.size
+                evicted += 1
+        if evicted:
+            with self._stats_lock:
+                self._events["evictions"] += evicted
+
+    def _queue_l3(self, family: str, params: list, now: float, flush_due: bool = True) -> None:
+        with self._l3_lock:
+            if not self._pending:
+                self._pending_since = now
+            self._pending.append((family, params))
+            due = (len(self._pending) >= self.write_behind_rows
+                   or now - self._pending_since >= self.write_behind_s)
+        if due and flush_due:
+            self.flush()
+
+    def _refresh(self, family: str, key: str, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            if (family, key) in self._refreshing:
+                return
+            self._refreshing.add((family, key))
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+        def run():
+            try:
+                t0 = time.perf_counter()
+                value = loader()
+                self._record(family, "origin", value is not None, t0)
+                if value is not None:
+                    self._store(family, key, value, flush_due=False)
+                self._event("refreshes")
+            except Exception as e:
+                self._event("errors")
+                logger.warning(f"[CACHE] refresh-ahead {family}:{key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard((family, key))
+
+        self._refresher.submit(run)
+
+    # ── metrics ──────────────────────────────────────────────────────────────
+    def _record(self, family: str, tier: str, hit: bool, t0: float) -> None:
+        elapsed = time.perf_counter() - t0
+        with self._stats_lock:
+            c = self._counts[(family, tier)]
+            c["hits" if hit else "misses"] += 1
+            c["seconds"] += elapsed
+
+    def _event(self, name: str) -> None:
+        with self._stats_lock:
+            self._events[name] += 1
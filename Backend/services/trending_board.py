@@ -0,0 +1,248 @@
+"""Trending runners leaderboard stored as Redis sorted sets and hashes.
+
+WalletPumpAnalyzer keeps one leaderboard per trending window. The window is
+the analyzer's cache key, e.g. ``7_5.0_50000_secure``. It used to be one JSON
+list under ``trending_leaderboard:{window}``, rewritten whole on every
+update. Each window now has:
+
+  trending_board:{window}             HASH  order, refreshed_at
+  trending_board:{window}:multiplier  ZSET  mint -> multiplier
+  trending_board:{window}:momentum    ZSET  mint -> momentum_score
+  trending_board:{window}:runners     HASH  mint -> runner, one redis_codec
+                                            payload per runner (orjson tag)
+  trending_board:{window}:all         STRING  the ranked board, one
+                                              redis_codec payload
+
+``order`` says which ZSET ranks the board. Boards rank by multiplier until
+a Live refresh re-ranks them by momentum. A full read, which the trending
+endpoint makes on every request, is one round trip for the meta hash and
+the ``:all`` payload: the same cost as the old blob. A top-N read is one
+round trip for the meta hash and the ZREVRANGE, and a second that HMGETs
+only those N runners. Runners are a few hundred bytes each; zstd barely
+shrinks them without a dictionary and decodes a frame per runner several
+times slower than orjson, so they are stored uncompressed.
+
+``write`` diffs against the board as the caller read it. It sends HSET for
+changed runners, ZADD for changed scores, ZREM/HDEL for evicted runners and
+a fresh ``:all`` payload, with every key's TTL refreshed, as one MULTI/EXEC.
+
+Two writers can start from the same board. So ``write`` WATCHes the rank
+ZSETs and the runners hash, and evicts every runner actually on the board
+that is not in the new list, not just the ones in ``previous``. A runner
+missing from the board is written whole. If another write lands between
+the WATCH and the EXEC, the transaction is retried against the new board. The board therefore never
+outgrows the list last written, and never keeps another writer's stale
+runners.
+
+Boards still in an older layout (one list blob, or one hash per runner
+under ``trending_runner:{window}:{mint}`` with a field per attribute) are
+read once and rewritten in this one. With no Redis client the board lives
+in this process, as the old in-memory trending cache did.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+from redis.exceptions import WatchError
+
+from services import redis_codec
+
+logger = logging.getLogger(__name__)
+
+ORDERS = ("multiplier", "momentum")
+_SCORE_FIELD = {"multiplier": "multiplier", "momentum": "momentum_score"}
+_WRITE_RETRIES = 5
+_RUNNER_CODEC = redis_codec.RedisCodec(codec="orjson")
+
+
+@dataclass(frozen=True)
+class BoardSnapshot:
+    runners: List[Dict[str, Any]]   # ranked, best first
+    order: str                      # "multiplier" or "momentum"
+    refreshed_at: float             # unix time of the last write; 0 if never
+
+
+def _meta_key(window: str) -> str:
+    return f"trending_board:{window}"
+
+
+def _rank_key(window: str, order: str) -> str:
+    return f"trending_board:{window}:{order}"
+
+
+def _runners_key(window: str) -> str:
+    return f"trending_board:{window}:runners"
+
+
+def _all_key(window: str) -> str:
+    return f"trending_board:{window}:all"
+
+
+def _legacy_runner_key(window: str, mint: str) -> str:
+    return f"trending_runner:{window}:{mint}"
+
+
+def _text(raw) -> str:
+    return raw.decode() if isinstance(raw, bytes) else raw
+
+
+class TrendingBoard:
+    def __init__(self, redis: Callable[[], Any], ttl: int):
+        self._redis = redis
+        self.ttl = ttl
+        self._local: Dict[str, BoardSnapshot] = {}
+
+    def read(self, window: str, limit: Optional[int] = None) -> Optional[BoardSnapshot]:
+        """The board ranked by its current order (top ``limit`` only if given); None if absent."""
+        r = self._redis()
+        if r is None:
+            snap = self._local.get(window)
+            if snap is not None and limit is not None:
+                snap = BoardSnapshot(snap.runners[:limit], snap.order, snap.refreshed_at)
+            return snap
+        try:
+            if limit is None:
+                pipe = r.pipeline(transaction=False)
+                pipe.hgetall(_meta_key(window))
+                pipe.get(_all_key(window))
+                meta, raw = pipe.execute()
+                meta = {_text(k): _text(v) for k, v in meta.items()}
+                if meta and raw:
+                    order = meta.get("order") if meta.get("order") in ORDERS else "multiplier"
+                    return BoardSnapshot(redis_codec.loads(raw), order,
+                                         float(meta.get("refreshed_at") or 0))
+
+            pipe = r.pipeline(transaction=False)
+            pipe.hgetall(_meta_key(window))
+            for order in ORDERS:
+                pipe.zrevrange(_rank_key(window, order), 0, -1 if limit is None else limit - 1)
+            meta, *ranked = pipe.execute()
+            meta = {_text(k): _text(v) for k, v in meta.items()}
+            if not meta:
+                return self._migrate_legacy(r, window, limit)
+            order = meta.get("order") if meta.get("order") in ORDERS else "multiplier"
+            mints = [_text(m) for m in ranked[ORDERS.index(order)]]
+            payloads = r.hmget(_runners_key(window), mints) if mints else []
+            if mints and not any(payloads):
+                return self._migrate_runner_hashes(r, window, mints, order, meta, limit)
+            runners = [_RUNNER_CODEC.loads(raw) for raw in payloads if raw]
+            return BoardSnapshot(runners, order, float(meta.get("refreshed_at") or 0))
+        except Exception as e:
+            logger.warning(f"[TRENDING] Board read {window} failed: {e}")
+            return None
+
+    def write(
+        self,
+        window: str,
+        runners: List[Dict[str, Any]],
+        previous: Optional[List[Dict[str, Any]]] = None,
+        order: str = "multiplier",
+        refreshed_at: Optional[float] = None,
+    ) -> int:
+        """Store ``runners`` (ranked) as the board, sending only what differs from ``previous``.
+
+        ``previous`` is the board as the caller read it, before changing it.
+        Pass copies, not the same dicts. Returns how many runners were
+        written.
+        """
+        refreshed_at = time.time() if refreshed_at is None else refreshed_at
+        r = self._redis()
+        if r is None:
+            self._local[window] = BoardSnapshot(list(runners), order, refreshed_at)
+            return len(runners)
+
+        rank_keys = [_rank_key(window, o) for o in ORDERS]
+        for _ in range(_WRITE_RETRIES):
+            try:
+                with r.pipeline(transaction=True) as pipe:
+                    pipe.watch(*rank_keys, _runners_key(window))
+                    on_board = [{_text(m) for m in pipe.zrange(key, 0, -1)} for key in rank_keys]
+                    stored = {_text(m) for m in pipe.hkeys(_runners_key(window))}
+                    pipe.multi()
+                    written = self._queue_write(pipe, window, runners, previous, on_board,
+                                                stored, order, refreshed_at)
+                    pipe.execute()
+                return written
+            except WatchError:
+                continue
+            except Exception as e:
+                logger.warning(f"[TRENDING] Board write {window} failed: {e}")
+                return 0
+        logger.warning(f"[TRENDING] Board write {window} skipped: board kept changing")
+        return 0
+
+    def _queue_write(self, pipe, window, runners, previous, on_board, stored, order,
+                     refreshed_at) -> int:
+        """Queue the diff from ``previous`` onto ``pipe``.
+
+        ``on_board`` is each rank ZSET's members and ``stored`` the mints in
+        the runners hash.
+        """
+        before = {p["address"]: p for p in previous or []}
+        after = {runner["address"]: runner for runner in runners}
+        runners_key = _runners_key(window)
+        evicted = (set().union(*on_board) | stored | before.keys()) - after.keys()
+        for mint in evicted:
+            for o in ORDERS:
+                pipe.zrem(_rank_key(window, o), mint)
+        if evicted:
+            pipe.hdel(runners_key, *evicted)
+        changed = {}
+        for mint, runner in after.items():
+            # New, or evicted by a concurrent write: nothing to diff against.
+            old = before.get(mint) if mint in stored else None
+            if old != runner:
+                changed[mint] = _RUNNER_CODEC.dumps(runner)
+            for o, members in zip(ORDERS, on_board):
+                field = _SCORE_FIELD[o]
+                score = runner.get(field)
+                if score is not None and (old is None or old.get(field) != score
+                                          or mint not in members):
+                    pipe.zadd(_rank_key(window, o), {mint: score})
+        if changed:
+            pipe.hset(runners_key, mapping=changed)
+        # What a full read of the rank ZSET would return, ranked the same way.
+        field = _SCORE_FIELD[order]
+        ranked = sorted((x for x in after.values() if x.get(field) is not None),
+                        key=lambda x: (x[field], x["address"]), reverse=True)
+        pipe.setex(_all_key(window), self.ttl, redis_codec.dumps(ranked))
+        pipe.hset(_meta_key(window), mapping={"order": order, "refreshed_at": repr(refreshed_at)})
+        for key in (_meta_key(window), runners_key, *(_rank_key(window, o) for o in ORDERS)):
+            pipe.expire(key, self.ttl)
+        return len(changed)
+
+    def _migrate_legacy(self, r, window, limit) -> Optional[BoardSnapshot]:
+        legacy_key = f"trending_leaderboard:{window}"
+        runners = redis_codec.loads(r.get(legacy_key))
+        if not runners:
+            return None
+        order = "momentum" if all("momentum_score" in x for x in runners) else "multiplier"
+        self.write(window, runners, order=order, refreshed_at=0.0)
+        r.delete(legacy_key)
+        runners = runners if limit is None else runners[:limit]
+        return BoardSnapshot(runners, order, 0.0)
+
+    def _migrate_runner_hashes(self, r, window, mints, order, meta, limit) -> Optional[BoardSnapshot]:
+        """Rewrite a board stored as one hash per runner (one field per attribute)."""
+        if limit is not None:
+            # Only the top N were ranked; migrate the whole board.
+            mints = [_text(m) for m in r.zrevrange(_rank_key(window, order), 0, -1)]
+        pipe = r.pipeline(transaction=False)
+        for mint in mints:
+            pipe.hgetall(_legacy_runner_key(window, mint))
+        runners = [
+            {_text(k): orjson.loads(v) for k, v in fields.items()}
+            for fields in pipe.execute() if fields
+        ]
+        if not runners:
+            return None
+        refreshed_at = float(meta.get("refreshed_at") or 0)
+        self.write(window, runners, order=order, refreshed_at=refreshed_at)
+        r.delete(*[_legacy_runner_key(window, mint) for mint in mints])
+        runners = runners if limit is None else runners[:limit]
+        return BoardSnapshot(runners, order, refreshed_at)
@@ -15,6 +15,7 @@ from typing import TYPE_CHECKING, Dict, List, Optional, Set
 
 import requests
 
+from services.signal_windows import SignalWindowScheduler
 from services.supabase_client import SCHEMA_NAME, get_supabase_client
 
 try:
@@ -61,6 +62,7 @@ class WalletActivityMonitor:
         telegram_notifier: Optional["TelegramNotifier"] = None,
         paper_trader: Optional["PaperTrader"] = None,
         db_path: str = None,
+        signal_window_redis=None,
     ):
         self.solanatracker_key = solanatracker_api_key
         self.poll_interval = poll_interval
@@ -73,8 +75,14 @@ class WalletActivityMonitor:
         self.telegram_notifier = telegram_notifier
         self.paper_trader = paper_trader
 
-        self.pending_signals = {}
-        self.buffer_lock = threading.Lock()
+        # One scheduler thread owns every open 60s multi-wallet window
+        # (previously one threading.Timer per token).
+        self.signal_windows = SignalWindowScheduler(
+            on_fire=self._flush_multi_signal,
+            window_s=60.0,
+            redis_client=signal_window_redis,
+            name="multi-wallet-windows",
+        )
 
         telegram_status = "Enabled" if telegram_notifier else "Disabled"
         print(
@@ -98,6 +106,7 @@ WALLET ACTIVITY MONITOR INITIALIZED
             return
 
         self.running = True
+        self.signal_windows.start()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         print(f"Wallet monitor started (polling every {self.poll_interval / 60:.1f} min)")
@@ -106,6 +115,7 @@ WALLET ACTIVITY MONITOR INITIALIZED
         self.running = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        self.signal_windows.stop(flush=True)
         print("Wallet monitor stopped")
 
     def _monitor_loop(self):
@@ -269,18 +279,9 @@ WALLET ACTIVITY MONITOR INITIALIZED
             )
 
     def _buffer_multi_wallet_signal(self, token_address: str, wallets_buying: List[Dict]):
-        with self.buffer_lock:
-            if token_address not in self.pending_signals:
-                self.pending_signals[token_address] = {"entries": []}
-                threading.Timer(60.0, self._flush_multi_signal, [token_address]).start()
-
-            self.pending_signals[token_address]["entries"].extend(wallets_buying)
-
-    def _flush_multi_signal(self, token_address: str):
-        with self.buffer_lock:
-            payload = self.pending_signals.pop(token_address, {"entries": []})
-            trades = payload.get("entries", [])
+        self.signal_windows.add(token_address, wallets_buying)
 
+    def _flush_multi_signal(self, token_address: str, trades: List[Dict]):
         if not trades:
             return
 
@@ -781,6 +782,7 @@ WALLET ACTIVITY MONITOR INITIALIZED
                 "running": self.running,
                 "poll_interval_seconds": self.poll_interval,
                 "telegram_enabled": self.telegram_notifier is not None,
+                "signal_windows": self.signal_windows.stats(),
             }
 
         except Exception as e:
@@ -793,6 +795,7 @@ WALLET ACTIVITY MONITOR INITIALIZED
                 "running": self.running,
                 "poll_interval_seconds": self.poll_interval,
                 "telegram_enabled": self.telegram_notifier is not None,
+                "signal_windows": self.signal_windows.stats(),
             }
 
     def force_check_wallet(self, wallet_address):
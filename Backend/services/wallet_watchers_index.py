@@ -0,0 +1,226 @@
+"""Redis-resident wallet → watchers index for Helius signal fan-out.
+
+Every Helius swap used to query ``wallet_watchlist`` for the wallet's
+watchers (``_process_signal``, and the tracked-wallet gate in
+``tasks.ingest_helius_signal``). The index keeps that answer in Redis:
+
+Key:    sifter:watchers:{wallet_address}   (HASH)
+Fields: ``_loaded`` (unix ts) plus one field per watcher, user_id → JSON of
+        ``alert_enabled`` and the filter columns the fan-out needs.
+TTL:    24h, refreshed by ``rebuild()`` (Celery beat) and on every load.
+
+Every watcher is indexed, alerts on or off: ``is_watched`` (the ingest
+gate) is true for any watcher, while ``get_watchers`` (alert fan-out) only
+returns the alert-enabled ones.
+
+A wallet with no watchers is cached as a hash holding only ``_loaded``, so
+untracked wallets don't hit the database either. A hash without ``_loaded``
+(never loaded, expired, or invalidated) is treated as a miss and reloaded
+from ``wallet_watchlist`` with one query.
+
+Watchlist CRUD calls ``invalidate(wallet_address)`` after writing, so the
+next signal for that wallet reloads its watchers. Like ``bot_state``, Redis
+errors fall back to the database rather than raising.
+
+Writes are versioned, like ``bot_user_cache``: ``invalidate`` stamps the
+wallet's generation key (sifter:watchers_gen:{wallet}) with the next value
+of a global epoch, and a load only stores its DB snapshot if no
+invalidation landed after it read the generation. ``rebuild`` reads the
+epoch before scanning the table, so a wallet invalidated mid-scan keeps
+its fresher entry.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from services.redis_pool import get_redis_client
+from services.supabase_client import SCHEMA_NAME, get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+INDEX_PREFIX = "sifter:watchers:"
+GEN_PREFIX = "sifter:watchers_gen:"
+EPOCH_KEY = "sifter:watchers_epoch"
+INDEX_TTL_SECONDS = 86400
+GEN_TTL_SECONDS = 2 * INDEX_TTL_SECONDS
+LOADED_FIELD = "_loaded"
+
+WATCHER_COLUMNS = ("user_id, wallet_address, alert_enabled, alert_threshold_usd, min_trade_usd, "
+                   "alert_on_buy, alert_on_sell")
+_REBUILD_PAGE = 1000
+
+# KEYS[1] = index hash; KEYS[2] = wallet generation; ARGV[1] = newest
+# generation the snapshot may overwrite; ARGV[2] = TTL; ARGV[3..] = field,
+# value pairs. Returns 1 if stored, 0 if an invalidation got there first.
+_STORE_LUA = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def _key(wallet_address: str) -> str:
+    return f"{INDEX_PREFIX}{wallet_address}"
+
+
+def _gen_key(wallet_address: str) -> str:
+    return f"{GEN_PREFIX}{wallet_address}"
+
+
+def _encode(row: Dict[str, Any]) -> str:
+    return json.dumps({
+        "alert_enabled": row.get("alert_enabled", True) is not False,
+        "alert_threshold_usd": row.get("alert_threshold_usd"),
+        "min_trade_usd": row.get("min_trade_usd"),
+        "alert_on_buy": row.get("alert_on_buy", True),
+        "alert_on_sell": row.get("alert_on_sell", True),
+    })
+
+
+def _decode(fields: Dict[str, str]) -> List[Dict[str, Any]]:
+    watchers = []
+    for user_id, raw in fields.items():
+        if user_id == LOADED_FIELD:
+            continue
+        try:
+            watcher = json.loads(raw)
+        except (ValueError, TypeError):
+            continue
+        watcher["user_id"] = user_id
+        watchers.append(watcher)
+    return watchers
+
+
+def _load_from_db(wallet_address: str) -> List[Dict[str, Any]]:
+    result = (
+        get_supabase_client().schema(SCHEMA_NAME).table("wallet_watchlist")
+        .select(WATCHER_COLUMNS)
+        .eq("wallet_address", wallet_address)
+        .execute()
+    )
+    return result.data or []
+
+
+def _write(script, wallet_address: str, rows: Iterable[Dict[str, Any]],
+           generation: int, client=None):
+    """Store ``rows`` unless ``wallet_address`` was invalidated after ``generation``."""
+    args: List[Any] = [generation, INDEX_TTL_SECONDS, LOADED_FIELD, repr(time.time())]
+    for row in rows:
+        if row.get("user_id"):
+            args += [str(row["user_id"]), _encode(row)]
+    return script(keys=[_key(wallet_address), _gen_key(wallet_address)], args=args, client=client)
+
+
+def _all_watchers(wallet_address: str) -> List[Dict[str, Any]]:
+    """Every watcher of ``wallet_address`` (index first, DB on miss).
+
+    Raises only if both Redis and the database fail.
+    """
+    client = None
+    try:
+        client = get_redis_client()
+        pipe = client.pipeline(transaction=False)
+        pipe.hgetall(_key(wallet_address))
+        pipe.get(_gen_key(wallet_address))
+        fields, generation = pipe.execute()
+        if fields and LOADED_FIELD in fields:
+            return _decode(fields)
+    except Exception as exc:  # pragma: no cover - redis unavailable
+        logger.warning("[WATCHERS] action=lookup status=redis_fail wallet=%s error=%s",
+                       wallet_address[:8], exc)
+        client = None
+
+    rows = _load_from_db(wallet_address)
+    if client is not None:
+        try:
+            _write(client.register_script(_STORE_LUA), wallet_address, rows, int(generation or 0))
+        except Exception as exc:  # pragma: no cover - redis unavailable
+            logger.warning("[WATCHERS] action=store status=redis_fail wallet=%s error=%s",
+                           wallet_address[:8], exc)
+    return [{**row, "user_id": str(row["user_id"])} for row in rows if row.get("user_id")]
+
+
+def get_watchers(wallet_address: str) -> List[Dict[str, Any]]:
+    """Alert-enabled watchers of ``wallet_address`` — the alert fan-out list."""
+    # Hashes written before alert_enabled was indexed only hold enabled watchers.
+    return [w for w in _all_watchers(wallet_address) if w.get("alert_enabled", True) is not False]
+
+
+def is_watched(wallet_address: str) -> bool:
+    """Whether anyone watches ``wallet_address``, alerts on or off — the ingest gate."""
+    return bool(_all_watchers(wallet_address))
+
+
+def invalidate(*wallet_addresses: Optional[str]) -> None:
+    """Drop the cached watchers for these wallets (call after watchlist writes).
+
+    Also advances their generation, so loads that read the database before
+    this call can't store their snapshot afterwards.
+    """
+    wallets = [w for w in wallet_addresses if w]
+    if not wallets:
+        return
+    try:
+        client = get_redis_client()
+        generation = client.incr(EPOCH_KEY)
+        pipe = client.pipeline(transaction=True)
+        for wallet_address in wallets:
+            pipe.set(_gen_key(wallet_address), generation, ex=GEN_TTL_SECONDS)
+        pipe.delete(*[_key(w) for w in wallets])
+        pipe.execute()
+    except Exception as exc:  # pragma: no cover - redis unavailable
+        logger.warning("[WATCHERS] action=invalidate status=redis_fail error=%s", exc)
+
+
+def rebuild() -> Dict[str, int]:
+    """Recompute the index for every watched wallet from ``wallet_watchlist``.
+
+    Wallets invalidated while the table was being read are skipped (their
+    next lookup reloads them), and index entries for wallets that no longer
+    have any watchers are deleted.
+    """
+    client = get_redis_client()
+    epoch = int(client.get(EPOCH_KEY) or 0)
+    table = get_supabase_client().schema(SCHEMA_NAME).table("wallet_watchlist")
+    by_wallet: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    offset = 0
+    while True:
+        page = (
+            table.select(WATCHER_COLUMNS)
+            .order("id")
+            .range(offset, offset + _REBUILD_PAGE - 1)
+            .execute()
+            .data
+            or []
+        )
+        for row in page:
+            if row.get("wallet_address"):
+                by_wallet[row["wallet_address"]].append(row)
+        if len(page) < _REBUILD_PAGE:
+            break
+        offset += _REBUILD_PAGE
+
+    script = client.register_script(_STORE_LUA)
+    pipe = client.pipeline(transaction=False)
+    for wallet_address, rows in by_wallet.items():
+        _write(script, wallet_address, rows, epoch, client=pipe)
+    skipped = pipe.execute().count(0)
+
+    stale = [key for key in client.scan_iter(match=f"{INDEX_PREFIX}*", count=500)
+             if key[len(INDEX_PREFIX):] not in by_wallet]
+    for start in range(0, len(stale), _REBUILD_PAGE):
+        client.delete(*stale[start:start + _REBUILD_PAGE])
+
+    watchers = sum(len(rows) for rows in by_wallet.values())
+    logger.info("[WATCHERS] action=rebuild wallets=%d watchers=%d skipped=%d removed=%d",
+                len(by_wallet), watchers, skipped, len(stale))
+    return {"wallets": len(by_wallet), "watchers": watchers}
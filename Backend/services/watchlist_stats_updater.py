@@ -16,7 +16,15 @@ ADDED_AT FILTERING:
 MERGE POLICY:
   All Supabase updates are merge-only — only fields actually computed are
   written. Fields not in the update dict retain their existing values.
+
+DAILY REFRESH ENGINE:
+  Metrics are computed once per distinct wallet on a thread pool, then
+  written through the bulk_refresh_watchlist_metrics RPC, which applies each
+  wallet's metrics to every user watching it. PostgREST requests scale with
+  distinct wallets / BULK_CHUNK instead of total watchlist rows.
 """
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import List, Dict
 from services.supabase_client import get_supabase_client, SCHEMA_NAME
@@ -29,9 +37,22 @@ from services.watchlist_manager import (
 import os
 
 
+# Columns daily_stats_refresh writes (see bulk_refresh_watchlist_metrics).
+METRIC_FIELDS = [
+    'roi_7d', 'roi_30d', 'runners_7d', 'runners_30d',
+    'win_rate_7d', 'last_trade_time',
+    'professional_score', 'consistency_score',
+]
+
+
 class WatchlistStatsUpdater:
     """Manages scheduled watchlist updates."""
 
+    # Distinct wallets whose metrics are computed at once (each is 2 activity
+    # queries), and wallets per bulk-refresh RPC call.
+    REFRESH_WORKERS = int(os.environ.get("WATCHLIST_REFRESH_WORKERS", "8"))
+    BULK_CHUNK = 200
+
     def __init__(self):
         self.supabase = get_supabase_client()
         self.schema   = SCHEMA_NAME
@@ -54,12 +75,17 @@ class WatchlistStatsUpdater:
         Fetches added_at per wallet so _refresh_wallet_metrics only counts
         trades that occurred AFTER the wallet was added to the watchlist.
         MERGE-ONLY: only fields returned by _refresh_wallet_metrics are written.
+
+        Returns success/error counts plus wall time and PostgREST request count
+        (metric computation's own activity queries are not counted).
         """
         print("\n" + "=" * 80)
         print(f"DAILY STATS REFRESH - {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"  Floors: >=${MIN_SPEND_USD} spend | {MIN_WALLET_ROI_MULT}x ROI | {MIN_TOKEN_LAUNCH_TO_ATH}x token launch-to-ATH")
         print("=" * 80)
 
+        run_start = time.perf_counter()
+
         # Fetch added_at alongside wallet/user so we can filter by watchlist date
         result = self._table('wallet_watchlist').select('wallet_address, user_id, added_at').execute()
 
@@ -82,44 +108,106 @@ class WatchlistStatsUpdater:
 
         print(f"\n[DAILY] Refreshing {len(unique_wallets)} unique wallets...")
 
-        success_count = 0
-        error_count   = 0
-
-        for wallet_address, info in unique_wallets.items():
-            try:
-                # Pass added_at — only trades after this date count toward metrics
-                metrics = self.manager._refresh_wallet_metrics(
-                    wallet_address,
-                    added_at=info.get('added_at'),
-                )
-
-                # MERGE-ONLY: skip fields that came back as None
-                update_data = {'last_updated': datetime.utcnow().isoformat()}
-                for field in [
-                    'roi_7d', 'roi_30d', 'runners_7d', 'runners_30d',
-                    'win_rate_7d', 'last_trade_time',
-                    'professional_score', 'consistency_score',
-                ]:
-                    val = metrics.get(field)
-                    if val is not None:
-                        update_data[field] = val
-
-                for user_id in info['user_ids']:
-                    self._table('wallet_watchlist').update(
-                        update_data
-                    ).eq('user_id', user_id).eq('wallet_address', wallet_address).execute()
-
-                success_count += 1
-                if success_count % 10 == 0:
-                    print(f"  Progress: {success_count}/{len(unique_wallets)}...")
-
-            except Exception as e:
-                print(f"  ✗ Error refreshing {wallet_address[:8]}...: {e}")
-                error_count += 1
+        compute_start = time.perf_counter()
+        updates, error_count = self._compute_wallet_updates(unique_wallets)
+        compute_ms = (time.perf_counter() - compute_start) * 1000.0
+
+        write_start = time.perf_counter()
+        requests, write_errors = self._write_wallet_updates(updates, unique_wallets)
+        write_ms = (time.perf_counter() - write_start) * 1000.0
+
+        success_count = len(updates) - write_errors
+        error_count  += write_errors
+        stats = {
+            'success':     success_count,
+            'errors':      error_count,
+            'wallets':     len(unique_wallets),
+            'rows':        len(result.data),
+            'requests':    requests + 1,  # writes + the watchlist select
+            'compute_ms':  round(compute_ms, 1),
+            'write_ms':    round(write_ms, 1),
+            'duration_ms': round((time.perf_counter() - run_start) * 1000.0, 1),
+        }
 
         print(f"\n[DAILY] Complete: {success_count} refreshed, {error_count} errors")
+        print(f"[DAILY] {stats['rows']} rows / {stats['wallets']} wallets in {stats['duration_ms']:.0f}ms "
+              f"(compute {stats['compute_ms']:.0f}ms, write {stats['write_ms']:.0f}ms, "
+              f"{stats['requests']} PostgREST requests)")
         print("=" * 80 + "\n")
-        return {'success': success_count, 'errors': error_count}
+        return stats
+
+    def _compute_wallet_updates(self, unique_wallets: Dict[str, Dict]):
+        """Compute the merge-only update for each distinct wallet, concurrently.
+
+        Returns ``({wallet_address: update_data}, error_count)``.
+        """
+        def compute(item):
+            wallet_address, info = item
+            # Pass added_at — only trades after this date count toward metrics
+            metrics = self.manager._refresh_wallet_metrics(
+                wallet_address,
+                added_at=info.get('added_at'),
+            )
+            # MERGE-ONLY: skip fields that came back as None
+            update_data = {'last_updated': datetime.utcnow().isoformat()}
+            for field in METRIC_FIELDS:
+                val = metrics.get(field)
+                if val is not None:
+                    update_data[field] = val
+            return update_data
+
+        updates     = {}
+        error_count = 0
+        if not unique_wallets:
+            return updates, error_count
+
+        workers = max(1, min(self.REFRESH_WORKERS, len(unique_wallets)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(compute, item): item[0] for item in unique_wallets.items()}
+            for future in as_completed(futures):
+                wallet_address = futures[future]
+                try:
+                    updates[wallet_address] = future.result()
+                except Exception as e:
+                    print(f"  ✗ Error refreshing {wallet_address[:8]}...: {e}")
+                    error_count += 1
+                    continue
+                if len(updates) % 50 == 0:
+                    print(f"  Progress: {len(updates)}/{len(unique_wallets)}...")
+        return updates, error_count
+
+    def _write_wallet_updates(self, updates: Dict[str, Dict], unique_wallets: Dict[str, Dict]):
+        """Write per-wallet updates to every watching row.
+
+        Uses the ``bulk_refresh_watchlist_metrics`` RPC, ``BULK_CHUNK`` wallets
+        per call; a chunk whose RPC fails falls back to one PATCH per wallet
+        (covering all its watchers). Returns ``(requests, failed_wallets)``.
+        """
+        requests = 0
+        failed   = 0
+        items    = list(updates.items())
+        for i in range(0, len(items), self.BULK_CHUNK):
+            chunk = items[i:i + self.BULK_CHUNK]
+            requests += 1
+            try:
+                self.supabase.schema(self.schema).rpc(
+                    'bulk_refresh_watchlist_metrics',
+                    {'p_rows': [{'wallet_address': addr, **data} for addr, data in chunk]},
+                ).execute()
+                continue
+            except Exception as e:
+                print(f"  ✗ Bulk refresh RPC failed ({len(chunk)} wallets), falling back to per-wallet updates: {e}")
+
+            for wallet_address, update_data in chunk:
+                requests += 1
+                try:
+                    self._table('wallet_watchlist').update(update_data).eq(
+                        'wallet_address', wallet_address
+                    ).in_('user_id', unique_wallets[wallet_address]['user_ids']).execute()
+                except Exception as e:
+                    print(f"  ✗ Error writing {wallet_address[:8]}...: {e}")
+                    failed += 1
+        return requests, failed
 
     # =========================================================================
     # WEEKLY RERANK (Sunday 4am UTC) — Full rerank with position changes
@@ -145,14 +233,17 @@ class WatchlistStatsUpdater:
         success_count = 0
         error_count   = 0
 
-        for user_id in user_ids:
-            try:
-                self.manager.rerank_user_watchlist(user_id)
-                print(f"  ✓ {user_id[:8]}...")
-                success_count += 1
-            except Exception as e:
-                print(f"  ✗ {user_id[:8]}...: {e}")
-                error_count += 1
+        # One trade fetch per distinct wallet for the whole run, however many
+        # users watch it.
+        with self.manager.trade_cache():
+            for user_id in user_ids:
+                try:
+                    self.manager.rerank_user_watchlist(user_id)
+                    print(f"  ✓ {user_id[:8]}...")
+                    success_count += 1
+                except Exception as e:
+                    print(f"  ✗ {user_id[:8]}...: {e}")
+                    error_count += 1
 
         print(f"\n[WEEKLY] Complete: {success_count} reranked, {error_count} errors")
         print("=" * 80 + "\n")
@@ -29,6 +29,7 @@ import signal
 import threading
 import traceback
 from utils import _roi_to_score
+from services import redis_codec
 
 # =============================================================================
 # TTL CONSTANTS
@@ -189,12 +190,12 @@ def _save_result_with_retry(key, data, ttl=None, max_attempts=3):
 
 def _save_result(key, data, ttl=None):
     r = _get_redis()
-    r.set(f"job_result:{key}", json.dumps(data), ex=ttl or PIPELINE_TTL)
+    r.set(f"job_result:{key}", redis_codec.dumps(data), ex=ttl or PIPELINE_TTL)
 
 def _load_result(key):
     r   = _get_redis()
     raw = r.get(f"job_result:{key}")
-    return json.loads(raw) if raw else None
+    return redis_codec.loads(raw)
 
 def _calculate_grade(score):
     if score >= 90: return 'A+'
@@ -417,7 +418,7 @@ def perform_wallet_analysis(self, data):
                 try:
                     current_ath_raw = r.get(f"token_ath:{token_address}")
                     if current_ath_raw:
-                        current_ath_price = json.loads(current_ath_raw).get('highest_price', 0)
+                        current_ath_price = redis_codec.loads(current_ath_raw).get('highest_price', 0)
                         cached_wallets    = cached_result.get('wallets', [])
                         cached_ath        = next(
                             (w.get('ath_price', 0) for w in cached_wallets if w.get('ath_price')), 0
@@ -655,7 +656,7 @@ def perform_auto_discovery(self, data):
     }).eq('job_id', job_id).execute()
 
     runners = analyzer.find_trending_runners_enhanced(
-        days_back=30, min_multiplier=5.0, min_liquidity=50000
+        days_back=30, min_multiplier=5.0, min_liquidity=50000, limit=10
     )
     if not runners:
         result = {'success': False, 'error': 'No secure trending runners found'}
@@ -664,7 +665,7 @@ def perform_auto_discovery(self, data):
         }).eq('job_id', job_id).execute()
         return result
 
-    selected = runners[:10]
+    selected = runners
     supabase.schema(SCHEMA_NAME).table('analysis_jobs').update({
         'phase': 'queuing_pipeline', 'progress': 25, 'tokens_total': len(selected),
     }).eq('job_id', job_id).execute()
@@ -1632,7 +1633,7 @@ def merge_and_save_final(self, data):
             try:
                 current_ath_raw = r.get(f"token_ath:{token_address}")
                 if current_ath_raw:
-                    current_ath_price = json.loads(current_ath_raw).get('highest_price', 0)
+                    current_ath_price = redis_codec.loads(current_ath_raw).get('highest_price', 0)
                     analysis_ath      = next(
                         (w.get('ath_price', 0) for w in wallet_list if w.get('ath_price')), 0)
                     if analysis_ath > 0 and current_ath_price > analysis_ath * 1.10:
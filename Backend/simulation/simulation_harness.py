@@ -20,6 +20,7 @@ Cluster alert testing:
 Run with:
   python simulation_harness.py --mode single --days 30 --market bull
   python simulation_harness.py --mode monte_carlo --runs 1000 --days 30
+  python simulation_harness.py --mode monte_carlo --runs 1000 --workers 0   # all cores
   python simulation_harness.py --mode alert_timing --runs 500
 
 FIXES IN THIS VERSION:
@@ -50,9 +51,13 @@ import random
 import statistics
 import argparse
 import json
+import multiprocessing
+import os
+import sys
 import time
 from collections import defaultdict
 from copy import deepcopy
+from functools import partial
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
@@ -1223,108 +1228,197 @@ def run_single_simulation(
 # MONTE CARLO RUNNER
 # =============================================================================
 
+def _monte_carlo_seed(run_idx: int) -> int:
+    return run_idx * 7 + 42
+
+
+def _monte_carlo_run(run_idx: int, days: int) -> Tuple[int, Optional[Dict], Optional[str]]:
+    """
+    One Monte Carlo run, reduced to what the aggregate needs.
+
+    Everything random in a run comes from its seed, including the starting
+    market state, so a run gives the same result whichever process runs it
+    and whatever ran before it. Only the summary goes back to the parent;
+    the daily snapshots are dropped in the worker.
+    """
+    seed          = _monte_carlo_seed(run_idx)
+    initial_state = random.Random(seed).choice(list(MarketState))
+
+    try:
+        result = run_single_simulation(
+            days           = days,
+            market_state   = initial_state,
+            seed           = seed,
+            verbose        = False,
+            include_alerts = (run_idx % 10 == 0),
+        )
+    except Exception as e:
+        return run_idx, None, str(e)
+
+    comparison = result.get('alert_strategy_comparison')
+    return run_idx, {
+        'assertion_pass_rate': result['assertion_pass_rate'],
+        'agents': [
+            (data['name'], data['score'], data['zone'], data['status'])
+            for data in result['final_watchlist_scores'].values()
+        ],
+        'recommendation': comparison.get('recommendation') if comparison else None,
+    }, None
+
+
+def _init_monte_carlo_worker():
+    # N workers printing full scorecards interleave into noise; the parent
+    # reports progress. Each worker also needs its own Redis connection.
+    global publisher
+    sys.stdout = open(os.devnull, 'w')
+    publisher  = SimulationPublisher()
+
+
+@dataclass
+class _RunningStats:
+    """Count, mean and sum of squared deviations (Welford), so no run's scores are kept."""
+    n:    int   = 0
+    mean: float = 0.0
+    m2:   float = 0.0
+
+    def add(self, x: float):
+        self.n    += 1
+        delta      = x - self.mean
+        self.mean += delta / self.n
+        self.m2   += delta * (x - self.mean)
+
+    def confidence_interval(self) -> Tuple:
+        if not self.n:
+            return (0, 0, 0)
+        if self.n < 2:
+            return (self.mean, self.mean, self.mean)
+        std    = (self.m2 / (self.n - 1)) ** 0.5
+        margin = 2 * std / (self.n ** 0.5)
+        return (round(self.mean - margin, 2), round(self.mean, 2), round(self.mean + margin, 2))
+
+
+@dataclass
+class MonteCarloAggregate:
+    """
+    Streaming aggregate of Monte Carlo run summaries.
+
+    Memory grows with the number of agents, zones and statuses, not runs.
+    Runs are added in run order in serial and parallel mode alike, so the
+    floating-point sums, and the results, are identical for the same runs.
+    """
+    runs_completed:     int                       = 0
+    pass_rate_sum:      float                     = 0.0
+    pass_rate_min:      Optional[float]           = None
+    pass_rate_max:      Optional[float]           = None
+    agent_scores:       Dict[str, _RunningStats]  = field(default_factory=dict)
+    agent_zones:        Dict[str, Dict[str, int]] = field(default_factory=dict)
+    agent_status:       Dict[str, Dict[str, int]] = field(default_factory=dict)
+    strategy_runs:      int                       = 0
+    immediate_wins:     int                       = 0
+
+    def add(self, summary: Dict):
+        self.runs_completed += 1
+
+        rate = summary['assertion_pass_rate']
+        self.pass_rate_sum += rate
+        self.pass_rate_min  = rate if self.pass_rate_min is None else min(self.pass_rate_min, rate)
+        self.pass_rate_max  = rate if self.pass_rate_max is None else max(self.pass_rate_max, rate)
+
+        for name, score, zone, status in summary['agents']:
+            if name not in self.agent_scores:
+                self.agent_scores[name] = _RunningStats()
+                self.agent_zones[name]  = {}
+                self.agent_status[name] = {}
+
+            self.agent_scores[name].add(score)
+            self.agent_zones[name][zone]    = self.agent_zones[name].get(zone, 0) + 1
+            self.agent_status[name][status] = self.agent_status[name].get(status, 0) + 1
+
+        if summary['recommendation'] is not None:
+            self.strategy_runs  += 1
+            self.immediate_wins += summary['recommendation'] == 'immediate'
+
+    def results(self) -> Dict:
+        n = self.runs_completed
+        return {
+            'runs_completed':      n,
+            'assertion_pass_rate': {
+                'mean': round(self.pass_rate_sum / n, 1) if n else 0,
+                'min':  round(self.pass_rate_min, 1)     if n else 0,
+                'max':  round(self.pass_rate_max, 1)     if n else 0,
+            },
+            'per_agent_confidence_intervals': {
+                name: {
+                    'score_95ci':  self.agent_scores[name].confidence_interval(),
+                    'zone_dist':   {k: round(v / n * 100, 1)
+                                    for k, v in self.agent_zones[name].items()},
+                    'status_dist': {k: round(v / n * 100, 1)
+                                    for k, v in self.agent_status[name].items()},
+                }
+                for name in self.agent_scores
+            },
+            'alert_strategy': {
+                'pct_runs_immediate_wins': round(
+                    self.immediate_wins / self.strategy_runs * 100, 1
+                ) if self.strategy_runs else 0,
+            },
+        }
+
+
 def run_monte_carlo(
-    n_runs:       int   = 1000,
-    days:         int   = 30,
-    noise_factor: float = 0.15,
+    n_runs:       int           = 1000,
+    days:         int           = 30,
+    noise_factor: float         = 0.15,
+    workers:      int           = 1,
+    chunksize:    Optional[int] = None,
 ) -> Dict:
+    """
+    ``workers`` > 1 runs the simulations in a process pool (0 = one per
+    core). Runs are handed out ``chunksize`` at a time (default: about eight
+    chunks per worker) and come back in run order, so the results match
+    ``workers=1`` exactly for the same ``n_runs`` and ``days``.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, n_runs))
+
     print(f"\n{'='*70}")
-    print(f"MONTE CARLO | {n_runs} runs | {days} days | Noise: ±{noise_factor*100:.0f}%")
+    print(f"MONTE CARLO | {n_runs} runs | {days} days | Noise: ±{noise_factor*100:.0f}% | "
+          f"Workers: {workers}")
     print(f"{'='*70}\n")
 
-    all_results: List[Dict] = []
+    aggregate  = MonteCarloAggregate()
     start_time = time.time()
+    run        = partial(_monte_carlo_run, days=days)
+
+    if workers == 1:
+        pool    = None
+        results = map(run, range(n_runs))
+    else:
+        chunksize = chunksize or max(1, n_runs // (workers * 8))
+        pool      = multiprocessing.Pool(workers, initializer=_init_monte_carlo_worker)
+        results   = pool.imap(run, range(n_runs), chunksize=chunksize)
+
+    try:
+        for done, (run_idx, summary, error) in enumerate(results, 1):
+            if error is not None:
+                print(f"  Run {run_idx} failed: {error}")
+            else:
+                aggregate.add(summary)
 
-    market_states = list(MarketState)
-
-    for run_idx in range(n_runs):
-        seed          = run_idx * 7 + 42
-        initial_state = random.choice(market_states)
+            if done % 100 == 0:
+                elapsed = time.time() - start_time
+                print(f"  Progress: {done}/{n_runs} runs | {elapsed:.1f}s elapsed")
+    finally:
+        if pool is not None:
+            pool.terminate()
 
-        try:
-            result = run_single_simulation(
-                days           = days,
-                market_state   = initial_state,
-                seed           = seed,
-                verbose        = False,
-                include_alerts = (run_idx % 10 == 0),
-            )
-            all_results.append(result)
-        except Exception as e:
-            print(f"  Run {run_idx} failed: {e}")
-
-        if (run_idx + 1) % 100 == 0:
-            elapsed = time.time() - start_time
-            print(f"  Progress: {run_idx+1}/{n_runs} runs | {elapsed:.1f}s elapsed")
-
-    assertion_rates = [r['assertion_pass_rate'] for r in all_results]
-
-    agent_scores: Dict[str, List[float]]    = {}
-    agent_zones:  Dict[str, Dict[str, int]] = {}
-    agent_status: Dict[str, Dict[str, int]] = {}
-
-    for result in all_results:
-        for addr, data in result['final_watchlist_scores'].items():
-            name = data['name']
-            if name not in agent_scores:
-                agent_scores[name] = []
-                agent_zones[name]  = {}
-                agent_status[name] = {}
-
-            agent_scores[name].append(data['score'])
-            zone   = data['zone']
-            status = data['status']
-            agent_zones[name][zone]    = agent_zones[name].get(zone, 0) + 1
-            agent_status[name][status] = agent_status[name].get(status, 0) + 1
-
-    strategy_results = [
-        r['alert_strategy_comparison']
-        for r in all_results
-        if r.get('alert_strategy_comparison')
-    ]
-
-    def _confidence_interval(data: List[float], confidence: float = 0.95) -> Tuple:
-        if not data:
-            return (0, 0, 0)
-        n    = len(data)
-        mean = statistics.mean(data)
-        if n < 2:
-            return (mean, mean, mean)
-        std    = statistics.stdev(data)
-        margin = 2 * std / (n ** 0.5)
-        return (round(mean - margin, 2), round(mean, 2), round(mean + margin, 2))
-
-    monte_carlo_results = {
-        'runs_completed':      len(all_results),
-        'assertion_pass_rate': {
-            'mean': round(statistics.mean(assertion_rates), 1) if assertion_rates else 0,
-            'min':  round(min(assertion_rates), 1)             if assertion_rates else 0,
-            'max':  round(max(assertion_rates), 1)             if assertion_rates else 0,
-        },
-        'per_agent_confidence_intervals': {
-            name: {
-                'score_95ci':  _confidence_interval(agent_scores[name]),
-                'zone_dist':   {k: round(v / len(all_results) * 100, 1)
-                                for k, v in agent_zones[name].items()},
-                'status_dist': {k: round(v / len(all_results) * 100, 1)
-                                for k, v in agent_status[name].items()},
-            }
-            for name in agent_scores
-        },
-        'alert_strategy': {
-            'pct_runs_immediate_wins': round(
-                sum(1 for r in strategy_results
-                    if r.get('recommendation') == 'immediate')
-                / len(strategy_results) * 100, 1
-            ) if strategy_results else 0,
-        },
-        'elapsed_seconds': round(time.time() - start_time, 1),
-    }
+    monte_carlo_results = aggregate.results()
+    monte_carlo_results['elapsed_seconds'] = round(time.time() - start_time, 1)
 
     print(f"\n{'='*70}")
     print("MONTE CARLO RESULTS")
     print(f"{'='*70}")
-    print(f"Runs completed: {len(all_results)}/{n_runs}")
+    print(f"Runs completed: {aggregate.runs_completed}/{n_runs}")
     print(f"Avg assertion pass rate: {monte_carlo_results['assertion_pass_rate']['mean']}%")
     print(f"\nAgent Score Confidence Intervals (95%):")
     print(f"{'Agent':<30} {'Low':>8} {'Mean':>8} {'High':>8} {'Elite%':>8}")
@@ -1352,6 +1446,8 @@ if __name__ == "__main__":
     parser.add_argument('--days',   type=int, default=30)
     parser.add_argument('--runs',   type=int, default=100)
     parser.add_argument('--seed',   type=int, default=42)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Monte Carlo worker processes (0 = one per core)')
     parser.add_argument('--market',
                         choices=['bull', 'bear', 'neutral', 'crash', 'squeeze'],
                         default='bull')
@@ -1377,8 +1473,9 @@ if __name__ == "__main__":
 
     elif args.mode == 'monte_carlo':
         result = run_monte_carlo(
-            n_runs = args.runs,
-            days   = args.days,
+            n_runs  = args.runs,
+            days    = args.days,
+            workers = args.workers,
         )
 
     if args.output and result:
@@ -31,7 +31,7 @@ FIXES IN THIS VERSION:
 import random
 import statistics
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 import mesa
 
@@ -310,7 +310,9 @@ class TraderAgentBase(mesa.Agent):
     ):
         super().__init__(unique_id, model)
         
-        self.personality     = personality
+        # Own copy: agents that degrade (Hank) rewrite their personality, and the
+        # PERSONALITY_* constants must start every run unchanged.
+        self.personality     = replace(personality)
         self.wallet_address  = wallet_address
         self.llm_chain       = llm_chain
         self.background      = background
@@ -1,24 +1,43 @@
 """
 Celery task: back up ClickHouse analytics tables to Supabase PostgreSQL.
 
-Runs weekly (Monday 2:00 AM UTC) via Beat schedule.  Each CH table is read
-in 1 000-row batches using SELECT ... FINAL and upserted into a mirrored
-Supabase table prefixed with ``ch_backup_``.
+Runs weekly (Monday 2:00 AM UTC) via Beat schedule.  Each run copies only the
+rows whose ``updated_at`` (the ReplacingMergeTree version column) falls in
+the window since the table's last completed backup, and upserts them into a
+mirrored Supabase table prefixed with ``ch_backup_``.
+
+Per-table checkpoints live in the Redis hash ``kys:ch_backup:checkpoints``:
+
+    {"since": <iso>, "until": <iso>, "after": [<ch_key values>] | null}
+
+``until`` stops WATERMARK_LAG short of now so rows written with a slightly
+older ``updated_at`` are not skipped. Inside a window, rows are read by keyset
+on the table's sort key (``ch_key``) and streamed in native blocks. Each
+key's latest version is taken with LIMIT 1 BY rather than FINAL. ``after`` is
+saved after every upserted batch, so an interrupted backup resumes from
+where it stopped. A window is complete once ``after`` is null, and the next
+run starts at its ``until``.
 """
 
+import json
 import logging
-from datetime import datetime, date
+import time
+from datetime import datetime, date, timedelta, timezone
 
 from celery_app import celery
 from services.clickhouse_client import get_clickhouse_client, CH_DATABASE
+from services.redis_pool import get_redis_client
 from services.supabase_client import get_supabase_client, SCHEMA_NAME
 
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 1_000
+CHECKPOINT_KEY = "kys:ch_backup:checkpoints"
+WATERMARK_LAG = timedelta(minutes=5)
+_EPOCH = datetime(1970, 1, 1)
 
 # ── table definitions ───────────────────────────────────────────────
-# (ch_table, supabase_table, columns, on_conflict key(s))
+# (ch_table, supabase_table, columns, on_conflict key(s), ch_key = CH sort key)
 TABLE_SPECS = [
     {
         "ch_table": "token_scans",
@@ -30,6 +49,7 @@ TABLE_SPECS = [
             "token_symbol", "token_name", "updated_at",
         ],
         "on_conflict": "token_address,scan_id",
+        "ch_key": ["token_address", "scan_id"],
     },
     {
         "ch_table": "wallet_token_stats",
@@ -42,6 +62,7 @@ TABLE_SPECS = [
             "qualifies", "outcome", "wallet_source", "updated_at",
         ],
         "on_conflict": "wallet_address,token_address,scan_id",
+        "ch_key": ["wallet_address", "token_address"],
     },
     {
         "ch_table": "wallet_aggregate_stats",
@@ -52,6 +73,7 @@ TABLE_SPECS = [
             "professional_score", "tier", "consistency_score", "updated_at",
         ],
         "on_conflict": "wallet_address",
+        "ch_key": ["wallet_address"],
     },
 ]
 
@@ -63,97 +85,176 @@ def _serialize_value(val):
     return val
 
 
-def _backup_table(ch, supabase, spec: dict) -> dict:
-    """Stream one CH table into Supabase in batches. Returns stats dict."""
+def _utcnow() -> datetime:
+    """Naive UTC, matching the ``DateTime`` values ClickHouse returns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _load_checkpoint(r, ch_table: str) -> dict | None:
+    if r is None:
+        return None
+    try:
+        raw = r.hget(CHECKPOINT_KEY, ch_table)
+        return json.loads(raw) if raw else None
+    except Exception as exc:
+        logger.warning("[%s] checkpoint read failed, backing up in full: %s", ch_table, exc)
+        return None
+
+
+def _save_checkpoint(r, ch_table: str, checkpoint: dict) -> None:
+    if r is None:
+        return
+    try:
+        r.hset(CHECKPOINT_KEY, ch_table, json.dumps(checkpoint))
+    except Exception as exc:
+        logger.warning("[%s] checkpoint write failed: %s", ch_table, exc)
+
+
+def _plan_window(checkpoint: dict | None, now: datetime) -> dict:
+    """The window to copy this run: resume an unfinished one or start the next."""
+    if checkpoint and checkpoint.get("after") is not None:
+        return dict(checkpoint)
+    since = checkpoint["until"] if checkpoint else _EPOCH.isoformat()
+    return {"since": since, "until": (now - WATERMARK_LAG).isoformat(), "after": None}
+
+
+def _window_query(spec: dict, window: dict) -> tuple[str, dict]:
+    """Rows of one table changed in (since, until], latest version per key,
+    in key order after ``window['after']``."""
+    key = spec["ch_key"]
+    key_list = ", ".join(key)
+    where = ["updated_at > {since:DateTime}", "updated_at <= {until:DateTime}"]
+    params = {
+        "since": datetime.fromisoformat(window["since"]),
+        "until": datetime.fromisoformat(window["until"]),
+    }
+    if window.get("after") is not None:
+        where.append(
+            f"({key_list}) > ({', '.join('{a%d:String}' % i for i in range(len(key)))})"
+        )
+        params.update({f"a{i}": v for i, v in enumerate(window["after"])})
+    query = (
+        f"SELECT {', '.join(spec['columns'])} FROM `{CH_DATABASE}`.`{spec['ch_table']}` "
+        f"WHERE {' AND '.join(where)} "
+        f"ORDER BY {key_list}, updated_at DESC "
+        f"LIMIT 1 BY {key_list}"
+    )
+    return query, params
+
+
+def _backup_table(ch, supabase, spec: dict, r=None) -> dict:
+    """Stream one CH table's changed rows into Supabase in batches. Returns stats dict."""
     ch_table = spec["ch_table"]
     sb_table = spec["sb_table"]
     columns = spec["columns"]
     on_conflict = spec["on_conflict"]
+    key_idx = [columns.index(k) for k in spec["ch_key"]]
 
-    col_list = ", ".join(columns)
-    query = f"SELECT {col_list} FROM `{CH_DATABASE}`.`{ch_table}` FINAL"
+    window = _plan_window(_load_checkpoint(r, ch_table), _utcnow())
+    query, params = _window_query(spec, window)
+    resumed = window.get("after") is not None
 
     total_rows = 0
     total_upserted = 0
+    bytes_sent = 0
     errors = 0
+    started = time.monotonic()
 
-    # Read all rows via the client (returns list of dicts)
-    try:
-        rows = ch.query(query).named_results()
-    except Exception as exc:
-        logger.error("Failed to query CH table %s: %s", ch_table, exc)
+    def stats(**extra):
+        elapsed = time.monotonic() - started
         return {
             "table": ch_table,
-            "rows_read": 0,
-            "rows_upserted": 0,
-            "errors": 1,
-            "error_detail": str(exc),
+            "rows_read": total_rows,
+            "rows_upserted": total_upserted,
+            "bytes_sent": bytes_sent,
+            "rows_per_sec": round(total_upserted / elapsed, 1) if elapsed > 0 else 0.0,
+            "duration_s": round(elapsed, 2),
+            "since": window["since"],
+            "until": window["until"],
+            "resumed": resumed,
+            "errors": errors,
+            **extra,
         }
 
-    batch: list[dict] = []
-
-    for row in rows:
-        total_rows += 1
-        record = {col: _serialize_value(row[col]) for col in columns}
-        batch.append(record)
-
-        if len(batch) >= BATCH_SIZE:
-            try:
-                supabase.schema(SCHEMA_NAME).table(sb_table).upsert(
-                    batch, on_conflict=on_conflict
-                ).execute()
-                total_upserted += len(batch)
-                logger.info(
-                    "[%s] upserted batch (%d rows so far)", sb_table, total_upserted
-                )
-            except Exception as exc:
-                errors += 1
-                logger.error(
-                    "[%s] batch upsert failed at row %d: %s",
-                    sb_table, total_rows, exc,
-                )
-            batch = []
-
-    # flush remaining rows
-    if batch:
+    def flush(batch: list[dict], last_key: list) -> bool:
+        nonlocal total_upserted, bytes_sent, errors
+        payload = [{col: _serialize_value(v) for col, v in zip(columns, row)} for row in batch]
         try:
             supabase.schema(SCHEMA_NAME).table(sb_table).upsert(
-                batch, on_conflict=on_conflict
+                payload, on_conflict=on_conflict
             ).execute()
-            total_upserted += len(batch)
-            logger.info(
-                "[%s] upserted final batch (%d rows total)", sb_table, total_upserted
-            )
         except Exception as exc:
             errors += 1
-            logger.error("[%s] final batch upsert failed: %s", sb_table, exc)
+            logger.error(
+                "[%s] batch upsert failed at row %d, will resume from checkpoint: %s",
+                sb_table, total_rows, exc,
+            )
+            return False
+        total_upserted += len(payload)
+        bytes_sent += len(json.dumps(payload, default=str))
+        window["after"] = last_key
+        _save_checkpoint(r, ch_table, window)
+        logger.info("[%s] upserted batch (%d rows so far)", sb_table, total_upserted)
+        return True
 
-    return {
-        "table": ch_table,
-        "rows_read": total_rows,
-        "rows_upserted": total_upserted,
-        "errors": errors,
-    }
+    batch: list = []
+    try:
+        with ch.query_row_block_stream(query, parameters=params) as stream:
+            for block in stream:
+                for row in block:
+                    total_rows += 1
+                    batch.append(row)
+                    if len(batch) >= BATCH_SIZE:
+                        if not flush(batch, [row[i] for i in key_idx]):
+                            return stats()
+                        batch = []
+    except Exception as exc:
+        logger.error("Failed to query CH table %s: %s", ch_table, exc)
+        return stats(errors=errors + 1, error_detail=str(exc))
+
+    # flush remaining rows
+    if batch and not flush(batch, [batch[-1][i] for i in key_idx]):
+        return stats()
+
+    _save_checkpoint(r, ch_table, {"since": window["since"], "until": window["until"], "after": None})
+    result = stats()
+    logger.info(
+        "[%s] backup window (%s, %s] done: %d rows, %d bytes, %.1f rows/s",
+        sb_table, window["since"], window["until"],
+        total_upserted, bytes_sent, result["rows_per_sec"],
+    )
+    return result
 
 
 @celery.task(name="tasks.backup_clickhouse_to_supabase", bind=True, max_retries=2)
-def backup_clickhouse_to_supabase(self):
-    """Back up all ClickHouse analytics tables to Supabase PostgreSQL."""
-    logger.info("Starting ClickHouse -> Supabase backup")
+def backup_clickhouse_to_supabase(self, full: bool = False):
+    """Back up all ClickHouse analytics tables to Supabase PostgreSQL.
+
+    ``full=True`` drops the checkpoints first and copies every table from scratch.
+    """
+    logger.info("Starting ClickHouse -> Supabase backup (full=%s)", full)
 
     ch = get_clickhouse_client()
     supabase = get_supabase_client()
+    try:
+        r = get_redis_client()
+        if full:
+            r.delete(CHECKPOINT_KEY)
+    except Exception as exc:
+        logger.warning("Redis unavailable, backing up without checkpoints: %s", exc)
+        r = None
     results = []
 
     for spec in TABLE_SPECS:
         logger.info("Backing up %s -> %s ...", spec["ch_table"], spec["sb_table"])
-        stats = _backup_table(ch, supabase, spec)
+        stats = _backup_table(ch, supabase, spec, r)
         results.append(stats)
 
     summary = {
         "tables": len(results),
         "total_rows_read": sum(r["rows_read"] for r in results),
         "total_rows_upserted": sum(r["rows_upserted"] for r in results),
+        "total_bytes_sent": sum(r["bytes_sent"] for r in results),
         "total_errors": sum(r["errors"] for r in results),
         "details": results,
     }
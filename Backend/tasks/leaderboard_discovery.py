@@ -32,6 +32,13 @@ logger = logging.getLogger(__name__)
 LEADERBOARD_SEEN_PREFIX = "kys:lb_seen:"
 LEADERBOARD_SEEN_TTL = 86400 * 7  # 7 days per wallet
 
+# Last-seen updated_at per wallet (epoch seconds, "0" = no rows), so repeat
+# scans within the hour skip the ClickHouse recency query entirely.
+LEADERBOARD_RECENCY_PREFIX = "kys:lb_recency:"
+LEADERBOARD_RECENCY_TTL = 3600
+RECENCY_SKIP_HOURS = 24
+RECENCY_QUERY_CHUNK = 1000
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -68,6 +75,70 @@ def _parse_timestamp(ts) -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _filter_recent_wallets(r, ch, wallets: list[str], stats: dict) -> list[str]:
+    """Drop wallets already seen or updated in ClickHouse within RECENCY_SKIP_HOURS.
+
+    Seen markers and cached recency come back in one Redis pipeline; the
+    remaining wallets are looked up with one grouped ClickHouse query per
+    RECENCY_QUERY_CHUNK wallets and cached. Fills ``stats`` with
+    recency_queries / recency_cache_hits / recency_ms.
+    """
+    started = time.monotonic()
+    stats.update(recency_queries=0, recency_cache_hits=0)
+
+    pipe = r.pipeline()
+    for wallet_addr in wallets:
+        pipe.exists(f"{LEADERBOARD_SEEN_PREFIX}{wallet_addr}")
+    for wallet_addr in wallets:
+        pipe.get(f"{LEADERBOARD_RECENCY_PREFIX}{wallet_addr}")
+    replies = pipe.execute()
+    seen, cached = replies[:len(wallets)], replies[len(wallets):]
+
+    candidates = [w for w, s in zip(wallets, seen) if not s]
+    last_seen: dict[str, float] = {}
+    misses: list[str] = []
+    for wallet_addr, s, value in zip(wallets, seen, cached):
+        if s:
+            continue
+        if value is not None:
+            last_seen[wallet_addr] = float(value)
+            stats["recency_cache_hits"] += 1
+        else:
+            misses.append(wallet_addr)
+
+    # max(updated_at) over all versions equals the latest version's, so no FINAL.
+    fetched: dict[str, float] = {}
+    for i in range(0, len(misses), RECENCY_QUERY_CHUNK):
+        chunk = misses[i:i + RECENCY_QUERY_CHUNK]
+        try:
+            stats["recency_queries"] += 1
+            result = ch.query(
+                "SELECT wallet_address, max(updated_at) FROM wallet_token_stats "
+                "WHERE wallet_address IN ({addrs:Array(String)}) "
+                "GROUP BY wallet_address",
+                parameters={"addrs": chunk},
+            )
+        except Exception as exc:
+            logger.warning("[LEADERBOARD] Recency query failed for %d wallets: %s", len(chunk), exc)
+            continue
+        for wallet_addr, last_updated in result.result_rows:
+            if isinstance(last_updated, datetime):
+                fetched[wallet_addr] = last_updated.replace(tzinfo=timezone.utc).timestamp()
+        for wallet_addr in chunk:
+            fetched.setdefault(wallet_addr, 0.0)
+
+    if fetched:
+        pipe = r.pipeline()
+        for wallet_addr, ts in fetched.items():
+            pipe.setex(f"{LEADERBOARD_RECENCY_PREFIX}{wallet_addr}", LEADERBOARD_RECENCY_TTL, int(ts))
+        pipe.execute()
+        last_seen.update(fetched)
+
+    cutoff = time.time() - RECENCY_SKIP_HOURS * 3600
+    stats["recency_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return [w for w in candidates if last_seen.get(w, 0.0) <= cutoff]
+
+
 def _is_conviction(pos: dict) -> bool:
     """Return True if position shows conviction (real commitment + 4x return)."""
     invested = float(pos.get("invested") or 0)
@@ -108,6 +179,7 @@ def leaderboard_discovery_scan(self):
     """Discover top wallets from the SolanaTracker V2 leaderboard, fetch their
     positions and enrichment data, and populate ClickHouse wallet_token_stats rows."""
 
+    scan_started = time.monotonic()
     try:
         r = get_redis_client()
 
@@ -169,35 +241,17 @@ def leaderboard_discovery_scan(self):
             if c.get("wallet") or c.get("walletAddress")
         ]
 
-        wallets_to_process: list[str] = []
-        for wallet_addr in top_wallets:
-            if r.exists(f"{LEADERBOARD_SEEN_PREFIX}{wallet_addr}"):
-                continue
-
-            # Check ClickHouse recency — skip if updated within 24 hours
-            try:
-                result = ch.query(
-                    "SELECT max(updated_at) FROM wallet_token_stats FINAL "
-                    "WHERE wallet_address = {addr:String}",
-                    parameters={"addr": wallet_addr},
-                )
-                if result.result_rows and result.result_rows[0][0]:
-                    last_updated = result.result_rows[0][0]
-                    if isinstance(last_updated, datetime):
-                        age_hours = (
-                            datetime.now(timezone.utc) - last_updated.replace(tzinfo=timezone.utc)
-                        ).total_seconds() / 3600
-                        if age_hours < 24:
-                            continue
-            except Exception:
-                pass
-
-            wallets_to_process.append(wallet_addr)
+        recency_stats: dict[str, Any] = {}
+        wallets_to_process = _filter_recent_wallets(r, ch, top_wallets, recency_stats)
 
         logger.info(
-            "[LEADERBOARD] %d wallets to process after filtering (from %d top-100)",
+            "[LEADERBOARD] %d wallets to process after filtering (from %d top-100) "
+            "recency_queries=%d cache_hits=%d recency_ms=%.1f",
             len(wallets_to_process),
             len(top_wallets),
+            recency_stats["recency_queries"],
+            recency_stats["recency_cache_hits"],
+            recency_stats["recency_ms"],
         )
 
         # =================================================================
@@ -700,6 +754,8 @@ def leaderboard_discovery_scan(self):
             "processed": len(wallet_positions),
             "rows_inserted": len(rows),
             "tokens_fetched": len(unique_tokens),
+            **recency_stats,
+            "duration_s": round(time.monotonic() - scan_started, 1),
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
@@ -23,16 +23,19 @@ import requests
 from celery_app import celery
 from services.clickhouse_client import get_clickhouse_client, insert_token_scans
 from services.http_session import get_http_session
+from services.known_tokens import KNOWN_TOKENS_KEY, claim as claim_known_tokens
 from services.redis_pool import get_redis_client
 
 SOLANATRACKER_BASE = "https://data.solanatracker.io"
 SOLANATRACKER_KEY = os.environ.get('SOLANATRACKER_API_KEY', '')
 
 # Redis keys
-KNOWN_TOKENS_KEY = 'kys:known_tokens'        # SET of all seen token addresses (30d TTL)
+# KNOWN_TOKENS_KEY: ZSET of seen token addresses, rolling 30d (services/known_tokens.py)
 PENDING_TOKENS_KEY = 'kys:pending_tokens'     # SET of tokens awaiting second-pass (30d TTL)
 QUALIFIED_TOKENS_KEY = 'kys:qualified_tokens'  # SET of tokens that passed 10x filter
 
+DISPATCH_BATCH = 100  # tasks per celery group publish
+
 
 def get_redis():
     """Return a Redis client from the shared connection pool."""
@@ -100,98 +103,112 @@ def build_token_scan_row(token_data: dict, endpoint: str) -> dict:
     }
 
 
+def _token_address(token: dict) -> str:
+    token_info = token.get('token', token)
+    return token_info.get('mint', token_info.get('address', token.get('address', '')))
+
+
+def _dispatch(task, arg_tuples: list) -> int:
+    """Publish ``task`` for each args tuple, DISPATCH_BATCH messages per group."""
+    from celery import group
+    for i in range(0, len(arg_tuples), DISPATCH_BATCH):
+        group(task.s(*args) for args in arg_tuples[i:i + DISPATCH_BATCH]).apply_async()
+    return len(arg_tuples)
+
+
+def _register_new(r, candidates: dict) -> list:
+    """Claim ``candidates`` (addr -> (token, discovered_via)) in the known-token
+    registry; mark the new ones pending and return their scan rows."""
+    new_addrs = claim_known_tokens(r, candidates.keys())
+    if not new_addrs:
+        return []
+    pipe = r.pipeline(transaction=False)
+    pipe.sadd(PENDING_TOKENS_KEY, *new_addrs)
+    pipe.expire(PENDING_TOKENS_KEY, 86400 * 30)
+    pipe.execute()
+
+    rows = []
+    for addr in new_addrs:
+        token, discovered_via = candidates[addr]
+        row = build_token_scan_row(token, discovered_via)
+        if row['token_address']:
+            rows.append(row)
+    return rows
+
+
 @celery.task(bind=True, max_retries=3, default_retry_delay=30, name='tasks.discover_new_tokens')
 def discover_new_tokens(self):
     """
     Poll just_graduated, newly_launched, trending_runners.
-    For each new token not already in kys:known_tokens Redis set:
+    For each new token not already in the kys:known_tokens registry:
       - Insert into token_scans
       - Enqueue wallet_qualification_scan task (first_pass)
     For tokens already in kys:pending_tokens that appear on trending_runners:
       - Enqueue second_pass_patch task
+    Registry checks are one pipeline per phase and tasks go out in groups.
     """
+    from tasks.wallet_qualification import second_pass_patch, wallet_qualification_scan
+
     r = get_redis()
-    scan_rows = []
-    new_count = 0
-    second_pass_count = 0
+    started = time.monotonic()
 
     # -- First-pass: just_graduated + newly_launched --
     first_pass_endpoints = [
         ('tokens/multi/graduated', 'just_graduated'),
         ('tokens/latest', 'newly_launched'),
     ]
+    candidates: dict = {}
     for api_endpoint, discovered_via in first_pass_endpoints:
         tokens = fetch_solanatracker(api_endpoint)
         time.sleep(1)  # Rate limit padding between endpoints
         for token in tokens:
-            token_info = token.get('token', token)
-            addr = token_info.get('mint', token_info.get('address', token.get('address', '')))
-            if not addr:
-                continue
-
-            # Skip if already known
-            if r.sismember(KNOWN_TOKENS_KEY, addr):
-                continue
-
-            # Mark as known (30-day TTL on the set)
-            r.sadd(KNOWN_TOKENS_KEY, addr)
-            r.expire(KNOWN_TOKENS_KEY, 86400 * 30)
-
-            # Also mark as pending second-pass
-            r.sadd(PENDING_TOKENS_KEY, addr)
-            r.expire(PENDING_TOKENS_KEY, 86400 * 30)
-
-            # Build scan row
-            row = build_token_scan_row(token, discovered_via)
-            if row['token_address']:
-                scan_rows.append(row)
-                new_count += 1
-
-                # Enqueue first-pass wallet scan
-                from tasks.wallet_qualification import wallet_qualification_scan
-                wallet_qualification_scan.delay(addr, 'first_pass')
+            addr = _token_address(token)
+            if addr and addr not in candidates:
+                candidates[addr] = (token, discovered_via)
+    scan_rows = _register_new(r, candidates)
 
     # -- Second-pass: trending_runners --
     time.sleep(2)  # Rate limit padding
-    runners = fetch_solanatracker('tokens/trending')
-    for token in runners:
-        token_info = token.get('token', token)
-        addr = token_info.get('mint', token_info.get('address', token.get('address', '')))
-        if not addr:
-            continue
-
-        if r.sismember(PENDING_TOKENS_KEY, addr):
-            # Token was first-pass scanned, now trending -- run second pass
-            from tasks.wallet_qualification import second_pass_patch
-            second_pass_patch.delay(addr, token)
-            second_pass_count += 1
-        elif not r.sismember(KNOWN_TOKENS_KEY, addr):
-            # Brand new from trending -- add and first-pass scan
-            r.sadd(KNOWN_TOKENS_KEY, addr)
-            r.expire(KNOWN_TOKENS_KEY, 86400 * 30)
-
-            r.sadd(PENDING_TOKENS_KEY, addr)
-            r.expire(PENDING_TOKENS_KEY, 86400 * 30)
-
-            row = build_token_scan_row(token, 'trending_runners')
-            if row['token_address']:
-                scan_rows.append(row)
-                new_count += 1
-
-                from tasks.wallet_qualification import wallet_qualification_scan
-                wallet_qualification_scan.delay(addr, 'first_pass')
+    runners = {}
+    for token in fetch_solanatracker('tokens/trending'):
+        addr = _token_address(token)
+        if addr and addr not in runners:
+            runners[addr] = token
+
+    second_pass = []
+    trending_candidates: dict = {}
+    if runners:
+        pipe = r.pipeline(transaction=False)
+        for addr in runners:
+            pipe.sismember(PENDING_TOKENS_KEY, addr)
+        for addr, pending in zip(runners, pipe.execute()):
+            if pending:
+                # Token was first-pass scanned, now trending -- run second pass
+                second_pass.append((addr, runners[addr]))
+            else:
+                # Brand new from trending (if unclaimed) -- add and first-pass scan
+                trending_candidates[addr] = (runners[addr], 'trending_runners')
+    scan_rows += _register_new(r, trending_candidates)
+
+    first_pass_count = _dispatch(
+        wallet_qualification_scan, [(row['token_address'], 'first_pass') for row in scan_rows]
+    )
+    second_pass_count = _dispatch(second_pass_patch, second_pass)
 
     # Bulk insert all new token scans into ClickHouse
     if scan_rows:
         try:
-            insert_token_scans(scan_rows)
+            insert_token_scans(scan_rows, buffered=True)
         except Exception as e:
             print(f"[TOKEN DISCOVERY] ClickHouse insert error: {e}")
 
     result = {
-        'new_tokens': new_count,
+        'new_tokens': first_pass_count,
         'second_pass_triggered': second_pass_count,
         'total_scanned': len(scan_rows),
+        'candidates': len(candidates) + len(runners),
+        'known_tokens': r.zcard(KNOWN_TOKENS_KEY),
+        'duration_ms': round((time.monotonic() - started) * 1000, 1),
         'timestamp': datetime.utcnow().isoformat(),
     }
     print(f"[TOKEN DISCOVERY] {result}")
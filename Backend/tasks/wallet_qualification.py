@@ -13,12 +13,18 @@ SolanaTracker V2 endpoints (migrated from deprecated V1):
 """
 
 import logging
+import os
 import time
 import uuid
 from datetime import datetime, timezone
 
+import numpy as np
+
 from celery_app import celery
-from services.clickhouse_client import insert_token_scans, insert_wallet_token_stats
+from services.clickhouse_client import (
+    insert_token_scans,
+    insert_wallet_token_stats_columns,
+)
 from services.redis_pool import get_redis_client
 from services.solana_tracker_client import get_st_client
 
@@ -394,6 +400,146 @@ def _disqualified_row(
     }
 
 
+# ===================================================================
+# Columnar builder
+# ===================================================================
+
+def _uuid4_strings(n: int) -> list[str]:
+    """``n`` random UUID4 strings from one urandom call."""
+    raw = np.frombuffer(os.urandom(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = raw.tobytes().hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * n, 32)
+    ]
+
+
+def _parse_timestamps(raw: list, now: datetime) -> list[datetime]:
+    """Vectorised _parse_timestamp: epoch values are scaled as arrays.
+
+    Strings and other odd values go through _parse_timestamp one by one;
+    missing values become ``now``.
+    """
+    numeric = np.array(
+        [t if isinstance(t, (int, float)) and not isinstance(t, bool) and t > 0 else 0.0 for t in raw],
+        dtype=np.float64,
+    )
+    secs = np.where(numeric > 1e15, numeric / 1e6, np.where(numeric > 1e12, numeric / 1e3, numeric))
+    utc = timezone.utc
+    return [
+        datetime.fromtimestamp(s, tz=utc) if s > 0
+        else now if t is None else _parse_timestamp(t)
+        for s, t in zip(secs.tolist(), raw)
+    ]
+
+
+def build_wallet_token_stats_columns(
+    wallet_list: list[dict],
+    token_address: str,
+    pass_type: str,
+    token_ath_mult: float = 0.0,
+    first_buyers_wallets: list[str] | None = None,
+) -> dict[str, list]:
+    """Columnar equivalent of build_wallet_token_stats_row over a whole token.
+
+    The V2 payloads are parsed once per wallet; floors, multipliers, outcome,
+    early-entry rank and rounding are then computed as NumPy arrays. Returns
+    wallet_token_stats columns (same names and order as the row dicts) as
+    plain lists, ready for insert_wallet_token_stats_columns. Values match the
+    row builder's, except that ``np.round`` can differ from ``round`` in the
+    last digit on exact halfway cases.
+    """
+    n = len(wallet_list)
+    fields = [_extract_v2_fields(w.get("pnl_data", {})) for w in wallet_list]
+    wallets = [w["wallet"] for w in wallet_list]
+    realized = np.fromiter((f["realized"] for f in fields), dtype=np.float64, count=n)
+    unrealized = np.fromiter((f["unrealized"] for f in fields), dtype=np.float64, count=n)
+    invested = np.fromiter((f["total_invested"] for f in fields), dtype=np.float64, count=n)
+    avg_buy = np.fromiter((f["avg_buy"] for f in fields), dtype=np.float64, count=n)
+
+    if pass_type == "first":
+        min_spend, min_roi = FIRST_PASS_MIN_SPEND, FIRST_PASS_MIN_ROI
+    else:
+        min_spend, min_roi = SECOND_PASS_MIN_SPEND, SECOND_PASS_MIN_ROI
+
+    # The spend floor is positive, so every row past it has invested > 0
+    # (the row builder's "return None" case cannot occur here).
+    has_invested = invested > 0
+    denom = np.where(has_invested, invested, 1.0)
+    realized_mult = np.where(has_invested, (realized + invested) / denom, 0.0)
+    total_mult = np.where(has_invested, (realized + unrealized + invested) / denom, 0.0)
+
+    below_spend = invested < min_spend
+    below_roi = ~below_spend & (realized_mult < min_roi)
+    passed = ~(below_spend | below_roi)
+
+    # Outcome: _compute_outcome over the rows that passed both floors.
+    if pass_type == "first":
+        outcome = np.full(n, "open", dtype=object)
+        qualifies = np.zeros(n, dtype=np.int64)
+    else:
+        wins = realized_mult > WIN_WALLET_MULT
+        draws = ~wins & (np.abs(realized_mult - WIN_WALLET_MULT) < 0.5)
+        outcome = np.where(wins, "win", np.where(draws, "draw", "loss")).astype(object)
+        qualifies = wins.astype(np.int64)
+    outcome[~passed] = "open" if pass_type == "first" else "loss"
+    qualifies[~passed] = 0
+
+    # Early entry: rank of the wallet's first appearance among first buyers.
+    entry_launch = np.zeros(n)
+    if first_buyers_wallets:
+        rank: dict[str, int] = {}
+        for i, w in enumerate(first_buyers_wallets):
+            rank.setdefault(w, i)
+        pos = np.fromiter((rank.get(w, -1) for w in wallets), dtype=np.float64, count=n)
+        found = passed & (pos >= 0)
+        pct = np.maximum(0.01, pos / max(len(first_buyers_wallets), 1))
+        entry_launch = np.where(found, np.round(1.0 / pct, 4), 0.0)
+
+    entry_to_ath = np.zeros(n)
+    if token_ath_mult > 0:
+        priced = passed & (avg_buy > 0)
+        entry_to_ath = np.where(priced, np.round(token_ath_mult / np.where(priced, avg_buy, 1.0), 4), 0.0)
+
+    reason = np.full(n, "", dtype=object)
+    reason[below_spend] = f"spend_below_{min_spend}"
+    reason[below_roi] = f"roi_below_{min_roi}x"
+
+    source = np.array([w.get("source", "unknown") for w in wallet_list], dtype=object)
+    source[~passed] = "disqualified"
+
+    now = datetime.now(timezone.utc)
+    spent = np.round(invested, 2).tolist()
+    return {
+        "wallet_address": wallets,
+        "token_address": [token_address] * n,
+        "scan_id": _uuid4_strings(n),
+        "first_entry_price": avg_buy.tolist(),
+        "first_entry_usd": spent,
+        "first_entry_timestamp": _parse_timestamps([f["first_buy_ms"] for f in fields], now),
+        "entry_price_to_launch_mult": entry_launch.tolist(),
+        "avg_entry_price": avg_buy.tolist(),
+        "avg_entry_to_ath_mult": entry_to_ath.tolist(),
+        "all_buys": ["[]"] * n,
+        "all_sells": ["[]"] * n,
+        "buy_count": [f["buy_count"] for f in fields],
+        "sell_count": [f["sell_count"] for f in fields],
+        "total_spent_usd": list(spent),
+        "realized_pnl_usd": np.round(realized, 2).tolist(),
+        "unrealized_pnl_usd": np.round(unrealized, 2).tolist(),
+        "total_pnl_usd": np.round(realized + unrealized, 2).tolist(),
+        "realized_roi_mult": np.round(realized_mult, 4).tolist(),
+        "total_roi_mult": np.round(total_mult, 4).tolist(),
+        "qualifies": qualifies.tolist(),
+        "outcome": outcome.tolist(),
+        "disqualify_reason": reason.tolist(),
+        "wallet_source": source.tolist(),
+        "updated_at": [now] * n,
+    }
+
+
 # ===================================================================
 # Celery tasks
 # ===================================================================
@@ -430,22 +576,21 @@ def wallet_qualification_scan(self, token_address: str, pass_type: str = "first"
         token_ath_price = _get_token_ath_mult(token_address)
         first_buyers_wallets = _get_first_buyers_wallets(token_address)
 
-        # 3. Build rows
-        rows = []
-        for wdata in wallet_list:
-            row = build_wallet_token_stats_row(
-                wdata, token_address, pass_type, token_ath_price,
-                first_buyers_wallets=first_buyers_wallets,
-            )
-            if row is not None:
-                rows.append(row)
+        # 3. Build rows as columns
+        columns = build_wallet_token_stats_columns(
+            wallet_list, token_address, pass_type, token_ath_price,
+            first_buyers_wallets=first_buyers_wallets,
+        )
+        rows_inserted = len(columns["wallet_address"])
 
-        # 4. Bulk insert into ClickHouse (materialized view auto-fires)
-        if rows:
-            insert_wallet_token_stats(rows)
+        # 4. Bulk insert into ClickHouse (materialized view auto-fires).
+        # acks_late: the rows must be stored before the task returns, so the
+        # server batches them (async_insert) rather than the process buffer.
+        if rows_inserted:
+            insert_wallet_token_stats_columns(columns, async_insert=True)
             logger.info(
                 "Inserted %d wallet_token_stats rows for token=%s pass=%s",
-                len(rows),
+                rows_inserted,
                 token_address[:12],
                 pass_type,
             )
@@ -473,7 +618,7 @@ def wallet_qualification_scan(self, token_address: str, pass_type: str = "first"
             "token_name": "",
             "updated_at": now,
         }
-        insert_token_scans([scan_row])
+        insert_token_scans([scan_row], async_insert=True)
 
         # 6. On first-pass: add token to Redis pending set
         if pass_type == "first":
@@ -485,8 +630,8 @@ def wallet_qualification_scan(self, token_address: str, pass_type: str = "first"
             "token": token_address,
             "pass": pass_type,
             "wallets_found": len(wallet_list),
-            "rows_inserted": len(rows),
-            "qualified": sum(1 for r in rows if r.get("qualifies") == 1),
+            "rows_inserted": rows_inserted,
+            "qualified": sum(columns["qualifies"]),
         }
 
     except Exception as exc:
@@ -544,26 +689,23 @@ def second_pass_patch(self, token_address: str, token_data: dict | None = None):
 
         # 3. Build rows with second-pass thresholds
         first_buyers_wallets = _get_first_buyers_wallets(token_address)
-        rows = []
-        for wdata in wallet_list:
-            row = build_wallet_token_stats_row(
-                wdata, token_address, "second", token_ath_price,
-                first_buyers_wallets=first_buyers_wallets,
-            )
-            if row is not None:
-                rows.append(row)
+        columns = build_wallet_token_stats_columns(
+            wallet_list, token_address, "second", token_ath_price,
+            first_buyers_wallets=first_buyers_wallets,
+        )
+        rows_inserted = len(columns["wallet_address"])
 
         # 4. Bulk insert (ReplacingMergeTree deduplicates)
-        if rows:
-            insert_wallet_token_stats(rows)
+        if rows_inserted:
+            insert_wallet_token_stats_columns(columns, async_insert=True)
             logger.info(
                 "Inserted %d second-pass rows for token=%s",
-                len(rows),
+                rows_inserted,
                 token_address[:12],
             )
 
         # 5. Update token_scans
-        qualified_count = sum(1 for r in rows if r.get("qualifies") == 1)
+        qualified_count = sum(columns["qualifies"])
         now = datetime.now(timezone.utc)
         scan_row = {
             "token_address": token_address,
@@ -586,7 +728,7 @@ def second_pass_patch(self, token_address: str, token_data: dict | None = None):
             "token_name": "",
             "updated_at": now,
         }
-        insert_token_scans([scan_row])
+        insert_token_scans([scan_row], async_insert=True)
 
         # 6. Move token between Redis sets
         r = _get_redis()
@@ -605,7 +747,7 @@ def second_pass_patch(self, token_address: str, token_data: dict | None = None):
             "status": "completed",
             "ath_mult": round(token_ath_mult, 2),
             "wallets_found": len(wallet_list),
-            "rows_inserted": len(rows),
+            "rows_inserted": rows_inserted,
             "qualified": qualified_count,
         }
 
@@ -618,11 +760,50 @@ def second_pass_patch(self, token_address: str, token_data: dict | None = None):
 # One-time requalification task
 # ===================================================================
 
+REQUALIFY_COLUMNS = [
+    'wallet_address', 'token_address', 'scan_id',
+    'first_entry_price', 'first_entry_usd', 'first_entry_timestamp',
+    'entry_price_to_launch_mult', 'avg_entry_price', 'avg_entry_to_ath_mult',
+    'all_buys', 'all_sells', 'buy_count', 'sell_count',
+    'total_spent_usd', 'realized_pnl_usd', 'unrealized_pnl_usd',
+    'total_pnl_usd', 'realized_roi_mult', 'total_roi_mult',
+    'qualifies', 'outcome', 'disqualify_reason', 'wallet_source',
+]
+_RQ = {name: i for i, name in enumerate(REQUALIFY_COLUMNS)}
+
+
+def _requalify_page_query(after: tuple[str, str] | None, page_size: int) -> tuple[str, dict]:
+    """One keyset page of wallet_token_stats, latest version per (wallet, token).
+
+    Pages seek on the sort key instead of using OFFSET, so each page reads only
+    its own rows. Duplicates the ReplacingMergeTree has not merged yet are
+    dropped with LIMIT 1 BY over updated_at DESC rather than FINAL.
+    """
+    where, params = "", {}
+    if after is not None:
+        where = (
+            "WHERE wallet_address >= {w:String} "
+            "AND (wallet_address > {w:String} OR token_address > {t:String}) "
+        )
+        params = {'w': after[0], 't': after[1]}
+    sql = (
+        f"SELECT {', '.join(REQUALIFY_COLUMNS)} FROM wallet_token_stats {where}"
+        f"ORDER BY wallet_address, token_address, updated_at DESC "
+        f"LIMIT 1 BY wallet_address, token_address "
+        f"LIMIT {int(page_size)}"
+    )
+    return sql, params
+
+
 @celery.task(name='tasks.requalify_existing_data', bind=True, max_retries=0,
              time_limit=7200, soft_time_limit=6600)
-def requalify_existing_data(self, batch_size=5000):
+def requalify_existing_data(self, batch_size=5000, after=None):
     """Re-insert all wallet_token_stats with corrected qualifies/outcome.
 
+    Walks the table in keyset pages of ``batch_size`` rows on (wallet_address,
+    token_address), streaming each page block by block. ``after`` resumes past
+    a (wallet_address, token_address) cursor from a previous run's result.
+
     Triggered on-demand:
         celery -A celery_app call tasks.requalify_existing_data
     """
@@ -632,73 +813,63 @@ def requalify_existing_data(self, batch_size=5000):
     if ch is None:
         return {"status": "error", "error": "ClickHouse unavailable"}
 
-    count_result = ch.query("SELECT count() FROM wallet_token_stats FINAL")
+    # Progress only: counts unmerged duplicates too, but needs no merge pass.
+    count_result = ch.query("SELECT count() FROM wallet_token_stats")
     total_rows = count_result.first_row[0]
-    logger.info("[REQUALIFY] Total rows: %d", total_rows)
-
-    columns = [
-        'wallet_address', 'token_address', 'scan_id',
-        'first_entry_price', 'first_entry_usd', 'first_entry_timestamp',
-        'entry_price_to_launch_mult', 'avg_entry_price', 'avg_entry_to_ath_mult',
-        'all_buys', 'all_sells', 'buy_count', 'sell_count',
-        'total_spent_usd', 'realized_pnl_usd', 'unrealized_pnl_usd',
-        'total_pnl_usd', 'realized_roi_mult', 'total_roi_mult',
-        'qualifies', 'outcome', 'disqualify_reason', 'wallet_source',
-    ]
+    logger.info("[REQUALIFY] Total rows (incl. unmerged versions): %d", total_rows)
 
-    stats = {'wins': 0, 'draws': 0, 'losses': 0, 'total': 0, 'changed': 0}
-    offset = 0
-
-    while offset < total_rows:
-        result = ch.query(
-            f"SELECT {', '.join(columns)} FROM wallet_token_stats FINAL "
-            f"ORDER BY wallet_address, token_address LIMIT {batch_size} OFFSET {offset}"
-        )
-        rows = list(result.named_results())
-        if not rows:
-            break
+    insert_columns = REQUALIFY_COLUMNS + ['updated_at']
+    stats = {'wins': 0, 'draws': 0, 'losses': 0, 'total': 0, 'changed': 0, 'pages': 0}
+    cursor = tuple(after) if after else None
 
+    while True:
+        sql, params = _requalify_page_query(cursor, batch_size)
         insert_data = []
-        insert_columns = columns + ['updated_at']
-
-        for row in rows:
-            new_outcome, new_qualifies = _compute_outcome(
-                row['realized_roi_mult'], 0.0, row['total_spent_usd']
-            )
-
-            disqualify_reason = row['disqualify_reason']
-            if new_qualifies == 1:
-                disqualify_reason = ''
+        now = datetime.now(timezone.utc)
 
-            stats['total'] += 1
-            if new_outcome == 'win':
-                stats['wins'] += 1
-            elif new_outcome == 'draw':
-                stats['draws'] += 1
-            else:
-                stats['losses'] += 1
-            if new_outcome != row['outcome'] or new_qualifies != row['qualifies']:
-                stats['changed'] += 1
-
-            insert_data.append([
-                row['wallet_address'], row['token_address'], row['scan_id'],
-                row['first_entry_price'], row['first_entry_usd'], row['first_entry_timestamp'],
-                row['entry_price_to_launch_mult'], row['avg_entry_price'], row['avg_entry_to_ath_mult'],
-                row['all_buys'], row['all_sells'], row['buy_count'], row['sell_count'],
-                row['total_spent_usd'], row['realized_pnl_usd'], row['unrealized_pnl_usd'],
-                row['total_pnl_usd'], row['realized_roi_mult'], row['total_roi_mult'],
-                new_qualifies, new_outcome, disqualify_reason, row['wallet_source'],
-                datetime.now(timezone.utc),
-            ])
+        # Rows are buffered per page and inserted once the stream is closed;
+        # the client session does not allow an insert mid-stream.
+        with ch.query_row_block_stream(sql, parameters=params) as stream:
+            for block in stream:
+                for row in block:
+                    row = list(row)
+                    new_outcome, new_qualifies = _compute_outcome(
+                        row[_RQ['realized_roi_mult']], 0.0, row[_RQ['total_spent_usd']]
+                    )
+
+                    stats['total'] += 1
+                    if new_outcome == 'win':
+                        stats['wins'] += 1
+                    elif new_outcome == 'draw':
+                        stats['draws'] += 1
+                    else:
+                        stats['losses'] += 1
+                    if new_outcome != row[_RQ['outcome']] or new_qualifies != row[_RQ['qualifies']]:
+                        stats['changed'] += 1
+
+                    row[_RQ['qualifies']] = new_qualifies
+                    row[_RQ['outcome']] = new_outcome
+                    if new_qualifies == 1:
+                        row[_RQ['disqualify_reason']] = ''
+                    row.append(now)
+                    insert_data.append(row)
+
+        if not insert_data:
+            break
 
         ch.insert(table='wallet_token_stats', data=insert_data,
                   database=CH_DATABASE, column_names=insert_columns)
-        offset += len(rows)
+        last = insert_data[-1]
+        cursor = (last[_RQ['wallet_address']], last[_RQ['token_address']])
+        stats['pages'] += 1
         logger.info(
-            "[REQUALIFY] %d/%d — %d wins, %d draws, %d losses, %d changed",
+            "[REQUALIFY] %d/%d — %d wins, %d draws, %d losses, %d changed (cursor=%s)",
             stats['total'], total_rows,
             stats['wins'], stats['draws'], stats['losses'], stats['changed'],
+            cursor[0][:12],
         )
+        if len(insert_data) < batch_size:
+            break
 
     logger.info("[REQUALIFY] Complete: %s", stats)
-    return {"status": "success", **stats}
+    return {"status": "success", "cursor": list(cursor) if cursor else None, **stats}
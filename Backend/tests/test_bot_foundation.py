@@ -11,6 +11,7 @@ No real Redis / Supabase / ClickHouse / Telegram calls — everything mocked.
 
 import json
 import os
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -20,26 +21,95 @@ import pytest
 # bot_state
 # ════════════════════════════════════════════════════════════════════════════
 
+class _FakeHashRedis:
+    """In-memory stand-in for the redis client's string + hash commands.
+
+    Pipelines (MULTI/EXEC) and scripts apply under one lock, like Redis
+    executing them atomically. A hash command on a string key raises
+    WRONGTYPE, as Redis does for the legacy JSON layout.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.ttls = {}
+        self.lock = threading.RLock()
+
+    def _hash(self, k, create=False):
+        v = self.store.get(k)
+        if isinstance(v, str):
+            raise Exception("WRONGTYPE Operation against a key holding the wrong kind of value")
+        if v is None and create:
+            v = self.store[k] = {}
+        return v
+
+    def get(self, k):
+        v = self.store.get(k)
+        if isinstance(v, dict):
+            raise Exception("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return v
+
+    def setex(self, k, ttl, v):
+        self.store[k] = v
+        self.ttls[k] = ttl
+
+    def delete(self, k):
+        self.store.pop(k, None)
+
+    def ttl(self, k):
+        return self.ttls.get(k, -1) if k in self.store else -2
+
+    def expire(self, k, ttl):
+        self.ttls[k] = int(ttl)
+
+    def hgetall(self, k):
+        return dict(self._hash(k) or {})
+
+    def hget(self, k, f):
+        return (self._hash(k) or {}).get(f)
+
+    def hset(self, k, mapping):
+        self._hash(k, create=True).update(mapping)
+
+    def hdel(self, k, *fields):
+        h = self._hash(k) or {}
+        for f in fields:
+            h.pop(f, None)
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((name, a, kw))
+
+            def execute(self):
+                with redis.lock:
+                    return [getattr(redis, name)(*a, **kw) for name, a, kw in ops]
+
+        return _Pipe()
+
+    def register_script(self, _lua):
+        """Python rendering of bot_state._REPLACE_DATA_LUA."""
+        def run(keys, args):
+            k, ttl, clear_awaiting, flat = keys[0], args[0], args[1], args[2:]
+            with self.lock:
+                h = self._hash(k, create=True)
+                for f in [f for f in h if f.startswith("d:")]:
+                    del h[f]
+                if clear_awaiting == "1":
+                    h.pop("awaiting", None)
+                h.update(dict(zip(flat[::2], flat[1::2])))
+                self.expire(k, ttl)
+                return [item for pair in h.items() for item in pair]
+        return run
+
+
 class TestBotState:
     @pytest.fixture
     def fake_redis(self):
-        """An in-memory stand-in for the redis client (get/setex/delete/ttl)."""
+        """An in-memory stand-in for the redis client (strings + hashes)."""
         store = {}
-
-        class FakeRedis:
-            def get(self, k):
-                return store.get(k)
-
-            def setex(self, k, ttl, v):
-                store[k] = v
-
-            def delete(self, k):
-                store.pop(k, None)
-
-            def ttl(self, k):
-                return 3600 if k in store else -2
-
-        return FakeRedis(), store
+        return _FakeHashRedis(store), store
 
     def test_get_state_default_when_absent(self, fake_redis):
         client, _ = fake_redis
@@ -98,6 +168,62 @@ class TestBotState:
             assert st["screen"] == "main"
             assert st["awaiting"] is None
 
+    def test_concurrent_field_updates_are_not_lost(self, fake_redis):
+        """Handlers writing different data fields of one chat never clobber each other."""
+        client, _ = fake_redis
+        with patch("services.bot_state.get_redis_client", return_value=client):
+            from services import bot_state
+
+            def writer(n):
+                for i in range(25):
+                    bot_state.set_awaiting("123", None, data={f"w{n}_{i}": i})
+
+            threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            data = bot_state.get_state("123")["data"]
+            assert len(data) == 8 * 25
+            assert data["w7_24"] == 24
+
+    def test_write_is_field_level_and_refreshes_ttl(self, fake_redis):
+        client, store = fake_redis
+        with patch("services.bot_state.get_redis_client", return_value=client):
+            from services import bot_state
+            bot_state.push_screen("123", "settings", data={"a": {"nested": [1, 2]}})
+            h = store["sifter:bot_state:123"]
+            assert h["screen"] == "settings"
+            assert json.loads(h["d:a"]) == {"nested": [1, 2]}
+            assert "awaiting" not in h
+            assert client.ttl("sifter:bot_state:123") == bot_state.STATE_TTL_SECONDS
+            st = bot_state.set_awaiting("123", "amount")
+            assert st["awaiting"] == "amount" and st["data"]["a"] == {"nested": [1, 2]}
+
+    def test_replace_data_drops_old_fields(self, fake_redis):
+        client, _ = fake_redis
+        with patch("services.bot_state.get_redis_client", return_value=client):
+            from services import bot_state
+            bot_state.set_state("123", screen="wizard", data={"a": 1, "b": 2})
+            st = bot_state.set_state("123", data={"c": 3}, merge_data=False)
+            assert st["data"] == {"c": 3}
+            assert st["screen"] == "wizard"
+            assert bot_state.get_state("123")["data"] == {"c": 3}
+
+    def test_legacy_json_state_is_read_and_migrated(self, fake_redis):
+        client, store = fake_redis
+        store["sifter:bot_state:123"] = json.dumps(
+            {"screen": "positions", "awaiting": "note_text", "data": {"pos": "p1"}})
+        with patch("services.bot_state.get_redis_client", return_value=client):
+            from services import bot_state
+            st = bot_state.get_state("123")
+            assert st["screen"] == "positions" and st["data"] == {"pos": "p1"}
+            assert bot_state.is_awaiting("123", "note_text") is True
+            st = bot_state.set_awaiting("123", None, data={"extra": True})
+            assert isinstance(store["sifter:bot_state:123"], dict)
+            assert st["screen"] == "positions" and st["awaiting"] is None
+            assert st["data"] == {"pos": "p1", "extra": True}
+
     def test_push_screen_clears_awaiting(self, fake_redis):
         client, _ = fake_redis
         with patch("services.bot_state.get_redis_client", return_value=client):
@@ -787,6 +913,89 @@ class TestTokenSafetyPaperTrader:
         assert snap is not None and snap["safe"] is True
 
 
+class TestPaperTraderExitSweep:
+    """check_exits fetches snapshots outside the lock and applies exits inside it."""
+
+    def _trader_with_positions(self, count):
+        import time as _time
+        from services.paper_trader import PaperPosition
+        trader = TestTokenSafetyPaperTrader()._trader()
+        for i in range(count):
+            token = f"TOK{i}"
+            trader.open_positions[token] = PaperPosition(
+                token_address=token, token_ticker=f"T{i}", entry_price=1.0,
+                entry_size_usd=10.0, token_amount=10.0, wallet_count=2,
+                signal_type="double", signal_key=f"k:{token}", opened_at=_time.time(),
+            )
+        return trader
+
+    def test_fetch_runs_without_lock(self):
+        trader = self._trader_with_positions(5)
+        held = []
+
+        def _fetch(token):
+            held.append(trader.lock.locked())
+            return {"price": 1.1, "safe": True, "reason": "ok", "liquidity": 1, "ticker": "T"}
+
+        with patch.object(trader, "_fetch_token_snapshot", side_effect=_fetch):
+            trader.check_exits()
+        assert len(held) == 5
+        assert not any(held)
+        assert trader.last_exit_sweep["positions"] == 5
+        assert trader.last_exit_sweep["exits"] == 0
+
+    def test_dead_token_closed_and_missing_snapshot_skipped(self):
+        trader = self._trader_with_positions(2)
+        prices = {"TOK0": 0.1}
+
+        def _fetch(token):
+            if token not in prices:
+                return None
+            return {"price": prices[token], "safe": True, "reason": "ok", "liquidity": 1, "ticker": "T"}
+
+        with patch.object(trader, "_fetch_token_snapshot", side_effect=_fetch):
+            trader.check_exits()
+        assert "TOK0" not in trader.open_positions
+        assert trader.ledger.is_closed("TOK0")
+        assert "TOK1" in trader.open_positions
+        assert trader.last_exit_sweep["exits"] == 1
+
+    def test_exit_writes_run_without_lock(self):
+        trader = self._trader_with_positions(3)
+        held = []
+        query = MagicMock()
+        query.insert.return_value = query
+        query.update.return_value = query
+        query.eq.return_value = query
+        query.execute.side_effect = lambda: held.append(trader.lock.locked())
+        trader._table = lambda _name: query
+
+        def _fetch(token):
+            return {"price": 0.1, "safe": True, "reason": "ok", "liquidity": 1, "ticker": "T"}
+
+        with patch.object(trader, "_fetch_token_snapshot", side_effect=_fetch):
+            trader.check_exits()
+        assert trader.open_positions == {}
+        # One close event + one position update per exit, all after the lock is released.
+        assert len(held) == 6
+        assert not any(held)
+        assert trader.last_exit_sweep["writes"] == 6
+        assert trader.last_exit_sweep["write_failures"] == 0
+
+    def test_reconcile_reads_db_without_lock(self):
+        trader = self._trader_with_positions(0)
+        held = []
+        real_fetch = trader.ledger.fetch_totals
+
+        def _fetch():
+            held.append(trader.lock.locked())
+            return real_fetch()
+
+        with patch.object(trader.ledger, "fetch_totals", side_effect=_fetch):
+            trader.reconcile_ledger()
+        assert held == [False]
+
+
 class TestTokenSafetyManualExecute:
     """_execute_full_manual_trade must abort before building a trade request."""
 
@@ -0,0 +1,146 @@
+"""Tests for services/bot_user_cache.py and its use in bot_handlers._load_user_ctx."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import bot_handlers, bot_user_cache
+
+
+class _DictRedis:
+    """Just enough of redis.Redis (decode_responses=True) for the cache."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+    def expire(self, key, ttl):
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self, transaction=False):
+        redis = self
+        ops = []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((name, a, kw))
+
+            def execute(self):
+                return [getattr(redis, name)(*a, **kw) for name, a, kw in ops]
+
+        return _Pipe()
+
+
+@pytest.fixture
+def redis():
+    fake = _DictRedis()
+    bot_user_cache.reset_stats()
+    with patch("services.bot_user_cache.get_redis_client", return_value=fake), \
+         patch.object(bot_user_cache, "ENABLED", True):
+        yield fake
+
+
+def _notifier(row=None, wallet=True):
+    """Notifier whose _table() returns the telegram_users row / bot_wallets probe."""
+    notifier = MagicMock()
+    notifier._is_operator.return_value = False
+
+    def table(name):
+        t = MagicMock()
+        q = t.select.return_value
+        q.eq.return_value = q
+        q.limit.return_value = q
+        if name == "telegram_users":
+            q.execute.return_value.data = [dict(row)] if row else []
+        else:
+            q.execute.return_value.data = [{"id": 1}] if wallet else []
+        return t
+
+    notifier._table.side_effect = table
+    return notifier
+
+
+ROW = {"user_id": "u1", "telegram_username": "alice", "auto_trade_enabled": False}
+
+
+class TestUserCtxCache:
+
+    def test_second_load_is_served_from_cache(self, redis):
+        notifier = _notifier(ROW)
+        first = bot_handlers._load_user_ctx(notifier, "42")
+        second = bot_handlers._load_user_ctx(notifier, "42")
+        assert first == second
+        assert second["has_wallet"] is True and second["connected"] is True
+        # telegram_users + bot_wallets on the miss, nothing on the hit.
+        assert notifier._table.call_count == 2
+        stats = bot_user_cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_operator_flag_is_not_cached(self, redis):
+        notifier = _notifier(ROW)
+        bot_handlers._load_user_ctx(notifier, "42")
+        notifier._is_operator.return_value = True
+        assert bot_handlers._load_user_ctx(notifier, "42")["is_operator"] is True
+
+    def test_unlinked_chat_is_not_cached(self, redis):
+        notifier = _notifier(None)
+        assert bot_handlers._load_user_ctx(notifier, "42") is None
+        assert bot_handlers._load_user_ctx(notifier, "42") is None
+        assert bot_user_cache.stats()["stores"] == 0
+
+    def test_settings_write_invalidates(self, redis):
+        notifier = _notifier(ROW)
+        bot_handlers._load_user_ctx(notifier, "42")
+        bot_handlers._update_user(notifier, "u1", {"auto_trade_enabled": True})
+        before = notifier._table.call_count
+        bot_handlers._load_user_ctx(notifier, "42")
+        assert notifier._table.call_count == before + 2
+        assert bot_user_cache.stats()["invalidations"] == 1
+
+    def test_stale_load_cannot_repopulate_after_invalidation(self, redis):
+        _, generation = bot_user_cache.lookup("42")
+        bot_user_cache.invalidate("42")          # settings write lands mid-load
+        bot_user_cache.store("42", {"user_id": "u1", "stale": True}, generation)
+        ctx, _ = bot_user_cache.lookup("42")
+        assert ctx is None
+
+    def test_fresh_load_rewarms_cache(self, redis):
+        notifier = _notifier(ROW)
+        bot_handlers._load_user_ctx(notifier, "42")
+        bot_handlers._load_user_ctx(notifier, "42", fresh=True)
+        assert notifier._table.call_count == 4
+        bot_handlers._load_user_ctx(notifier, "42")
+        assert notifier._table.call_count == 4
+
+    def test_disabled_cache_always_reads_db(self, redis):
+        notifier = _notifier(ROW)
+        with patch.object(bot_user_cache, "ENABLED", False):
+            bot_handlers._load_user_ctx(notifier, "42")
+            bot_handlers._load_user_ctx(notifier, "42")
+        assert notifier._table.call_count == 4
+        assert redis.data == {}
+
+    def test_redis_errors_degrade_to_db(self):
+        broken = MagicMock()
+        broken.mget.side_effect = ConnectionError("down")
+        broken.pipeline.side_effect = ConnectionError("down")
+        notifier = _notifier(ROW)
+        with patch("services.bot_user_cache.get_redis_client", return_value=broken), \
+             patch.object(bot_user_cache, "ENABLED", True):
+            assert bot_handlers._load_user_ctx(notifier, "42")["user_id"] == "u1"
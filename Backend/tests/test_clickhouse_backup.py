@@ -0,0 +1,175 @@
+"""Tests for tasks/clickhouse_backup.py — incremental, checkpointed backups."""
+
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tasks import clickhouse_backup
+from tasks.clickhouse_backup import CHECKPOINT_KEY, TABLE_SPECS, _backup_table, _plan_window
+
+SPEC = next(s for s in TABLE_SPECS if s["ch_table"] == "wallet_aggregate_stats")
+T0 = datetime(2026, 7, 1)
+
+
+def _row(wallet, updated_at, score=50.0):
+    values = {c: 0 for c in SPEC["columns"]}
+    values.update(wallet_address=wallet, professional_score=score, tier="A", updated_at=updated_at)
+    return tuple(values[c] for c in SPEC["columns"])
+
+
+class _FakeCH:
+    """Evaluates the window query over in-memory rows, streamed in small blocks."""
+
+    def __init__(self, rows, block=2, fail=False):
+        self.rows, self.block, self.fail, self.queries = rows, block, fail, []
+        self.upd = SPEC["columns"].index("updated_at")
+
+    @contextmanager
+    def query_row_block_stream(self, sql, parameters=None):
+        self.queries.append((sql, parameters))
+        if self.fail:
+            raise Exception("connection reset")
+        p = parameters
+        after = (p["a0"],) if "a0" in p else None
+        latest = {}
+        for row in self.rows:
+            if not p["since"] < row[self.upd] <= p["until"]:
+                continue
+            key = (row[0],)
+            if after is not None and key <= after:
+                continue
+            if key not in latest or row[self.upd] > latest[key][self.upd]:
+                latest[key] = row
+        out = [latest[k] for k in sorted(latest)]
+        yield (out[i:i + self.block] for i in range(0, len(out), self.block))
+
+
+class _HashRedis:
+    def __init__(self):
+        self.h = {}
+
+    def hget(self, key, field):
+        return self.h.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self.h.setdefault(key, {})[field] = value
+
+    def delete(self, key):
+        self.h.pop(key, None)
+
+    def checkpoint(self):
+        return json.loads(self.h[CHECKPOINT_KEY]["wallet_aggregate_stats"])
+
+
+def _supabase(fail_on_call=None):
+    sb = MagicMock()
+    upserts = []
+
+    def upsert(batch, on_conflict):
+        upserts.append(batch)
+        if fail_on_call is not None and len(upserts) == fail_on_call:
+            raise Exception("statement timeout")
+        return MagicMock()
+
+    sb.schema.return_value.table.return_value.upsert.side_effect = upsert
+    return sb, upserts
+
+
+@pytest.fixture
+def now():
+    with patch.object(clickhouse_backup, "_utcnow", return_value=T0 + timedelta(days=7)):
+        yield T0 + timedelta(days=7)
+
+
+class TestPlanWindow:
+    def test_first_run_starts_at_epoch(self):
+        w = _plan_window(None, T0)
+        assert w["since"] == "1970-01-01T00:00:00"
+        assert w["until"] == (T0 - clickhouse_backup.WATERMARK_LAG).isoformat()
+        assert w["after"] is None
+
+    def test_next_window_starts_at_previous_until(self):
+        w = _plan_window({"since": "x", "until": "2026-06-24T00:00:00", "after": None}, T0)
+        assert w["since"] == "2026-06-24T00:00:00"
+
+    def test_unfinished_window_is_resumed_unchanged(self):
+        cp = {"since": "a", "until": "b", "after": ["W5"]}
+        assert _plan_window(cp, T0) == cp
+
+
+class TestBackupTable:
+    def test_latest_version_per_key_in_batches(self, now):
+        rows = [_row(f"W{i}", T0) for i in range(5)] + [_row("W1", T0 + timedelta(hours=1), score=90.0)]
+        r = _HashRedis()
+        sb, upserts = _supabase()
+        with patch.object(clickhouse_backup, "BATCH_SIZE", 2):
+            stats = _backup_table(_FakeCH(rows), sb, SPEC, r)
+
+        sent = [row for batch in upserts for row in batch]
+        assert [row["wallet_address"] for row in sent] == ["W0", "W1", "W2", "W3", "W4"]
+        assert sent[1]["professional_score"] == 90.0
+        assert sent[0]["updated_at"] == T0.isoformat()
+        assert stats["rows_upserted"] == 5 and stats["errors"] == 0
+        assert stats["bytes_sent"] == sum(len(json.dumps(b)) for b in upserts)
+        assert "rows_per_sec" in stats
+        assert r.checkpoint()["after"] is None
+
+    def test_second_run_only_copies_rows_changed_since(self, now):
+        rows = [_row("W0", T0), _row("W1", T0)]
+        r = _HashRedis()
+        ch = _FakeCH(rows)
+        _backup_table(ch, _supabase()[0], SPEC, r)
+
+        rows.append(_row("W2", now + timedelta(days=1)))
+        with patch.object(clickhouse_backup, "_utcnow", return_value=now + timedelta(days=7)):
+            sb, upserts = _supabase()
+            stats = _backup_table(ch, sb, SPEC, r)
+
+        assert [row["wallet_address"] for batch in upserts for row in batch] == ["W2"]
+        assert stats["since"] == (now - clickhouse_backup.WATERMARK_LAG).isoformat()
+        assert "FINAL" not in ch.queries[-1][0]
+
+    def test_failed_upsert_keeps_checkpoint_and_next_run_resumes(self, now):
+        rows = [_row(f"W{i}", T0) for i in range(6)]
+        r = _HashRedis()
+        ch = _FakeCH(rows)
+        sb, _ = _supabase(fail_on_call=2)
+        with patch.object(clickhouse_backup, "BATCH_SIZE", 2):
+            stats = _backup_table(ch, sb, SPEC, r)
+        assert stats["errors"] == 1 and stats["rows_upserted"] == 2
+        assert r.checkpoint()["after"] == ["W1"]
+
+        sb, upserts = _supabase()
+        with patch.object(clickhouse_backup, "BATCH_SIZE", 2):
+            stats = _backup_table(ch, sb, SPEC, r)
+        assert [row["wallet_address"] for batch in upserts for row in batch] == ["W2", "W3", "W4", "W5"]
+        assert stats["resumed"] is True
+        assert ch.queries[-1][1]["a0"] == "W1"
+        assert r.checkpoint()["after"] is None
+
+    def test_query_failure_reports_error(self, now):
+        stats = _backup_table(_FakeCH([], fail=True), _supabase()[0], SPEC, _HashRedis())
+        assert stats["errors"] == 1
+        assert "connection reset" in stats["error_detail"]
+
+    def test_runs_without_redis(self, now):
+        sb, upserts = _supabase()
+        stats = _backup_table(_FakeCH([_row("W0", T0)]), sb, SPEC, None)
+        assert stats["rows_upserted"] == 1 and len(upserts) == 1
+
+
+class TestBackupTask:
+    def test_full_drops_checkpoints(self, now):
+        r = _HashRedis()
+        r.hset(CHECKPOINT_KEY, "wallet_aggregate_stats", "{}")
+        with patch.object(clickhouse_backup, "get_clickhouse_client", return_value=_FakeCH([])), \
+             patch.object(clickhouse_backup, "get_supabase_client", return_value=_supabase()[0]), \
+             patch.object(clickhouse_backup, "get_redis_client", return_value=r):
+            summary = clickhouse_backup.backup_clickhouse_to_supabase.run(full=True)
+        assert summary["tables"] == len(TABLE_SPECS)
+        assert summary["total_errors"] == 0
+        assert summary["total_bytes_sent"] == 0
+        assert json.loads(r.hget(CHECKPOINT_KEY, "wallet_aggregate_stats"))["since"] == "1970-01-01T00:00:00"
@@ -1,15 +1,24 @@
 """Tests for services/clickhouse_client.py."""
 
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
 
 from services.clickhouse_client import CH_DATABASE
 from services.clickhouse_client import (
     _dicts_to_rows,
+    _read_models_ready,
+    _wallet_token_source,
     insert_token_scans,
     insert_wallet_token_stats,
+    insert_wallet_token_stats_columns,
     get_wallet_stats,
+    get_wallet_token_stats_for_token,
+    query_elite_100,
+    query_top20_for_tokens,
 )
+from services.clickhouse_insert_buffer import ClickHouseInsertBuffer
 
 
 # ---------------------------------------------------------------------------
@@ -60,8 +69,19 @@ class TestInsertTokenScans:
             data=[["SOL", 1000]],
             database=CH_DATABASE,
             column_names=["token", "ts"],
+            settings=None,
         )
 
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_async_insert_waits_for_server_flush(self, mock_get_client):
+        """Verify async_insert=True sends server-side async insert settings, not via the buffer."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+
+        insert_token_scans([{"token": "SOL", "ts": 1000}], async_insert=True)
+
+        assert mock_ch.insert.call_args.kwargs["settings"] == {"async_insert": 1, "wait_for_async_insert": 1}
+
 
 # ---------------------------------------------------------------------------
 # insert_wallet_token_stats
@@ -84,6 +104,131 @@ class TestInsertWalletTokenStats:
             column_names=["wallet", "token", "roi"],
         )
 
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    @patch('services.clickhouse_insert_buffer.get_insert_buffer')
+    def test_buffered_insert_goes_to_buffer(self, mock_get_buffer, mock_get_client):
+        """Verify buffered=True queues rows instead of inserting."""
+        rows = [{"wallet": "abc", "token": "SOL", "roi": 1.5}]
+        insert_wallet_token_stats(rows, buffered=True)
+
+        mock_get_buffer.return_value.add.assert_called_once_with('wallet_token_stats', rows)
+        mock_get_client.assert_not_called()
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_insert_columns_is_column_oriented(self, mock_get_client):
+        """Verify a column dict is sent as-is with column_oriented=True."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+
+        insert_wallet_token_stats_columns({"wallet": ["a", "b"], "roi": [1.5, 2.0]})
+
+        mock_ch.insert.assert_called_once_with(
+            table='wallet_token_stats',
+            data=[["a", "b"], [1.5, 2.0]],
+            database=CH_DATABASE,
+            column_names=["wallet", "roi"],
+            column_oriented=True,
+            settings=None,
+        )
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    @patch('services.clickhouse_insert_buffer.get_insert_buffer')
+    def test_buffered_columns_go_to_buffer(self, mock_get_buffer, mock_get_client):
+        columns = {"wallet": ["a"], "roi": [1.5]}
+        insert_wallet_token_stats_columns(columns, buffered=True)
+        insert_wallet_token_stats_columns({"wallet": [], "roi": []}, buffered=True)
+
+        mock_get_buffer.return_value.add_columns.assert_called_once_with('wallet_token_stats', columns)
+        mock_get_client.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# ClickHouseInsertBuffer
+# ---------------------------------------------------------------------------
+
+class TestClickHouseInsertBuffer:
+    def _buffer(self, **kwargs):
+        ch = MagicMock()
+        buf = ClickHouseInsertBuffer(client_factory=lambda: ch, **kwargs)
+        return buf, ch
+
+    def test_full_block_sent_column_oriented(self):
+        """Verify a block is sent as columns once it reaches flush_rows."""
+        buf, ch = self._buffer(flush_rows=3, flush_interval_s=60)
+        buf.add('token_scans', [{"token": "A", "ts": 1}, {"token": "B", "ts": 2}])
+        ch.insert.assert_not_called()
+
+        buf.add('token_scans', [{"token": "C", "ts": 3}])
+        ch.insert.assert_called_once_with(
+            table='token_scans',
+            data=[["A", "B", "C"], [1, 2, 3]],
+            column_names=["token", "ts"],
+            database=CH_DATABASE,
+            column_oriented=True,
+            settings=None,
+        )
+        assert buf.pending_rows() == 0
+        buf.close()
+
+    def test_blocks_split_by_table_and_columns(self):
+        """Verify each (table, column set) gets its own insert."""
+        buf, ch = self._buffer(flush_interval_s=60)
+        buf.add('token_scans', [{"token": "A"}, {"token": "B", "ts": 2}])
+        buf.add('wallet_token_stats', [{"wallet": "w"}])
+        assert buf.close() == 3
+
+        sent = {(c.kwargs['table'], tuple(c.kwargs['column_names'])): c.kwargs['data']
+                for c in ch.insert.call_args_list}
+        assert sent == {
+            ('token_scans', ('token',)): [["A"]],
+            ('token_scans', ('token', 'ts')): [["B"], [2]],
+            ('wallet_token_stats', ('wallet',)): [["w"]],
+        }
+
+    def test_add_columns_shares_block_with_rows(self):
+        """Verify a column block and row dicts with the same columns go out as one insert."""
+        buf, ch = self._buffer(flush_rows=4, flush_interval_s=60)
+        buf.add('wallet_token_stats', [{"wallet": "a", "roi": 1.0}])
+        buf.add_columns('wallet_token_stats', {"wallet": ["b", "c"], "roi": [2.0, 3.0]})
+        ch.insert.assert_not_called()
+
+        buf.add_columns('wallet_token_stats', {"wallet": ["d"], "roi": [4.0]})
+        assert ch.insert.call_count == 1
+        assert ch.insert.call_args.kwargs['data'] == [["a", "b", "c", "d"], [1.0, 2.0, 3.0, 4.0]]
+        assert buf.stats()["rows_sent"] == 4
+        buf.close()
+
+    def test_interval_flush_from_background_thread(self):
+        """Verify a partial block is sent once it has been open flush_interval_s."""
+        buf, ch = self._buffer(flush_rows=1000, flush_interval_s=0.05)
+        buf.add('token_scans', [{"token": "A"}])
+        for _ in range(100):
+            if ch.insert.called:
+                break
+            time.sleep(0.01)
+        assert ch.insert.call_count == 1
+        assert buf.stats()["rows_sent"] == 1
+        buf.close()
+
+    def test_async_insert_settings(self):
+        """Verify async_insert=True passes the server-side async settings."""
+        buf, ch = self._buffer(flush_rows=1, async_insert=True)
+        buf.add('token_scans', [{"token": "A"}])
+        assert ch.insert.call_args.kwargs['settings'] == {"async_insert": 1, "wait_for_async_insert": 1}
+        buf.close()
+
+    def test_failed_insert_is_counted_and_reconnects(self):
+        """Verify a failed send doesn't raise and the next send opens a new client."""
+        factory = MagicMock()
+        factory.return_value.insert.side_effect = [Exception("too many parts"), None]
+        buf = ClickHouseInsertBuffer(flush_rows=1, client_factory=factory)
+        buf.add('token_scans', [{"token": "A"}])
+        buf.add('token_scans', [{"token": "B"}])
+        assert buf.stats()["rows_failed"] == 1
+        assert buf.stats()["rows_sent"] == 1
+        assert factory.call_count == 2
+        buf.close()
+
 
 # ---------------------------------------------------------------------------
 # get_wallet_stats
@@ -112,3 +257,155 @@ class TestGetWalletStats:
 
         result = get_wallet_stats("abc")
         assert result == expected_row
+
+
+# ---------------------------------------------------------------------------
+# FINAL-free reads
+# ---------------------------------------------------------------------------
+
+class TestFinalFreeReads:
+    @pytest.fixture(autouse=True)
+    def _fresh_table_cache(self):
+        with patch.dict('services.clickhouse_client._read_models_ready', clear=True):
+            yield
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_point_lookups_take_newest_version(self, mock_get_client):
+        """Verify wallet / wallet-token lookups read the newest row without FINAL."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+        mock_ch.query.return_value.result_rows = []
+
+        get_wallet_stats("abc")
+        get_wallet_token_stats_for_token("abc", "SOL")
+
+        for c in mock_ch.query.call_args_list:
+            sql = c.args[0]
+            assert "FINAL" not in sql
+            assert "ORDER BY updated_at DESC LIMIT 1" in sql
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_top20_dedups_with_argmax(self, mock_get_client):
+        """Verify top-20 dedups (wallet, token) with argMax before filtering qualifies."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+
+        query_top20_for_tokens(["T1", "T2"])
+
+        sql = mock_ch.query.call_args.args[0]
+        assert "FINAL" not in sql
+        assert "argMax(s.qualifies, s.updated_at)" in sql
+        assert mock_ch.query.call_args.kwargs["parameters"] == {"token_list": ["T1", "T2"]}
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_elite_100_reads_read_model(self, mock_get_client):
+        """Verify elite 100 merges argMax states from wallet_aggregate_latest once backfilled."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+        mock_ch.command.return_value = 1
+        mock_ch.query.return_value.named_results.return_value = [{"wallet_address": "abc"}]
+
+        assert query_elite_100() == [{"wallet_address": "abc"}]
+        sql = mock_ch.query.call_args.args[0]
+        assert "FROM wallet_aggregate_latest" in sql
+        assert "argMaxMerge(wallet_aggregate_latest.professional_score)" in sql
+        assert mock_ch.query.call_count == 1
+        assert mock_ch.command.call_args.kwargs["parameters"]["table"] == "wallet_aggregate_latest"
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_elite_100_skips_read_model_until_backfilled(self, mock_get_client):
+        """Verify a read model without the ready marker is never queried."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+        mock_ch.command.return_value = 0
+        mock_ch.query.return_value.named_results.return_value = [{"wallet_address": "abc"}]
+
+        assert query_elite_100() == [{"wallet_address": "abc"}]
+        assert mock_ch.query.call_count == 1
+        assert "FROM wallet_aggregate_stats" in mock_ch.query.call_args.args[0]
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_elite_100_falls_back_to_argmax(self, mock_get_client):
+        """Verify a read model that errors falls back to argMax over wallet_aggregate_stats."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+        mock_ch.command.return_value = 1
+        fallback = MagicMock()
+        fallback.named_results.return_value = [{"wallet_address": "abc"}]
+        mock_ch.query.side_effect = [Exception("Table wallet_aggregate_latest doesn't exist"), fallback]
+
+        assert query_elite_100() == [{"wallet_address": "abc"}]
+        sql = mock_ch.query.call_args.args[0]
+        assert "FROM wallet_aggregate_stats" in sql and "FINAL" not in sql
+        assert "argMax(wallet_aggregate_stats.professional_score, wallet_aggregate_stats.updated_at)" in sql
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_elite_100_empty_when_both_fail(self, mock_get_client):
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+        mock_ch.query.side_effect = Exception("connection refused")
+
+        assert query_elite_100() == []
+
+
+# ---------------------------------------------------------------------------
+# Token-first routing to wallet_token_stats_by_token
+# ---------------------------------------------------------------------------
+
+class TestWalletTokenSource:
+    @pytest.fixture(autouse=True)
+    def _fresh_table_cache(self):
+        with patch.dict('services.clickhouse_client._read_models_ready', clear=True):
+            yield
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_top20_uses_by_token_table_once_backfilled(self, mock_get_client):
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+        mock_ch.command.return_value = 1
+
+        query_top20_for_tokens(["T1"])
+
+        sql = mock_ch.query.call_args.args[0]
+        assert "FROM wallet_token_stats_by_token AS s" in sql
+        check = mock_ch.command.call_args
+        assert "FROM system.tables" in check.args[0] and "comment = {marker:String}" in check.args[0]
+        assert check.kwargs["parameters"] == {
+            "db": CH_DATABASE, "table": "wallet_token_stats_by_token", "marker": "backfilled",
+        }
+
+    @patch('services.clickhouse_client.get_clickhouse_client')
+    def test_top20_falls_back_to_base_table(self, mock_get_client):
+        """Verify a missing, still-backfilling or unreachable companion routes to wallet_token_stats."""
+        mock_ch = MagicMock()
+        mock_get_client.return_value = mock_ch
+
+        for exists in (0, Exception("timeout")):
+            mock_ch.command.side_effect = [exists]
+            query_top20_for_tokens(["T1"])
+            assert "FROM wallet_token_stats AS s" in mock_ch.query.call_args.args[0]
+            _read_models_ready.clear()
+
+    def test_readiness_is_cached(self):
+        mock_ch = MagicMock()
+        mock_ch.command.return_value = 0
+        cols = {"wallet_address", "token_address", "qualifies"}
+
+        assert _wallet_token_source(mock_ch, cols, by_token=True) == "wallet_token_stats"
+        assert _wallet_token_source(mock_ch, cols, by_token=True) == "wallet_token_stats"
+        assert mock_ch.command.call_count == 1
+
+        # A negative result is re-checked once it is old enough.
+        with patch('services.clickhouse_client.time.monotonic', return_value=time.monotonic() + 301):
+            mock_ch.command.return_value = 1
+            assert _wallet_token_source(mock_ch, cols, by_token=True) == "wallet_token_stats_by_token"
+        assert mock_ch.command.call_count == 2
+
+    def test_queries_outside_the_companion_use_base_table(self):
+        """Verify wallet-first queries and columns the companion lacks never route there."""
+        mock_ch = MagicMock()
+        mock_ch.command.return_value = 1
+
+        assert _wallet_token_source(mock_ch, {"wallet_address"}, by_token=False) == "wallet_token_stats"
+        assert _wallet_token_source(mock_ch, {"all_buys"}, by_token=True) == "wallet_token_stats"
+        mock_ch.command.assert_not_called()
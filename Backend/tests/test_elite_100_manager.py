@@ -109,10 +109,11 @@ class TestCalculateWinStreak:
 # ===========================================================================
 
 class TestGenerateElite100:
-    """Tests for generate_elite_100."""
+    """Tests for generate_elite_100 — full-scan fallback when the rollup RPC is missing."""
 
     def _setup(self):
         mock_supabase = MagicMock()
+        mock_supabase.schema.return_value.rpc.side_effect = Exception("function not found")
         with patch("services.elite_100_manager.get_supabase_client", return_value=mock_supabase):
             from services.elite_100_manager import Elite100Manager
             mgr = Elite100Manager()
@@ -186,6 +187,68 @@ class TestGenerateElite100:
         assert len(result) == 100
 
 
+class TestGenerateElite100FromRollup:
+    """generate_elite_100 ranked by the elite_top_wallets RPC."""
+
+    ROLLUP = [
+        {"wallet_address": "W2", "professional_score": 90.0, "roi_30d": 150.0, "runners_30d": 3.0,
+         "times_added": 2, "composite_score": 60.5,
+         "representative": {"tier": "S", "win_rate_7d": 65, "consistency_score": 55,
+                            "last_trade_time": "2025-01-01", "form": ["win", "win", "loss"]}},
+        {"wallet_address": "W1", "professional_score": 50.0, "roi_30d": 10.0, "runners_30d": 1.0,
+         "times_added": 1, "composite_score": 23.0, "representative": {}},
+    ]
+
+    def _setup(self, rows):
+        mock_supabase = MagicMock()
+        mock_supabase.schema.return_value.rpc.return_value.execute.return_value.data = rows
+        with patch("services.elite_100_manager.get_supabase_client", return_value=mock_supabase):
+            from services.elite_100_manager import Elite100Manager
+            mgr = Elite100Manager()
+        return mgr, mock_supabase
+
+    def test_reads_ranked_top_n_without_scanning_watchlist(self):
+        mgr, mock_sb = self._setup(self.ROLLUP)
+        result = mgr.generate_elite_100(sort_by="roi")
+
+        mock_sb.schema.return_value.rpc.assert_called_once_with(
+            "elite_top_wallets", {"p_sort": "roi", "p_limit": 100})
+        mock_sb.schema.return_value.table.return_value.select.assert_not_called()
+        assert [w["wallet_address"] for w in result] == ["W2", "W1"]
+        assert [w["rank"] for w in result] == [1, 2]
+
+    def test_maps_rollup_row_to_elite_shape(self):
+        mgr, _ = self._setup(self.ROLLUP)
+        top = mgr.generate_elite_100()[0]
+
+        assert top["tier"] == "S" and top["times_added"] == 2
+        assert top["composite_score"] == 60.5
+        assert top["win_streak"] == 2
+        assert top["runner_hits_30d"] == top["runners_30d"] == 3.0
+        assert top["last_trade_time"] == "2025-01-01"
+
+    def test_missing_representative_fields_default(self):
+        mgr, _ = self._setup(self.ROLLUP)
+        w = mgr.generate_elite_100()[1]
+
+        assert w["form"] == [] and w["win_streak"] == 0
+        assert w["win_rate_7d"] == 0 and w["tier"] is None
+
+    def test_empty_rollup_does_not_fall_back(self):
+        mgr, mock_sb = self._setup([])
+        assert mgr.generate_elite_100() == []
+        mock_sb.schema.return_value.table.return_value.select.assert_not_called()
+
+    def test_results_are_cached(self):
+        mgr, mock_sb = self._setup(self.ROLLUP)
+        mgr.generate_elite_100()
+
+        insert = mock_sb.schema.return_value.table.return_value.insert
+        payload = insert.call_args[0][0]
+        assert payload["cache_type"] == "elite_100_score"
+        assert len(payload["data"]) == 2
+
+
 # ===========================================================================
 # generate_community_top_100
 # ===========================================================================
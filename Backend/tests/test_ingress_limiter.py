@@ -0,0 +1,117 @@
+"""Tests for services/ingress_limiter.py and its use on the Helius webhook."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from services import ingress_limiter
+
+
+class _GcraRedis:
+    """Runs the limiter's GCRA script in Python against a settable clock."""
+
+    def __init__(self):
+        self.data = {}
+        self.now_us = 1_700_000_000_000_000
+
+    def advance(self, seconds):
+        self.now_us += int(seconds * 1_000_000)
+
+    def register_script(self, source):
+        assert source == ingress_limiter._GCRA_LUA
+
+        def script(keys, args):
+            interval, tolerance = int(args[0]), int(args[1])
+            now = self.now_us
+            stored = self.data.get(keys[0])
+            tat = int(stored[0]) if stored and stored[1] > now else now
+            tat = max(tat, now)
+            if tat - now > tolerance:
+                return [0, tat - tolerance - now]
+            new_tat = tat + interval
+            self.data[keys[0]] = (str(new_tat), new_tat)  # expires when the bucket refills
+            return [1, 0]
+        return script
+
+
+@pytest.fixture
+def redis():
+    fake = _GcraRedis()
+    with patch("services.ingress_limiter.get_redis_client", return_value=fake):
+        yield fake
+
+
+class TestCheck:
+
+    def test_allows_burst_then_limits(self, redis):
+        results = [ingress_limiter.check("t", "ip", rate=10, per=1)[0] for _ in range(12)]
+        assert results == [True] * 10 + [False] * 2
+
+    def test_refills_at_the_configured_rate(self, redis):
+        for _ in range(10):
+            ingress_limiter.check("t", "ip", rate=10, per=1)
+        allowed, retry_after = ingress_limiter.check("t", "ip", rate=10, per=1)
+        assert not allowed
+        assert retry_after == pytest.approx(0.1)
+
+        redis.advance(0.1)
+        assert ingress_limiter.check("t", "ip", rate=10, per=1)[0]
+        assert not ingress_limiter.check("t", "ip", rate=10, per=1)[0]
+
+    def test_keys_are_independent(self, redis):
+        for _ in range(3):
+            ingress_limiter.check("t", "a", rate=3, per=60)
+        assert not ingress_limiter.check("t", "a", rate=3, per=60)[0]
+        assert ingress_limiter.check("t", "b", rate=3, per=60)[0]
+        assert ingress_limiter.check("other", "a", rate=3, per=60)[0]
+
+    def test_one_key_per_source(self, redis):
+        for _ in range(50):
+            ingress_limiter.check("t", "ip", rate=100, per=60)
+        assert list(redis.data) == ["sifter:rl:t:ip"]
+
+    def test_redis_error_fails_open(self):
+        broken = MagicMock()
+        broken.register_script.side_effect = ConnectionError("down")
+        with patch("services.ingress_limiter.get_redis_client", return_value=broken):
+            assert ingress_limiter.check("t", "ip", rate=1, per=60) == (True, 0.0)
+
+
+class TestDecorator:
+
+    def _app(self, **kwargs):
+        app = Flask(__name__)
+
+        @app.route("/hook", methods=["POST"])
+        @ingress_limiter.rate_limit("hook", 2, 60, **kwargs)
+        def hook():
+            return "ok"
+
+        return app.test_client()
+
+    def test_default_rejection_is_429_with_retry_after(self, redis):
+        client = self._app()
+        assert [client.post("/hook").status_code for _ in range(3)] == [200, 200, 429]
+        assert client.post("/hook").headers["Retry-After"] == "30"
+
+    def test_custom_key_and_response(self, redis):
+        client = self._app(key_func=lambda: "shared", on_limited=lambda retry: ("slow down", 200))
+        client.post("/hook")
+        client.post("/hook")
+        response = client.post("/hook")
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == "slow down"
+
+
+class TestHeliusWebhook:
+
+    def test_rate_limited_requests_get_200(self, client, redis):
+        with patch.dict("os.environ", {"HELIUS_WEBHOOK_SECRET": "s3cret"}), \
+             patch("services.tasks.ingest_helius_signal"):
+            statuses = [
+                client.post("/api/webhooks/helius", json=[], headers={"Authorization": "s3cret"})
+                for _ in range(101)
+            ]
+        assert all(r.status_code == 200 for r in statuses)
+        assert [r.get_json()["status"] for r in statuses[-2:]] == ["ok", "rate_limited"]
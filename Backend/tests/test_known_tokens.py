@@ -0,0 +1,193 @@
+"""Tests for services/known_tokens.py and the batched discover_new_tokens flow."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import known_tokens
+from services.known_tokens import KNOWN_TOKENS_KEY, KNOWN_TOKENS_RETENTION
+
+
+class _Redis:
+    """Just enough of redis.Redis (decode_responses=True) for the registry."""
+
+    def __init__(self):
+        self.sets, self.zsets, self.commands = {}, {}, 0
+
+    def type(self, key):
+        return "set" if key in self.sets else "zset" if key in self.zsets else "none"
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def sismember(self, key, member):
+        return member in self.sets.get(key, ())
+
+    def expire(self, key, ttl):
+        return True
+
+    def delete(self, key):
+        self.sets.pop(key, None)
+        self.zsets.pop(key, None)
+
+    def zadd(self, key, mapping, nx=False):
+        z = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if nx and member in z:
+                continue
+            added += member not in z
+            z[member] = score
+        return added
+
+    def zremrangebyscore(self, key, lo, hi):
+        z = self.zsets.get(key, {})
+        gone = [m for m, s in z.items() if s <= hi]
+        for m in gone:
+            del z[m]
+        return len(gone)
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((name, a, kw))
+
+            def execute(self):
+                redis.commands += 1
+                return [getattr(redis, name)(*a, **kw) for name, a, kw in ops]
+
+        return _Pipe()
+
+
+@pytest.fixture(autouse=True)
+def _reset_legacy_flag():
+    known_tokens._legacy_checked = False
+    yield
+    known_tokens._legacy_checked = False
+
+
+class TestClaim:
+
+    def test_returns_only_unseen_in_order(self):
+        r = _Redis()
+        assert known_tokens.claim(r, ["A", "B"], now=1000) == ["A", "B"]
+        assert known_tokens.claim(r, ["C", "A", "C", "", "D"], now=2000) == ["C", "D"]
+        assert r.zsets[KNOWN_TOKENS_KEY] == {"A": 1000, "B": 1000, "C": 2000, "D": 2000}
+
+    def test_first_seen_score_is_kept(self):
+        r = _Redis()
+        known_tokens.claim(r, ["A"], now=1000)
+        known_tokens.claim(r, ["A"], now=5000)
+        assert r.zscore(KNOWN_TOKENS_KEY, "A") == 1000
+
+    def test_rolling_trim(self):
+        r = _Redis()
+        known_tokens.claim(r, ["OLD"], now=1000)
+        known_tokens.claim(r, ["NEW"], now=1000 + KNOWN_TOKENS_RETENTION - 1)
+        known_tokens.claim(r, ["X"], now=1001 + KNOWN_TOKENS_RETENTION)
+
+        assert set(r.zsets[KNOWN_TOKENS_KEY]) == {"NEW", "X"}
+
+    def test_one_round_trip_per_batch(self):
+        r = _Redis()
+        known_tokens.claim(r, [f"T{i}" for i in range(500)], now=1000)
+        assert r.commands == 1
+
+    def test_empty_batch_is_a_no_op(self):
+        r = _Redis()
+        assert known_tokens.claim(r, ["", None]) == []
+        assert r.commands == 0
+
+    def test_legacy_set_converted_without_reclaiming(self):
+        r = _Redis()
+        r.sadd(KNOWN_TOKENS_KEY, "A", "B")
+
+        assert known_tokens.claim(r, ["A", "C"], now=1000) == ["C"]
+        assert r.type(KNOWN_TOKENS_KEY) == "zset"
+        assert set(r.zsets[KNOWN_TOKENS_KEY]) == {"A", "B", "C"}
+
+
+class TestIsKnown:
+
+    def test_lookup(self):
+        r = _Redis()
+        known_tokens.claim(r, ["A"], now=1000)
+        assert known_tokens.is_known(r, "A") is True
+        assert known_tokens.is_known(r, "B") is False
+
+    def test_reads_legacy_set(self):
+        r = _Redis()
+        r.sadd(KNOWN_TOKENS_KEY, "A")
+        assert known_tokens.is_known(r, "A") is True
+
+
+class TestDiscoverNewTokens:
+
+    def _run(self, r, feeds):
+        from tasks import token_discovery
+        dispatched = []
+
+        def fake_dispatch(task, args):
+            dispatched.append((task.name, list(args)))
+            return len(args)
+
+        with patch.object(token_discovery, "get_redis", return_value=r), \
+             patch.object(token_discovery, "fetch_solanatracker", side_effect=lambda ep: feeds.get(ep, [])), \
+             patch.object(token_discovery, "insert_token_scans") as insert, \
+             patch.object(token_discovery, "_dispatch", side_effect=fake_dispatch), \
+             patch.object(token_discovery.time, "sleep"):
+            result = token_discovery.discover_new_tokens.run()
+        return result, dispatched, insert
+
+    def test_new_tokens_dispatched_in_one_batch(self):
+        r = _Redis()
+        feeds = {
+            "tokens/multi/graduated": [{"token": {"mint": "G1"}}, {"token": {"mint": "G2"}}],
+            "tokens/latest": [{"token": {"mint": "G2"}}, {"token": {"mint": "L1"}}],
+        }
+        result, dispatched, insert = self._run(r, feeds)
+
+        first = dict(dispatched)["tasks.wallet_qualification_scan"]
+        assert first == [("G1", "first_pass"), ("G2", "first_pass"), ("L1", "first_pass")]
+        assert [row["discovered_via"] for row in insert.call_args[0][0]] == [
+            "just_graduated", "just_graduated", "newly_launched"]
+        assert r.sets["kys:pending_tokens"] == {"G1", "G2", "L1"}
+        assert result["new_tokens"] == 3 and result["known_tokens"] == 3
+
+    def test_known_tokens_not_redispatched(self):
+        r = _Redis()
+        known_tokens.claim(r, ["G1"])
+        result, dispatched, _ = self._run(r, {"tokens/latest": [{"token": {"mint": "G1"}}]})
+
+        assert dict(dispatched)["tasks.wallet_qualification_scan"] == []
+        assert result["new_tokens"] == 0
+
+    def test_trending_pending_goes_to_second_pass_and_new_to_first(self):
+        r = _Redis()
+        r.sadd("kys:pending_tokens", "P1")
+        trending = [{"token": {"mint": "P1"}}, {"token": {"mint": "N1"}}]
+        result, dispatched, _ = self._run(r, {"tokens/trending": trending})
+
+        by_task = dict(dispatched)
+        assert by_task["tasks.second_pass_patch"] == [("P1", trending[0])]
+        assert by_task["tasks.wallet_qualification_scan"] == [("N1", "first_pass")]
+        assert result["second_pass_triggered"] == 1 and result["new_tokens"] == 1
+
+    def test_dispatch_groups_by_batch(self):
+        from tasks import token_discovery
+        task = MagicMock()
+        with patch("celery.group") as group, patch.object(token_discovery, "DISPATCH_BATCH", 2):
+            assert token_discovery._dispatch(task, [("A",), ("B",), ("C",)]) == 3
+        assert group.call_count == 2
+        assert group.return_value.apply_async.call_count == 2
@@ -4,10 +4,14 @@ tasks/leaderboard_discovery.py and tasks/wallet_qualification.py.
 """
 
 import pytest
-from datetime import datetime, timezone
-from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
 
 from tasks.leaderboard_discovery import (
+    LEADERBOARD_RECENCY_PREFIX,
+    LEADERBOARD_RECENCY_TTL,
+    LEADERBOARD_SEEN_PREFIX,
+    _filter_recent_wallets,
     _is_conviction,
     _parse_timestamp as ld_parse_timestamp,
     _extract_token_mint,
@@ -513,3 +517,114 @@ class TestWqParseTimestamp:
         result = wq_parse_timestamp(-1)
         after = datetime.now(timezone.utc)
         assert before <= result <= after
+
+
+# =====================================================================
+# _filter_recent_wallets (leaderboard_discovery.py)
+# =====================================================================
+
+
+class _StringRedis:
+    """Just enough of redis.Redis (decode_responses=True) for the recency filter."""
+
+    def __init__(self, data=None):
+        self.data = dict(data or {})
+        self.ttls = {}
+        self.pipelines = 0
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = str(value)
+        self.ttls[key] = ttl
+
+    def pipeline(self, transaction=True):
+        redis = self
+        redis.pipelines += 1
+        ops = []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((name, a, kw))
+
+            def execute(self):
+                return [getattr(redis, name)(*a, **kw) for name, a, kw in ops]
+
+        return _Pipe()
+
+
+class TestFilterRecentWallets:
+
+    def _ch(self, rows):
+        ch = MagicMock()
+        ch.query.return_value.result_rows = rows
+        return ch
+
+    def _hours_ago(self, hours):
+        return (datetime.now(timezone.utc) - timedelta(hours=hours)).replace(tzinfo=None)
+
+    def test_one_batched_query_for_all_misses(self):
+        r = _StringRedis()
+        ch = self._ch([("W1", self._hours_ago(2)), ("W2", self._hours_ago(48))])
+        stats = {}
+
+        out = _filter_recent_wallets(r, ch, ["W1", "W2", "W3"], stats)
+
+        assert out == ["W2", "W3"]  # W1 updated 2h ago; W3 has no rows
+        assert ch.query.call_count == 1
+        sql = ch.query.call_args[0][0]
+        assert "FINAL" not in sql and "GROUP BY wallet_address" in sql
+        assert ch.query.call_args[1]["parameters"] == {"addrs": ["W1", "W2", "W3"]}
+        assert stats["recency_queries"] == 1 and stats["recency_cache_hits"] == 0
+        assert "recency_ms" in stats
+
+    def test_results_are_cached_with_ttl(self):
+        r = _StringRedis()
+        _filter_recent_wallets(r, self._ch([("W1", self._hours_ago(2))]), ["W1", "W3"], {})
+
+        assert r.data[f"{LEADERBOARD_RECENCY_PREFIX}W3"] == "0"
+        assert int(r.data[f"{LEADERBOARD_RECENCY_PREFIX}W1"]) > 0
+        assert set(r.ttls.values()) == {LEADERBOARD_RECENCY_TTL}
+
+    def test_cache_hits_skip_clickhouse(self):
+        r = _StringRedis()
+        ch = self._ch([("W1", self._hours_ago(2))])
+        _filter_recent_wallets(r, ch, ["W1", "W2"], {})
+
+        ch.reset_mock()
+        stats = {}
+        out = _filter_recent_wallets(r, ch, ["W1", "W2"], stats)
+
+        assert out == ["W2"]
+        ch.query.assert_not_called()
+        assert stats["recency_queries"] == 0 and stats["recency_cache_hits"] == 2
+
+    def test_seen_wallets_dropped_before_lookup(self):
+        r = _StringRedis({f"{LEADERBOARD_SEEN_PREFIX}W1": "1"})
+        ch = self._ch([])
+        out = _filter_recent_wallets(r, ch, ["W1", "W2"], {})
+
+        assert out == ["W2"]
+        assert ch.query.call_args[1]["parameters"] == {"addrs": ["W2"]}
+
+    def test_lookups_are_chunked(self):
+        ch = self._ch([])
+        stats = {}
+        with patch("tasks.leaderboard_discovery.RECENCY_QUERY_CHUNK", 2):
+            out = _filter_recent_wallets(_StringRedis(), ch, ["W1", "W2", "W3"], stats)
+
+        assert stats["recency_queries"] == 2
+        assert out == ["W1", "W2", "W3"]
+
+    def test_query_failure_keeps_wallets_and_caches_nothing(self):
+        r = _StringRedis()
+        ch = MagicMock()
+        ch.query.side_effect = Exception("timeout")
+        out = _filter_recent_wallets(r, ch, ["W1", "W2"], {})
+
+        assert out == ["W1", "W2"]
+        assert not any(k.startswith(LEADERBOARD_RECENCY_PREFIX) for k in r.data)
@@ -0,0 +1,155 @@
+"""Tests for services/paper_portfolio_ledger.py — PortfolioLedger."""
+
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from services.paper_portfolio_ledger import PortfolioLedger
+from services.paper_trader import PaperPosition
+
+
+def _table_returning(positions=None, closed=None, entries=None):
+    """Build a fake ``_table`` whose queries return canned rows per table/columns."""
+    def table(name):
+        t = MagicMock()
+
+        def select(columns, *a, **kw):
+            q = MagicMock()
+            if name == "paper_trade_events":
+                rows = entries or []
+            elif columns == "realized_pnl_usd":
+                rows = positions or []
+            else:
+                rows = closed or []
+            for method in ("eq", "neq", "gte", "order", "limit"):
+                getattr(q, method).return_value = q
+            q.execute.return_value.data = rows
+
+            def range_(start, end):
+                page = MagicMock()
+                page.execute.return_value.data = rows[start:min(end + 1, start + 1000)]
+                return page
+
+            q.range.side_effect = range_
+            return q
+
+        t.select.side_effect = select
+        return t
+    return table
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+class TestPortfolioLedger:
+
+    def test_hydrate_loads_totals_closed_and_entries(self):
+        now = time.time()
+        ledger = PortfolioLedger(_table_returning(
+            positions=[{"realized_pnl_usd": 12.5}, {"realized_pnl_usd": -2.5}],
+            closed=[{"token_address": "NEW"}, {"token_address": "OLD"}],
+            entries=[{"created_at": _iso(now - 600)}, {"created_at": _iso(now - 7200)}],
+        ))
+        ledger.hydrate()
+        assert ledger.realized_pnl_usd == 10.0
+        assert ledger.is_closed("OLD") and ledger.is_closed("NEW")
+        assert not ledger.is_closed("OTHER")
+        assert ledger.count_recent_entries(3600) == 1
+        assert ledger.count_recent_entries(86400) == 2
+
+    def test_closed_set_is_bounded(self):
+        ledger = PortfolioLedger(_table_returning(), closed_capacity=3)
+        for token in ("A", "B", "C", "D"):
+            ledger.record_close(token)
+        assert list(ledger.closed_tokens) == ["B", "C", "D"]
+        assert ledger.closed_truncated is True
+
+    def test_evicted_token_confirmed_from_db(self):
+        ledger = PortfolioLedger(_table_returning(closed=[{"token_address": "A"}]), closed_capacity=1)
+        ledger.record_close("A")
+        ledger.record_close("B")
+        assert "A" not in ledger.closed_tokens
+        assert ledger.is_closed("A") is True
+
+    def test_deployed_uses_remaining_fraction(self):
+        ledger = PortfolioLedger(_table_returning())
+        pos = PaperPosition(
+            token_address="T", token_ticker="T", entry_price=1.0, entry_size_usd=100.0,
+            token_amount=100.0, wallet_count=1, signal_type="single", signal_key="k",
+            opened_at=time.time(), remaining_amount=25.0,
+        )
+        assert ledger.deployed_usd([pos]) == 25.0
+
+    def test_reconcile_corrects_drift(self):
+        ledger = PortfolioLedger(_table_returning(positions=[{"realized_pnl_usd": 50}]))
+        ledger.record_realized(40.0)
+        ledger.record_entry()
+        report = ledger.reconcile()
+        assert report["realized_drift_usd"] == 10.0
+        assert report["entries_drift"] == -1
+        assert ledger.realized_pnl_usd == 50
+        assert ledger.count_recent_entries(3600) == 0
+
+    def test_decision_latency_metrics(self):
+        ledger = PortfolioLedger(_table_returning())
+        for ms in range(1, 101):
+            ledger.record_decision_latency(float(ms))
+        metrics = ledger.metrics()
+        assert metrics["decisions"] == 100
+        assert metrics["decision_ms_p50"] == 51.0
+        assert metrics["decision_ms_p99"] == 100.0
+
+    def test_closed_tokens_paged_past_postgrest_cap(self):
+        closed = [{"token_address": f"T{i}"} for i in range(2500)]
+        ledger = PortfolioLedger(_table_returning(closed=closed), closed_capacity=2200)
+        ledger.hydrate()
+        assert len(ledger.closed_tokens) == 2200
+        assert ledger.closed_truncated is True
+        assert "T2199" in ledger.closed_tokens and "T2200" not in ledger.closed_tokens
+
+    def test_realized_total_from_rpc(self):
+        rpc = MagicMock()
+        rpc.return_value.execute.return_value.data = 123.5
+        table = MagicMock(side_effect=_table_returning(positions=[{"realized_pnl_usd": 1}]))
+        ledger = PortfolioLedger(table, rpc=rpc)
+        ledger.hydrate()
+        rpc.assert_called_once_with("paper_realized_pnl_total")
+        assert ledger.realized_pnl_usd == 123.5
+
+    def test_realized_total_falls_back_to_paged_sum(self):
+        rpc = MagicMock(side_effect=RuntimeError("function not found"))
+        positions = [{"realized_pnl_usd": 1}] * 1500
+        ledger = PortfolioLedger(_table_returning(positions=positions), rpc=rpc)
+        ledger.hydrate()
+        assert ledger.realized_pnl_usd == 1500
+
+    def test_reconcile_keeps_activity_recorded_during_fetch(self):
+        ledger = PortfolioLedger(_table_returning(positions=[{"realized_pnl_usd": 50}]))
+        totals = ledger.fetch_totals()
+        ledger.record_realized(5.0)
+        ledger.record_entry()
+        ledger.reconcile(totals)
+        assert ledger.realized_pnl_usd == 55.0
+        assert ledger.count_recent_entries(3600) == 1
+
+    def test_paged_queries_end_with_a_unique_order(self):
+        queries = []
+        fake = _table_returning()
+
+        def table(name):
+            t = fake(name)
+            select = t.select.side_effect
+
+            def capture(columns, *a, **kw):
+                q = select(columns, *a, **kw)
+                queries.append((name, q))
+                return q
+
+            t.select.side_effect = capture
+            return t
+
+        PortfolioLedger(table).hydrate()
+        assert len(queries) == 3
+        for name, q in queries:
+            assert q.order.call_args_list[-1].args == ("id",), name
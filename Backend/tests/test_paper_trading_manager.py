@@ -0,0 +1,109 @@
+"""Tests for services/paper_trading_manager.py — grouped exit sweep."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _pos(pid, mint, **kw):
+    row = {
+        "id": pid,
+        "user_id": f"user-{pid}",
+        "token_address": mint,
+        "token_symbol": mint[:4],
+        "avg_entry_price": 1.0,
+        "total_invested_usd": 100.0,
+        "current_value_usd": 120.0,
+        "opened_at": (datetime.now(timezone.utc) - timedelta(days=1)).isoformat(),
+        "metadata": {},
+    }
+    row.update(kw)
+    return row
+
+
+@pytest.fixture
+def manager():
+    sb = MagicMock()
+    with patch("services.paper_trading_manager.get_supabase_client", return_value=sb):
+        from services.paper_trading_manager import PaperTradingManager
+        mgr = PaperTradingManager()
+    mgr._table = MagicMock()
+    return mgr
+
+
+def _set_positions(mgr, rows):
+    q = mgr._table.return_value.select.return_value.eq.return_value
+    q.execute.return_value.data = rows
+
+
+class TestCheckExitsSweep:
+
+    def test_one_price_fetch_per_mint(self, manager):
+        _set_positions(manager, [_pos("1", "MINTA"), _pos("2", "MINTA"), _pos("3", "MINTB")])
+        with patch.object(manager, "_fetch_token_price", return_value=1.2) as fetch, \
+             patch.object(manager, "_get_notifier", return_value=None):
+            stats = manager.check_exits()
+        assert sorted(c.args[0] for c in fetch.call_args_list) == ["MINTA", "MINTB"]
+        assert stats["checked"] == 3
+        assert stats["mints"] == 2
+        assert stats["tp_exits"] == stats["sl_exits"] == stats["age_exits"] == 0
+
+    def test_full_closes_batched_in_one_update(self, manager):
+        old = (datetime.now(timezone.utc) - timedelta(days=20)).isoformat()
+        _set_positions(manager, [
+            _pos("1", "DEAD"), _pos("2", "DEAD"), _pos("3", "OLD", opened_at=old),
+        ])
+        prices = {"DEAD": 0.1, "OLD": 1.0}
+        notifier = MagicMock()
+        with patch.object(manager, "_fetch_token_price", side_effect=prices.get), \
+             patch.object(manager, "_get_notifier", return_value=notifier):
+            stats = manager.check_exits()
+        assert stats["sl_exits"] == 2 and stats["age_exits"] == 1
+        update = manager._table.return_value.update
+        update.assert_called_once_with({"status": "closed", "closed_at": update.call_args.args[0]["closed_at"]})
+        assert sorted(update.return_value.in_.call_args.args[1]) == ["1", "2", "3"]
+        # One bulk insert for all three log rows
+        inserted = manager._table.return_value.insert.call_args.args[0]
+        assert len(inserted) == 3
+        assert notifier._notify_paper_trade_event.call_count == 3
+
+    def test_full_closes_chunked_and_failed_chunk_counted(self, manager):
+        manager.EXIT_CLOSE_CHUNK = 2
+        _set_positions(manager, [_pos(str(i), "DEAD") for i in range(5)])
+        in_ = manager._table.return_value.update.return_value.in_
+        in_.return_value.execute.side_effect = [MagicMock(), RuntimeError("414"), MagicMock()]
+        notifier = MagicMock()
+        with patch.object(manager, "_fetch_token_price", return_value=0.1), \
+             patch.object(manager, "_get_notifier", return_value=notifier):
+            stats = manager.check_exits()
+        assert [c.args[1] for c in in_.call_args_list] == [["0", "1"], ["2", "3"], ["4"]]
+        assert stats["sl_exits"] == 5
+        assert stats["errors"] == 2
+        # Only the closes that landed are logged and notified.
+        assert len(manager._table.return_value.insert.call_args.args[0]) == 3
+        assert notifier._notify_paper_trade_event.call_count == 3
+
+    def test_partial_take_profit_records_tier(self, manager):
+        _set_positions(manager, [_pos("1", "MOON", metadata={"tp_tiers_triggered": ["5.0x"]})])
+        with patch.object(manager, "_fetch_token_price", return_value=11.0), \
+             patch.object(manager, "_get_notifier", return_value=None):
+            stats = manager.check_exits()
+        assert stats["tp_exits"] == 1
+        payload = manager._table.return_value.update.call_args.args[0]
+        assert payload["metadata"] == {"tp_tiers_triggered": ["10.0x", "5.0x"]}
+        assert payload["total_invested_usd"] == 67.0
+
+    def test_already_triggered_tier_skipped(self, manager):
+        pos = _pos("1", "MOON", metadata={"tp_tiers_triggered": ["5.0x"]})
+        decision = manager._exit_decision(pos, 6.0, datetime.now(timezone.utc))
+        assert decision is None
+
+    def test_notifier_is_shared_across_sweeps(self, manager):
+        with patch.dict("os.environ", {"TELEGRAM_BOT_TOKEN": "t"}), \
+             patch("services.telegram_notifier._shared_notifier", None), \
+             patch("services.telegram_notifier.TelegramNotifier") as tn:
+            first = manager._get_notifier()
+            second = manager._get_notifier()
+        assert first is second
+        tn.assert_called_once_with("t")
@@ -0,0 +1,108 @@
+"""Tests for services/redis_codec.py."""
+
+import json
+
+import orjson
+import pytest
+
+from services.redis_codec import (
+    COMPRESS_MIN_BYTES,
+    RedisCodec,
+    load_dictionaries,
+    train_dictionary,
+)
+
+
+def _token(i):
+    return {
+        "symbol": f"S{i}", "name": f"Token {i}", "address": f"Mint{i:040d}",
+        "liquidity": 1000.5 * i, "holders": i, "socials": {"twitter": f"t{i}"},
+    }
+
+
+@pytest.fixture
+def dict_paths(tmp_path):
+    paths = []
+    for n, offset in ((1, 0), (2, 1000)):
+        path = tmp_path / f"d{n}.zdict"
+        path.write_bytes(train_dictionary([_token(offset + i) for i in range(400)], 4096))
+        paths.append(str(path))
+    return paths
+
+
+class TestRoundTrip:
+    @pytest.mark.parametrize("codec", ["zstd", "orjson", "json"])
+    def test_round_trip(self, codec):
+        c = RedisCodec(codec)
+        value = {"wallets": [_token(i) for i in range(20)], "total": 20, "ok": True, "none": None}
+        assert c.loads(c.dumps(value)) == value
+
+    def test_large_payload_compressed(self):
+        c = RedisCodec()
+        value = [_token(i) for i in range(100)]
+        raw = c.dumps(value)
+        assert raw[0] == 0x02
+        assert len(raw) < len(json.dumps(value)) / 2
+        assert c.payload_size(raw) == len(orjson.dumps(value))
+
+    def test_small_payload_not_compressed(self):
+        raw = RedisCodec().dumps({"price": 0.25})
+        assert raw[0] == 0x01 and len(raw) - 1 < COMPRESS_MIN_BYTES
+        assert RedisCodec.payload_size(raw) == len(raw) - 1
+
+    def test_json_mode_writes_legacy_text(self):
+        assert RedisCodec("json").dumps({"a": 1}) == b'{"a": 1}'
+
+    def test_non_str_keys_become_strings_like_json(self):
+        c = RedisCodec()
+        assert c.loads(c.dumps({1: "x"})) == json.loads(json.dumps({1: "x"}))
+
+    def test_int_beyond_64_bits_falls_back_to_json(self):
+        c = RedisCodec()
+        assert c.loads(c.dumps({"supply": 2 ** 70})) == {"supply": 2 ** 70}
+
+    def test_unknown_codec_rejected(self):
+        with pytest.raises(ValueError):
+            RedisCodec("pickle")
+
+
+class TestLegacyEntries:
+    @pytest.mark.parametrize("raw", ['{"a": [1, 2]}', b'{"a": [1, 2]}', b' {"a": [1, 2]}'])
+    def test_json_text_still_readable(self, raw):
+        assert RedisCodec().loads(raw) == {"a": [1, 2]}
+
+    def test_nan_from_json_dumps_still_readable(self):
+        assert RedisCodec().loads(json.dumps({"x": float("inf")}).encode()) == {"x": float("inf")}
+
+    def test_missing_key(self):
+        assert RedisCodec().loads(None) is None
+
+
+class TestDictionaries:
+    def test_frame_records_dictionary(self, dict_paths):
+        dicts = load_dictionaries(dict_paths)
+        with_dict = RedisCodec(dictionaries=dicts)
+        plain = RedisCodec()
+        value = [_token(5000 + i) for i in range(3)]
+
+        raw = with_dict.dumps(value)
+        assert len(raw) < len(plain.dumps(value))
+        assert with_dict.loads(raw) == value
+        with pytest.raises(ValueError, match="dictionary"):
+            plain.loads(raw)
+
+    def test_dictionary_only_for_small_payloads(self, dict_paths):
+        with_dict = RedisCodec(dictionaries=load_dictionaries(dict_paths))
+        small, large = _token(1), [_token(i) for i in range(200)]
+
+        assert with_dict.dumps(small)[0] == 0x02
+        assert RedisCodec().dumps(small)[0] == 0x01  # too small to gain without one
+        assert RedisCodec().loads(with_dict.dumps(large)) == large  # no dictionary needed
+
+    def test_retired_dictionary_still_decodes(self, dict_paths):
+        old = RedisCodec(dictionaries=load_dictionaries(dict_paths[1:]))
+        rotated = RedisCodec(dictionaries=load_dictionaries(dict_paths))
+        value = [_token(i) for i in range(3)]
+
+        assert rotated.dictionary.dict_id == next(iter(load_dictionaries(dict_paths[:1])))
+        assert rotated.loads(old.dumps(value)) == value
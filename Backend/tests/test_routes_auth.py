@@ -92,3 +92,37 @@ class TestHandleSignup:
             content_type="application/json",
         )
         assert resp.status_code == 500
+
+
+# ===========================================================================
+# POST /api/auth/bot-signup, /api/auth/bot-login — bot context cache
+# ===========================================================================
+
+def _linking_supabase(previous_owner, has_row):
+    supabase = MagicMock()
+    supabase.auth.admin.create_user.return_value.user.id = "new-user"
+    supabase.auth.sign_in_with_password.return_value.user.id = "new-user"
+    select = supabase.schema.return_value.table.return_value.select.return_value
+    select.eq.return_value.execute.return_value.data = [{"user_id": previous_owner}]
+    select.eq.return_value.limit.return_value.execute.return_value.data = [{"id": 1}] if has_row else []
+    return supabase
+
+
+class TestBotLinkInvalidatesUserCache:
+    """Relinking a chat drops the cached bot context for the chat and both accounts."""
+
+    @pytest.mark.parametrize("path,has_row", [("/api/auth/bot-login", True), ("/api/auth/bot-signup", False)])
+    @patch("routes.auth.get_email_service")
+    @patch("routes.auth.bot_user_cache")
+    @patch("routes.auth.get_supabase_client")
+    def test_chat_and_both_users_invalidated(self, mock_get_sb, mock_cache, _email, client, path, has_row):
+        mock_get_sb.return_value = _linking_supabase("old-user", has_row)
+        with patch("services.redis_pool.get_redis_client"):
+            resp = client.post(
+                path,
+                data=json.dumps({"email": "a@b.co", "password": "password123", "chat_id": "42"}),
+                content_type="application/json",
+            )
+        assert resp.status_code in (200, 201)
+        mock_cache.invalidate.assert_called_once_with("42")
+        assert sorted(c.args[0] for c in mock_cache.invalidate_user.call_args_list) == ["new-user", "old-user"]
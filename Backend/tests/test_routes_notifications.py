@@ -272,6 +272,22 @@ class TestTelegramWebhook:
             )
         assert resp.status_code == 200
 
+    def test_webhook_overflow_returns_503(self, client):
+        notifier = _mock_notifier()
+        dispatcher = MagicMock()
+        dispatcher.submit.return_value = "overflow"
+        with patch("routes.telegram.telegram_notifier", notifier), \
+             patch("routes.telegram._get_update_dispatcher", return_value=dispatcher), \
+             patch.dict("os.environ", {"TELEGRAM_SECRET_TOKEN": "test-secret"}, clear=False):
+            resp = client.post(
+                "/api/telegram/webhook",
+                data=json.dumps({"update_id": 1, "message": {"text": "hi", "chat": {"id": 1}}}),
+                content_type="application/json",
+                headers={"X-Telegram-Bot-Api-Secret-Token": "test-secret"},
+            )
+        assert resp.status_code == 503
+        dispatcher.record_ack.assert_called_once()
+
     def test_webhook_empty_body_returns_400(self, client):
         notifier = _mock_notifier()
         with patch("routes.telegram.telegram_notifier", notifier):
@@ -0,0 +1,186 @@
+"""Tests for services/signal_windows.py — SignalWindowScheduler."""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+from services.signal_windows import SignalWindowScheduler
+
+
+def _collector():
+    fired = []
+    done = threading.Event()
+
+    def on_fire(key, entries):
+        fired.append((key, entries))
+        done.set()
+
+    return fired, done, on_fire
+
+
+class TestSignalWindowScheduler:
+
+    def test_entries_buffered_and_fired_once(self):
+        """Adds within a window merge; the callback fires once after window_s."""
+        fired, done, on_fire = _collector()
+        sched = SignalWindowScheduler(on_fire=on_fire, window_s=0.05)
+        assert sched.add("TOKEN", [{"wallet": "a"}]) is True
+        assert sched.add("TOKEN", [{"wallet": "b"}]) is False
+        assert done.wait(2)
+        sched.stop()
+        assert fired == [("TOKEN", [{"wallet": "a"}, {"wallet": "b"}])]
+        assert sched.pending_count() == 0
+
+    def test_single_thread_for_many_windows(self):
+        """Thousands of open windows share one scheduler thread."""
+        sched = SignalWindowScheduler(on_fire=lambda k, e: None, window_s=30)
+        before = threading.active_count()
+        for i in range(2000):
+            sched.add(f"T{i}", [{"wallet": "w"}])
+        assert threading.active_count() - before <= 1
+        assert sched.pending_count() == 2000
+        sched.stop()
+
+    def test_fires_in_deadline_order(self):
+        """Windows fire in the order their deadlines expire."""
+        order = []
+        sched = SignalWindowScheduler(on_fire=lambda k, e: order.append(k), window_s=0.05)
+        sched.add("first", [])
+        time.sleep(0.01)
+        sched.add("second", [])
+        deadline = time.time() + 2
+        while len(order) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        sched.stop()
+        assert order == ["first", "second"]
+
+    def test_stop_with_flush_fires_open_windows(self):
+        """stop(flush=True) drains pending windows without waiting for deadlines."""
+        fired, _, on_fire = _collector()
+        sched = SignalWindowScheduler(on_fire=on_fire, window_s=60)
+        sched.add("A", [{"wallet": "x"}])
+        sched.stop(flush=True)
+        assert fired == [("A", [{"wallet": "x"}])]
+
+    def test_callback_error_does_not_kill_thread(self):
+        """A failing callback is logged and later windows still fire."""
+        calls = []
+
+        def on_fire(key, entries):
+            calls.append(key)
+            if key == "bad":
+                raise RuntimeError("boom")
+
+        sched = SignalWindowScheduler(on_fire=on_fire, window_s=0.02)
+        sched.add("bad", [])
+        time.sleep(0.005)
+        sched.add("good", [])
+        deadline = time.time() + 2
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        sched.stop()
+        assert calls == ["bad", "good"]
+
+    def test_redis_persist_and_hydrate(self):
+        """Windows are written to Redis and rehydrated on start()."""
+        redis = MagicMock()
+        sched = SignalWindowScheduler(on_fire=lambda k, e: None, window_s=60, redis_client=redis)
+        sched.add("T1", [{"wallet": "a"}])
+        pipe = redis.pipeline.return_value
+        pipe.zadd.assert_called_once()
+        pipe.rpush.assert_called_once()
+        sched.stop()
+
+        fired, done, on_fire = _collector()
+        redis2 = MagicMock()
+        redis2.zrange.return_value = [("T9", time.time() - 1)]
+        redis2.lrange.return_value = [json.dumps({"wallet": "z"})]
+        redis2.pipeline.return_value.execute.return_value = [[json.dumps({"wallet": "z"})], 1, 1]
+        restored = SignalWindowScheduler(on_fire=on_fire, window_s=60, redis_client=redis2)
+        restored.start()
+        assert done.wait(2)
+        restored.stop()
+        assert fired == [("T9", [{"wallet": "z"}])]
+        redis2.pipeline.return_value.zrem.assert_called_with("sifter:monitor:windows", "T9")
+
+    def test_hydrate_drops_expired_window(self):
+        """A window whose deadline passed long before the restart is deleted, not fired."""
+        fired = []
+        redis = MagicMock()
+        redis.zrange.return_value = [("OLD", time.time() - 3000)]
+        redis.lrange.return_value = [json.dumps({"wallet": "z"})]
+        sched = SignalWindowScheduler(on_fire=lambda k, e: fired.append(k), window_s=60, redis_client=redis)
+        sched.start()
+        time.sleep(0.05)
+        sched.stop(flush=True)
+        assert fired == []
+        assert sched.pending_count() == 0
+        pipe = redis.pipeline.return_value
+        pipe.zrem.assert_called_once_with("sifter:monitor:windows", "OLD")
+        pipe.delete.assert_called_once_with("sifter:monitor:window:OLD")
+
+    def test_window_claimed_by_another_worker_not_fired(self):
+        """Only the process whose ZREM removes the deadline fires a persisted window."""
+        redis = MagicMock()
+        fired = []
+        sched = SignalWindowScheduler(on_fire=lambda k, e: fired.append(k), window_s=60, redis_client=redis)
+        sched.add("T1", [{"wallet": "a"}])
+        redis.pipeline.return_value.execute.return_value = [[], 0, 0]
+        sched.stop(flush=True)
+        assert fired == []
+
+    def test_claim_fires_entries_from_every_worker(self):
+        """The claiming process fires the shared list, including other workers' entries."""
+        redis = MagicMock()
+        fired, _, on_fire = _collector()
+        sched = SignalWindowScheduler(on_fire=on_fire, window_s=60, redis_client=redis)
+        sched.add("T1", [{"wallet": "a"}])
+        shared = [json.dumps({"wallet": "a"}), json.dumps({"wallet": "b"})]
+        redis.pipeline.return_value.execute.return_value = [shared, 1, 1]
+        sched.stop(flush=True)
+        assert fired == [("T1", [{"wallet": "a"}, {"wallet": "b"}])]
+
+    def test_append_re_adds_the_window_deadline(self):
+        """Entries added after another worker claimed the key get a claimable deadline."""
+        redis = MagicMock()
+        sched = SignalWindowScheduler(on_fire=lambda k, e: None, window_s=60, redis_client=redis)
+        sched.add("T1", [{"wallet": "a"}])
+        sched.add("T1", [{"wallet": "b"}])
+        zadds = redis.pipeline.return_value.zadd.call_args_list
+        assert len(zadds) == 2
+        assert zadds[0] == zadds[1]
+        assert zadds[1].kwargs == {"nx": True}
+        sched.stop()
+
+    def test_lost_claim_still_fires_orphaned_entries(self):
+        """A list left behind without a deadline is fired by the worker that took it."""
+        redis = MagicMock()
+        fired, _, on_fire = _collector()
+        sched = SignalWindowScheduler(on_fire=on_fire, window_s=60, redis_client=redis)
+        sched.add("T1", [{"wallet": "b"}])
+        redis.pipeline.return_value.execute.return_value = [[json.dumps({"wallet": "b"})], 0, 1]
+        sched.stop(flush=True)
+        assert fired == [("T1", [{"wallet": "b"}])]
+
+    def test_redis_write_happens_outside_the_lock(self):
+        """add() persists to Redis without holding the scheduler's condition."""
+        redis = MagicMock()
+        sched = SignalWindowScheduler(on_fire=lambda k, e: None, window_s=60, redis_client=redis)
+        acquired = []
+
+        def probe():
+            if sched._cond.acquire(timeout=0.5):
+                acquired.append(True)
+                sched._cond.release()
+
+        def execute():
+            t = threading.Thread(target=probe)
+            t.start()
+            t.join()
+            return [1, 1, 1]
+
+        redis.pipeline.return_value.execute.side_effect = execute
+        sched.add("T1", [{"wallet": "a"}])
+        sched.stop()
+        assert acquired == [True]
@@ -0,0 +1,185 @@
+"""Tests for services/telegram_delivery.py — TelegramDelivery."""
+
+import json
+import time
+from unittest.mock import MagicMock
+
+import requests
+
+from services import telegram_delivery
+from services.telegram_delivery import DELAY_QUEUE_KEY, MAX_ATTEMPTS, TelegramDelivery
+
+
+def _delivery(responses=None, wait_us=0):
+    redis = MagicMock()
+    redis.register_script.return_value.return_value = wait_us
+    session = MagicMock()
+    if responses is not None:
+        session.post.return_value.json.side_effect = responses
+    return TelegramDelivery("TOKEN", redis_client=redis, session=session, api_base="http://tg"), redis, session
+
+
+def _queued_job(redis):
+    mapping = redis.zadd.call_args[0][1]
+    raw, due = next(iter(mapping.items()))
+    return json.loads(raw), due
+
+
+class TestTelegramDelivery:
+
+    def test_first_message_sends_immediately(self):
+        delivery, redis, session = _delivery([{"ok": True, "result": {}}])
+        result = delivery.call("sendMessage", {"chat_id": 1, "text": "hi"})
+        assert result["ok"] is True
+        session.post.assert_called_once()
+        assert session.post.call_args[0][0] == "http://tg/botTOKEN/sendMessage"
+        redis.zadd.assert_not_called()
+        assert delivery.counters["sent"] == 1
+
+    def test_slots_booked_in_shared_redis_pacers(self):
+        delivery, redis, _ = _delivery([{"ok": True}, {"ok": True}])
+        script = redis.register_script.return_value
+        delivery.call("sendMessage", {"chat_id": 1, "text": "a"})
+        assert script.call_args.kwargs == {
+            "keys": ["sifter:tg:rate:TOKEN:chat:1", "sifter:tg:rate:TOKEN:global"],
+            "args": [1_000_000, int(1_000_000 / telegram_delivery.GLOBAL_RATE_PER_S),
+                     int(telegram_delivery.MAX_INLINE_WAIT_S * 1_000_000)],
+        }
+        delivery.call("answerCallbackQuery", {"callback_query_id": "x"})
+        assert script.call_args.kwargs["keys"] == ["sifter:tg:rate:TOKEN:global"]
+        redis.register_script.assert_called_once()
+
+    def test_paced_background_message_is_queued_not_slept(self):
+        delivery, redis, session = _delivery(wait_us=800_000)
+        t0 = time.perf_counter()
+        result = delivery.call("sendMessage", {"chat_id": 1, "text": "b"}, defer=True)
+        assert time.perf_counter() - t0 < 0.1
+        assert result == {"ok": True, "queued": True, "reason": "paced"}
+        job, due = _queued_job(redis)
+        # Pacing keeps the attempt count and holds its slot.
+        assert job["attempt"] == 0 and job["reserved"] is True
+        assert due > time.time() + 0.5
+        session.post.assert_not_called()
+
+    def test_paced_reply_waits_inline(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(telegram_delivery.time, "sleep", sleeps.append)
+        delivery, redis, session = _delivery([{"ok": True}], wait_us=800_000)
+        assert delivery.call("sendMessage", {"chat_id": 1, "text": "b"}) == {"ok": True}
+        assert sleeps == [0.8]
+        session.post.assert_called_once()
+        redis.zadd.assert_not_called()
+
+    def test_reply_behind_long_backlog_is_refused_not_sent(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(telegram_delivery.time, "sleep", sleeps.append)
+        # The script refused to book (negative wait): the slot is 5 s out.
+        delivery, redis, session = _delivery(wait_us=-5_000_000)
+        result = delivery.call("sendMessage", {"chat_id": 1, "text": "b"})
+        assert result["ok"] is False and result["rate_limited"] is True
+        assert result["error_code"] == 429 and result["parameters"]["retry_after"] == 5
+        assert delivery.counters["rate_limited"] == 1
+        assert sleeps == []
+        session.post.assert_not_called()
+        redis.zadd.assert_not_called()
+
+    def test_local_pacer_refuses_reply_without_booking(self, monkeypatch):
+        monkeypatch.setattr(telegram_delivery.time, "sleep", lambda s: None)
+        delivery, redis, session = _delivery([{"ok": True}] * 10)
+        redis.register_script.side_effect = ConnectionError("redis down")
+        # Five 1/s replies to one chat: the fifth is ~4 s out, past the 3 s cap.
+        results = [delivery.call("sendMessage", {"chat_id": 1, "text": str(i)}) for i in range(5)]
+        assert [r.get("rate_limited", False) for r in results] == [False] * 4 + [True]
+        tat = delivery._chats["1"].tat
+        delivery.call("sendMessage", {"chat_id": 1, "text": "again"})
+        # The refused reply left the chat's booking untouched.
+        assert delivery._chats["1"].tat == tat
+
+    def test_local_pacer_when_redis_is_down(self):
+        delivery, redis, session = _delivery([{"ok": True}])
+        redis.register_script.side_effect = ConnectionError("redis down")
+        delivery.call("sendMessage", {"chat_id": 1, "text": "a"}, defer=True)
+        result = delivery.call("sendMessage", {"chat_id": 1, "text": "b"}, defer=True)
+        assert result["reason"] == "paced"
+        assert session.post.call_count == 1
+
+    def test_telegram_429_schedules_retry_with_retry_after(self):
+        delivery, redis, _ = _delivery([{"ok": False, "error_code": 429, "parameters": {"retry_after": 7}}])
+        result = delivery.call("sendMessage", {"chat_id": 1, "text": "a"}, defer=True)
+        assert result["queued"] is True and result["reason"] == "telegram_429"
+        job, due = _queued_job(redis)
+        assert job["attempt"] == 1 and job["reserved"] is False
+        assert due >= time.time() + 6
+        assert delivery.counters["rate_limited"] == 1
+
+    def test_connection_error_defers_background_messages_only(self):
+        delivery, redis, session = _delivery()
+        session.post.side_effect = requests.ConnectionError("down")
+        assert delivery.call("sendMessage", {"chat_id": 1}, defer=True)["queued"] is True
+        assert delivery.call("sendMessage", {"chat_id": 1})["ok"] is False
+        result = delivery.call("answerCallbackQuery", {"callback_query_id": "x"}, defer=True)
+        assert result["ok"] is False
+        assert redis.zadd.call_count == 1
+
+    def test_reply_429_is_returned_not_queued(self):
+        delivery, redis, _ = _delivery([{"ok": False, "error_code": 429, "parameters": {"retry_after": 7}}])
+        result = delivery.call("sendMessage", {"chat_id": 1, "text": "a"})
+        assert result["error_code"] == 429
+        redis.zadd.assert_not_called()
+
+    def test_interactive_calls_are_never_deferred(self):
+        delivery, redis, session = _delivery([{"ok": True}, {"ok": True}], wait_us=800_000)
+        delivery.call("editMessageText", {"chat_id": 1, "message_id": 2}, defer=True)
+        delivery.call("editMessageText", {"chat_id": 1, "message_id": 2}, defer=True)
+        assert session.post.call_count == 2
+        redis.zadd.assert_not_called()
+
+    def test_drops_after_max_attempts(self):
+        delivery, redis, _ = _delivery([{"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}])
+        result = delivery.call("sendMessage", {"chat_id": 1}, defer=True, attempt=MAX_ATTEMPTS - 1)
+        assert result["ok"] is False
+        redis.zadd.assert_not_called()
+        assert delivery.counters["dropped"] == 1
+
+    def test_drain_due_claims_and_sends(self):
+        delivery, redis, session = _delivery([{"ok": True}])
+        job = json.dumps({"method": "sendMessage", "data": {"chat_id": 5, "text": "x"},
+                          "attempt": 1, "reserved": True})
+        redis.zrangebyscore.return_value = [(job, time.time())]
+        redis.zrem.return_value = 1
+        assert delivery.drain_due() == 1
+        redis.zrem.assert_called_once_with(DELAY_QUEUE_KEY, job)
+        session.post.assert_called_once()
+
+    def test_drain_due_skips_jobs_claimed_elsewhere(self):
+        delivery, redis, session = _delivery()
+        job = json.dumps({"method": "sendMessage", "data": {"chat_id": 5}, "attempt": 0})
+        redis.zrangebyscore.return_value = [(job, time.time())]
+        redis.zrem.return_value = 0
+        assert delivery.drain_due() == 0
+        session.post.assert_not_called()
+
+    def test_late_reserved_job_is_repaced(self):
+        # Chat 5 already sent just now; a job that was due long ago must not jump the pacer.
+        delivery, redis, session = _delivery([{"ok": True}], wait_us=900_000)
+        job = json.dumps({"method": "sendMessage", "data": {"chat_id": 5}, "attempt": 0, "reserved": True})
+        redis.zrangebyscore.return_value = [(job, time.time() - 30)]
+        redis.zrem.return_value = 1
+        assert delivery.drain_due() == 0
+        session.post.assert_not_called()
+        assert redis.zadd.call_count == 1
+
+    def test_metrics_report_latency_and_depth(self):
+        delivery, redis, _ = _delivery([{"ok": True}])
+        redis.zcard.return_value = 3
+        delivery.call("sendMessage", {"chat_id": 1})
+        metrics = delivery.metrics()
+        assert metrics["sent"] == 1
+        assert metrics["queue_depth"] == 3
+        assert metrics["send_ms_p99"] >= 0.0
+
+    def test_shared_instance_per_token(self, monkeypatch):
+        monkeypatch.setattr(telegram_delivery, "_deliveries", {})
+        a = telegram_delivery.get_telegram_delivery("T1")
+        assert telegram_delivery.get_telegram_delivery("T1") is a
+        assert telegram_delivery.get_telegram_delivery("T2") is not a
@@ -0,0 +1,152 @@
+"""Tests for services/telegram_update_dispatcher.py — UpdateDispatcher."""
+
+import threading
+import time
+
+from services.telegram_update_dispatcher import UpdateDispatcher
+
+
+def _msg(update_id, chat, text="hi"):
+    return {"update_id": update_id, "message": {"chat": {"id": chat}, "text": text}}
+
+
+def _press(update_id, chat, message_id=10, data="menu|open"):
+    return {"update_id": update_id, "callback_query": {
+        "id": str(update_id), "from": {"id": chat}, "data": data,
+        "message": {"message_id": message_id, "chat": {"id": chat}},
+    }}
+
+
+class TestUpdateDispatcher:
+
+    def test_per_chat_order_is_preserved(self):
+        seen = {}
+        lock = threading.Lock()
+
+        def handler(update):
+            time.sleep(0.001)
+            chat = update["message"]["chat"]["id"]
+            with lock:
+                seen.setdefault(chat, []).append(update["update_id"])
+
+        d = UpdateDispatcher(handler, workers=4)
+        for i in range(200):
+            d.submit(_msg(i, i % 5))
+        d.stop()
+        for chat, ids in seen.items():
+            assert ids == sorted(ids)
+        assert sum(len(v) for v in seen.values()) == 200
+
+    def test_one_chat_never_runs_concurrently(self):
+        running = set()
+        overlap = []
+        lock = threading.Lock()
+
+        def handler(update):
+            chat = update["message"]["chat"]["id"]
+            with lock:
+                if chat in running:
+                    overlap.append(chat)
+                running.add(chat)
+            time.sleep(0.002)
+            with lock:
+                running.discard(chat)
+
+        d = UpdateDispatcher(handler, workers=8)
+        for i in range(100):
+            d.submit(_msg(i, i % 3))
+        d.stop()
+        assert overlap == []
+
+    def test_chats_run_in_parallel(self):
+        barrier = threading.Barrier(2, timeout=2)
+
+        def handler(update):
+            barrier.wait()  # only passes if two chats are handled at once
+
+        d = UpdateDispatcher(handler, workers=2)
+        d.submit(_msg(1, "a"))
+        d.submit(_msg(2, "b"))
+        d.stop()
+        assert d.counters["processed"] == 2
+
+    def test_redelivered_update_is_dropped(self):
+        d = UpdateDispatcher(lambda u: None, workers=1)
+        assert d.submit(_msg(7, 1)) == "queued"
+        assert d.submit(_msg(7, 1)) == "duplicate"
+        d.stop()
+        assert d.counters["processed"] == 1
+
+    def test_repeated_button_press_collapses_while_queued(self):
+        gate = threading.Event()
+        d = UpdateDispatcher(lambda u: gate.wait(2), workers=1)
+        assert d.submit(_msg(1, 1)) == "queued"       # occupies the chat
+        assert d.submit(_press(2, 1)) == "queued"
+        assert d.submit(_press(3, 1)) == "collapsed"
+        assert d.submit(_press(4, 1, data="menu|other")) == "queued"
+        gate.set()
+        d.stop()
+        assert d.counters["processed"] == 3
+
+    def test_overflow_sheds_callbacks_and_refuses_messages(self):
+        gate = threading.Event()
+        d = UpdateDispatcher(lambda u: gate.wait(2), workers=1, max_pending=2)
+        d.submit(_msg(1, 1))
+        d.submit(_msg(2, 2))
+        assert d.submit(_msg(3, 3)) == "overflow"
+        assert d.submit(_press(4, 4)) == "shed"
+        gate.set()
+        d.stop()
+        m = d.metrics()
+        assert m["overflow"] == 1 and m["shed"] == 1
+        assert m["peak_pending"] == 2
+
+    def test_refused_update_is_accepted_on_redelivery(self):
+        gate = threading.Event()
+        d = UpdateDispatcher(lambda u: gate.wait(2), workers=1, max_pending=1)
+        d.submit(_msg(1, 1))
+        assert d.submit(_msg(2, 2)) == "overflow"
+        assert d.submit(_press(3, 3)) == "shed"
+        gate.set()
+        d.stop()
+        assert d.submit(_msg(2, 2)) == "queued"
+        d.stop()
+        assert d.submit(_press(3, 3)) == "queued"
+        d.stop()
+        assert d.counters["processed"] == 3
+
+    def test_collapsed_and_shed_queries_are_handed_back(self):
+        gate = threading.Event()
+        discarded = []
+        d = UpdateDispatcher(lambda u: gate.wait(2), workers=1, max_pending=3,
+                             on_discard=lambda u, status: discarded.append((u["update_id"], status)))
+        d.submit(_msg(1, 1))
+        d.submit(_press(2, 1))
+        d.submit(_press(3, 1))
+        d.submit(_msg(4, 2))
+        d.submit(_msg(5, 3))
+        d.submit(_press(6, 4))
+        gate.set()
+        d.stop()
+        assert discarded == [(3, "collapsed"), (6, "shed")]
+
+    def test_handler_errors_are_counted_not_fatal(self):
+        def handler(update):
+            if update["update_id"] == 1:
+                raise RuntimeError("boom")
+
+        d = UpdateDispatcher(handler, workers=1)
+        d.submit(_msg(1, 1))
+        d.submit(_msg(2, 1))
+        d.stop()
+        assert d.counters["failed"] == 1 and d.counters["processed"] == 1
+
+    def test_metrics_report_latency_and_depth(self):
+        d = UpdateDispatcher(lambda u: None, workers=2)
+        d.submit(_msg(1, 1))
+        d.record_ack(1.5)
+        d.stop()
+        m = d.metrics()
+        assert m["pending"] == 0 and m["workers"] == 2
+        assert m["ack_ms_p50"] == 1.5
+        assert m["wait_ms_p99"] >= 0.0
@@ -0,0 +1,251 @@
+"""Tests for services/tiered_cache.py."""
+
+import json
+import threading
+import time
+
+import duckdb
+import pytest
+
+from services import redis_codec
+from services.tiered_cache import CachePolicy, DuckDBBinding, TieredCache
+
+
+class _Redis:
+    """GET/SETEX/DEL/TTL with a controllable clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.store = {}
+        self.gets = 0
+
+    def get(self, k):
+        self.gets += 1
+        v = self.store.get(k)
+        return v[0] if v and v[1] > self.clock() else None
+
+    def setex(self, k, ttl, v):
+        self.store[k] = (v, self.clock() + ttl)
+
+    def delete(self, k):
+        self.store.pop(k, None)
+
+    def ttl(self, k):
+        v = self.store.get(k)
+        return int(v[1] - self.clock()) if v else -2
+
+    def pipeline(self, transaction=False):
+        redis, calls = self, []
+
+        class _Pipe:
+            def get(self, k):
+                calls.append(lambda: redis.get(k))
+
+            def ttl(self, k):
+                calls.append(lambda: redis.ttl(k))
+
+            def execute(self):
+                return [c() for c in calls]
+
+        return _Pipe()
+
+
+def _load(con, key, min_updated):
+    row = con.execute(
+        "SELECT v, last_updated FROM kv WHERE k = ? AND last_updated > ?", [key, min_updated]
+    ).fetchone()
+    return (json.loads(row[0]), row[1]) if row else None
+
+
+KV = DuckDBBinding(
+    load=_load,
+    store_sql="INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+    store_params=lambda key, value, now: [key, json.dumps(value), now],
+)
+
+
+@pytest.fixture
+def env():
+    clock = {"now": 1_000_000.0}
+    now = lambda: clock["now"]  # noqa: E731
+    redis = _Redis(now)
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE kv (k TEXT PRIMARY KEY, v TEXT, last_updated DOUBLE)")
+
+    def make(policy=None, **kwargs):
+        policies = {"fam": policy or CachePolicy(ttl=600, redis_ttl=900, l1_ttl=60)}
+        kwargs.setdefault("l3_writable", True)
+        return TieredCache(policies, redis=lambda: redis, duckdb=lambda: con,
+                           bindings={"fam": KV}, clock=now, **kwargs)
+
+    return make, redis, con, clock
+
+
+class TestReadThrough:
+    def test_miss_loads_once_and_fills_every_tier(self, env):
+        make, redis, con, _ = env
+        cache = make(write_behind_rows=1)
+        calls = []
+
+        assert cache.get_or_load("fam", "k", lambda: calls.append(1) or {"v": 1}) == {"v": 1}
+        assert cache.get_or_load("fam", "k", lambda: calls.append(1) or {"v": 2}) == {"v": 1}
+
+        assert calls == [1]
+        assert redis_codec.loads(redis.store["fam:k"][0]) == {"v": 1}
+        assert con.execute("SELECT v FROM kv WHERE k = 'k'").fetchone()[0] == '{"v": 1}'
+
+    def test_redis_hit_promoted_to_l1(self, env):
+        make, redis, _, _ = env
+        cache = make()
+        redis.setex("fam:k", 900, '{"v": 1}')
+
+        cache.get("fam", "k")
+        cache.get("fam", "k")
+
+        assert redis.gets == 1
+        fam = cache.stats()["families"]["fam"]
+        assert (fam["l1"]["hits"], fam["l1"]["misses"], fam["l1"]["hit_rate"]) == (1, 1, 0.5)
+        assert fam["l2"]["hits"] == 1
+
+    def test_duckdb_hit_promoted_to_redis_with_remaining_ttl(self, env):
+        make, redis, con, clock = env
+        cache = make()
+        con.execute("INSERT INTO kv VALUES ('k', '{\"v\": 3}', ?)", [clock["now"] - 100])
+
+        assert cache.get("fam", "k") == {"v": 3}
+        assert redis.ttl("fam:k") == 800  # redis_ttl minus the row's age
+        assert cache.get("fam", "k") == {"v": 3}
+        assert cache.stats()["families"]["fam"]["l3"]["hits"] == 1
+
+    def test_stale_duckdb_row_is_a_miss(self, env):
+        make, _, con, clock = env
+        cache = make()
+        con.execute("INSERT INTO kv VALUES ('k', '{\"v\": 3}', ?)", [clock["now"] - 601])
+        assert cache.get("fam", "k") is None
+
+    def test_l1_expires_after_l1_ttl(self, env):
+        make, redis, _, clock = env
+        cache = make()
+        cache.set("fam", "k", {"v": 1})
+        redis.setex("fam:k", 900, '{"v": 2}')  # another worker's write
+
+        assert cache.get("fam", "k") == {"v": 1}
+        clock["now"] += 61
+        assert cache.get("fam", "k") == {"v": 2}
+
+    def test_works_without_redis_or_duckdb(self):
+        cache = TieredCache({"fam": CachePolicy(600, 900, 60)}, redis=lambda: None)
+        assert cache.get_or_load("fam", "k", lambda: [1]) == [1]
+        assert cache.get("fam", "k") == [1]
+
+
+class TestL1Budget:
+    def test_lru_evicts_to_byte_budget(self, env):
+        make, _, _, _ = env
+        cache = make(l1_bytes=100)
+        for i in range(5):
+            cache.set("fam", f"k{i}", "x" * 30)  # 32 bytes encoded
+        cache.get("fam", "k2")  # touch: k2 becomes most recent
+
+        s = cache.stats()
+        assert s["l1"]["entries"] == 3 and s["l1"]["bytes"] <= 100
+        assert s["evictions"] == 2
+        with cache._lock:
+            assert [k for _, k in cache._l1] == ["k3", "k4", "k2"]
+
+    def test_oversized_value_skips_l1(self, env):
+        make, _, _, _ = env
+        cache = make(l1_bytes=10)
+        cache.set("fam", "k", "x" * 50)
+        assert cache.stats()["l1"]["entries"] == 0
+        assert cache.get("fam", "k") == "x" * 50  # still served from Redis
+
+
+class TestWriteBehind:
+    def test_l3_writes_batched_until_threshold(self, env):
+        make, _, con, _ = env
+        cache = make(write_behind_rows=3, write_behind_s=3600)
+        cache.set("fam", "a", 1)
+        cache.set("fam", "b", 2)
+        assert con.execute("SELECT count(*) FROM kv").fetchone()[0] == 0
+        assert cache.stats()["l3_pending"] == 2
+
+        cache.set("fam", "c", 3)
+        assert con.execute("SELECT count(*) FROM kv").fetchone()[0] == 3
+        assert cache.stats()["l3_writes"] == 3
+
+    def test_flush_on_age_and_explicit(self, env):
+        make, _, con, clock = env
+        cache = make(write_behind_rows=100, write_behind_s=30)
+        cache.set("fam", "a", 1)
+        clock["now"] += 31
+        cache.set("fam", "b", 2)
+        assert con.execute("SELECT count(*) FROM kv").fetchone()[0] == 2
+
+        cache.set("fam", "c", 3)
+        assert cache.flush() == 1
+
+    def test_read_only_never_writes_duckdb(self, env):
+        make, _, con, _ = env
+        cache = make(l3_writable=False, write_behind_rows=1)
+        cache.set("fam", "a", 1)
+        cache.flush()
+        assert con.execute("SELECT count(*) FROM kv").fetchone()[0] == 0
+
+
+class TestRefreshAhead:
+    def test_hot_key_reloaded_in_background_near_expiry(self, env):
+        make, redis, _, clock = env
+        cache = make(CachePolicy(ttl=600, redis_ttl=900, l1_ttl=1000, refresh_ahead=0.1))
+        cache.set("fam", "k", {"v": 1})
+
+        clock["now"] += 500  # before the refresh window
+        assert cache.get_or_load("fam", "k", lambda: {"v": 2}) == {"v": 1}
+        assert cache.stats()["refreshes"] == 0
+
+        clock["now"] += 50  # inside the last 10% of ttl
+        assert cache.get_or_load("fam", "k", lambda: {"v": 2}) == {"v": 1}
+        for _ in range(100):
+            if cache.stats()["refreshes"]:
+                break
+            time.sleep(0.01)
+        cache.close()
+        assert cache.get("fam", "k") == {"v": 2}
+        assert redis_codec.loads(redis.store["fam:k"][0]) == {"v": 2}
+
+    def test_refresh_only_queues_l3_rows_off_the_caller_thread(self, env, monkeypatch):
+        make, _, con, clock = env
+        cache = make(CachePolicy(ttl=600, redis_ttl=900, l1_ttl=1000, refresh_ahead=0.1),
+                     write_behind_rows=1)
+        cache.set("fam", "k", {"v": 1})
+        caller = threading.get_ident()
+        flush_threads = []
+        real_flush = cache.flush
+
+        def flush():
+            flush_threads.append(threading.get_ident())
+            return real_flush()
+
+        monkeypatch.setattr(cache, "flush", flush)
+        clock["now"] += 550
+        cache.get_or_load("fam", "k", lambda: {"v": 2})
+        for _ in range(100):
+            if cache.stats()["refreshes"]:
+                break
+            time.sleep(0.01)
+
+        assert flush_threads == []
+        assert cache.stats()["l3_pending"] == 1
+        cache.set("fam", "other", {"v": 3})  # the next foreground write sends it
+        assert flush_threads == [caller]
+        assert json.loads(con.execute("SELECT v FROM kv WHERE k = 'k'").fetchone()[0]) == {"v": 2}
+
+    def test_age_of_redis_entry_comes_from_its_ttl(self, env):
+        make, redis, _, clock = env
+        cache = make(CachePolicy(ttl=600, redis_ttl=900, l1_ttl=60, refresh_ahead=0.1))
+        redis.setex("fam:k", 330, '{"v": 1}')  # written 570s ago
+        loads = []
+
+        cache.get_or_load("fam", "k", lambda: loads.append(1) or {"v": 2})
+        cache.close()
+        assert loads == [1]
@@ -66,7 +66,7 @@ class TestHoldersClient:
         c = object.__new__(SolanaTrackerClient)
         redis = MagicMock()
         redis.get.return_value = json.dumps({"stale": True})
-        with patch("services.solana_tracker_client.get_redis_client", return_value=redis), \
+        with patch("services.solana_tracker_client.get_redis_binary_client", return_value=redis), \
              patch.object(c, "_get", return_value={"fresh": True}) as get:
             out = c._cached_get("/tokens/TOK", ttl=3600, force_refresh=True)
         assert out == {"fresh": True}
@@ -78,8 +78,8 @@ class TestHoldersClient:
         from services.solana_tracker_client import SolanaTrackerClient
         c = object.__new__(SolanaTrackerClient)
         redis = MagicMock()
-        redis.get.return_value = json.dumps({"cached": True})
-        with patch("services.solana_tracker_client.get_redis_client", return_value=redis), \
+        redis.get.return_value = json.dumps({"cached": True}).encode()  # written before the codec
+        with patch("services.solana_tracker_client.get_redis_binary_client", return_value=redis), \
              patch.object(c, "_get", return_value={"fresh": True}) as get:
             out = c._cached_get("/tokens/TOK", ttl=3600)
         assert out == {"cached": True}
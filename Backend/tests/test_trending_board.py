@@ -0,0 +1,268 @@
+"""Tests for services/trending_board.py."""
+
+from redis.exceptions import WatchError
+
+from services import redis_codec
+from services.trending_board import TrendingBoard
+
+
+class _Redis:
+    """Hash / sorted-set / string commands over dicts, returning bytes like a raw client.
+
+    Pipelines follow redis-py: commands run immediately after WATCH, queue
+    after MULTI, and EXEC raises WatchError if anything was written since the
+    WATCH (coarser than per-key, which is enough here).
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.hset_fields = 0
+        self.ttls = {}
+        self.writes = 0
+        self.on_watch = None  # called once a write has WATCHed, to inject a racing write
+
+    def get(self, k):
+        return self.data.get(k)
+
+    def setex(self, k, ttl, v):
+        self.writes += 1
+        self.data[k] = v
+        self.ttls[k] = ttl
+
+    def delete(self, *keys):
+        self.writes += 1
+        for k in keys:
+            self.data.pop(k, None)
+
+    def expire(self, k, ttl):
+        self.ttls[k] = ttl
+
+    def hset(self, k, mapping):
+        self.writes += 1
+        self.hset_fields += len(mapping)
+        h = self.data.setdefault(k, {})
+        for f, v in mapping.items():
+            h[f.encode()] = v if isinstance(v, bytes) else str(v).encode()
+
+    def hdel(self, k, *fields):
+        self.writes += 1
+        for f in fields:
+            self.data.get(k, {}).pop(f.encode(), None)
+
+    def hgetall(self, k):
+        return dict(self.data.get(k, {}))
+
+    def hkeys(self, k):
+        return list(self.data.get(k, {}))
+
+    def hmget(self, k, fields):
+        h = self.data.get(k, {})
+        return [h.get(f.encode()) for f in fields]
+
+    def zadd(self, k, mapping):
+        self.writes += 1
+        self.data.setdefault(k, {}).update(mapping)
+
+    def zrem(self, k, member):
+        self.writes += 1
+        self.data.get(k, {}).pop(member, None)
+
+    def zrange(self, k, start, stop):
+        return list(reversed(self.zrevrange(k, 0, -1)))[start:None if stop == -1 else stop + 1]
+
+    def zrevrange(self, k, start, stop):
+        ranked = sorted(self.data.get(k, {}).items(), key=lambda kv: -kv[1])
+        ranked = ranked[start:] if stop == -1 else ranked[start:stop + 1]
+        return [m.encode() for m, _ in ranked]
+
+    def pipeline(self, transaction=True):
+        redis, calls = self, []
+
+        class _Pipe:
+            watched_at = None
+            queueing = True
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def watch(self, *keys):
+                self.watched_at, self.queueing = redis.writes, False
+                if redis.on_watch:
+                    hook, redis.on_watch = redis.on_watch, None
+                    hook()
+
+            def multi(self):
+                self.queueing = True
+
+            def __getattr__(self, name):
+                if not self.queueing:
+                    return getattr(redis, name)
+                return lambda *a, **kw: calls.append((getattr(redis, name), a, kw))
+
+            def execute(self):
+                if self.watched_at is not None and redis.writes != self.watched_at:
+                    raise WatchError("watched keys changed")
+                return [fn(*a, **kw) for fn, a, kw in calls]
+
+        return _Pipe()
+
+
+def _runner(mint, multiplier, **extra):
+    return {"address": mint, "symbol": mint.upper(), "multiplier": multiplier,
+            "current_price": 0.01, "security": {"mint_revoked": True}, **extra}
+
+
+def _board(redis):
+    return TrendingBoard(lambda: redis, ttl=43200)
+
+
+class TestReadWrite:
+    def test_round_trip_ranked_by_multiplier(self):
+        redis = _Redis()
+        board = _board(redis)
+        runners = [_runner("a", 50.0), _runner("b", 9.5), _runner("c", 20.0)]
+        board.write("7_5.0_50000_secure", runners, refreshed_at=1000.0)
+
+        snap = board.read("7_5.0_50000_secure")
+        assert [r["address"] for r in snap.runners] == ["a", "c", "b"]
+        assert snap.runners[0] == runners[0]
+        assert (snap.order, snap.refreshed_at) == ("multiplier", 1000.0)
+        assert redis.ttls["trending_board:7_5.0_50000_secure:runners"] == 43200
+
+    def test_full_read_served_from_the_board_payload(self):
+        redis = _Redis()
+        board = _board(redis)
+        board.write("w", [_runner("a", 50.0), _runner("b", 9.5), _runner("c", 20.0)])
+        redis.data["trending_board:w:runners"].clear()  # the payload alone must suffice
+        assert [r["address"] for r in board.read("w").runners] == ["a", "c", "b"]
+
+    def test_board_payload_follows_diff_writes(self):
+        board = _board(_Redis())
+        previous = [_runner("a", 50.0), _runner("b", 9.5)]
+        board.write("w", previous)
+        board.write("w", [dict(previous[1], multiplier=99.0), _runner("c", 30.0)], previous)
+        assert board.read("w").runners == [
+            dict(previous[1], multiplier=99.0), _runner("c", 30.0),
+        ]
+
+    def test_limit_reads_only_top_runners(self):
+        redis = _Redis()
+        board = _board(redis)
+        board.write("w", [_runner(f"m{i}", float(i)) for i in range(20)])
+        assert [r["address"] for r in board.read("w", limit=3).runners] == ["m19", "m18", "m17"]
+
+    def test_missing_board(self):
+        assert _board(_Redis()).read("w") is None
+
+    def test_momentum_order(self):
+        board = _board(_Redis())
+        runners = [_runner("a", 50.0, momentum_score=10.0), _runner("b", 9.5, momentum_score=80.0)]
+        board.write("w", runners, order="momentum")
+        snap = board.read("w")
+        assert [r["address"] for r in snap.runners] == ["b", "a"] and snap.order == "momentum"
+
+
+class TestDiffWrites:
+    def test_only_changed_fields_sent(self):
+        redis = _Redis()
+        board = _board(redis)
+        previous = [_runner("a", 50.0), _runner("b", 9.5)]
+        board.write("w", previous)
+        redis.hset_fields = 0
+
+        updated = [dict(previous[0], current_price=0.02), dict(previous[1])]
+        assert board.write("w", updated, previous) == 1
+        assert redis.hset_fields == 1 + 2  # runner "a", plus the meta hash
+
+    def test_evicted_runner_removed(self):
+        redis = _Redis()
+        board = _board(redis)
+        previous = [_runner("a", 50.0), _runner("b", 9.5)]
+        board.write("w", previous)
+
+        board.write("w", [dict(previous[0]), _runner("c", 30.0)], previous)
+        assert [r["address"] for r in board.read("w").runners] == ["a", "c"]
+        assert b"b" not in redis.data["trending_board:w:runners"]
+
+    def test_score_follows_changed_multiplier(self):
+        board = _board(_Redis())
+        previous = [_runner("a", 50.0), _runner("b", 9.5)]
+        board.write("w", previous)
+        board.write("w", [dict(previous[0]), dict(previous[1], multiplier=99.0)], previous)
+        snap = board.read("w")
+        assert [(r["address"], r["multiplier"]) for r in snap.runners] == [("b", 99.0), ("a", 50.0)]
+
+    def test_dropped_field_deleted(self):
+        board = _board(_Redis())
+        previous = [_runner("a", 50.0, rank=1)]
+        board.write("w", previous)
+        current = dict(previous[0])
+        del current["rank"]
+        board.write("w", [current], previous)
+        assert "rank" not in board.read("w").runners[0]
+
+
+class TestConcurrentWrites:
+    def test_write_from_stale_board_evicts_runners_it_never_saw(self):
+        redis = _Redis()
+        board = _board(redis)
+        read = [_runner("a", 50.0), _runner("b", 9.5)]
+        board.write("w", read)
+
+        # Two writers read the same board; the second writes after the first.
+        board.write("w", [dict(read[0]), _runner("d", 40.0)], read)
+        board.write("w", [dict(read[0]), _runner("c", 30.0)], read)
+
+        assert [r["address"] for r in board.read("w").runners] == ["a", "c"]
+        assert b"d" not in redis.data["trending_board:w:runners"]
+
+    def test_race_during_write_is_retried(self):
+        redis = _Redis()
+        board = _board(redis)
+        read = [_runner("a", 50.0), _runner("b", 9.5)]
+        board.write("w", read)
+
+        # The other writer lands between our WATCH and EXEC and evicts "a".
+        redis.on_watch = lambda: board.write("w", [_runner("d", 40.0)], read)
+        board.write("w", [dict(read[0], current_price=0.5), _runner("c", 30.0)], read)
+
+        snap = board.read("w")
+        assert [r["address"] for r in snap.runners] == ["a", "c"]
+        assert snap.runners[0] == dict(read[0], current_price=0.5)  # rewritten whole
+
+
+class TestFallbacks:
+    def test_legacy_blob_migrated(self):
+        redis = _Redis()
+        legacy = [_runner("a", 50.0), _runner("b", 9.5)]
+        redis.data["trending_leaderboard:w"] = redis_codec.dumps(legacy)
+
+        snap = _board(redis).read("w")
+        assert snap.runners == legacy and snap.refreshed_at == 0.0
+        assert "trending_leaderboard:w" not in redis.data
+        assert _board(redis).read("w").runners == legacy
+
+    def test_per_runner_hashes_migrated(self):
+        import orjson
+        redis = _Redis()
+        legacy = [_runner("a", 50.0), _runner("b", 9.5)]
+        redis.data["trending_board:w"] = {b"order": b"multiplier", b"refreshed_at": b"1000.0"}
+        redis.data["trending_board:w:multiplier"] = {"a": 50.0, "b": 9.5}
+        for runner in legacy:
+            redis.data[f"trending_runner:w:{runner['address']}"] = {
+                k.encode(): orjson.dumps(v) for k, v in runner.items()
+            }
+
+        snap = _board(redis).read("w", limit=1)
+        assert snap.runners == legacy[:1] and snap.refreshed_at == 1000.0
+        assert "trending_runner:w:a" not in redis.data
+        assert _board(redis).read("w").runners == legacy
+
+    def test_without_redis_board_is_in_process(self):
+        board = TrendingBoard(lambda: None, ttl=43200)
+        assert board.read("w") is None
+        board.write("w", [_runner("a", 50.0), _runner("b", 9.5)])
+        assert [r["address"] for r in board.read("w", limit=1).runners] == ["a"]
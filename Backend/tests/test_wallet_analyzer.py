@@ -2,9 +2,10 @@
 
 import pytest
 import time
-import json
 from unittest.mock import patch, MagicMock
 
+from services import redis_codec
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -68,6 +69,12 @@ class TestRedisHelpers:
         result = analyzer._redis_get("some_key")
         assert result == {"foo": "bar"}
 
+    def test_redis_get_decodes_codec_payload(self):
+        analyzer = _make_analyzer()
+        analyzer._redis = MagicMock()
+        analyzer._redis.get.return_value = redis_codec.dumps({"runners": [{"x": 1}] * 50})
+        assert analyzer._redis_get("some_key") == {"runners": [{"x": 1}] * 50}
+
     def test_redis_get_returns_none_when_empty(self):
         analyzer = _make_analyzer()
         analyzer._redis = MagicMock()
@@ -89,7 +96,7 @@ class TestRedisHelpers:
         analyzer = _make_analyzer()
         analyzer._redis = MagicMock()
         analyzer._redis_set("k", {"a": 1}, 300)
-        analyzer._redis.setex.assert_called_once_with("k", 300, json.dumps({"a": 1}))
+        analyzer._redis.setex.assert_called_once_with("k", 300, redis_codec.dumps({"a": 1}))
 
     def test_redis_set_no_op_without_client(self):
         analyzer = _make_analyzer()
@@ -113,24 +120,102 @@ class TestRedisHelpers:
 # ===========================================================================
 
 class TestHybridCache:
-    """Tests for _get_from_cache / _save_to_cache."""
+    """Tests for the analyzer's cache families on top of TieredCache."""
 
     def test_returns_redis_data_when_available(self):
         analyzer = _make_analyzer()
         analyzer._redis = MagicMock()
-        analyzer._redis.get.return_value = '{"cached": true}'
-        data, source = analyzer._get_from_cache("rk", "SELECT 1", [])
-        assert data == {"cached": True}
-        assert source == "redis"
+        analyzer._redis.get.return_value = '{"price": 0.5}'
+        analyzer.fetch_with_retry = MagicMock()
+
+        assert analyzer._get_token_launch_price("Mint1") == 0.5
+        analyzer._redis.get.assert_called_once_with("launch_price:Mint1")
+        analyzer.fetch_with_retry.assert_not_called()
 
     def test_returns_none_when_nothing_cached(self):
         analyzer = _make_analyzer()
         analyzer._redis = MagicMock()
         analyzer._redis.get.return_value = None
         analyzer.con = None
-        data, source = analyzer._get_from_cache("rk", "SELECT 1", [])
-        assert data is None
-        assert source is None
+        analyzer.fetch_with_retry = MagicMock(return_value=None)
+
+        assert analyzer._get_token_launch_price("Mint1") is None
+        analyzer._redis.setex.assert_not_called()
+
+    def test_second_read_served_in_process(self):
+        """A Redis hit is promoted to L1, so the next read skips Redis."""
+        analyzer = _make_analyzer()
+        analyzer._redis = MagicMock()
+        analyzer._redis.get.return_value = '{"price": 0.5}'
+
+        analyzer._get_token_launch_price("Mint1")
+        analyzer._get_token_launch_price("Mint1")
+
+        assert analyzer._redis.get.call_count == 1
+        stats = analyzer.cache_stats()["families"]["launch_price"]
+        assert stats["l1"]["hits"] == 1 and stats["l2"]["hits"] == 1
+
+    def test_api_result_written_to_redis_with_family_ttl(self):
+        from services.wallet_analyzer import REDIS_TTL_LAUNCH
+        analyzer = _make_analyzer()
+        analyzer._redis = MagicMock()
+        analyzer._redis.get.return_value = None
+        analyzer.fetch_with_retry = MagicMock(return_value={
+            "pools": [{"liquidity": {"usd": 10}, "price": {"usd": 0.25}}],
+        })
+
+        assert analyzer._get_token_launch_price("Mint1") == 0.25
+        analyzer._redis.setex.assert_called_once_with(
+            "launch_price:Mint1", REDIS_TTL_LAUNCH, redis_codec.dumps({"price": 0.25})
+        )
+
+
+# ===========================================================================
+# Trending leaderboard
+# ===========================================================================
+
+class TestTrendingBoard:
+    """Tests for the trending leaderboard on top of TrendingBoard."""
+
+    def _runners(self):
+        return [
+            {"address": "A", "symbol": "A", "multiplier": 50.0, "volume_24h": 1e4, "holders": 10, "liquidity": 6e4},
+            {"address": "B", "symbol": "B", "multiplier": 9.0, "volume_24h": 9e6, "holders": 5000, "liquidity": 9e5},
+        ]
+
+    def test_fresh_board_served_without_api_call(self):
+        analyzer = _make_analyzer()
+        analyzer._redis = None
+        analyzer._trending.write("7_5.0_50000_secure", self._runners())
+        analyzer.fetch_with_retry = MagicMock()
+
+        runners = analyzer.find_trending_runners_enhanced(limit=1)
+
+        assert [r["address"] for r in runners] == ["A"]
+        analyzer.fetch_with_retry.assert_not_called()
+
+    def test_stale_board_kept_when_api_unavailable(self):
+        analyzer = _make_analyzer()
+        analyzer._redis = None
+        analyzer._trending.write("7_5.0_50000_secure", self._runners(), refreshed_at=0.0)
+        analyzer.fetch_with_retry = MagicMock(return_value=None)
+
+        assert len(analyzer.find_trending_runners_enhanced()) == 2
+        analyzer.fetch_with_retry.assert_called_once()
+        assert analyzer._trending.read("7_5.0_50000_secure").refreshed_at > 0
+
+    def test_refresh_reranks_by_momentum_with_rank_change(self):
+        analyzer = _make_analyzer()
+        analyzer._redis = None
+        analyzer._trending.write("7_5.0_50000_secure",
+                                 [dict(r, rank=i) for i, r in enumerate(self._runners(), 1)])
+        analyzer._get_token_detailed_info = MagicMock(return_value=None)
+        analyzer._get_price_range_in_period = MagicMock(return_value=None)
+
+        runners = analyzer.refresh_runner_market_data()
+
+        assert [(r["address"], r["rank"], r["rank_change"]) for r in runners] == [("B", 1, 1), ("A", 2, -1)]
+        assert analyzer._trending.read("7_5.0_50000_secure").order == "momentum"
 
 
 # ===========================================================================
@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from unittest.mock import patch
 
 from tasks.wallet_qualification import (
+    build_wallet_token_stats_columns,
     build_wallet_token_stats_row,
     _compute_outcome,
     _disqualified_row,
@@ -254,3 +255,185 @@ class TestTimestampHandling:
         # Should be roughly now (within a few seconds)
         delta = abs((datetime.now(timezone.utc) - row["first_entry_timestamp"]).total_seconds())
         assert delta < 5
+
+
+class TestBuildWalletTokenStatsColumns:
+    """Tests for build_wallet_token_stats_columns (columnar row builder)."""
+
+    @staticmethod
+    def _wallets():
+        cases = [
+            dict(realized=500, total_invested=100, first_buy_time=1700000000000),  # 6x
+            dict(realized=420, total_invested=100, entry_price=0),                 # 5.2x
+            dict(realized=360, total_invested=100),                                # 4.6x, draw
+            dict(realized=210, total_invested=80),                                 # 3.6x
+            dict(realized=50, total_invested=100),                                 # roi floor
+            dict(realized=500, total_invested=60),                                 # spend floor
+            dict(realized=0, total_invested=0),
+        ]
+        wallets = []
+        for i, kw in enumerate(cases):
+            wd = _make_wallet_data(**kw)
+            wd["wallet"] = f"W{i}"
+            wallets.append(wd)
+        return wallets
+
+    @pytest.mark.parametrize("pass_type", ["first", "second"])
+    def test_matches_row_builder(self, pass_type):
+        """Every column equals what build_wallet_token_stats_row gives per wallet."""
+        wallets = self._wallets()
+        first_buyers = ["W3", "W0", "Wx", "W0"]
+        cols = build_wallet_token_stats_columns(wallets, "T", pass_type, 0.05, first_buyers)
+        rows = [build_wallet_token_stats_row(w, "T", pass_type, 0.05, first_buyers) for w in wallets]
+
+        assert list(cols) == list(rows[0])
+        assert len(cols["wallet_address"]) == len(rows)
+        for i, row in enumerate(rows):
+            for name, value in row.items():
+                if name in ("scan_id", "updated_at"):
+                    continue
+                if name == "first_entry_timestamp":
+                    # Without a firstBuy, both fall back to "now".
+                    assert i > 0 or cols[name][i] == value
+                    continue
+                assert cols[name][i] == pytest.approx(value), (i, name)
+
+    def test_scan_ids_are_unique_uuid4(self):
+        import uuid
+        cols = build_wallet_token_stats_columns(self._wallets(), "T", "first")
+        ids = [uuid.UUID(s) for s in cols["scan_id"]]
+        assert len(set(ids)) == len(ids)
+        assert all(u.version == 4 for u in ids)
+        assert all(str(u) == s for u, s in zip(ids, cols["scan_id"]))
+
+    def test_plain_python_values(self):
+        """Columns hold Python scalars, so they mix with row-wise inserts in one block."""
+        cols = build_wallet_token_stats_columns(self._wallets(), "T", "second")
+        assert type(cols["total_roi_mult"][0]) is float
+        assert type(cols["qualifies"][0]) is int
+        assert cols["first_entry_timestamp"][0].tzinfo is timezone.utc
+
+    def test_empty_wallet_list(self):
+        cols = build_wallet_token_stats_columns([], "T", "second")
+        assert set(cols) == EXPECTED_COLUMNS
+        assert all(v == [] for v in cols.values())
+
+
+# ===================================================================
+# Scan tasks store their rows before returning (acks_late)
+# ===================================================================
+
+class TestScanTasksInsertBeforeAck:
+
+    @pytest.mark.parametrize("task_name", ["wallet_qualification_scan", "second_pass_patch"])
+    def test_rows_stored_before_redis_and_return(self, task_name):
+        from unittest.mock import MagicMock
+        import tasks.wallet_qualification as wq
+
+        calls = MagicMock()
+        wallet = _make_wallet_data(realized=500, total_invested=100)
+        wallet["wallet"] = "W0"
+        with patch.object(wq, "_fetch_wallets_for_token", return_value=[wallet]), \
+             patch.object(wq, "_get_first_buyers_wallets", return_value=[]), \
+             patch.object(wq, "_get_token_ath_mult", return_value=0.05), \
+             patch.object(wq, "_get_redis", return_value=calls.redis), \
+             patch("services.clickhouse_client.get_clickhouse_client", return_value=calls.ch), \
+             patch("services.clickhouse_insert_buffer.get_insert_buffer", return_value=calls.buffer):
+            result = getattr(wq, task_name).run("T")
+
+        assert result["rows_inserted"] == 1
+        assert calls.buffer.mock_calls == []
+        names = [name for name, _, _ in calls.mock_calls]
+        inserts = [i for i, name in enumerate(names) if name == "ch.insert"]
+        assert [calls.mock_calls[i].kwargs["table"] for i in inserts] == ["wallet_token_stats", "token_scans"]
+        assert all(calls.mock_calls[i].kwargs["settings"]["wait_for_async_insert"] == 1 for i in inserts)
+        assert inserts[-1] < min(i for i, name in enumerate(names) if name.startswith("redis."))
+
+
+# ===================================================================
+# requalify_existing_data
+# ===================================================================
+
+class _FakeCH:
+    """Serves keyset pages from a sorted row list, in blocks of two rows."""
+
+    def __init__(self, keys):
+        from tasks.wallet_qualification import REQUALIFY_COLUMNS
+        self.rows = []
+        for wallet, token, roi in sorted(keys):
+            row = dict.fromkeys(REQUALIFY_COLUMNS, 0)
+            row.update(wallet_address=wallet, token_address=token, realized_roi_mult=roi,
+                       total_spent_usd=100.0, outcome='loss', disqualify_reason='low roi')
+            self.rows.append([row[c] for c in REQUALIFY_COLUMNS])
+        self.queries, self.inserts = [], []
+
+    def query(self, sql, parameters=None):
+        from unittest.mock import MagicMock
+        return MagicMock(first_row=[len(self.rows)])
+
+    def query_row_block_stream(self, sql, parameters=None):
+        import contextlib
+        self.queries.append((sql, parameters))
+        limit = int(sql.rsplit("LIMIT", 1)[1])
+        after = (parameters['w'], parameters['t']) if parameters else None
+        page = [r for r in self.rows if after is None or (r[0], r[1]) > after][:limit]
+        return contextlib.nullcontext([page[i:i + 2] for i in range(0, len(page), 2)])
+
+    def insert(self, table, data, database, column_names):
+        self.inserts.append((data, column_names))
+
+
+class TestRequalifyExistingData:
+
+    KEYS = [("W1", "T1", 6.0), ("W1", "T2", 1.0), ("W2", "T1", 4.8), ("W3", "T9", 9.0), ("W4", "T1", 0.5)]
+
+    def _run(self, ch, **kwargs):
+        from tasks.wallet_qualification import requalify_existing_data
+        with patch("services.clickhouse_client.get_clickhouse_client", return_value=ch):
+            return requalify_existing_data.run(**kwargs)
+
+    def test_page_query_is_keyset_without_final(self):
+        from tasks.wallet_qualification import _requalify_page_query
+        sql, params = _requalify_page_query(("W1", "T2"), 100)
+        assert "FINAL" not in sql and "OFFSET" not in sql
+        assert "LIMIT 1 BY wallet_address, token_address" in sql
+        assert "updated_at DESC" in sql
+        assert params == {"w": "W1", "t": "T2"}
+        assert _requalify_page_query(None, 100)[1] == {}
+
+    def test_walks_every_row_once_by_cursor(self):
+        ch = _FakeCH(self.KEYS)
+        result = self._run(ch, batch_size=2)
+
+        assert result["total"] == 5 and result["pages"] == 3
+        assert [q[1] for q in ch.queries] == [{}, {"w": "W1", "t": "T2"}, {"w": "W3", "t": "T9"}]
+        written = [(r[0], r[1]) for data, _ in ch.inserts for r in data]
+        assert written == [(w, t) for w, t, _ in sorted(self.KEYS)]
+        assert result["cursor"] == ["W4", "T1"]
+
+    def test_recomputes_outcome_and_appends_updated_at(self):
+        ch = _FakeCH(self.KEYS)
+        result = self._run(ch, batch_size=10)
+
+        data, columns = ch.inserts[0]
+        assert columns[-1] == "updated_at"
+        rows = {(r[0], r[1]): dict(zip(columns, r)) for r in data}
+        assert rows[("W1", "T1")]["outcome"] == "win" and rows[("W1", "T1")]["qualifies"] == 1
+        assert rows[("W1", "T1")]["disqualify_reason"] == ""
+        assert rows[("W2", "T1")]["outcome"] == "draw"
+        assert rows[("W1", "T2")]["disqualify_reason"] == "low roi"
+        assert isinstance(rows[("W4", "T1")]["updated_at"], datetime)
+        assert (result["wins"], result["draws"], result["losses"]) == (2, 1, 2)
+        assert result["changed"] == 3 and result["pages"] == 1
+
+    def test_resumes_after_cursor(self):
+        ch = _FakeCH(self.KEYS)
+        result = self._run(ch, batch_size=10, after=["W2", "T1"])
+
+        assert result["total"] == 2
+        assert ch.queries[0][1] == {"w": "W2", "t": "T1"}
+
+    def test_empty_table(self):
+        ch = _FakeCH([])
+        result = self._run(ch)
+        assert result["total"] == 0 and result["cursor"] is None and not ch.inserts
@@ -0,0 +1,255 @@
+"""Tests for services/wallet_watchers_index.py and the Helius fan-out path."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from routes import helius_webhook
+from services import wallet_watchers_index
+
+
+class _HashRedis:
+    """Just enough of redis.Redis (decode_responses=True) for the index."""
+
+    def __init__(self):
+        self.data = {}
+
+    def hgetall(self, key):
+        return dict(self.data.get(key) or {})
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match, count=None):
+        return [key for key in list(self.data) if key.startswith(match.rstrip("*"))]
+
+    def register_script(self, _source):
+        def store(keys, args, client=None):
+            if client is not None and client is not self:
+                return client.store(keys, args)
+            if int(self.data.get(keys[1]) or 0) > int(args[0]):
+                return 0
+            fields = args[2:]
+            self.data[keys[0]] = dict(zip(fields[::2], fields[1::2]))
+            return 1
+
+        self.store = store
+        return store
+
+    def pipeline(self, transaction=True):
+        redis = self
+        ops = []
+
+        class _Pipe:
+            def store(self, keys, args):
+                ops.append(("store", (keys, args), {}))
+
+            def __getattr__(self, name):
+                return lambda *a, **kw: ops.append((name, a, kw))
+
+            def execute(self):
+                return [getattr(redis, name)(*a, **kw) for name, a, kw in ops]
+
+        return _Pipe()
+
+
+def _supabase(rows):
+    """Supabase mock whose wallet_watchlist query returns ``rows``."""
+    client = MagicMock()
+    query = client.schema.return_value.table.return_value.select.return_value
+    query.eq.return_value.execute.return_value.data = rows
+    return client
+
+
+WATCHERS = [
+    {"user_id": "u1", "wallet_address": "W1", "min_trade_usd": 0, "alert_on_buy": True},
+    {"user_id": "u2", "wallet_address": "W1", "min_trade_usd": 500, "alert_on_buy": True},
+    {"user_id": "u3", "wallet_address": "W1", "min_trade_usd": 0, "alert_on_buy": False},
+]
+
+
+@pytest.fixture
+def redis():
+    fake = _HashRedis()
+    with patch("services.wallet_watchers_index.get_redis_client", return_value=fake):
+        yield fake
+
+
+class TestWatchersIndex:
+
+    def test_miss_loads_from_db_and_caches(self, redis):
+        supabase = _supabase(WATCHERS)
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=supabase):
+            first = wallet_watchers_index.get_watchers("W1")
+            second = wallet_watchers_index.get_watchers("W1")
+
+        assert supabase.schema.call_count == 1
+        assert sorted(w["user_id"] for w in first) == ["u1", "u2", "u3"]
+        assert sorted(w["user_id"] for w in second) == ["u1", "u2", "u3"]
+        assert next(w for w in second if w["user_id"] == "u2")["min_trade_usd"] == 500
+
+    def test_unwatched_wallet_is_cached_as_empty(self, redis):
+        supabase = _supabase([])
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=supabase):
+            assert not wallet_watchers_index.is_watched("W9")
+            assert not wallet_watchers_index.is_watched("W9")
+
+        assert supabase.schema.call_count == 1
+        assert set(redis.data["sifter:watchers:W9"]) == {wallet_watchers_index.LOADED_FIELD}
+
+    def test_invalidate_forces_reload(self, redis):
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=_supabase([])):
+            assert wallet_watchers_index.get_watchers("W1") == []
+
+        wallet_watchers_index.invalidate("W1", None)
+
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=_supabase(WATCHERS[:1])):
+            assert [w["user_id"] for w in wallet_watchers_index.get_watchers("W1")] == ["u1"]
+
+    def test_watchers_with_alerts_off_still_count_as_watched(self, redis):
+        rows = [{"user_id": "u1", "wallet_address": "W3", "alert_enabled": False},
+                {"user_id": "u2", "wallet_address": "W4", "alert_enabled": False},
+                {"user_id": "u3", "wallet_address": "W4", "alert_enabled": True}]
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=_supabase(rows[:1])):
+            assert wallet_watchers_index.is_watched("W3")
+            assert wallet_watchers_index.get_watchers("W3") == []
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=_supabase(rows[1:])):
+            assert [w["user_id"] for w in wallet_watchers_index.get_watchers("W4")] == ["u3"]
+            assert [w["user_id"] for w in wallet_watchers_index.get_watchers("W4")] == ["u3"]
+
+    def test_load_racing_an_invalidate_is_not_stored(self, redis):
+        """A DB snapshot read before a watchlist write must not outlive its invalidate."""
+        def stale_read_then_user_adds_wallet(_wallet):
+            wallet_watchers_index.invalidate("W5")
+            return []
+
+        with patch("services.wallet_watchers_index._load_from_db", side_effect=stale_read_then_user_adds_wallet):
+            assert not wallet_watchers_index.is_watched("W5")
+        assert "sifter:watchers:W5" not in redis.data
+
+        with patch("services.wallet_watchers_index.get_supabase_client",
+                   return_value=_supabase([{"user_id": "u1", "wallet_address": "W5"}])):
+            assert wallet_watchers_index.is_watched("W5")
+
+    def test_rebuild_groups_rows_by_wallet(self, redis):
+        client = MagicMock()
+        page = (client.schema.return_value.table.return_value.select.return_value
+                .order.return_value.range.return_value)
+        page.execute.return_value.data = WATCHERS + [{"user_id": "u4", "wallet_address": "W2"}]
+
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=client):
+            assert wallet_watchers_index.rebuild() == {"wallets": 2, "watchers": 4}
+            assert [w["user_id"] for w in wallet_watchers_index.get_watchers("W2")] == ["u4"]
+
+    def test_rebuild_skips_wallets_invalidated_mid_scan_and_drops_unwatched(self, redis):
+        redis.data["sifter:watchers:GONE"] = {wallet_watchers_index.LOADED_FIELD: "1", "u9": "{}"}
+        client = MagicMock()
+        page = (client.schema.return_value.table.return_value.select.return_value
+                .order.return_value.range.return_value)
+
+        def scan_page():
+            wallet_watchers_index.invalidate("W2")
+            return MagicMock(data=WATCHERS + [{"user_id": "u4", "wallet_address": "W2"}])
+
+        page.execute.side_effect = scan_page
+
+        with patch("services.wallet_watchers_index.get_supabase_client", return_value=client):
+            wallet_watchers_index.rebuild()
+
+        assert "sifter:watchers:GONE" not in redis.data
+        assert "sifter:watchers:W2" not in redis.data
+        assert set(redis.data["sifter:watchers:W1"]) == {wallet_watchers_index.LOADED_FIELD, "u1", "u2", "u3"}
+
+
+SIGNAL = {
+    "wallet_address": "W1aaaaaaaa",
+    "token_address": "MINT",
+    "token_ticker": "TKN",
+    "tx_hash": "sig",
+    "usd_value": 100.0,
+    "sol_amount": 0.5,
+    "wallet_tier": "S",
+}
+
+
+class TestProcessSignal:
+
+    def _run(self, watchers):
+        supabase = MagicMock()
+        with patch("services.wallet_watchers_index.get_watchers", return_value=watchers), \
+             patch.object(helius_webhook, "get_supabase_client", return_value=supabase), \
+             patch("services.tasks.fanout_wallet_alerts") as fanout, \
+             patch.object(helius_webhook, "_maybe_record_paper_trades"):
+            helius_webhook._process_signal(dict(SIGNAL))
+        insert = supabase.schema.return_value.table.return_value.insert
+        return insert, fanout
+
+    @pytest.mark.parametrize("count", [1, 100, 1000])
+    def test_one_insert_and_one_fanout_regardless_of_audience(self, count):
+        watchers = [{"user_id": f"u{i}", "min_trade_usd": 0, "alert_on_buy": True} for i in range(count)]
+        insert, fanout = self._run(watchers)
+
+        assert insert.call_count == 1
+        assert len(insert.call_args[0][0]) == count
+        assert fanout.delay.call_count == 1
+        assert len(fanout.delay.call_args[0][0]) == count
+
+    def test_filters_apply_before_fanout(self):
+        insert, fanout = self._run([{**w} for w in WATCHERS])
+
+        assert [row["user_id"] for row in insert.call_args[0][0]] == ["u1"]
+        user_ids, alert_data = fanout.delay.call_args[0]
+        assert user_ids == ["u1"]
+        assert alert_data["trade"]["token_ticker"] == "TKN"
+        assert alert_data["wallet"]["address"] == SIGNAL["wallet_address"]
+
+    def test_no_watchers_does_nothing(self):
+        insert, fanout = self._run([])
+        insert.assert_not_called()
+        fanout.delay.assert_not_called()
+
+
+class TestFanoutTask:
+
+    def test_large_audience_is_chunked(self):
+        from services import tasks
+
+        with patch.object(tasks.fanout_wallet_alerts, "delay") as delay, \
+             patch("services.telegram_notifier.get_telegram_notifier") as get_notifier:
+            result = tasks.fanout_wallet_alerts.run([f"u{i}" for i in range(250)], {"trade": {}})
+
+        assert result == {"status": "split", "chunks": 3}
+        assert [len(c[0][0]) for c in delay.call_args_list] == [100, 100, 50]
+        get_notifier.return_value.send_wallet_alert.assert_not_called()
+
+    def test_chunk_resolves_chat_ids_in_one_query(self):
+        from services import tasks
+
+        supabase = MagicMock()
+        query = (supabase.schema.return_value.table.return_value.select.return_value
+                 .in_.return_value.eq.return_value)
+        query.execute.return_value.data = [
+            {"user_id": "u1", "telegram_chat_id": "111"},
+            {"user_id": "u2", "telegram_chat_id": None},
+        ]
+        notifier = MagicMock()
+        notifier.send_wallet_alert.return_value = True
+
+        with patch("services.telegram_notifier.get_telegram_notifier", return_value=notifier), \
+             patch("services.supabase_client.get_supabase_client", return_value=supabase):
+            result = tasks.fanout_wallet_alerts.run(["u1", "u2"], {"trade": {}})
+
+        assert result["sent"] == 1
+        assert query.execute.call_count == 1
+        notifier.send_wallet_alert.assert_called_once_with("u1", {"trade": {}}, chat_id="111")
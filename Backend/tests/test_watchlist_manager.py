@@ -253,3 +253,106 @@ class TestUpdatePositionMovements:
         watchlist = [{"wallet_address": "NEW", "position": 5}]
         result = mgr._update_position_movements(watchlist, {})
         assert result[0]["movement"] == "up"
+
+
+# ===========================================================================
+# Shared trade window / trade_cache
+# ===========================================================================
+
+def _trade(days_ago, side="buy", token="T1"):
+    from datetime import datetime, timedelta
+    return {"token_address": token, "side": side, "price_per_token": 1.0, "usd_value": 100.0,
+            "block_time": (datetime.utcnow() - timedelta(days=days_ago)).isoformat()}
+
+
+class TestTradeWindow:
+    """_get_recent_trades cuts 7d/30d/form views from one 30-day fetch."""
+
+    TRADES = [_trade(1), _trade(5, "sell"), _trade(10), _trade(25)]
+
+    def _mgr(self):
+        mgr = _make_manager()
+        mgr._fetch_trades = MagicMock(return_value=list(self.TRADES))
+        return mgr
+
+    def test_refresh_metrics_fetches_once(self):
+        mgr = self._mgr()
+        metrics = mgr._refresh_wallet_metrics("W1")
+        assert mgr._fetch_trades.call_count == 1
+        assert metrics["last_trade_time"] == self.TRADES[0]["block_time"]
+
+    def test_views_are_derived_in_memory(self):
+        mgr = self._mgr()
+        with mgr.trade_cache():
+            assert mgr._get_recent_trades("W1", days=7) == self.TRADES[:2]
+            assert mgr._get_recent_trades("W1", days=30) == self.TRADES
+            assert mgr._get_recent_trades("W1", days=30, limit=3) == self.TRADES[:3]
+        assert mgr._fetch_trades.call_count == 1
+
+    def test_since_clips_the_window(self):
+        from datetime import datetime, timedelta
+        mgr = self._mgr()
+        since = (datetime.utcnow() - timedelta(days=7)).isoformat()
+        assert mgr._get_recent_trades("W1", days=30, since=since) == self.TRADES[:2]
+
+    def test_epoch_and_zulu_block_times_are_supported(self):
+        import time
+        from datetime import datetime, timedelta
+        mgr = _make_manager()
+        recent = {"block_time": (datetime.utcnow() - timedelta(days=2)).isoformat() + "Z"}
+        epoch = {"block_time": int(time.time() - 3 * 86400)}
+        old = {"block_time": int(time.time() - 20 * 86400)}
+        assert mgr._filter_trades([recent, epoch, old], days=7) == [recent, epoch]
+
+    def test_no_cache_outside_block(self):
+        mgr = self._mgr()
+        mgr._get_recent_trades("W1", days=7)
+        mgr._get_recent_trades("W1", days=7)
+        assert mgr._fetch_trades.call_count == 2
+        assert mgr._trade_cache is None
+
+    def test_nested_blocks_share_the_outer_cache(self):
+        mgr = self._mgr()
+        with mgr.trade_cache():
+            with mgr.trade_cache():
+                mgr._get_recent_trades("W1", days=7)
+            mgr._get_recent_trades("W1", days=30)
+        assert mgr._fetch_trades.call_count == 1
+
+    def test_rerank_fetches_each_wallet_once(self):
+        mgr = self._mgr()
+        mgr._get_watchlist = MagicMock(side_effect=lambda uid: [
+            {"wallet_address": "W1", "position": 1}, {"wallet_address": "W2", "position": 2},
+        ])
+        mgr._save_watchlist = MagicMock()
+        mgr._generate_promotion_queue = MagicMock()
+
+        with mgr.trade_cache():
+            for user_id in ("u1", "u2", "u3"):
+                mgr.rerank_user_watchlist(user_id)
+
+        fetched = [c.args[0] for c in mgr._fetch_trades.call_args_list]
+        assert sorted(fetched) == ["W1", "W2"]
+
+    def test_failed_fetch_not_cached_for_the_next_user(self):
+        mgr = _make_manager()
+        mgr._table = MagicMock()
+        query = mgr._table.return_value.select.return_value.eq.return_value.gte.return_value.order.return_value
+        query.execute.side_effect = [RuntimeError("timeout"), MagicMock(data=list(self.TRADES))]
+        watchlist = [{"wallet_address": "W1", "position": 1, "roi_30d": 42.0}]
+        mgr._get_watchlist = MagicMock(side_effect=lambda uid: [dict(w) for w in watchlist])
+        mgr._save_watchlist = MagicMock()
+        mgr._generate_promotion_queue = MagicMock()
+
+        with mgr.trade_cache():
+            mgr.rerank_user_watchlist("u1")
+            mgr.rerank_user_watchlist("u2")
+
+        first, second = (c.args[1][0] for c in mgr._save_watchlist.call_args_list)
+        # u1's metrics fetch failed: stored metrics are left alone, not zeroed.
+        assert first["roi_30d"] == 42.0
+        assert "last_trade_time" not in first
+        # The failure wasn't cached: the retry succeeded and u2 sees the real trades.
+        assert second["last_trade_time"] == self.TRADES[0]["block_time"]
+        assert second["roi_30d"] != 42.0
+        assert query.execute.call_count == 2
@@ -0,0 +1,107 @@
+"""Tests for services/watchlist_stats_updater.py — daily refresh engine."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+
+def _make_updater(rows, metrics=None):
+    """WatchlistStatsUpdater over mocked Supabase returning ``rows`` for the watchlist select."""
+    with patch("services.watchlist_stats_updater.get_supabase_client") as get_client, \
+         patch("services.watchlist_manager.get_supabase_client"):
+        from services.watchlist_stats_updater import WatchlistStatsUpdater
+        updater = WatchlistStatsUpdater()
+    supabase = get_client.return_value
+    supabase.schema.return_value.table.return_value.select.return_value.execute.return_value.data = rows
+    updater.manager = MagicMock()
+    updater.manager._refresh_wallet_metrics.side_effect = metrics or (
+        lambda addr, added_at=None: {'roi_7d': 10.0, 'runners_7d': 2, 'consistency_score': None}
+    )
+    return updater, supabase
+
+
+ROWS = [
+    {'wallet_address': 'W1', 'user_id': 'u1', 'added_at': '2026-05-02T00:00:00'},
+    {'wallet_address': 'W1', 'user_id': 'u2', 'added_at': '2026-05-01T00:00:00'},
+    {'wallet_address': 'W1', 'user_id': 'u3', 'added_at': None},
+    {'wallet_address': 'W2', 'user_id': 'u1', 'added_at': None},
+]
+
+
+class TestDailyStatsRefresh:
+
+    def test_one_rpc_for_all_rows(self):
+        updater, supabase = _make_updater(ROWS)
+        result = updater.daily_stats_refresh()
+
+        rpc = supabase.schema.return_value.rpc
+        assert rpc.call_count == 1
+        name, params = rpc.call_args[0]
+        assert name == 'bulk_refresh_watchlist_metrics'
+        assert sorted(r['wallet_address'] for r in params['p_rows']) == ['W1', 'W2']
+        supabase.schema.return_value.table.return_value.update.assert_not_called()
+        assert result['success'] == 2 and result['errors'] == 0
+        assert result['requests'] == 2  # select + one RPC
+        assert result['rows'] == 4 and result['wallets'] == 2
+
+    def test_metrics_once_per_wallet_with_earliest_added_at(self):
+        updater, _ = _make_updater(ROWS)
+        updater.daily_stats_refresh()
+
+        calls = {c.args[0]: c.kwargs['added_at'] for c in updater.manager._refresh_wallet_metrics.call_args_list}
+        assert calls == {'W1': '2026-05-01T00:00:00', 'W2': None}
+
+    def test_payload_is_merge_only(self):
+        updater, supabase = _make_updater(ROWS[:1])
+        updater.daily_stats_refresh()
+
+        row = supabase.schema.return_value.rpc.call_args[0][1]['p_rows'][0]
+        assert row['roi_7d'] == 10.0 and row['runners_7d'] == 2
+        assert 'consistency_score' not in row
+        assert 'last_updated' in row
+
+    def test_rpc_is_chunked(self):
+        rows = [{'wallet_address': f'W{i}', 'user_id': 'u1', 'added_at': None} for i in range(5)]
+        updater, supabase = _make_updater(rows)
+        updater.BULK_CHUNK = 2
+        result = updater.daily_stats_refresh()
+
+        assert [len(c[0][1]['p_rows']) for c in supabase.schema.return_value.rpc.call_args_list] == [2, 2, 1]
+        assert result['requests'] == 4
+
+    def test_rpc_failure_falls_back_to_one_update_per_wallet(self):
+        updater, supabase = _make_updater(ROWS)
+        supabase.schema.return_value.rpc.side_effect = Exception("function not found")
+        result = updater.daily_stats_refresh()
+
+        update = supabase.schema.return_value.table.return_value.update
+        assert update.call_count == 2
+        in_ = update.return_value.eq.return_value.in_
+        user_ids = {tuple(c.args[1]) for c in in_.call_args_list}
+        assert user_ids == {('u1', 'u2', 'u3'), ('u1',)}
+        assert result['success'] == 2
+        assert result['requests'] == 4  # select + failed RPC + 2 updates
+
+    def test_metric_errors_are_counted_and_skipped(self):
+        def metrics(addr, added_at=None):
+            if addr == 'W2':
+                raise RuntimeError("boom")
+            return {'roi_7d': 1.0}
+
+        updater, supabase = _make_updater(ROWS, metrics=metrics)
+        result = updater.daily_stats_refresh()
+
+        assert result['success'] == 1 and result['errors'] == 1
+        rows = supabase.schema.return_value.rpc.call_args[0][1]['p_rows']
+        assert [r['wallet_address'] for r in rows] == ['W1']
+
+    def test_wallets_computed_concurrently(self):
+        rows = [{'wallet_address': f'W{i}', 'user_id': 'u1', 'added_at': None} for i in range(4)]
+        barrier = threading.Barrier(4, timeout=5)
+
+        def metrics(addr, added_at=None):
+            barrier.wait()  # deadlocks (and times out) unless all 4 run at once
+            return {'roi_7d': 1.0}
+
+        updater, _ = _make_updater(rows, metrics=metrics)
+        updater.REFRESH_WORKERS = 4
+        assert updater.daily_stats_refresh()['errors'] == 0
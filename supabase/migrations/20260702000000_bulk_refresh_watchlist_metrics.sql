@@ -0,0 +1,43 @@
+-- Bulk write path for WatchlistStatsUpdater.daily_stats_refresh.
+--
+-- The daily refresh computes metrics once per distinct wallet, but used to
+-- PATCH wallet_watchlist once per (user, wallet) row. This function takes a
+-- chunk of per-wallet metric rows and applies each to every user watching
+-- that wallet in a single UPDATE.
+--
+-- p_rows: JSON array of objects with wallet_address plus any of the metric
+-- columns below. Rows are decoded with jsonb_populate_record against the
+-- table itself, so column types always match. MERGE-ONLY: a metric that is
+-- absent or null in the payload keeps its current value.
+--
+-- Returns the number of wallet_watchlist rows updated. Idempotent.
+
+CREATE OR REPLACE FUNCTION sifter_dev.bulk_refresh_watchlist_metrics(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = sifter_dev, pg_temp
+AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE sifter_dev.wallet_watchlist AS w
+    SET roi_7d             = COALESCE(m.roi_7d, w.roi_7d),
+        roi_30d            = COALESCE(m.roi_30d, w.roi_30d),
+        runners_7d         = COALESCE(m.runners_7d, w.runners_7d),
+        runners_30d        = COALESCE(m.runners_30d, w.runners_30d),
+        win_rate_7d        = COALESCE(m.win_rate_7d, w.win_rate_7d),
+        last_trade_time    = COALESCE(m.last_trade_time, w.last_trade_time),
+        professional_score = COALESCE(m.professional_score, w.professional_score),
+        consistency_score  = COALESCE(m.consistency_score, w.consistency_score),
+        last_updated       = COALESCE(m.last_updated, NOW())
+    FROM jsonb_array_elements(p_rows) AS e(payload),
+         LATERAL jsonb_populate_record(NULL::sifter_dev.wallet_watchlist, e.payload) AS m
+    WHERE w.wallet_address = m.wallet_address;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION sifter_dev.bulk_refresh_watchlist_metrics(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION sifter_dev.bulk_refresh_watchlist_metrics(JSONB) TO service_role;
@@ -0,0 +1,202 @@
+-- Server-side aggregation for Elite100Manager.generate_elite_100.
+--
+-- generate_elite_100 used to select every wallet_watchlist row and fold them
+-- per wallet in Python. wallet_watchlist_elite_agg keeps that fold in the
+-- database instead: one row per watched wallet with the best metrics across
+-- all watchlists, times_added, and the composite score, indexed for each
+-- supported sort. generate_elite_100 reads the ranked top-N straight from it.
+--
+-- Maintenance is incremental: statement-level triggers on wallet_watchlist
+-- collect the wallet addresses a statement touched (via transition tables)
+-- and recompute only those wallets. A bulk refresh chunk of 200 wallets costs
+-- one recompute per wallet, not one per (user, wallet) row.
+--
+-- Aggregation matches the Python fold:
+--   professional_score / roi_30d / runners_30d  MAX over watchers (NULL -> 0)
+--   times_added                                  watcher count
+--   tier / win_rate_7d / consistency_score /
+--   last_trade_time / form                       taken from one representative
+--                                                row (highest professional_score,
+--                                                then most recently updated)
+--   composite_score                              see _calculate_composite_score
+--
+-- The representative fields are kept as JSONB so the rollup does not have to
+-- track the column types of wallet_watchlist.
+
+CREATE TABLE IF NOT EXISTS sifter_dev.wallet_watchlist_elite_agg (
+    wallet_address     TEXT PRIMARY KEY,
+    professional_score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    roi_30d            DOUBLE PRECISION NOT NULL DEFAULT 0,
+    runners_30d        DOUBLE PRECISION NOT NULL DEFAULT 0,
+    times_added        INTEGER NOT NULL DEFAULT 0,
+    composite_score    DOUBLE PRECISION NOT NULL DEFAULT 0,
+    representative     JSONB NOT NULL DEFAULT '{}'::jsonb,
+    refreshed_at       TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_elite_agg_composite
+    ON sifter_dev.wallet_watchlist_elite_agg (composite_score DESC, wallet_address);
+CREATE INDEX IF NOT EXISTS idx_elite_agg_roi
+    ON sifter_dev.wallet_watchlist_elite_agg (roi_30d DESC, wallet_address);
+CREATE INDEX IF NOT EXISTS idx_elite_agg_runners
+    ON sifter_dev.wallet_watchlist_elite_agg (runners_30d DESC, wallet_address);
+
+ALTER TABLE sifter_dev.wallet_watchlist_elite_agg ENABLE ROW LEVEL SECURITY;
+
+
+-- Recompute the rollup for p_wallets (NULL = every wallet). Wallets that are
+-- no longer on any watchlist are removed. Returns the number of rows upserted.
+CREATE OR REPLACE FUNCTION sifter_dev.refresh_elite_agg(p_wallets TEXT[] DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = sifter_dev, pg_temp
+AS $$
+DECLARE
+    v_upserted INTEGER;
+BEGIN
+    DELETE FROM sifter_dev.wallet_watchlist_elite_agg AS a
+    WHERE (p_wallets IS NULL OR a.wallet_address = ANY(p_wallets))
+      AND NOT EXISTS (
+          SELECT 1 FROM sifter_dev.wallet_watchlist w
+          WHERE w.wallet_address = a.wallet_address
+      );
+
+    INSERT INTO sifter_dev.wallet_watchlist_elite_agg AS a (
+        wallet_address, professional_score, roi_30d, runners_30d,
+        times_added, composite_score, representative, refreshed_at
+    )
+    SELECT g.wallet_address, g.professional_score, g.roi_30d, g.runners_30d,
+           g.times_added,
+           g.professional_score * 0.40
+             + LEAST(100, g.roi_30d / 500 * 100) * 0.30
+             + LEAST(100, g.runners_30d / 20 * 100) * 0.20
+             + COALESCE((g.representative->>'win_rate_7d')::DOUBLE PRECISION, 0) * 0.10,
+           g.representative,
+           NOW()
+    FROM (
+        SELECT w.wallet_address,
+               MAX(COALESCE(w.professional_score, 0))::DOUBLE PRECISION AS professional_score,
+               MAX(COALESCE(w.roi_30d, 0))::DOUBLE PRECISION            AS roi_30d,
+               MAX(COALESCE(w.runners_30d, 0))::DOUBLE PRECISION        AS runners_30d,
+               COUNT(*)::INTEGER                                         AS times_added,
+               (ARRAY_AGG(
+                    jsonb_build_object(
+                        'tier', w.tier,
+                        'win_rate_7d', w.win_rate_7d,
+                        'consistency_score', w.consistency_score,
+                        'last_trade_time', w.last_trade_time,
+                        'form', w.form
+                    )
+                    ORDER BY w.professional_score DESC NULLS LAST, w.last_updated DESC NULLS LAST
+               ))[1] AS representative
+        FROM sifter_dev.wallet_watchlist w
+        WHERE p_wallets IS NULL OR w.wallet_address = ANY(p_wallets)
+        GROUP BY w.wallet_address
+    ) AS g
+    ON CONFLICT (wallet_address) DO UPDATE
+    SET professional_score = EXCLUDED.professional_score,
+        roi_30d            = EXCLUDED.roi_30d,
+        runners_30d        = EXCLUDED.runners_30d,
+        times_added        = EXCLUDED.times_added,
+        composite_score    = EXCLUDED.composite_score,
+        representative     = EXCLUDED.representative,
+        refreshed_at       = EXCLUDED.refreshed_at;
+
+    GET DIAGNOSTICS v_upserted = ROW_COUNT;
+    RETURN v_upserted;
+END;
+$$;
+
+
+-- Transition tables are per-event, so each event gets its own trigger
+-- function; all three hand the touched wallets to refresh_elite_agg.
+-- SECURITY DEFINER so watchlist writes made under a user role can still
+-- maintain the (RLS-locked) rollup.
+CREATE OR REPLACE FUNCTION sifter_dev.elite_agg_after_insert()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = sifter_dev, pg_temp
+AS $$
+BEGIN
+    PERFORM sifter_dev.refresh_elite_agg(ARRAY(SELECT DISTINCT wallet_address FROM new_rows));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sifter_dev.elite_agg_after_update()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = sifter_dev, pg_temp
+AS $$
+BEGIN
+    PERFORM sifter_dev.refresh_elite_agg(ARRAY(
+        SELECT wallet_address FROM new_rows
+        UNION
+        SELECT wallet_address FROM old_rows
+    ));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sifter_dev.elite_agg_after_delete()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = sifter_dev, pg_temp
+AS $$
+BEGIN
+    PERFORM sifter_dev.refresh_elite_agg(ARRAY(SELECT DISTINCT wallet_address FROM old_rows));
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_elite_agg_insert ON sifter_dev.wallet_watchlist;
+CREATE TRIGGER trg_elite_agg_insert
+    AFTER INSERT ON sifter_dev.wallet_watchlist
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sifter_dev.elite_agg_after_insert();
+
+DROP TRIGGER IF EXISTS trg_elite_agg_update ON sifter_dev.wallet_watchlist;
+CREATE TRIGGER trg_elite_agg_update
+    AFTER UPDATE ON sifter_dev.wallet_watchlist
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sifter_dev.elite_agg_after_update();
+
+DROP TRIGGER IF EXISTS trg_elite_agg_delete ON sifter_dev.wallet_watchlist;
+CREATE TRIGGER trg_elite_agg_delete
+    AFTER DELETE ON sifter_dev.wallet_watchlist
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sifter_dev.elite_agg_after_delete();
+
+
+-- Ranked top-N for generate_elite_100. Each sort has its own branch so the
+-- matching index drives the scan.
+CREATE OR REPLACE FUNCTION sifter_dev.elite_top_wallets(p_sort TEXT DEFAULT 'score', p_limit INTEGER DEFAULT 100)
+RETURNS SETOF sifter_dev.wallet_watchlist_elite_agg
+LANGUAGE plpgsql
+STABLE
+SET search_path = sifter_dev, pg_temp
+AS $$
+BEGIN
+    IF p_sort = 'roi' THEN
+        RETURN QUERY SELECT * FROM sifter_dev.wallet_watchlist_elite_agg
+            ORDER BY roi_30d DESC, wallet_address LIMIT p_limit;
+    ELSIF p_sort = 'runners' THEN
+        RETURN QUERY SELECT * FROM sifter_dev.wallet_watchlist_elite_agg
+            ORDER BY runners_30d DESC, wallet_address LIMIT p_limit;
+    ELSE
+        RETURN QUERY SELECT * FROM sifter_dev.wallet_watchlist_elite_agg
+            ORDER BY composite_score DESC, wallet_address LIMIT p_limit;
+    END IF;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION sifter_dev.refresh_elite_agg(TEXT[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION sifter_dev.refresh_elite_agg(TEXT[]) TO service_role;
+REVOKE ALL ON FUNCTION sifter_dev.elite_top_wallets(TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION sifter_dev.elite_top_wallets(TEXT, INTEGER) TO service_role;
+
+-- Backfill from the current watchlists.
+SELECT sifter_dev.refresh_elite_agg();
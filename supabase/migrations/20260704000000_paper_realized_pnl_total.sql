@@ -0,0 +1,18 @@
+-- Realized PnL total for PortfolioLedger.
+--
+-- The ledger used to select realized_pnl_usd from every paper_trade_positions
+-- row and sum it in Python. That pulled the whole table over the wire, and
+-- PostgREST capped the response at max-rows, so the total silently covered
+-- only the first 1000 positions. The sum now happens in the database.
+
+CREATE OR REPLACE FUNCTION sifter_dev.paper_realized_pnl_total()
+RETURNS NUMERIC
+LANGUAGE sql
+STABLE
+SET search_path = sifter_dev, pg_temp
+AS $$
+    SELECT COALESCE(SUM(realized_pnl_usd), 0) FROM sifter_dev.paper_trade_positions;
+$$;
+
+REVOKE ALL ON FUNCTION sifter_dev.paper_realized_pnl_total() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION sifter_dev.paper_realized_pnl_total() TO service_role;
@@ -0,0 +1,85 @@
+-- Serialize wallet_watchlist_elite_agg recomputes.
+--
+-- refresh_elite_agg runs from statement-level triggers. Under READ COMMITTED,
+-- two transactions writing watchlist rows for the same wallet could each
+-- recompute while the other's write was still uncommitted, and the later
+-- upsert would then store an aggregate missing the other write.
+-- The function now takes a transaction-scoped advisory lock per wallet before
+-- recomputing, so the second recompute waits for the first transaction to
+-- commit and then reads its rows.
+
+CREATE OR REPLACE FUNCTION sifter_dev.refresh_elite_agg(p_wallets TEXT[] DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SET search_path = sifter_dev, pg_temp
+AS $$
+DECLARE
+    v_upserted INTEGER;
+    v_wallet   TEXT;
+BEGIN
+    -- Serialize recomputes per wallet. Each statement below takes a fresh
+    -- snapshot, so once the lock is held the recompute sees every watchlist
+    -- write committed by an earlier holder. Locks go in sorted order so two
+    -- multi-wallet statements can't deadlock. A full refresh excludes all
+    -- per-wallet recomputes for its duration.
+    IF p_wallets IS NULL THEN
+        PERFORM pg_advisory_xact_lock(hashtext('sifter_dev.refresh_elite_agg'));
+    ELSE
+        PERFORM pg_advisory_xact_lock_shared(hashtext('sifter_dev.refresh_elite_agg'));
+        FOR v_wallet IN SELECT DISTINCT w FROM unnest(p_wallets) AS w ORDER BY w LOOP
+            PERFORM pg_advisory_xact_lock(hashtext('sifter_dev.elite_agg'), hashtext(v_wallet));
+        END LOOP;
+    END IF;
+
+    DELETE FROM sifter_dev.wallet_watchlist_elite_agg AS a
+    WHERE (p_wallets IS NULL OR a.wallet_address = ANY(p_wallets))
+      AND NOT EXISTS (
+          SELECT 1 FROM sifter_dev.wallet_watchlist w
+          WHERE w.wallet_address = a.wallet_address
+      );
+
+    INSERT INTO sifter_dev.wallet_watchlist_elite_agg AS a (
+        wallet_address, professional_score, roi_30d, runners_30d,
+        times_added, composite_score, representative, refreshed_at
+    )
+    SELECT g.wallet_address, g.professional_score, g.roi_30d, g.runners_30d,
+           g.times_added,
+           g.professional_score * 0.40
+             + LEAST(100, g.roi_30d / 500 * 100) * 0.30
+             + LEAST(100, g.runners_30d / 20 * 100) * 0.20
+             + COALESCE((g.representative->>'win_rate_7d')::DOUBLE PRECISION, 0) * 0.10,
+           g.representative,
+           NOW()
+    FROM (
+        SELECT w.wallet_address,
+               MAX(COALESCE(w.professional_score, 0))::DOUBLE PRECISION AS professional_score,
+               MAX(COALESCE(w.roi_30d, 0))::DOUBLE PRECISION            AS roi_30d,
+               MAX(COALESCE(w.runners_30d, 0))::DOUBLE PRECISION        AS runners_30d,
+               COUNT(*)::INTEGER                                         AS times_added,
+               (ARRAY_AGG(
+                    jsonb_build_object(
+                        'tier', w.tier,
+                        'win_rate_7d', w.win_rate_7d,
+                        'consistency_score', w.consistency_score,
+                        'last_trade_time', w.last_trade_time,
+                        'form', w.form
+                    )
+                    ORDER BY w.professional_score DESC NULLS LAST, w.last_updated DESC NULLS LAST
+               ))[1] AS representative
+        FROM sifter_dev.wallet_watchlist w
+        WHERE p_wallets IS NULL OR w.wallet_address = ANY(p_wallets)
+        GROUP BY w.wallet_address
+    ) AS g
+    ON CONFLICT (wallet_address) DO UPDATE
+    SET professional_score = EXCLUDED.professional_score,
+        roi_30d            = EXCLUDED.roi_30d,
+        runners_30d        = EXCLUDED.runners_30d,
+        times_added        = EXCLUDED.times_added,
+        composite_score    = EXCLUDED.composite_score,
+        representative     = EXCLUDED.representative,
+        refreshed_at       = EXCLUDED.refreshed_at;
+
+    GET DIAGNOSTICS v_upserted = ROW_COUNT;
+    RETURN v_upserted;
+END;
+$$;